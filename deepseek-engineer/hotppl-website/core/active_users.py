@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Active Users
+HyperLogLog sketches of distinct active users per minute, hour and day
+"""
+
+import hashlib
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from database import db
+
+PRECISION = 12  # 4096 one-byte registers per sketch
+FLUSH_INTERVAL = 60.0
+
+# (bucket seconds, retention seconds), finest first
+TIERS = (
+    (60, 26 * 3600),
+    (3600, 35 * 86400),
+    (86400, 400 * 86400)
+)
+
+# Every logged event with a user sets one register in the sketch of its
+# minute, its hour and its day; a sketch is 4KB whatever the number of users
+# and any set of sketches merges by register-wise max. A window is covered
+# with the coarsest aligned buckets that fit (days, then hours, then minutes
+# at the ragged ends), so a 30-day count merges about 100 sketches instead
+# of scanning the events. Edges older than a tier's retention fall back to
+# the enclosing coarser bucket, rounding the window start down to the hour
+# or day. Counts have a standard error of 1.04 / sqrt(4096) = 1.6%. Dirty
+# sketches are written to active_user_sketches at most every FLUSH_INTERVAL
+# seconds and reloaded on first use after a restart.
+
+REGISTER_WEIGHTS = np.exp2(-np.arange(65, dtype=np.float64))
+
+def register_position(item: str, precision: int = PRECISION) -> Tuple[int, int]:
+    """(register index, rank) of an item's 64-bit hash"""
+    h = int.from_bytes(hashlib.blake2b(item.encode(), digest_size=8).digest(), 'big')
+    rest_bits = 64 - precision
+    rest = h & ((1 << rest_bits) - 1)
+    return h >> rest_bits, rest_bits - rest.bit_length() + 1
+
+class HyperLogLog:
+    def __init__(self, precision: int = PRECISION, registers: np.ndarray = None):
+        self.precision = precision
+        self.registers = registers if registers is not None else np.zeros(1 << precision, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        """Standard error of count()"""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def add(self, item: str):
+        index, rank = register_position(item, self.precision)
+        if self.registers[index] < rank:
+            self.registers[index] = rank
+
+    def merge(self, other: 'HyperLogLog'):
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+    def count(self) -> int:
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / REGISTER_WEIGHTS[self.registers].sum()
+        zeros = m - np.count_nonzero(self.registers)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small cardinalities
+        return int(round(estimate))
+
+class ActiveUserSketches:
+    def __init__(self, precision: int = PRECISION, flush_interval: float = FLUSH_INTERVAL):
+        self.precision = precision
+        self.flush_interval = flush_interval
+        self.buckets: Dict[int, Dict[int, np.ndarray]] = {width: {} for width, _ in TIERS}
+        self.dirty = set()
+        self.loaded_path: Optional[str] = None
+        self.last_flush = time.time()
+        self.lock = threading.Lock()
+
+        self.metrics = {
+            'users_added': 0,
+            'queries': 0,
+            'sketches_merged': 0,
+            'flushes': 0
+        }
+
+    def add(self, user_id: str, when: datetime = None):
+        """Record user_id as active at when"""
+        timestamp = int((when or datetime.now()).timestamp())
+        index, rank = register_position(user_id, self.precision)
+        now = time.time()
+        with self.lock:
+            self._ensure_loaded()
+            self._set(timestamp, index, rank, now)
+            self.metrics['users_added'] += 1
+            if now - self.last_flush >= self.flush_interval:
+                self._flush()
+
+    def _set(self, timestamp: int, index: int, rank: int, now: float):
+        for width, retention in TIERS:
+            start = timestamp - timestamp % width
+            if start <= now - retention - width:
+                continue  # older than this tier keeps
+            registers = self.buckets[width].get(start)
+            if registers is None:
+                registers = self.buckets[width][start] = np.zeros(1 << self.precision, dtype=np.uint8)
+            if registers[index] < rank:
+                registers[index] = rank
+                self.dirty.add((width, start))
+
+    def count(self, since: datetime, until: datetime = None) -> int:
+        """Approximate distinct users active in [since, until)"""
+        return self.sketch(since, until).count()
+
+    def sketch(self, since: datetime, until: datetime = None) -> HyperLogLog:
+        """Merged sketch of every user active in [since, until)"""
+        now = time.time()
+        end = int(until.timestamp()) if until else int(now) + 1
+        t = int(since.timestamp())
+        t -= t % TIERS[0][0]
+        merged = HyperLogLog(self.precision)
+        with self.lock:
+            self._ensure_loaded()
+            while t < end:
+                tier = next((i for i in range(len(TIERS) - 1, 0, -1)
+                             if t % TIERS[i][0] == 0 and t + TIERS[i][0] <= end), 0)
+                width = TIERS[tier][0]
+                while tier < len(TIERS) - 1 and t < now - TIERS[tier][1]:
+                    tier += 1  # pruned from this tier; use the enclosing coarser bucket
+                    width = TIERS[tier][0]
+                start = t - t % width
+                registers = self.buckets[width].get(start)
+                if registers is not None:
+                    np.maximum(merged.registers, registers, out=merged.registers)
+                    self.metrics['sketches_merged'] += 1
+                t = start + width
+        self.metrics['queries'] += 1
+        return merged
+
+    def _ensure_loaded(self):
+        # The sketches belong to one database; reload when it changes
+        if self.loaded_path != db.db_path:
+            self._load()
+
+    def _load(self):
+        now = time.time()
+        self.buckets = {width: {} for width, _ in TIERS}
+        self.dirty = set()
+        self.loaded_path = db.db_path
+
+        conn = sqlite3.connect(db.db_path)
+        try:
+            for width, retention in TIERS:
+                rows = conn.execute('''
+                    SELECT bucket_start, registers FROM active_user_sketches
+                    WHERE bucket_seconds = ? AND bucket_start > ?
+                ''', (width, now - retention - width)).fetchall()
+                for start, blob in rows:
+                    self.buckets[width][start] = np.frombuffer(blob, dtype=np.uint8).copy()
+        finally:
+            conn.close()
+        if not any(self.buckets.values()):
+            self._backfill(now - TIERS[-1][1])
+
+    def _backfill(self, since: float):
+        """Build sketches from logged events, for a database that has none yet"""
+        conn = sqlite3.connect(db.db_path)
+        try:
+            rows = conn.execute('''
+                SELECT user_id, timestamp FROM analytics WHERE timestamp >= ? AND user_id IS NOT NULL
+            ''', (datetime.fromtimestamp(since),)).fetchall()
+        finally:
+            conn.close()
+        now = time.time()
+        for user_id, timestamp in rows:
+            index, rank = register_position(user_id, self.precision)
+            self._set(int(datetime.fromisoformat(timestamp).timestamp()), index, rank, now)
+        if rows:
+            print(f"📊 Active user sketches backfilled from {len(rows)} events")
+
+    def flush(self):
+        """Persist dirty sketches and prune expired ones"""
+        with self.lock:
+            self._ensure_loaded()
+            self._flush()
+
+    def _flush(self):
+        now = time.time()
+        rows = [(width, start, self.buckets[width][start].tobytes()) for width, start in self.dirty
+                if start in self.buckets[width]]
+        conn = sqlite3.connect(db.db_path)
+        try:
+            conn.executemany('''
+                INSERT OR REPLACE INTO active_user_sketches (bucket_seconds, bucket_start, registers)
+                VALUES (?, ?, ?)
+            ''', rows)
+            for width, retention in TIERS:
+                # Buckets overlapping the retention window are kept
+                cutoff = now - retention - width
+                for start in [start for start in self.buckets[width] if start <= cutoff]:
+                    del self.buckets[width][start]
+                conn.execute('DELETE FROM active_user_sketches WHERE bucket_seconds = ? AND bucket_start <= ?',
+                             (width, cutoff))
+            conn.commit()
+        finally:
+            conn.close()
+        self.dirty = set()
+        self.last_flush = now
+        self.metrics['flushes'] += 1
+
+    def get_metrics(self) -> Dict[str, int]:
+        metrics = dict(self.metrics)
+        metrics['sketches'] = sum(len(buckets) for buckets in self.buckets.values())
+        return metrics
@@ -5,14 +5,12 @@ Advanced AI-powered content analysis, voice cloning, and trend detection
 """
 
 import asyncio
-import aiohttp
 import cv2
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 import json
 import os
-import tempfile
 import subprocess
 from dataclasses import dataclass, asdict
 from enum import Enum
@@ -23,8 +21,13 @@ from transformers import pipeline, AutoModel, AutoTokenizer
 import openai
 from google.cloud import videointelligence, speech, translate_v2 as translate
 
-from database import db, Submission, User
+from database import db, Submission, User, SubmissionStatus, UserRole
 from analytics_service import analytics_service
+from inference_batcher import InferenceBatcher
+from analysis_cache import AnalysisCache
+from download_manager import DownloadManager
+from job_queue import DurableJobQueue, JobLane
+from frame_quality import stack_frames, score_frame_batch, summarize_quality
 
 class ContentQuality(Enum):
     POOR = 1
@@ -66,6 +69,11 @@ class AdvancedAIProcessor:
         self.trend_detector = None
         self.quality_assessor = None
         
+        # Micro-batchers shared by all in-flight submissions
+        self.video_batcher = None
+        self.audio_batcher = None
+        self.text_batcher = None
+        
         # Google Cloud clients
         self.video_client = videointelligence.VideoIntelligenceServiceClient()
         self.speech_client = speech.SpeechClient()
@@ -74,9 +82,18 @@ class AdvancedAIProcessor:
         # OpenAI client
         openai.api_key = os.getenv('OPENAI_API_KEY')
         
-        # Processing queues
-        self.processing_queue = asyncio.Queue()
-        self.priority_queue = asyncio.Queue()
+        # Shared, bounded downloader for submission videos
+        self.downloader = DownloadManager()
+        
+        # Content-addressed cache of frame- and audio-level results
+        self.analysis_cache = AnalysisCache()
+        
+        # Longest side frames are downscaled to before quality scoring; sharpness uses full resolution
+        self.quality_max_side = 480
+        
+        # Durable processing queue with priority and regular lanes
+        self.job_queue = DurableJobQueue(os.getenv('HOTPPL_JOB_DB', 'hotppl_jobs.db'))
+        self.idle_poll_interval = 0.5
         
         # Performance metrics
         self.metrics = {
@@ -109,6 +126,14 @@ class AdvancedAIProcessor:
             # Quality assessment model (custom trained)
             self.quality_assessor = self.load_quality_model()
             
+            # Batch requests across submissions instead of one pipeline call each
+            self.video_batcher = InferenceBatcher('video', self.video_analyzer,
+                                                  max_batch_size=4, max_wait_ms=50)
+            self.audio_batcher = InferenceBatcher('audio', self.audio_analyzer,
+                                                  max_batch_size=8, max_wait_ms=30)
+            self.text_batcher = InferenceBatcher('text', self.text_analyzer,
+                                                 max_batch_size=32, max_wait_ms=10)
+            
             print("✅ AI models initialized")
             
         except Exception as e:
@@ -143,9 +168,10 @@ class AdvancedAIProcessor:
         print(f"🎬 Processing submission: {submission.title}")
         
         try:
-            # Add to appropriate queue
-            queue = self.priority_queue if priority else self.processing_queue
-            await queue.put((submission, user, start_time))
+            # Persist to the appropriate lane so a restart doesn't lose it
+            lane = JobLane.PRIORITY if priority else JobLane.REGULAR
+            await asyncio.to_thread(self.job_queue.enqueue,
+                                    self._encode_job(submission, user, start_time), lane)
             
             # Return placeholder analysis (actual processing happens in worker)
             return ContentAnalysis(
@@ -171,50 +197,134 @@ class AdvancedAIProcessor:
     
     async def process_queue_worker(self):
         """Worker for processing regular submissions"""
-        while True:
-            try:
-                submission, user, start_time = await self.processing_queue.get()
-                analysis = await self.analyze_submission(submission, user, start_time)
-                await self.store_analysis(analysis)
-                self.processing_queue.task_done()
-                
-            except Exception as e:
-                print(f"❌ Queue worker error: {e}")
-                await asyncio.sleep(5)
+        await self.run_queue_worker(JobLane.REGULAR)
     
     async def priority_queue_worker(self):
         """Worker for processing priority submissions"""
+        await self.run_queue_worker(JobLane.PRIORITY)
+    
+    async def run_queue_worker(self, lane: str):
+        """Claim jobs from one lane, retrying failures with backoff"""
+        priority = lane == JobLane.PRIORITY
+        
         while True:
+            job = None
             try:
-                submission, user, start_time = await self.priority_queue.get()
-                analysis = await self.analyze_submission(submission, user, start_time, priority=True)
+                job = await asyncio.to_thread(self.job_queue.claim, lane)
+                if job is None:
+                    await asyncio.sleep(self.idle_poll_interval)
+                    continue
+                
+                submission, user, start_time = self._decode_job(job.payload)
+                heartbeat = asyncio.create_task(self._hold_lease(job))
+                try:
+                    analysis = await self.analyze_submission(submission, user, start_time, priority=priority)
+                finally:
+                    heartbeat.cancel()
+                
+                if analysis.status == ProcessingStatus.FAILED:
+                    error = analysis.visual_analysis.get('error', 'analysis failed')
+                    status = await asyncio.to_thread(self.job_queue.nack, job.id, job.lease_id, error)
+                    if status == 'dead':
+                        # Out of retries: record the failure
+                        await self.store_analysis(analysis)
+                    continue
+                
                 await self.store_analysis(analysis)
-                self.priority_queue.task_done()
+                await asyncio.to_thread(self.job_queue.ack, job.id, job.lease_id)
                 
             except Exception as e:
-                print(f"❌ Priority worker error: {e}")
-                await asyncio.sleep(5)
+                print(f"❌ {lane.title()} worker error: {e}")
+                if job is not None:
+                    await asyncio.to_thread(self.job_queue.nack, job.id, job.lease_id, str(e))
+                else:
+                    await asyncio.sleep(self.idle_poll_interval)
+    
+    async def _hold_lease(self, job):
+        """Keep extending a job's lease while it is being analyzed"""
+        interval = self.job_queue.visibility_timeout / 3
+        while True:
+            await asyncio.sleep(interval)
+            if not await asyncio.to_thread(self.job_queue.extend_lease, job.id, job.lease_id):
+                print(f"⚠️ Lost lease on job {job.id}")
+                return
+    
+    def _encode_job(self, submission: Submission, user: User, start_time: datetime) -> Dict[str, Any]:
+        """Serialize a queued submission for the durable queue"""
+        submission_data = asdict(submission)
+        submission_data['status'] = submission.status.value
+        user_data = asdict(user)
+        user_data['role'] = user.role.value
+        
+        return {
+            'submission': submission_data,
+            'user': user_data,
+            'start_time': start_time.isoformat()
+        }
+    
+    def _decode_job(self, payload: Dict[str, Any]) -> Tuple[Submission, User, datetime]:
+        """Rebuild the submission, user and start time from a queued job"""
+        submission_data = dict(payload['submission'])
+        submission_data['status'] = SubmissionStatus(submission_data['status'])
+        for field in ('created_at', 'updated_at'):
+            submission_data[field] = datetime.fromisoformat(submission_data[field])
+        
+        user_data = dict(payload['user'])
+        user_data['role'] = UserRole(user_data['role'])
+        for field in ('created_at', 'last_active'):
+            user_data[field] = datetime.fromisoformat(user_data[field])
+        
+        return Submission(**submission_data), User(**user_data), datetime.fromisoformat(payload['start_time'])
     
     async def analyze_submission(self, submission: Submission, user: User, 
                                start_time: datetime, priority: bool = False) -> ContentAnalysis:
         """Comprehensive submission analysis"""
         
+        video_path = None
         try:
             # Download video
             video_path = await self.download_video(submission.video_url)
             
-            # Parallel analysis
-            tasks = [
-                self.analyze_video_content(video_path, submission.scene_name),
-                self.analyze_audio_content(video_path),
-                self.analyze_technical_quality(video_path),
-                self.assess_creativity(submission, user),
-                self.detect_trends(submission, video_path)
-            ]
-            
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            # Re-submitted clips reuse their frame- and audio-level results
+            fingerprint, cached = await asyncio.to_thread(self.analysis_cache.lookup, video_path)
             
-            visual_analysis, audio_analysis, technical_analysis, creativity_analysis, trend_analysis = results
+            if cached:
+                audio_analysis = cached['audio_analysis']
+                technical_analysis = cached['technical_analysis']
+                
+                # The cache holds clip-level results only; score this submission's scene
+                results = await asyncio.gather(
+                    self.score_scene(video_path, submission.scene_name),
+                    self.assess_creativity(submission, user),
+                    self.detect_trends(submission, video_path),
+                    return_exceptions=True
+                )
+                scene_accuracy, creativity_analysis, trend_analysis = results
+                if isinstance(scene_accuracy, Exception):
+                    scene_accuracy = 0.0
+                visual_analysis = {**cached['visual_analysis'], 'scene_accuracy': scene_accuracy}
+            else:
+                # Parallel analysis
+                tasks = [
+                    self.analyze_video_content(video_path, submission.scene_name),
+                    self.analyze_audio_content(video_path),
+                    self.analyze_technical_quality(video_path),
+                    self.assess_creativity(submission, user),
+                    self.detect_trends(submission, video_path)
+                ]
+                
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+                
+                visual_analysis, audio_analysis, technical_analysis, creativity_analysis, trend_analysis = results
+                
+                # Only cache sections that completed cleanly
+                sections = {
+                    'visual_analysis': visual_analysis,
+                    'audio_analysis': audio_analysis,
+                    'technical_analysis': technical_analysis
+                }
+                if all(isinstance(section, dict) and 'error' not in section for section in sections.values()):
+                    await asyncio.to_thread(self.analysis_cache.store, fingerprint, sections)
             
             # Calculate overall scores
             quality_score = self.calculate_quality_score(visual_analysis, audio_analysis, technical_analysis)
@@ -236,9 +346,6 @@ class AdvancedAIProcessor:
             # Update metrics
             self.update_metrics(content_quality, processing_time, voice_clone_data is not None)
             
-            # Clean up
-            os.unlink(video_path)
-            
             return ContentAnalysis(
                 submission_id=submission.id,
                 quality_score=quality_score,
@@ -259,33 +366,42 @@ class AdvancedAIProcessor:
         except Exception as e:
             print(f"❌ Analysis failed: {e}")
             return self.create_failed_analysis(submission.id, str(e))
+        
+        finally:
+            # Clean up, whether analysis succeeded or not
+            if video_path:
+                self.downloader.cleanup(video_path)
     
     async def download_video(self, video_url: str) -> str:
         """Download video for processing"""
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp4')
+        return await self.downloader.download(video_url)
+    
+    def sample_frames(self, video_path: str, count: int = 10) -> List[np.ndarray]:
+        """Read the first frames of a video for analysis"""
+        cap = cv2.VideoCapture(video_path)
+        frames = []
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(video_url) as response:
-                with open(temp_file.name, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(8192):
-                        f.write(chunk)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
         
-        return temp_file.name
+        cap.release()
+        return frames
+    
+    async def score_scene(self, video_path: str, scene_name: str) -> float:
+        """Scene accuracy alone, for clips whose other results came from the cache"""
+        frames = await asyncio.to_thread(self.sample_frames, video_path)
+        if not frames:
+            return 0.0
+        return await self.calculate_scene_accuracy(frames, scene_name)
     
     async def analyze_video_content(self, video_path: str, scene_name: str) -> Dict[str, Any]:
         """Analyze video content and scene accuracy"""
         try:
             # Extract frames
-            cap = cv2.VideoCapture(video_path)
-            frames = []
-            
-            while len(frames) < 10:  # Sample 10 frames
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                frames.append(frame)
-            
-            cap.release()
+            frames = self.sample_frames(video_path)
             
             if not frames:
                 return {'error': 'No frames extracted'}
@@ -293,20 +409,27 @@ class AdvancedAIProcessor:
             # Scene-specific analysis
             scene_accuracy = await self.calculate_scene_accuracy(frames, scene_name)
             
+            # Frame-level metrics for the whole sample in one batched pass
+            frame_scores = score_frame_batch(stack_frames(frames), max_side=self.quality_max_side)
+            
             # Visual quality metrics
-            visual_quality = self.assess_visual_quality(frames)
+            visual_quality = self.assess_visual_quality(frame_scores)
             
             # Object detection
             objects_detected = await self.detect_objects(frames)
             
             # Color analysis
-            color_analysis = self.analyze_colors(frames)
+            color_analysis = self.analyze_colors(frame_scores)
+            
+            # Action classification, batched with other in-flight submissions
+            classification = await self.classify_video(video_path)
             
             return {
                 'scene_accuracy': scene_accuracy,
                 'visual_quality': visual_quality,
                 'objects_detected': objects_detected,
                 'color_analysis': color_analysis,
+                'classification': classification,
                 'frame_count': len(frames)
             }
             
@@ -336,10 +459,14 @@ class AdvancedAIProcessor:
             # Music analysis
             music_analysis = self.analyze_music_sync(y, sr)
             
+            # Audio classification, batched with other in-flight submissions
+            classification = await self.classify_audio(audio_path)
+            
             # Clean up
             os.unlink(audio_path)
             
             return {
+                'classification': classification,
                 'tempo': float(tempo),
                 'spectral_centroid_mean': float(np.mean(spectral_centroids)),
                 'mfcc_features': mfccs.tolist(),
@@ -362,30 +489,24 @@ class AdvancedAIProcessor:
             height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
             frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
             
-            # Quality metrics
-            sharpness_scores = []
-            brightness_scores = []
+            # Sample frames, then score them as one batch
+            frames = []
             
             for i in range(0, frame_count, max(1, frame_count // 10)):
                 cap.set(cv2.CAP_PROP_POS_FRAMES, i)
                 ret, frame = cap.read()
                 if ret:
-                    # Sharpness (Laplacian variance)
-                    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                    sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
-                    sharpness_scores.append(sharpness)
-                    
-                    # Brightness
-                    brightness = np.mean(gray)
-                    brightness_scores.append(brightness)
+                    frames.append(frame)
             
             cap.release()
             
+            quality = summarize_quality(score_frame_batch(stack_frames(frames), max_side=self.quality_max_side))
+            
             # Calculate overall technical score
             resolution_score = min(1.0, (width * height) / (1920 * 1080))
             fps_score = min(1.0, fps / 30.0)
-            sharpness_score = min(1.0, np.mean(sharpness_scores) / 1000.0)
-            brightness_score = 1.0 - abs(np.mean(brightness_scores) - 128) / 128
+            sharpness_score = quality['sharpness_score']
+            brightness_score = quality['brightness_score']
             
             overall_score = (resolution_score + fps_score + sharpness_score + brightness_score) / 4
             
@@ -393,14 +514,37 @@ class AdvancedAIProcessor:
                 'resolution': {'width': width, 'height': height},
                 'fps': fps,
                 'frame_count': frame_count,
-                'sharpness_score': float(np.mean(sharpness_scores)),
-                'brightness_score': float(np.mean(brightness_scores)),
+                'sharpness_score': quality['sharpness'],
+                'brightness_score': quality['brightness'],
+                'contrast': quality['contrast'],
+                'motion': quality['motion'],
                 'overall_score': overall_score
             }
             
         except Exception as e:
             return {'error': str(e)}
     
+    def assess_visual_quality(self, frame_scores: Dict[str, Any]) -> float:
+        """Combine batched frame metrics into a 0-1 visual quality score"""
+        quality = summarize_quality(frame_scores)
+        
+        return (quality['sharpness_score'] + quality['brightness_score'] +
+                quality['contrast_score'] + quality['colorfulness_score']) / 4
+    
+    def analyze_colors(self, frame_scores: Dict[str, Any]) -> Dict[str, Any]:
+        """Summarize color usage from batched per-frame histograms"""
+        histograms = frame_scores['histograms']  # (N, 3, bins), BGR
+        mean_histogram = histograms.mean(axis=0)
+        bin_centers = (np.arange(histograms.shape[2]) + 0.5) * (256 / histograms.shape[2])
+        
+        return {
+            'dominant_channel': ['blue', 'green', 'red'][int(np.argmax(mean_histogram @ bin_centers))],
+            'channel_means': {name: float(mean_histogram[i] @ bin_centers)
+                              for i, name in enumerate(['blue', 'green', 'red'])},
+            'colorfulness': float(np.mean(frame_scores['colorfulness'])),
+            'histogram': mean_histogram.tolist()
+        }
+    
     async def assess_creativity(self, submission: Submission, user: User) -> Dict[str, Any]:
         """Assess creativity and originality"""
         try:
@@ -457,6 +601,53 @@ class AdvancedAIProcessor:
         except Exception as e:
             return []
     
+    async def classify_video(self, video_path: str) -> List[Dict[str, Any]]:
+        """Run video classification through the shared batcher"""
+        if not self.video_batcher:
+            return []
+        return await self.video_batcher.submit(video_path)
+    
+    async def classify_audio(self, audio_path: str) -> List[Dict[str, Any]]:
+        """Run audio classification through the shared batcher"""
+        if not self.audio_batcher:
+            return []
+        return await self.audio_batcher.submit(audio_path)
+    
+    async def classify_text(self, text: str) -> Dict[str, Any]:
+        """Run sentiment analysis through the shared batcher"""
+        return await self.text_batcher.submit(text)
+    
+    async def analyze_text_creativity(self, text: str) -> Dict[str, Any]:
+        """Score a submission description using the batched text classifier"""
+        if not text or not self.text_batcher:
+            return {'score': 0.5, 'sentiment': None}
+        
+        sentiment = await self.classify_text(text)
+        label = sentiment.get('label', '').lower()
+        confidence = float(sentiment.get('score', 0.0))
+        
+        # Confident, expressive descriptions score higher than neutral ones
+        score = 0.5 if label == 'neutral' else 0.5 + confidence * 0.5
+        
+        return {'score': score, 'sentiment': sentiment}
+    
+    def get_batching_metrics(self) -> Dict[str, Any]:
+        """Get batch size and queue wait metrics for each model"""
+        batchers = {
+            'video': self.video_batcher,
+            'audio': self.audio_batcher,
+            'text': self.text_batcher
+        }
+        return {name: batcher.get_metrics() for name, batcher in batchers.items() if batcher}
+    
+    def get_queue_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, dead letters and oldest job age"""
+        return self.job_queue.get_metrics()
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Get analysis cache hit-rate metrics"""
+        return self.analysis_cache.get_metrics()
+    
     # Additional helper methods would continue here...
     # (Voice cloning, quality calculation, etc.)
     
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Analysis Cache
+Content-addressed cache of frame-level and audio-level analysis results
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+HASH_CHUNK_SIZE = 1024 * 1024
+FRAME_SAMPLES = 8
+
+# Fields that depend on the submission rather than the clip; never cached, so
+# a clip re-submitted to another scene is scored against that scene
+SUBMISSION_FIELDS = {
+    'visual_analysis': ('scene_accuracy',)
+}
+
+@dataclass
+class VideoFingerprint:
+    content_hash: str  # sha256 of the file bytes
+    frame_hashes: List[int]  # 64-bit dHash per sampled frame
+
+def hash_file(path: str) -> str:
+    """Streaming sha256 of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def dhash_frame(frame: np.ndarray) -> int:
+    """64-bit difference hash of one frame, robust to re-encoding and resizing"""
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+def perceptual_hash(video_path: str, samples: int = FRAME_SAMPLES) -> List[int]:
+    """dHash of frames sampled evenly across the video"""
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+
+    hashes = []
+    positions = np.linspace(0, max(frame_count - 1, 0), num=samples, dtype=int) if frame_count > 0 else []
+    for position in positions:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+        ret, frame = cap.read()
+        if ret:
+            hashes.append(dhash_frame(frame))
+
+    cap.release()
+    return hashes
+
+def _json_default(value: Any):
+    """Serialize numpy scalars and arrays found in analysis results"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+class AnalysisCache:
+    """On-disk, LRU-evicted cache of analysis sections keyed by video fingerprint.
+
+    Lookups first try the exact content hash, then fall back to the nearest
+    perceptual hash so re-encoded or re-uploaded clips still hit.
+    """
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = 512 * 1024 * 1024,
+                 max_hamming_distance: float = 6.0):
+        self.cache_dir = cache_dir or os.getenv(
+            'HOTPPL_ANALYSIS_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'hotppl_analysis_cache')
+        )
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.db_path = os.path.join(self.cache_dir, 'analysis_cache.db')
+        self.max_bytes = max_bytes
+        self.max_hamming_distance = max_hamming_distance
+
+        # Perceptual hashes kept in memory for vectorized near-duplicate search
+        self._lock = threading.Lock()
+        self._keys: List[str] = []
+        self._frame_matrix = np.zeros((0, FRAME_SAMPLES), dtype=np.uint64)
+        self._frame_counts = np.zeros(0, dtype=np.int64)
+
+        # Performance metrics
+        self.metrics = {
+            'lookups': 0,
+            'exact_hits': 0,
+            'near_duplicate_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+        self.init_cache()
+
+    def init_cache(self):
+        """Initialize the cache index and load perceptual hashes"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                content_hash TEXT PRIMARY KEY,
+                frame_hashes TEXT NOT NULL, -- JSON array of 64-bit ints
+                results TEXT NOT NULL, -- JSON object
+                size_bytes INTEGER NOT NULL,
+                created_at TIMESTAMP NOT NULL,
+                last_access TIMESTAMP NOT NULL
+            )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_access ON analysis_cache(last_access)')
+        conn.commit()
+
+        cursor.execute('SELECT content_hash, frame_hashes FROM analysis_cache')
+        rows = cursor.fetchall()
+        conn.close()
+
+        with self._lock:
+            for content_hash, frame_hashes in rows:
+                self._index_frames(content_hash, json.loads(frame_hashes))
+
+    def fingerprint(self, video_path: str) -> VideoFingerprint:
+        """Compute the full fingerprint of a downloaded video"""
+        return VideoFingerprint(hash_file(video_path), perceptual_hash(video_path))
+
+    def lookup(self, video_path: str) -> Tuple[VideoFingerprint, Optional[Dict[str, Any]]]:
+        """Find cached results for a video, decoding frames only on an exact-hash miss"""
+        self.metrics['lookups'] += 1
+
+        content_hash = hash_file(video_path)
+        results = self.get(content_hash)
+        if results is not None:
+            self.metrics['exact_hits'] += 1
+            return VideoFingerprint(content_hash, []), results
+
+        fingerprint = VideoFingerprint(content_hash, perceptual_hash(video_path))
+        similar_hash = self.find_similar(fingerprint.frame_hashes)
+        if similar_hash:
+            results = self.get(similar_hash)
+            if results is not None:
+                self.metrics['near_duplicate_hits'] += 1
+                return fingerprint, results
+
+        self.metrics['misses'] += 1
+        return fingerprint, None
+
+    def get(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """Get cached results by exact content hash"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT results FROM analysis_cache WHERE content_hash = ?', (content_hash,))
+        row = cursor.fetchone()
+        if row:
+            cursor.execute('UPDATE analysis_cache SET last_access = ? WHERE content_hash = ?',
+                           (datetime.now(), content_hash))
+            conn.commit()
+        conn.close()
+
+        return json.loads(row[0]) if row else None
+
+    def find_similar(self, frame_hashes: List[int]) -> Optional[str]:
+        """Return the content hash of the closest cached video within the Hamming threshold"""
+        if not frame_hashes:
+            return None
+
+        with self._lock:
+            if not self._keys:
+                return None
+
+            query = np.zeros(FRAME_SAMPLES, dtype=np.uint64)
+            query[:len(frame_hashes)] = frame_hashes
+            compared = np.minimum(self._frame_counts, len(frame_hashes))
+
+            # Popcount of XOR per sampled frame, averaged over the frames both videos have
+            xor = np.bitwise_xor(self._frame_matrix, query)
+            bit_counts = np.unpackbits(xor.view(np.uint8), axis=1).reshape(len(self._keys), FRAME_SAMPLES, 64).sum(axis=2)
+            mask = np.arange(FRAME_SAMPLES) < compared[:, None]
+            distances = np.where(compared > 0, (bit_counts * mask).sum(axis=1) / np.maximum(compared, 1), np.inf)
+
+            best = int(np.argmin(distances))
+            if distances[best] <= self.max_hamming_distance:
+                return self._keys[best]
+        return None
+
+    def store(self, fingerprint: VideoFingerprint, results: Dict[str, Any]):
+        """Store the clip-level parts of analysis results and evict least recently used entries"""
+        results = dict(results)
+        for section, fields in SUBMISSION_FIELDS.items():
+            if isinstance(results.get(section), dict):
+                results[section] = {k: v for k, v in results[section].items() if k not in fields}
+        payload = json.dumps(results, default=_json_default)
+        now = datetime.now()
+
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            INSERT OR REPLACE INTO analysis_cache (content_hash, frame_hashes, results,
+                                                   size_bytes, created_at, last_access)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (fingerprint.content_hash, json.dumps(fingerprint.frame_hashes), payload,
+              len(payload), now, now))
+        conn.commit()
+
+        evicted = self._evict(cursor)
+        conn.commit()
+        conn.close()
+
+        with self._lock:
+            self._index_frames(fingerprint.content_hash, fingerprint.frame_hashes)
+            if evicted:
+                self._drop_frames(evicted)
+
+        self.metrics['stores'] += 1
+        self.metrics['evictions'] += len(evicted)
+
+    def _evict(self, cursor) -> List[str]:
+        """Delete least recently used entries until the cache fits in max_bytes"""
+        cursor.execute('SELECT COALESCE(SUM(size_bytes), 0) FROM analysis_cache')
+        total = cursor.fetchone()[0]
+        if total <= self.max_bytes:
+            return []
+
+        evicted = []
+        cursor.execute('SELECT content_hash, size_bytes FROM analysis_cache ORDER BY last_access ASC')
+        for content_hash, size_bytes in cursor.fetchall():
+            if total <= self.max_bytes:
+                break
+            evicted.append(content_hash)
+            total -= size_bytes
+
+        cursor.executemany('DELETE FROM analysis_cache WHERE content_hash = ?',
+                           [(content_hash,) for content_hash in evicted])
+        return evicted
+
+    def _index_frames(self, content_hash: str, frame_hashes: List[int]):
+        """Add or replace one row of the in-memory perceptual hash matrix"""
+        if content_hash in self._keys:
+            self._drop_frames([content_hash])
+        if not frame_hashes:
+            return
+
+        row = np.zeros((1, FRAME_SAMPLES), dtype=np.uint64)
+        row[0, :min(len(frame_hashes), FRAME_SAMPLES)] = frame_hashes[:FRAME_SAMPLES]
+        self._keys.append(content_hash)
+        self._frame_matrix = np.vstack([self._frame_matrix, row])
+        self._frame_counts = np.append(self._frame_counts, min(len(frame_hashes), FRAME_SAMPLES))
+
+    def _drop_frames(self, content_hashes: List[str]):
+        """Remove rows from the in-memory perceptual hash matrix"""
+        drop = set(content_hashes)
+        keep = [i for i, key in enumerate(self._keys) if key not in drop]
+        self._keys = [self._keys[i] for i in keep]
+        self._frame_matrix = self._frame_matrix[keep]
+        self._frame_counts = self._frame_counts[keep]
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get cache hit-rate metrics"""
+        lookups = self.metrics['lookups']
+        hits = self.metrics['exact_hits'] + self.metrics['near_duplicate_hits']
+        return {
+            **self.metrics,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': len(self._keys)
+        }
@@ -6,13 +6,19 @@ Comprehensive analytics and metrics tracking for the platform
 
 import sqlite3
 import json
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass
 import uuid
-from collections import defaultdict
 
 from database import db
+from active_users import ActiveUserSketches
+from anomaly_detector import StreamingAnomalyDetector
+from heavy_hitters import HeavyHitters
+from trending import LOOKBACK_HALF_LIVES, TrendingIndex
+
+HEAVY_HITTER_RECONCILE_SECONDS = 900  # exact SQL counts replace the streaming summaries this often
 
 @dataclass
 class AnalyticsEvent:
@@ -44,13 +50,36 @@ class AdvancedAnalyticsService:
             
             # Platform events
             'page_view', 'api_call', 'error_occurred', 'feature_used',
+            'submission_error', 'sync_event_processed', 'sync_event_failed',
             
             # Challenge events
             'challenge_started', 'challenge_ended', 'challenge_participated',
             
             # Content events
-            'content_processed', 'content_moderated', 'content_trending'
+            'content_processed', 'content_moderated', 'content_trending',
+            
+            # Creator economy events
+            'points_awarded', 'creator_promoted', 'collaboration_matched',
+            
+            # Viral engine events
+            'viral_campaign_launched', 'viral_metrics_updated', 'post_went_viral'
         }
+
+        # Rolling per-metric baselines; alerts reach the dashboard and sync engine
+        self.anomaly_detector = StreamingAnomalyDetector()
+        
+        # Distinct active users per minute/hour/day, mergeable over any window
+        self.active_users = ActiveUserSketches()
+        
+        # Top scenes, tools, active users and commands, updated as events arrive
+        self.heavy_hitters = HeavyHitters()
+        self.heavy_hitters_source = None  # database the summaries were last reconciled against
+        self.heavy_hitters_reconciled_at = 0.0
+        db.submission_listeners.append(self._track_submission)
+        
+        # Decayed vote scores in rank order, rebuilt from the votes table on first read
+        self.trending = TrendingIndex()
+        self.trending_source = None
     
     def log_event(self, event_type: str, event_data: Dict[str, Any], 
                   user_id: str = None, submission_id: str = None,
@@ -90,11 +119,124 @@ class AdvancedAnalyticsService:
     
     def _process_real_time_metrics(self, event: AnalyticsEvent):
         """Process real-time metrics and triggers"""
-        # Update real-time counters
-        # Trigger notifications
-        # Update leaderboards
-        # Check for milestones
-        pass
+        self.anomaly_detector.observe(event.event_type, event.event_data, event.timestamp.timestamp())
+        if event.user_id:
+            self.active_users.add(event.user_id, event.timestamp)
+            self.heavy_hitters.add('active_users', event.user_id, event.timestamp)
+        if event.submission_id and event.event_type in ('vote_cast', 'vote_removed'):
+            weight = 1.0 if event.event_type == 'vote_cast' else -1.0
+            self.trending.record_vote(event.submission_id, event.timestamp.timestamp(), weight)
+        if event.event_type == 'discord_command_used':
+            self.heavy_hitters.add('commands', event.event_data.get('command', 'unknown'), event.timestamp)
+    
+    def _track_submission(self, submission):
+        """Count a new submission's scene and tools"""
+        self.heavy_hitters.add('scenes', submission.scene_name, submission.created_at)
+        for tool in submission.tools_used:
+            self.heavy_hitters.add('tools', tool, submission.created_at)
+    
+    def reconcile_heavy_hitters(self):
+        """Replace the streaming top-K summaries with exact counts from SQL"""
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        since = today - timedelta(days=self.heavy_hitters.retention_days - 1)
+        
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT date(timestamp), user_id, COUNT(*) FROM analytics
+            WHERE timestamp >= ? AND user_id IS NOT NULL
+            GROUP BY 1, 2
+        ''', (since,))
+        self.heavy_hitters.load('active_users', cursor.fetchall())
+        
+        cursor.execute('''
+            SELECT date(timestamp), COALESCE(json_extract(event_data, '$.command'), 'unknown'), COUNT(*)
+            FROM analytics
+            WHERE event_type = 'discord_command_used' AND timestamp >= ? AND json_valid(event_data)
+            GROUP BY 1, 2
+        ''', (since,))
+        self.heavy_hitters.load('commands', cursor.fetchall())
+        
+        cursor.execute('''
+            SELECT date(created_at), scene_name, COUNT(*) FROM submissions
+            WHERE created_at >= ?
+            GROUP BY 1, 2
+        ''', (since,))
+        self.heavy_hitters.load('scenes', cursor.fetchall())
+        
+        cursor.execute('''
+            SELECT date(s.created_at), t.value, COUNT(*)
+            FROM submissions s, json_each(s.tools_used) t
+            WHERE s.created_at >= ? AND json_valid(s.tools_used)
+            GROUP BY 1, 2
+        ''', (since,))
+        daily_tools = cursor.fetchall()
+        cursor.execute('''
+            SELECT t.value, COUNT(*)
+            FROM submissions s, json_each(s.tools_used) t
+            WHERE json_valid(s.tools_used)
+            GROUP BY 1
+        ''')
+        self.heavy_hitters.load('tools', daily_tools, cursor.fetchall())
+        
+        conn.close()
+        self.heavy_hitters_source = db.db_path
+        self.heavy_hitters_reconciled_at = time.monotonic()
+    
+    def reload_trending(self):
+        """Rebuild the trending index from recent votes"""
+        since = datetime.now() - timedelta(seconds=self.trending.half_life * LOOKBACK_HALF_LIVES)
+        conn = sqlite3.connect(db.db_path)
+        votes = conn.execute('SELECT submission_id, created_at FROM votes WHERE created_at >= ?',
+                             (since,)).fetchall()
+        conn.close()
+        self.trending.rebuild((submission_id, datetime.fromisoformat(created_at).timestamp())
+                              for submission_id, created_at in votes)
+        self.trending_source = db.db_path
+    
+    def get_trending_submissions(self, limit: int = 5) -> List[Dict[str, Any]]:
+        """Approved submissions with the highest decayed vote scores"""
+        conn = sqlite3.connect(db.db_path)
+        trending = self._trending_submissions(conn.cursor(), limit)
+        conn.close()
+        return trending
+    
+    def _trending_submissions(self, cursor, limit: int) -> List[Dict[str, Any]]:
+        if self.trending_source != db.db_path:
+            self.reload_trending()
+        
+        # Over-fetch so unapproved submissions can be skipped, reading deeper
+        # ranks until enough are approved or the index runs out
+        rows, checked, fetch = {}, set(), limit * 2
+        while True:
+            ranked = self.trending.top(fetch)
+            unchecked = [submission_id for submission_id, _ in ranked if submission_id not in checked]
+            cursor.execute(f'''
+                SELECT s.id, s.title, s.scene_name, s.vote_count, u.username
+                FROM submissions s
+                JOIN users u ON s.user_id = u.id
+                WHERE s.id IN ({','.join('?' * len(unchecked))}) AND s.status = 'approved'
+            ''', unchecked)
+            rows.update((row[0], row) for row in cursor.fetchall())
+            checked.update(unchecked)
+            if sum(submission_id in rows for submission_id, _ in ranked) >= limit or len(ranked) < fetch:
+                break
+            fetch *= 2
+        
+        return [{
+            'id': submission_id,
+            'title': rows[submission_id][1],
+            'scene': rows[submission_id][2],
+            'votes': rows[submission_id][3],
+            'creator': rows[submission_id][4],
+            'trending_score': round(score, 3)
+        } for submission_id, score in ranked if submission_id in rows][:limit]
+    
+    def _reconcile_heavy_hitters_if_due(self):
+        if (self.heavy_hitters_source != db.db_path or
+                time.monotonic() - self.heavy_hitters_reconciled_at >= HEAVY_HITTER_RECONCILE_SECONDS):
+            self.reconcile_heavy_hitters()
     
     def get_dashboard_data(self) -> Dict[str, Any]:
         """Get comprehensive dashboard analytics"""
@@ -107,6 +249,8 @@ class AdvancedAnalyticsService:
         week_ago = today - timedelta(days=7)
         month_ago = today - timedelta(days=30)
         
+        self._reconcile_heavy_hitters_if_due()
+        
         dashboard = {
             'overview': self._get_overview_stats(cursor, today),
             'growth': self._get_growth_metrics(cursor, week_ago, month_ago),
@@ -134,12 +278,10 @@ class AdvancedAnalyticsService:
         cursor.execute('SELECT COUNT(*) FROM votes')
         total_votes = cursor.fetchone()[0]
         
-        # Active users today
-        cursor.execute('''
-            SELECT COUNT(DISTINCT user_id) FROM analytics 
-            WHERE timestamp >= ? AND user_id IS NOT NULL
-        ''', (today,))
-        active_today = cursor.fetchone()[0]
+        # Active users today, this week and this month (approximate, see active_users)
+        active_today = self.active_users.count(today)
+        active_week = self.active_users.count(today - timedelta(days=6))
+        active_month = self.active_users.count(today - timedelta(days=29))
         
         # Submissions today
         cursor.execute('SELECT COUNT(*) FROM submissions WHERE created_at >= ?', (today,))
@@ -150,6 +292,8 @@ class AdvancedAnalyticsService:
             'total_submissions': total_submissions,
             'total_votes': total_votes,
             'active_users_today': active_today,
+            'active_users_week': active_week,
+            'active_users_month': active_month,
             'submissions_today': submissions_today
         }
     
@@ -185,17 +329,14 @@ class AdvancedAnalyticsService:
         ''')
         avg_votes = cursor.fetchone()[0] or 0
         
-        # Most active users
-        cursor.execute('''
-            SELECT u.username, COUNT(a.id) as activity_count
-            FROM users u
-            JOIN analytics a ON u.id = a.user_id
-            WHERE a.timestamp >= ?
-            GROUP BY u.id
-            ORDER BY activity_count DESC
-            LIMIT 5
-        ''', (today,))
-        top_active_users = [{'username': row[0], 'activity': row[1]} for row in cursor.fetchall()]
+        # Most active users, from the streaming summary; ids without a user row are skipped
+        candidates = self.heavy_hitters.top('active_users', limit=10, since=today)
+        cursor.execute(f'''
+            SELECT id, username FROM users WHERE id IN ({','.join('?' * len(candidates))})
+        ''', [user_id for user_id, _ in candidates])
+        usernames = dict(cursor.fetchall())
+        top_active_users = [{'username': usernames[user_id], 'activity': count}
+                            for user_id, count in candidates if user_id in usernames][:5]
         
         # Engagement rate (votes per view)
         cursor.execute('''
@@ -206,7 +347,7 @@ class AdvancedAnalyticsService:
             WHERE view_count > 0
         ''')
         votes, views = cursor.fetchone()
-        engagement_rate = (votes / views * 100) if views > 0 else 0
+        engagement_rate = (votes / views * 100) if views else 0
         
         return {
             'average_votes_per_submission': round(avg_votes, 2),
@@ -216,37 +357,10 @@ class AdvancedAnalyticsService:
     
     def _get_content_metrics(self, cursor, today) -> Dict[str, Any]:
         """Get content-related metrics"""
-        # Popular scenes
-        cursor.execute('''
-            SELECT scene_name, COUNT(*) as count
-            FROM submissions
-            WHERE created_at >= ?
-            GROUP BY scene_name
-            ORDER BY count DESC
-            LIMIT 5
-        ''', (today - timedelta(days=7),))
-        popular_scenes = [{'scene': row[0], 'count': row[1]} for row in cursor.fetchall()]
-        
-        # Popular tools
-        cursor.execute('''
-            SELECT tools_used FROM submissions 
-            WHERE tools_used IS NOT NULL AND tools_used != '[]'
-        ''')
-        all_tools = []
-        for row in cursor.fetchall():
-            try:
-                tools = json.loads(row[0])
-                all_tools.extend(tools)
-            except:
-                continue
-        
-        tool_counts = defaultdict(int)
-        for tool in all_tools:
-            tool_counts[tool] += 1
-        
-        popular_tools = [{'tool': tool, 'count': count} 
-                        for tool, count in sorted(tool_counts.items(), 
-                                                key=lambda x: x[1], reverse=True)[:5]]
+        # Popular scenes this week and tools of all time, from the streaming summaries
+        popular_scenes = [{'scene': scene, 'count': count}
+                          for scene, count in self.heavy_hitters.top('scenes', since=today - timedelta(days=7))]
+        popular_tools = [{'tool': tool, 'count': count} for tool, count in self.heavy_hitters.top('tools')]
         
         # Content quality scores
         cursor.execute('''
@@ -275,24 +389,9 @@ class AdvancedAnalyticsService:
         ''', (today,))
         discord_activity_today = cursor.fetchone()[0]
         
-        # Most used Discord commands
-        cursor.execute('''
-            SELECT event_data FROM analytics 
-            WHERE event_type = 'discord_command_used' AND timestamp >= ?
-        ''', (today - timedelta(days=7),))
-        
-        command_counts = defaultdict(int)
-        for row in cursor.fetchall():
-            try:
-                data = json.loads(row[0])
-                command = data.get('command', 'unknown')
-                command_counts[command] += 1
-            except:
-                continue
-        
-        popular_commands = [{'command': cmd, 'count': count} 
-                           for cmd, count in sorted(command_counts.items(), 
-                                                  key=lambda x: x[1], reverse=True)[:5]]
+        # Most used Discord commands this week, from the streaming summary
+        popular_commands = [{'command': command, 'count': count}
+                            for command, count in self.heavy_hitters.top('commands', since=today - timedelta(days=7))]
         
         return {
             'discord_activity_today': discord_activity_today,
@@ -301,25 +400,8 @@ class AdvancedAnalyticsService:
     
     def _get_trending_data(self, cursor) -> Dict[str, Any]:
         """Get trending content and creators"""
-        # Trending submissions (high vote velocity)
-        cursor.execute('''
-            SELECT s.id, s.title, s.scene_name, s.vote_count, u.username
-            FROM submissions s
-            JOIN users u ON s.user_id = u.id
-            WHERE s.created_at >= ? AND s.status = 'approved'
-            ORDER BY (s.vote_count / (julianday('now') - julianday(s.created_at))) DESC
-            LIMIT 5
-        ''', (datetime.now() - timedelta(days=3),))
-        
-        trending_submissions = []
-        for row in cursor.fetchall():
-            trending_submissions.append({
-                'id': row[0],
-                'title': row[1],
-                'scene': row[2],
-                'votes': row[3],
-                'creator': row[4]
-            })
+        # Trending submissions (decayed vote velocity)
+        trending_submissions = self._trending_submissions(cursor, 5)
         
         # Rising creators (recent high activity)
         cursor.execute('''
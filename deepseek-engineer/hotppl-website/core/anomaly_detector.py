@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Anomaly Detector
+Streaming EWMA/z-score anomaly alerts over the analytics event stream
+"""
+
+import asyncio
+import math
+import time
+import uuid
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, FrozenSet, List, Optional
+
+from metrics_scheduler import TokenBucket
+
+ERROR_EVENTS = frozenset({'error_occurred', 'submission_error', 'sync_event_failed'})
+
+# Every metric is aggregated into fixed time buckets. When a bucket closes
+# (on the next event, or on tick() when the stream goes quiet, so a stall
+# reads as zeros) its value is compared with an exponentially weighted mean
+# and variance of earlier buckets, then folded into them: a few floats per
+# metric, however many events arrive. |z| past the threshold after warm-up
+# raises an alert, and the value folded into the baseline is clamped to the
+# threshold so one incident cannot mask the next bucket. A repeat of the
+# same metric and direction within the cooldown updates the open alert
+# instead of raising a new one, and new alerts pass a token bucket before
+# listeners (dashboard, Discord) see them.
+
+@dataclass
+class MetricSpec:
+    name: str
+    label: str
+    events: FrozenSet[str]  # event types counted; empty means every event
+    kind: str  # 'rate': events per bucket, 'ratio': events / all events, 'mean': mean of value_field
+    bucket_seconds: float
+    scale: float = 1.0  # bucket value -> reported unit, e.g. per-10s count -> per minute
+    value_field: Optional[str] = None
+    direction: str = 'both'  # 'both', 'up' or 'down'
+    threshold: float = 4.0
+    min_std: float = 1.0  # floor on the standard deviation, in reported units
+    actions: Dict[str, str] = field(default_factory=dict)  # direction -> suggested action
+
+DEFAULT_METRICS = [
+    MetricSpec('submissions_per_hour', 'Submissions per hour', frozenset({'submission_created'}), 'rate',
+               bucket_seconds=60, scale=60, min_std=5.0,
+               actions={'drop': 'Investigate potential issues with submission flow',
+                        'spike': 'Check moderation capacity for the submission surge'}),
+    MetricSpec('votes_per_minute', 'Votes per minute', frozenset({'vote_cast'}), 'rate',
+               bucket_seconds=10, scale=6, min_std=3.0,
+               actions={'drop': 'Check voting and Discord reaction sync',
+                        'spike': 'Check for vote brigading on trending submissions'}),
+    MetricSpec('error_rate', 'Error rate', ERROR_EVENTS, 'ratio', bucket_seconds=10, direction='up',
+               min_std=0.02, actions={'spike': 'Inspect recent errors and roll back the latest deploy if needed'}),
+    MetricSpec('sync_latency_ms', 'Sync latency (ms)', frozenset({'sync_event_processed'}), 'mean',
+               bucket_seconds=5, value_field='latency_ms', direction='up', min_std=5.0,
+               actions={'spike': 'Check Redis and WebSocket fan-out load'})
+]
+
+@dataclass
+class AnomalyAlert:
+    id: str
+    metric: str
+    direction: str  # 'spike' or 'drop'
+    severity: str  # 'warning' or 'danger'
+    message: str
+    action: str
+    value: float
+    baseline: float
+    z_score: float
+    raised_at: float
+    last_seen: float
+    occurrences: int = 1
+    resolved: bool = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Alert in the dashboard's alert format"""
+        return {
+            'type': self.severity,
+            'message': self.message,
+            'action': self.action,
+            'metric': self.metric,
+            'value': self.value,
+            'baseline': self.baseline,
+            'z_score': self.z_score,
+            'occurrences': self.occurrences,
+            'raised_at': datetime.fromtimestamp(self.raised_at).isoformat()
+        }
+
+class MetricState:
+    """Open bucket plus EWMA mean/variance of closed buckets"""
+    __slots__ = ('bucket_start', 'hits', 'total', 'value_sum', 'mean', 'var', 'samples')
+
+    def __init__(self, bucket_start: float):
+        self.bucket_start = bucket_start
+        self.hits = 0
+        self.total = 0
+        self.value_sum = 0.0
+        self.mean = 0.0
+        self.var = 0.0
+        self.samples = 0
+
+class StreamingAnomalyDetector:
+    def __init__(self, metrics: List[MetricSpec] = None, alpha: float = 0.05, warmup_buckets: int = 20,
+                 cooldown: float = 300.0, max_alerts_per_minute: float = 6.0, max_gap_buckets: int = 120,
+                 clock: Callable[[], float] = time.time):
+        self.specs = {spec.name: spec for spec in (metrics or DEFAULT_METRICS)}
+        self.alpha = alpha
+        self.warmup_buckets = warmup_buckets
+        self.cooldown = cooldown
+        self.max_gap_buckets = max_gap_buckets  # empty buckets replayed after a long silence
+        self.clock = clock
+
+        self.states: Dict[str, MetricState] = {}
+        self.open_alerts: Dict[tuple, AnomalyAlert] = {}
+        self.recent_alerts: deque = deque(maxlen=50)
+        self.alert_limiter = TokenBucket(rate=max_alerts_per_minute / 60.0, burst=max_alerts_per_minute)
+        self.listeners: List[Callable[[AnomalyAlert], None]] = []
+
+        self.metrics = {
+            'events_observed': 0,
+            'buckets_closed': 0,
+            'alerts_raised': 0,
+            'alerts_deduplicated': 0,
+            'alerts_rate_limited': 0,
+            'alerts_resolved': 0
+        }
+
+    def subscribe(self, listener: Callable[[AnomalyAlert], None]):
+        """Call listener with every new (not deduplicated or rate-limited) alert"""
+        self.listeners.append(listener)
+
+    def observe(self, event_type: str, event_data: Dict[str, Any] = None, now: float = None):
+        """Feed one analytics event"""
+        now = self.clock() if now is None else now
+        self.metrics['events_observed'] += 1
+        for spec in self.specs.values():
+            state = self._advance(spec, now)
+            matched = not spec.events or event_type in spec.events
+            if spec.kind == 'ratio':
+                state.total += 1
+                state.hits += matched
+            elif matched:
+                if spec.kind == 'mean':
+                    value = (event_data or {}).get(spec.value_field)
+                    if value is None:
+                        continue
+                    state.value_sum += value
+                state.hits += 1
+
+    def tick(self, now: float = None):
+        """Close elapsed buckets even when no events arrive"""
+        now = self.clock() if now is None else now
+        for spec in self.specs.values():
+            self._advance(spec, now)
+
+    async def run(self, interval: float = 1.0):
+        """Tick forever so quiet streams still close their buckets"""
+        while True:
+            self.tick()
+            await asyncio.sleep(interval)
+
+    def _advance(self, spec: MetricSpec, now: float) -> MetricState:
+        state = self.states.get(spec.name)
+        if state is None:
+            state = self.states[spec.name] = MetricState(now - now % spec.bucket_seconds)
+            return state
+
+        elapsed = int((now - state.bucket_start) // spec.bucket_seconds)
+        if elapsed <= 0:
+            return state
+        self._close_bucket(spec, state, state.bucket_start + spec.bucket_seconds)
+        # Buckets with no events at all: zero rate, no ratio or mean to report
+        if spec.kind == 'rate':
+            for i in range(1, min(elapsed, self.max_gap_buckets)):
+                self._close_bucket(spec, state, state.bucket_start + (i + 1) * spec.bucket_seconds)
+        state.bucket_start += elapsed * spec.bucket_seconds
+        return state
+
+    def _close_bucket(self, spec: MetricSpec, state: MetricState, closed_at: float):
+        if spec.kind == 'rate':
+            value = state.hits * spec.scale
+        elif spec.kind == 'ratio':
+            value = state.hits / state.total * spec.scale if state.total else None
+        else:
+            value = state.value_sum / state.hits * spec.scale if state.hits else None
+        state.hits, state.total, state.value_sum = 0, 0, 0.0
+        if value is None:
+            return
+        self.metrics['buckets_closed'] += 1
+
+        if state.samples >= self.warmup_buckets:
+            std = max(math.sqrt(state.var), spec.min_std)
+            z = (value - state.mean) / std
+            self._evaluate(spec, value, state.mean, z, closed_at)
+            # An anomaly moves the baseline by at most threshold standard
+            # deviations, so a sustained incident keeps alerting while a
+            # genuine level shift is still learned over a few buckets
+            value = min(max(value, state.mean - spec.threshold * std), state.mean + spec.threshold * std)
+
+        # EWMA mean and variance (West's incremental form)
+        if state.samples == 0:
+            state.mean = value
+        else:
+            diff = value - state.mean
+            increment = self.alpha * diff
+            state.mean += increment
+            state.var = (1 - self.alpha) * (state.var + diff * increment)
+        state.samples += 1
+
+    def _evaluate(self, spec: MetricSpec, value: float, baseline: float, z: float, now: float):
+        if z >= spec.threshold and spec.direction in ('both', 'up'):
+            direction = 'spike'
+        elif z <= -spec.threshold and spec.direction in ('both', 'down'):
+            direction = 'drop'
+        else:
+            for key in [key for key in self.open_alerts if key[0] == spec.name]:
+                self.open_alerts.pop(key).resolved = True
+                self.metrics['alerts_resolved'] += 1
+            return
+
+        key = (spec.name, direction)
+        alert = self.open_alerts.get(key)
+        if alert is not None and now - alert.last_seen < self.cooldown:
+            alert.occurrences += 1
+            alert.last_seen = now
+            alert.value, alert.z_score = value, z
+            self.metrics['alerts_deduplicated'] += 1
+            return
+
+        if not self.alert_limiter.try_acquire(now):
+            self.metrics['alerts_rate_limited'] += 1
+            return
+
+        severity = 'danger' if abs(z) >= 2 * spec.threshold else 'warning'
+        alert = AnomalyAlert(
+            id=str(uuid.uuid4()),
+            metric=spec.name,
+            direction=direction,
+            severity=severity,
+            message=f"{spec.label} {direction}: {value:.2f} vs baseline {baseline:.2f} (z={z:+.1f})",
+            action=spec.actions.get(direction, 'Investigate the anomaly'),
+            value=value,
+            baseline=baseline,
+            z_score=z,
+            raised_at=now,
+            last_seen=now
+        )
+        self.open_alerts[key] = alert
+        self.recent_alerts.append(alert)
+        self.metrics['alerts_raised'] += 1
+        print(f"🚨 {alert.message}")
+
+        for listener in self.listeners:
+            try:
+                listener(alert)
+            except Exception as e:
+                print(f"⚠️ Anomaly alert listener failed: {e}")
+
+    def active_alerts(self) -> List[Dict[str, Any]]:
+        """Unresolved alerts, newest first, in the dashboard's alert format"""
+        return [alert.to_dict() for alert in sorted(self.open_alerts.values(), key=lambda a: -a.raised_at)]
+
+    def get_baselines(self) -> Dict[str, Dict[str, float]]:
+        """Current EWMA mean and standard deviation per metric"""
+        return {name: {'mean': state.mean, 'std': math.sqrt(state.var), 'buckets': state.samples}
+                for name, state in self.states.items()}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        metrics['open_alerts'] = len(self.open_alerts)
+        return metrics
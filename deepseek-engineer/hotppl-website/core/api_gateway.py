@@ -15,6 +15,8 @@ from typing import Dict, List, Optional
 import uuid
 
 from database import db, UserRole, SubmissionStatus
+from chart_rollups import CHART_SPECS, ChartRollup
+from submission_listing import DEFAULT_PAGE_SIZE, list_submissions
 # from discord_service import DiscordService
 # from analytics_service import AnalyticsService
 # from content_processor import ContentProcessor
@@ -39,6 +41,9 @@ CORS(app)
 discord_service = DiscordService()
 analytics_service = AnalyticsService()
 content_processor = ContentProcessor()
+chart_rollup = ChartRollup()
+
+CHART_ROLLUP_MAX_AGE = 900  # seconds between chart rollups
 
 class APIGateway:
     def __init__(self):
@@ -149,24 +154,20 @@ def create_submission():
 
 @app.route('/api/submissions', methods=['GET'])
 def get_submissions():
-    """Get submissions with filtering and pagination"""
-    page = int(request.args.get('page', 1))
-    limit = int(request.args.get('limit', 20))
-    status = request.args.get('status', 'approved')
-    scene = request.args.get('scene')
-    
-    # Get submissions from database
-    # Apply filters
-    # Return paginated results
+    """Get submissions with filtering and keyset pagination"""
+    try:
+        page = list_submissions(
+            status=request.args.get('status', SubmissionStatus.APPROVED.value),
+            scene=request.args.get('scene'),
+            tool=request.args.get('tool'),
+            sort=request.args.get('sort', 'recent'),
+            limit=request.args.get('limit', DEFAULT_PAGE_SIZE),
+            cursor=request.args.get('cursor')
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    return jsonify({
-        'submissions': [],
-        'pagination': {
-            'page': page,
-            'limit': limit,
-            'total': 0
-        }
-    })
+    return jsonify(page)
 
 @app.route('/api/leaderboard', methods=['GET'])
 def get_leaderboard():
@@ -221,6 +222,24 @@ def get_analytics_dashboard():
     """Get analytics dashboard data"""
     return jsonify(analytics_service.get_dashboard_data())
 
+@app.route('/api/analytics/charts', methods=['GET'])
+def get_dashboard_charts():
+    """Get pre-aggregated dashboard chart data keyed by chart spec ID"""
+    payload = chart_rollup.latest(max_age=CHART_ROLLUP_MAX_AGE)
+    
+    # Clients revalidate with If-None-Match and get a 304 until the data changes
+    response = app.response_class(payload.body, mimetype='application/json')
+    response.set_etag(payload.etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/api/analytics/chart-specs', methods=['GET'])
+def get_chart_specs():
+    """Get chart spec definitions; spec IDs are versioned so these never change"""
+    response = jsonify(CHART_SPECS)
+    response.headers['Cache-Control'] = 'public, max-age=86400'
+    return response
+
 @app.route('/api/discord/webhook', methods=['POST'])
 def discord_webhook():
     """Handle Discord webhook events"""
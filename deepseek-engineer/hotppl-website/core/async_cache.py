@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Async Cache
+In-process TTL cache with stale-while-revalidate, single-flight loads and LRU eviction
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# A value is fresh for its TTL, then served stale for up to stale_ttl more
+# while one background task reloads it. Entries within refresh_ahead of
+# expiry are also reloaded in the background, so hot keys rarely go stale.
+# Only a missing or fully expired entry makes the caller wait, and callers
+# waiting on the same key share one load. A failed background reload keeps
+# the old value; a failed foreground load raises to every waiting caller.
+# The least recently used entries are evicted beyond max_entries.
+
+@dataclass
+class CacheEntry:
+    value: Any
+    loaded_at: float
+    expires_at: float
+    stale_until: float
+    load_ms: float
+    hits: int = 0
+
+class AsyncTTLCache:
+    def __init__(self, ttl: float = 300.0, stale_ttl: float = 0.0, refresh_ahead: float = 0.0,
+                 max_entries: int = 1024, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.refresh_ahead = refresh_ahead  # seconds before expiry to start a background reload
+        self.max_entries = max_entries
+        self.clock = clock
+
+        self.entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self.loading: Dict[Hashable, asyncio.Future] = {}
+        self.background: set = set()
+
+        self.metrics = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'loads': 0,
+            'load_errors': 0,
+            'background_refreshes': 0,
+            'refresh_errors': 0,
+            'evictions': 0,
+            'total_load_ms': 0.0
+        }
+
+    async def get(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: float = None,
+                  stale_ttl: float = None) -> Any:
+        """Cached value for key, loading it with loader() when missing or expired"""
+        now = self.clock()
+        entry = self.entries.get(key)
+
+        if entry is not None and now < entry.stale_until:
+            self.entries.move_to_end(key)
+            entry.hits += 1
+            if now < entry.expires_at:
+                self.metrics['hits'] += 1
+                if now >= entry.expires_at - self.refresh_ahead:
+                    self._refresh_in_background(key, loader, ttl, stale_ttl)
+            else:
+                self.metrics['stale_hits'] += 1
+                self._refresh_in_background(key, loader, ttl, stale_ttl)
+            return entry.value
+
+        self.metrics['misses'] += 1
+        if key in self.loading:
+            self.metrics['coalesced'] += 1
+            return await asyncio.shield(self.loading[key])
+        return await self._load(key, loader, ttl, stale_ttl)
+
+    def _load(self, key: Hashable, loader: Callable[[], Awaitable[Any]], ttl: Optional[float],
+              stale_ttl: Optional[float]) -> asyncio.Future:
+        """Start the single in-flight load for key"""
+        async def run():
+            start = time.perf_counter()
+            try:
+                value = await loader()
+            except Exception:
+                self.metrics['load_errors'] += 1
+                raise
+            finally:
+                self.loading.pop(key, None)
+            load_ms = (time.perf_counter() - start) * 1000
+            self.metrics['loads'] += 1
+            self.metrics['total_load_ms'] += load_ms
+            self.set(key, value, ttl, stale_ttl, load_ms)
+            return value
+
+        future = asyncio.ensure_future(run())
+        self.loading[key] = future
+        return asyncio.shield(future)
+
+    def _refresh_in_background(self, key: Hashable, loader: Callable[[], Awaitable[Any]],
+                               ttl: Optional[float], stale_ttl: Optional[float]):
+        if key in self.loading:
+            return
+        self.metrics['background_refreshes'] += 1
+
+        async def refresh():
+            try:
+                await self._load(key, loader, ttl, stale_ttl)
+            except Exception as e:
+                self.metrics['refresh_errors'] += 1
+                print(f"⚠️ Background refresh of {key!r} failed, serving stale value: {e}")
+
+        task = asyncio.ensure_future(refresh())
+        self.background.add(task)
+        task.add_done_callback(self.background.discard)
+
+    def set(self, key: Hashable, value: Any, ttl: float = None, stale_ttl: float = None, load_ms: float = 0.0):
+        """Store a value directly, e.g. to warm the cache"""
+        now = self.clock()
+        ttl = self.ttl if ttl is None else ttl
+        stale_ttl = self.stale_ttl if stale_ttl is None else stale_ttl
+        self.entries[key] = CacheEntry(value, now, now + ttl, now + ttl + stale_ttl, load_ms)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.metrics['evictions'] += 1
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Current value regardless of age, without counting or refreshing"""
+        entry = self.entries.get(key)
+        return entry.value if entry else None
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or everything"""
+        if key is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(key, None)
+
+    async def drain(self):
+        """Wait for background refreshes to finish"""
+        while self.background:
+            await asyncio.gather(*list(self.background), return_exceptions=True)
+
+    def describe(self) -> Dict[Hashable, Dict[str, float]]:
+        """Per-key age, remaining freshness, last load time and hits"""
+        now = self.clock()
+        return {key: {'age_s': now - entry.loaded_at,
+                      'fresh_for_s': max(0.0, entry.expires_at - now),
+                      'load_ms': entry.load_ms,
+                      'hits': entry.hits}
+                for key, entry in self.entries.items()}
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Cache metrics with hit rate and average load time"""
+        metrics = dict(self.metrics)
+        lookups = metrics['hits'] + metrics['stale_hits'] + metrics['misses']
+        metrics['hit_rate'] = (metrics['hits'] + metrics['stale_hits']) / lookups if lookups else 0.0
+        metrics['avg_load_ms'] = metrics['total_load_ms'] / metrics['loads'] if metrics['loads'] else 0.0
+        metrics['entries'] = len(self.entries)
+        metrics['in_flight'] = len(self.loading)
+        return metrics
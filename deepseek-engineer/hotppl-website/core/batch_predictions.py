@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Batch Predictions
+Scheduled, chunked scoring of recent submissions and creators into a prediction table
+"""
+
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from database import db
+from feature_store import EPOCH, FeatureStore
+from model_training import MODEL_DATASETS
+
+DEFAULT_CHUNK_SIZE = 4096
+RECENT_DAYS = 30
+
+# Nothing is scored per request. A run scores every submission created, and
+# every creator active, in the last RECENT_DAYS with each model, predicting
+# chunk_size rows per call so one tree traversal covers thousands of rows,
+# and writes the chunk's predictions in one executemany. Rows are keyed by
+# model version, so readers keep seeing the previous version's predictions
+# until a run for the new version completes; older versions are then
+# deleted. Insights are plain indexed queries over the table.
+
+class BatchPredictor:
+    def __init__(self, feature_store: FeatureStore, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 recent_days: int = RECENT_DAYS):
+        self.feature_store = feature_store
+        self.chunk_size = chunk_size
+        self.recent_days = recent_days
+        self.scored_version = 0
+        self.scored_at = None
+
+        self.metrics = {
+            'runs': 0,
+            'rows_scored': 0,
+            'chunks': 0,
+            'last_run_ms': 0.0
+        }
+
+    def recent_features(self, now: datetime = None) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+        """(entity ids, feature matrix) of recent submissions and recently active creators"""
+        now = now or datetime.now()
+        cutoff = (now - timedelta(days=self.recent_days) - EPOCH).total_seconds() / 86400
+        store = self.feature_store
+
+        submission_ids, submission_features, _ = store.submission_features(now)
+        creator_ids, creator_features, _ = store.creator_features(now)
+        recent_submissions = store.submissions.column('created_day') >= cutoff
+        active_creators = store.creators.column('last_active_day') >= cutoff
+        return {
+            'submissions': (np.array(submission_ids, dtype=object)[recent_submissions],
+                            submission_features[recent_submissions]),
+            'creators': (np.array(creator_ids, dtype=object)[active_creators], creator_features[active_creators])
+        }
+
+    def run(self, models: Dict[str, Any], version: int, now: datetime = None) -> Dict[str, int]:
+        """Score recent entities with every model and store the predictions under version"""
+        start = time.perf_counter()
+        predicted_at = now or datetime.now()
+        entities = self.recent_features(now)
+        counts = {}
+
+        conn = sqlite3.connect(db.db_path)
+        try:
+            for name, (entity_type, _) in MODEL_DATASETS.items():
+                ids, features = entities[entity_type]
+                for offset in range(0, len(ids), self.chunk_size):
+                    chunk_ids = ids[offset:offset + self.chunk_size]
+                    scores = models[name].predict(features[offset:offset + self.chunk_size])
+                    conn.executemany('''
+                        INSERT OR REPLACE INTO model_predictions
+                            (entity_type, entity_id, model, model_version, score, predicted_at)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', [(entity_type, entity_id, name, version, float(score), predicted_at)
+                          for entity_id, score in zip(chunk_ids, scores)])
+                    conn.commit()
+                    self.metrics['chunks'] += 1
+                counts[name] = len(ids)
+
+            conn.execute('DELETE FROM model_predictions WHERE model_version < ?', (version,))
+            conn.commit()
+        finally:
+            conn.close()
+
+        self.scored_version = version
+        self.scored_at = predicted_at
+        self.metrics['runs'] += 1
+        self.metrics['rows_scored'] += sum(counts.values())
+        self.metrics['last_run_ms'] = (time.perf_counter() - start) * 1000
+        return counts
+
+    def top(self, model: str, limit: int = 10, lowest: bool = False) -> List[Tuple[str, float]]:
+        """Highest (or lowest) scored entities for a model in the scored version"""
+        order = 'ASC' if lowest else 'DESC'
+        conn = sqlite3.connect(db.db_path)
+        try:
+            return conn.execute(f'''
+                SELECT entity_id, score FROM model_predictions
+                WHERE model = ? AND model_version = ? ORDER BY score {order} LIMIT ?
+            ''', (model, self.scored_version, limit)).fetchall()
+        finally:
+            conn.close()
+
+    def aggregate(self, model: str) -> Tuple[int, float, float]:
+        """Count, mean and sum of a model's scores in the scored version"""
+        conn = sqlite3.connect(db.db_path)
+        try:
+            count, mean, total = conn.execute('''
+                SELECT COUNT(*), AVG(score), SUM(score) FROM model_predictions
+                WHERE model = ? AND model_version = ?
+            ''', (model, self.scored_version)).fetchone()
+        finally:
+            conn.close()
+        return count, mean or 0.0, total or 0.0
+
+    def insights(self, limit: int = 10) -> Dict[str, Any]:
+        """Dashboard insights from the stored predictions"""
+        scored_creators, mean_retention, _ = self.aggregate('retention')
+        _, _, revenue_forecast = self.aggregate('revenue')
+        return {
+            'model_version': self.scored_version,
+            'scored_at': self.scored_at.isoformat() if self.scored_at else None,
+            # The viral model predicts log1p(votes + 3 * shares)
+            'viral_opportunities': [{'submission_id': entity_id, 'expected_engagement': float(np.expm1(score))}
+                                    for entity_id, score in self.top('viral', limit)],
+            'creator_churn_risk': [{'creator_id': entity_id, 'churn_risk': 1.0 - score}
+                                   for entity_id, score in self.top('retention', limit, lowest=True)],
+            'average_churn_risk': 1.0 - mean_retention if scored_creators else 0.0,
+            'revenue_forecast': revenue_forecast,
+            'top_revenue_creators': [{'creator_id': entity_id, 'predicted_revenue': score}
+                                     for entity_id, score in self.top('revenue', limit)]
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        metrics['scored_version'] = self.scored_version
+        return metrics
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Campaign Pipeline
+Dependency-aware async stage runner with per-stage timeouts and latency tracking
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Tuple
+
+# Every stage becomes a task as soon as the pipeline starts and waits only on
+# its own dependencies, so independent stages overlap. A stage that fails or
+# times out yields its default; if it was required, stages depending on it are
+# skipped and the run reports the failure instead of stopping other branches.
+
+@dataclass
+class PipelineStage:
+    name: str
+    run: Callable[[Dict[str, Any]], Awaitable[Any]]  # receives {dependency: result}
+    depends_on: List[str] = field(default_factory=list)
+    timeout: float = 10.0
+    required: bool = True
+    default: Any = None
+
+@dataclass
+class PipelineResult:
+    results: Dict[str, Any]
+    statuses: Dict[str, str]  # 'ok', 'failed', 'timeout', 'skipped'
+    latencies: Dict[str, float]  # milliseconds
+    errors: Dict[str, str]
+    total_ms: float
+
+    @property
+    def failed_stages(self) -> List[str]:
+        return [name for name, status in self.statuses.items() if status != 'ok']
+
+class PipelineError(Exception):
+    def __init__(self, stage: str, result: PipelineResult):
+        super().__init__(f"Required stage '{stage}' {result.statuses[stage]}: {result.errors.get(stage, '')}")
+        self.stage = stage
+        self.result = result
+
+class CampaignPipeline:
+    def __init__(self, stages: List[PipelineStage]):
+        self.stages = {stage.name: stage for stage in stages}
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        """Stage names with dependencies first; rejects unknown and cyclic dependencies"""
+        order, state = [], {}
+
+        def visit(name: str):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Pipeline cycle through stage '{name}'")
+            state[name] = 'visiting'
+            for dependency in self.stages[name].depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Stage '{name}' depends on unknown stage '{dependency}'")
+                visit(dependency)
+            state[name] = 'done'
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    async def run(self) -> PipelineResult:
+        """Run all stages, overlapping independent ones; raises PipelineError if a required stage fails"""
+        start = time.perf_counter()
+        result = PipelineResult(results={}, statuses={}, latencies={}, errors={}, total_ms=0.0)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: PipelineStage):
+            if stage.depends_on:
+                await asyncio.gather(*(tasks[d] for d in stage.depends_on))
+
+            blocked = [d for d in stage.depends_on
+                       if result.statuses[d] != 'ok' and self.stages[d].required]
+            if blocked:
+                result.statuses[stage.name] = 'skipped'
+                result.errors[stage.name] = f"dependency {blocked[0]} {result.statuses[blocked[0]]}"
+                result.results[stage.name] = stage.default
+                result.latencies[stage.name] = 0.0
+                return
+
+            inputs = {d: result.results[d] for d in stage.depends_on}
+            stage_start = time.perf_counter()
+            try:
+                result.results[stage.name] = await asyncio.wait_for(stage.run(inputs), stage.timeout)
+                result.statuses[stage.name] = 'ok'
+            except asyncio.TimeoutError:
+                result.statuses[stage.name] = 'timeout'
+                result.errors[stage.name] = f"timed out after {stage.timeout}s"
+                result.results[stage.name] = stage.default
+            except Exception as e:
+                result.statuses[stage.name] = 'failed'
+                result.errors[stage.name] = str(e)
+                result.results[stage.name] = stage.default
+            result.latencies[stage.name] = (time.perf_counter() - stage_start) * 1000
+
+        for name in self.order:
+            tasks[name] = asyncio.create_task(run_stage(self.stages[name]))
+        await asyncio.gather(*tasks.values())
+
+        result.total_ms = (time.perf_counter() - start) * 1000
+        for name in self.order:
+            if result.statuses[name] != 'ok' and self.stages[name].required:
+                raise PipelineError(name, result)
+        return result
+
+async def fan_out(keys: Iterable[Hashable], fn: Callable[[Any], Awaitable[Any]],
+                  timeout: float) -> Tuple[Dict[Any, Any], Dict[Any, str]]:
+    """Run fn for every key concurrently; returns (results, errors) keyed the same way"""
+    keys = list(keys)
+    outcomes = await asyncio.gather(*(asyncio.wait_for(fn(key), timeout) for key in keys),
+                                    return_exceptions=True)
+
+    results, errors = {}, {}
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[key] = f"timed out after {timeout}s"
+        elif isinstance(outcome, Exception):
+            errors[key] = str(outcome)
+        else:
+            results[key] = outcome
+    return results, errors
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Chart Rollups
+Pre-aggregated dashboard chart series served as compact arrays keyed by chart spec ID
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from database import db
+
+DEFAULT_ROLLUP_DAYS = 30
+
+# Rendering lives on the client: each chart is shipped as bare data plus the
+# ID of a versioned spec (chart type, axes, title) the client already has.
+# Daily series are a start date and one value per day; the heatmap is a
+# weekday x hour matrix. The ETag covers the serialized charts only, so a
+# rollup that finds no new data keeps the same ETag and clients revalidating
+# with If-None-Match get a 304 instead of the payload.
+
+CHART_SPECS = {
+    'user_growth.v1': {'type': 'line', 'x': 'day', 'y': 'users', 'title': 'User Growth'},
+    'submission_volume.v1': {'type': 'bar', 'x': 'day', 'y': 'submissions', 'title': 'Daily Submissions'},
+    'revenue_growth.v1': {'type': 'line', 'x': 'day', 'y': 'revenue', 'title': 'Revenue Growth'},
+    'engagement_heatmap.v1': {'type': 'heatmap', 'x': 'hour', 'y': 'weekday', 'title': 'Engagement Heatmap',
+                              'y_labels': ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']},
+    'viral_distribution.v1': {'type': 'pie', 'title': 'Viral Content by Platform'}
+}
+
+CHART_IDS = {
+    'user_growth': 'user_growth.v1',
+    'submission_volume': 'submission_volume.v1',
+    'revenue_growth': 'revenue_growth.v1',
+    'engagement_heatmap': 'engagement_heatmap.v1',
+    'viral_distribution': 'viral_distribution.v1'
+}
+
+@dataclass
+class ChartPayload:
+    charts: Dict[str, Dict[str, Any]]
+    body: bytes  # serialized once per rollup, served as-is
+    etag: str
+    generated_at: float  # time.monotonic() of the rollup
+    build_ms: float
+
+def daily_series(rows: List[tuple], start: datetime, days: int) -> List[Any]:
+    """One value per day from (YYYY-MM-DD, value) rows, zero-filled"""
+    by_day = dict(rows)
+    return [by_day.get((start + timedelta(days=i)).strftime('%Y-%m-%d'), 0) for i in range(days)]
+
+class ChartRollup:
+    def __init__(self, days: int = DEFAULT_ROLLUP_DAYS):
+        self.days = days
+        self.payload: Optional[ChartPayload] = None
+        self.lock = threading.Lock()
+
+        self.metrics = {
+            'rollups': 0,
+            'unchanged_rollups': 0,
+            'total_build_ms': 0.0
+        }
+
+    def build(self, now: datetime = None) -> ChartPayload:
+        """Aggregate every chart series from the database"""
+        started = time.perf_counter()
+        now = now or datetime.now()
+        start = (now - timedelta(days=self.days - 1)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        conn = sqlite3.connect(db.db_path)
+        try:
+            cursor = conn.cursor()
+
+            cursor.execute('SELECT COUNT(*) FROM users WHERE created_at < ?', (start,))
+            users_before = cursor.fetchone()[0]
+            cursor.execute('''
+                SELECT date(created_at), COUNT(*) FROM users
+                WHERE created_at >= ? GROUP BY date(created_at)
+            ''', (start,))
+            user_growth = []
+            for new_users in daily_series(cursor.fetchall(), start, self.days):
+                users_before += new_users
+                user_growth.append(users_before)
+
+            cursor.execute('''
+                SELECT date(created_at), COUNT(*) FROM submissions
+                WHERE created_at >= ? GROUP BY date(created_at)
+            ''', (start,))
+            submission_volume = daily_series(cursor.fetchall(), start, self.days)
+
+            cursor.execute('''
+                SELECT date(occurred_at), SUM(amount_micros) FROM revenue_events
+                WHERE occurred_at >= ? GROUP BY date(occurred_at)
+            ''', (start,))
+            revenue = [round(micros / 1_000_000, 2)
+                       for micros in daily_series(cursor.fetchall(), start, self.days)]
+
+            heatmap = [[0] * 24 for _ in range(7)]
+            cursor.execute('''
+                SELECT CAST(strftime('%w', created_at) AS INTEGER), CAST(strftime('%H', created_at) AS INTEGER),
+                       COUNT(*)
+                FROM votes WHERE created_at >= ? GROUP BY 1, 2
+            ''', (start,))
+            for weekday, hour, count in cursor.fetchall():
+                heatmap[weekday][hour] = count
+
+            cursor.execute('''
+                SELECT json_extract(event_data, '$.platform') AS platform, COUNT(*) FROM analytics
+                WHERE event_type = 'post_went_viral' AND timestamp >= ?
+                GROUP BY platform ORDER BY COUNT(*) DESC, platform
+            ''', (start,))
+            viral = [(platform or 'unknown', count) for platform, count in cursor.fetchall()]
+        finally:
+            conn.close()
+
+        first_day = start.strftime('%Y-%m-%d')
+        charts = {
+            'user_growth': {'spec': CHART_IDS['user_growth'], 'start': first_day, 'values': user_growth},
+            'submission_volume': {'spec': CHART_IDS['submission_volume'], 'start': first_day,
+                                  'values': submission_volume},
+            'revenue_growth': {'spec': CHART_IDS['revenue_growth'], 'start': first_day, 'values': revenue},
+            'engagement_heatmap': {'spec': CHART_IDS['engagement_heatmap'], 'values': heatmap},
+            'viral_distribution': {'spec': CHART_IDS['viral_distribution'],
+                                   'labels': [platform for platform, _ in viral],
+                                   'values': [count for _, count in viral]}
+        }
+
+        body = json.dumps({'charts': charts}, separators=(',', ':')).encode()
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        build_ms = (time.perf_counter() - started) * 1000
+        return ChartPayload(charts, body, etag, time.monotonic(), build_ms)
+
+    def refresh(self, now: datetime = None) -> ChartPayload:
+        """Run the rollup and publish it; an unchanged rollup keeps the old payload"""
+        payload = self.build(now)
+        with self.lock:
+            self.metrics['rollups'] += 1
+            self.metrics['total_build_ms'] += payload.build_ms
+            if self.payload is not None and self.payload.etag == payload.etag:
+                self.metrics['unchanged_rollups'] += 1
+                self.payload.generated_at = payload.generated_at
+            else:
+                self.payload = payload
+            return self.payload
+
+    def latest(self, max_age: float = None) -> ChartPayload:
+        """Last published rollup, refreshed first if missing or older than max_age seconds"""
+        payload = self.payload
+        if payload is None or (max_age is not None and time.monotonic() - payload.generated_at > max_age):
+            payload = self.refresh()
+        return payload
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        metrics['avg_build_ms'] = metrics['total_build_ms'] / metrics['rollups'] if metrics['rollups'] else 0.0
+        metrics['payload_bytes'] = len(self.payload.body) if self.payload else 0
+        return metrics
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Collaboration Index
+In-memory inverted index over creator profiles for collaboration matching
+"""
+
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+SPECIALTY = 'specialty'
+SCENE = 'scene'
+
+DEFAULT_WEIGHTS = {
+    'skills': 0.5,
+    'scene': 0.25,
+    'rating': 0.15,
+    'reputation': 0.1
+}
+
+# Each creator occupies a row. Numeric attributes live in parallel NumPy
+# arrays and every specialty/preferred scene maps to a posting set of rows.
+# A query concatenates the postings of its terms and bincounts them, which
+# yields the overlap with every candidate at once; filters and scores are
+# then evaluated only over rows that hit at least one term.
+
+def normalize_term(term: str) -> str:
+    return term.strip().lower()
+
+class CreatorIndex:
+    def __init__(self, tier_order: List[str], capacity: int = 1024):
+        self.tier_rank = {tier: rank for rank, tier in enumerate(tier_order)}
+
+        self.row_of: Dict[str, int] = {}
+        self.user_ids: List[Optional[str]] = []
+        self.free_rows: List[int] = []
+        self.row_terms: Dict[int, Set[Tuple[str, str]]] = {}
+
+        self.postings: Dict[Tuple[str, str], Set[int]] = {}
+        self.posting_arrays: Dict[Tuple[str, str], np.ndarray] = {}
+
+        self.capacity = 0
+        self.active = np.zeros(0, dtype=bool)
+        self.available = np.zeros(0, dtype=bool)
+        self.tiers = np.zeros(0, dtype=np.int8)
+        self.ratings = np.zeros(0, dtype=np.float32)
+        self.reputations = np.zeros(0, dtype=np.float32)
+        self.specialty_counts = np.zeros(0, dtype=np.int16)
+        self._grow(capacity)
+
+        self.metrics = {
+            'creators_indexed': 0,
+            'updates': 0,
+            'searches': 0,
+            'average_search_ms': 0.0
+        }
+
+    def _grow(self, capacity: int):
+        """Extend the attribute arrays to hold at least capacity rows"""
+        if capacity <= self.capacity:
+            return
+        extra = capacity - self.capacity
+        self.active = np.concatenate([self.active, np.zeros(extra, dtype=bool)])
+        self.available = np.concatenate([self.available, np.zeros(extra, dtype=bool)])
+        self.tiers = np.concatenate([self.tiers, np.zeros(extra, dtype=np.int8)])
+        self.ratings = np.concatenate([self.ratings, np.zeros(extra, dtype=np.float32)])
+        self.reputations = np.concatenate([self.reputations, np.zeros(extra, dtype=np.float32)])
+        self.specialty_counts = np.concatenate([self.specialty_counts, np.zeros(extra, dtype=np.int16)])
+        self.capacity = capacity
+
+    def _allocate_row(self, user_id: str) -> int:
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.user_ids[row] = user_id
+        else:
+            row = len(self.user_ids)
+            self.user_ids.append(user_id)
+            if row >= self.capacity:
+                self._grow(self.capacity * 2)
+        self.row_of[user_id] = row
+        return row
+
+    def _set_terms(self, row: int, terms: Set[Tuple[str, str]]):
+        """Move a row's posting memberships to a new term set"""
+        old_terms = self.row_terms.get(row, set())
+        for term in old_terms - terms:
+            postings = self.postings[term]
+            postings.discard(row)
+            if not postings:
+                del self.postings[term]
+            self.posting_arrays.pop(term, None)
+        for term in terms - old_terms:
+            self.postings.setdefault(term, set()).add(row)
+            self.posting_arrays.pop(term, None)
+        self.row_terms[row] = terms
+
+    def upsert(self, profile: Any):
+        """Index or re-index a creator profile"""
+        row = self.row_of.get(profile.user_id)
+        if row is None:
+            row = self._allocate_row(profile.user_id)
+            self.metrics['creators_indexed'] += 1
+
+        specialties = {normalize_term(s) for s in profile.specialties}
+        scenes = {normalize_term(s) for s in profile.preferred_scenes}
+        self._set_terms(row, {(SPECIALTY, s) for s in specialties} | {(SCENE, s) for s in scenes})
+
+        self.active[row] = True
+        self.available[row] = profile.availability_status == 'available'
+        self.tiers[row] = self.tier_rank.get(profile.tier.value, 0)
+        self.ratings[row] = profile.collaboration_rating
+        self.reputations[row] = profile.reputation_score
+        self.specialty_counts[row] = len(specialties)
+        self.metrics['updates'] += 1
+
+    def remove(self, user_id: str) -> bool:
+        """Drop a creator from the index"""
+        row = self.row_of.pop(user_id, None)
+        if row is None:
+            return False
+
+        self._set_terms(row, set())
+        del self.row_terms[row]
+        self.active[row] = False
+        self.available[row] = False
+        self.user_ids[row] = None
+        self.free_rows.append(row)
+        self.metrics['creators_indexed'] -= 1
+        return True
+
+    def _posting_array(self, term: Tuple[str, str]) -> np.ndarray:
+        array = self.posting_arrays.get(term)
+        if array is None:
+            array = np.fromiter(self.postings.get(term, ()), dtype=np.int64)
+            self.posting_arrays[term] = array
+        return array
+
+    def _term_hits(self, field: str, terms: Iterable[str]) -> np.ndarray:
+        """Number of query terms each row matches"""
+        arrays = [self._posting_array((field, normalize_term(t))) for t in terms]
+        if not arrays:
+            return np.zeros(len(self.user_ids), dtype=np.int64)
+        return np.bincount(np.concatenate(arrays), minlength=len(self.user_ids))
+
+    def search(self, skills: List[str], scene: Optional[str] = None, top_n: int = 10,
+               min_tier: Optional[str] = None, min_rating: float = 0.0,
+               available_only: bool = True, exclude: Iterable[str] = (),
+               weights: Dict[str, float] = None) -> List[Tuple[str, float]]:
+        """Top-N creators by skill/scene similarity, rating and reputation"""
+        start = time.perf_counter()
+        results = self._search(skills, scene, top_n, min_tier, min_rating, available_only,
+                               exclude, weights or DEFAULT_WEIGHTS)
+        self.update_search_metrics((time.perf_counter() - start) * 1000)
+        return results
+
+    def _search(self, skills: List[str], scene: Optional[str], top_n: int,
+                min_tier: Optional[str], min_rating: float, available_only: bool,
+                exclude: Iterable[str], weights: Dict[str, float]) -> List[Tuple[str, float]]:
+        size = len(self.user_ids)
+        skills = list({normalize_term(s) for s in skills})
+
+        skill_hits = self._term_hits(SPECIALTY, skills)
+        # A mastered scene shows up as a specialty, so count either signal
+        scene_hits = np.zeros(size, dtype=np.int64)
+        if scene:
+            scene_hits = self._term_hits(SCENE, [scene]) + self._term_hits(SPECIALTY, [scene])
+
+        if skills or scene:
+            candidates = np.flatnonzero((skill_hits + scene_hits) > 0)
+        else:
+            candidates = np.flatnonzero(self.active[:size])
+
+        # Filters
+        mask = self.active[candidates] & (self.ratings[candidates] >= min_rating)
+        if available_only:
+            mask &= self.available[candidates]
+        if min_tier is not None:
+            mask &= self.tiers[candidates] >= self.tier_rank.get(min_tier, 0)
+        for user_id in exclude:
+            row = self.row_of.get(user_id)
+            if row is not None:
+                mask &= candidates != row
+        candidates = candidates[mask]
+        if len(candidates) == 0:
+            return []
+
+        # Cosine similarity between the required skills and each specialty set
+        skill_score = np.zeros(len(candidates), dtype=np.float32)
+        if skills:
+            counts = np.maximum(self.specialty_counts[candidates], 1)
+            skill_score = skill_hits[candidates] / np.sqrt(len(skills) * counts)
+
+        scores = (weights['skills'] * skill_score
+                  + weights['scene'] * np.minimum(scene_hits[candidates], 1)
+                  + weights['rating'] * np.clip(self.ratings[candidates] / 5.0, 0.0, 1.0)
+                  + weights['reputation'] * np.clip(self.reputations[candidates] / 10.0, 0.0, 1.0))
+
+        if len(candidates) > top_n:
+            best = np.argpartition(-scores, top_n - 1)[:top_n]
+        else:
+            best = np.arange(len(candidates))
+        best = best[np.argsort(-scores[best], kind='stable')]
+
+        return [(self.user_ids[candidates[i]], float(scores[i])) for i in best]
+
+    def update_search_metrics(self, elapsed_ms: float):
+        searches = self.metrics['searches'] + 1
+        self.metrics['average_search_ms'] += (elapsed_ms - self.metrics['average_search_ms']) / searches
+        self.metrics['searches'] = searches
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Index metrics"""
+        metrics = dict(self.metrics)
+        metrics['terms'] = len(self.postings)
+        return metrics
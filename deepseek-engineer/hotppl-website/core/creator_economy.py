@@ -5,6 +5,8 @@ Advanced multi-tier reward system, collaboration matching, and monetization fram
 """
 
 import asyncio
+import os
+import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
@@ -14,8 +16,11 @@ import json
 import math
 from decimal import Decimal
 
-from database import db, User, Submission, UserRole
+from database import db, User, Submission, SubmissionStatus, UserRole
 from analytics_service import analytics_service
+from points_ledger import PointsLedger
+from collaboration_index import CreatorIndex
+from revenue_settlement import RevenueSettlement
 
 class RewardTier(Enum):
     EARTHLING = "earthling"
@@ -72,6 +77,13 @@ class RewardTransaction:
     metadata: Dict[str, Any]
     created_at: datetime
 
+@dataclass
+class PendingAward:
+    points: int
+    reason: str
+    submission_id: Optional[str] = None
+    collaboration_id: Optional[str] = None
+
 @dataclass
 class CollaborationRequest:
     id: str
@@ -88,6 +100,15 @@ class CollaborationRequest:
     created_at: datetime
     updated_at: datetime
 
+# Profiles joined with their ledger-projected points and tier
+CREATOR_PROFILE_QUERY = '''
+    SELECT p.user_id, COALESCE(b.tier, ?), COALESCE(b.total_points, 0), p.reputation_score,
+           p.specialties, p.collaboration_rating, p.monetization_enabled, p.revenue_share,
+           p.badges, p.achievements, p.preferred_scenes, p.availability_status,
+           p.portfolio_highlights, p.social_links, p.created_at, p.updated_at
+    FROM creator_profiles p LEFT JOIN creator_balances b ON b.user_id = p.user_id
+'''
+
 class AdvancedCreatorEconomy:
     def __init__(self):
         # Reward configuration
@@ -123,11 +144,44 @@ class AdvancedCreatorEconomy:
             RewardTier.ALIEN_ELITE: 0.7
         }
         
+        # Benefits granted on reaching each tier
+        self.tier_benefits = {
+            RewardTier.RISING_STAR: {
+                'badges': ['Rising Star'],
+                'exclusive_access': ['early_challenges'],
+                'bonus_points': 50
+            },
+            RewardTier.SCENE_MASTER: {
+                'badges': ['Scene Master'],
+                'exclusive_access': ['creator_lounge', 'advanced_tools'],
+                'bonus_points': 200
+            },
+            RewardTier.TOP_CREATOR: {
+                'badges': ['Top Creator'],
+                'exclusive_access': ['vip_discord', 'monetization'],
+                'bonus_points': 500
+            },
+            RewardTier.VIRAL_LEGEND: {
+                'badges': ['Viral Legend'],
+                'exclusive_access': ['legend_tier', 'revenue_sharing'],
+                'bonus_points': 1000
+            },
+            RewardTier.ALIEN_ELITE: {
+                'badges': ['Alien Elite'],
+                'exclusive_access': ['elite_tier', 'platform_governance'],
+                'bonus_points': 2000
+            }
+        }
+        
         # Collaboration matching algorithm
         self.collaboration_matcher = CollaborationMatcher()
+        self.collaboration_index_source = None  # database the matcher was loaded from
+        
+        # Append-only points ledger with materialized balances
+        self.ledger = PointsLedger()
         
         # Monetization system
-        self.monetization_system = MonetizationSystem()
+        self.monetization_system = MonetizationSystem(self.revenue_shares)
         
         # Performance tracking
         self.economy_metrics = {
@@ -166,114 +220,125 @@ class AdvancedCreatorEconomy:
         
         return profile
     
-    async def award_points(self, user_id: str, points: int, reason: str, 
+    async def award_points(self, user_id: str, points: int, reason: str,
                           submission_id: str = None, collaboration_id: str = None) -> RewardTransaction:
         """Award points to a creator"""
-        transaction = RewardTransaction(
-            id=str(uuid.uuid4()),
-            user_id=user_id,
-            reward_type=RewardType.POINTS,
-            amount=float(points),
-            reason=reason,
-            submission_id=submission_id,
-            collaboration_id=collaboration_id,
-            metadata={'timestamp': datetime.now().isoformat()},
-            created_at=datetime.now()
+        transactions = await self.award_points_batch(
+            user_id, [PendingAward(points, reason, submission_id, collaboration_id)]
         )
-        
-        # Update creator profile
+        return transactions[0]
+    
+    async def award_points_batch(self, user_id: str, awards: List[PendingAward],
+                                 new_specialties: List[str] = None) -> List[RewardTransaction]:
+        """Award every point amount for one event, resolve promotions and persist once"""
+        now = datetime.now()
+        transactions = [self.create_points_transaction(user_id, award, now) for award in awards]
+        promotions = []
+        
+        # Update creator profile in memory
         profile = await self.get_creator_profile(user_id)
         if profile:
-            profile.total_points += points
+            profile.total_points += sum(award.points for award in awards)
+            
+            for specialty in new_specialties or []:
+                if specialty not in profile.specialties:
+                    profile.specialties.append(specialty)
             
-            # Check for tier promotion
-            new_tier = self.calculate_tier(profile.total_points, await self.get_user_submission_count(user_id))
-            if new_tier != profile.tier:
-                await self.promote_creator(profile, new_tier)
+            # Check for tier promotion, including promotions caused by bonuses
+            submission_count = await self.get_user_submission_count(user_id)
+            promotions = self.resolve_promotions(profile, submission_count, transactions, now)
             
-            profile.updated_at = datetime.now()
-            await self.store_creator_profile(profile)
+            profile.updated_at = now
         
-        # Store transaction
-        await self.store_reward_transaction(transaction)
+        # Store all transactions and the profile together
+        await self.store_reward_batch(profile, transactions)
         
         # Update metrics
+        points = int(sum(transaction.amount for transaction in transactions))
         self.economy_metrics['total_points_distributed'] += points
         
         # Log analytics
         analytics_service.log_event('points_awarded', {
             'user_id': user_id,
             'points': points,
-            'reason': reason,
+            'reasons': [transaction.reason for transaction in transactions],
             'total_points': profile.total_points if profile else points
         })
         
-        return transaction
+        for old_tier, new_tier in promotions:
+            analytics_service.log_event('creator_promoted', {
+                'user_id': user_id,
+                'old_tier': old_tier.value,
+                'new_tier': new_tier.value,
+                'total_points': profile.total_points
+            })
+            print(f"🎉 Creator {user_id} promoted to {new_tier.value}")
+        
+        return transactions
+    
+    def create_points_transaction(self, user_id: str, award: PendingAward,
+                                  timestamp: datetime) -> RewardTransaction:
+        """Build a points transaction for an award"""
+        return RewardTransaction(
+            id=str(uuid.uuid4()),
+            user_id=user_id,
+            reward_type=RewardType.POINTS,
+            amount=float(award.points),
+            reason=award.reason,
+            submission_id=award.submission_id,
+            collaboration_id=award.collaboration_id,
+            metadata={'timestamp': timestamp.isoformat()},
+            created_at=timestamp
+        )
     
-    async def promote_creator(self, profile: CreatorProfile, new_tier: RewardTier):
-        """Promote creator to new tier"""
-        old_tier = profile.tier
+    def resolve_promotions(self, profile: CreatorProfile, submission_count: int,
+                           transactions: List[RewardTransaction],
+                           timestamp: datetime) -> List[Tuple[RewardTier, RewardTier]]:
+        """Apply tier changes until the tier is stable, appending bonus transactions"""
+        promotions = []
+        
+        # Points only grow here, so the tier settles within one pass per tier
+        for _ in range(len(RewardTier)):
+            new_tier = self.calculate_tier(profile.total_points, submission_count)
+            if new_tier == profile.tier:
+                break
+            
+            old_tier = profile.tier
+            bonus_points = self.promote_creator(profile, new_tier)
+            promotions.append((old_tier, new_tier))
+            
+            if bonus_points > 0:
+                profile.total_points += bonus_points
+                transactions.append(self.create_points_transaction(
+                    profile.user_id,
+                    PendingAward(bonus_points, f"Tier promotion bonus: {new_tier.value}"),
+                    timestamp
+                ))
+        
+        return promotions
+    
+    def promote_creator(self, profile: CreatorProfile, new_tier: RewardTier) -> int:
+        """Promote creator to new tier and return the bonus points it earns"""
         profile.tier = new_tier
         profile.revenue_share = self.revenue_shares[new_tier]
         
-        # Award tier-specific benefits
-        await self.award_tier_benefits(profile, new_tier)
-        
         # Enable monetization for higher tiers
         if new_tier.value in ['top_creator', 'viral_legend', 'alien_elite']:
             profile.monetization_enabled = True
         
-        # Log promotion
-        analytics_service.log_event('creator_promoted', {
-            'user_id': profile.user_id,
-            'old_tier': old_tier.value,
-            'new_tier': new_tier.value,
-            'total_points': profile.total_points
-        })
-        
-        print(f"🎉 Creator {profile.user_id} promoted to {new_tier.value}")
+        # Award tier-specific benefits
+        return self.award_tier_benefits(profile, new_tier)
     
-    async def award_tier_benefits(self, profile: CreatorProfile, tier: RewardTier):
-        """Award tier-specific benefits"""
-        benefits = {
-            RewardTier.RISING_STAR: {
-                'badges': ['Rising Star'],
-                'exclusive_access': ['early_challenges'],
-                'bonus_points': 50
-            },
-            RewardTier.SCENE_MASTER: {
-                'badges': ['Scene Master'],
-                'exclusive_access': ['creator_lounge', 'advanced_tools'],
-                'bonus_points': 200
-            },
-            RewardTier.TOP_CREATOR: {
-                'badges': ['Top Creator'],
-                'exclusive_access': ['vip_discord', 'monetization'],
-                'bonus_points': 500
-            },
-            RewardTier.VIRAL_LEGEND: {
-                'badges': ['Viral Legend'],
-                'exclusive_access': ['legend_tier', 'revenue_sharing'],
-                'bonus_points': 1000
-            },
-            RewardTier.ALIEN_ELITE: {
-                'badges': ['Alien Elite'],
-                'exclusive_access': ['elite_tier', 'platform_governance'],
-                'bonus_points': 2000
-            }
-        }
-        
-        tier_benefits = benefits.get(tier, {})
+    def award_tier_benefits(self, profile: CreatorProfile, tier: RewardTier) -> int:
+        """Award tier-specific badges and return the tier's bonus points"""
+        tier_benefits = self.tier_benefits.get(tier, {})
         
         # Award badges
         for badge in tier_benefits.get('badges', []):
             if badge not in profile.badges:
                 profile.badges.append(badge)
         
-        # Award bonus points
-        bonus_points = tier_benefits.get('bonus_points', 0)
-        if bonus_points > 0:
-            await self.award_points(profile.user_id, bonus_points, f"Tier promotion bonus: {tier.value}")
+        return tier_benefits.get('bonus_points', 0)
     
     def calculate_tier(self, total_points: int, submission_count: int) -> RewardTier:
         """Calculate creator tier based on points and submissions"""
@@ -289,65 +354,87 @@ class AdvancedCreatorEconomy:
         user_id = submission.user_id
         
         # Base submission reward
-        base_points = self.point_values['submission_created']
-        await self.award_points(user_id, base_points, "New submission", submission.id)
+        awards = [PendingAward(self.point_values['submission_created'], "New submission", submission.id)]
         
         # Quality bonus
         quality_score = analysis_results.get('quality_score', 0.0)
         if quality_score > 0.8:
             quality_bonus = int(quality_score * 50)
-            await self.award_points(user_id, quality_bonus, "High quality submission", submission.id)
+            awards.append(PendingAward(quality_bonus, "High quality submission", submission.id))
         
         # Creativity bonus
         creativity_score = analysis_results.get('creativity_score', 0.0)
         if creativity_score > 0.7:
             creativity_bonus = int(creativity_score * 30)
-            await self.award_points(user_id, creativity_bonus, "Creative submission", submission.id)
+            awards.append(PendingAward(creativity_bonus, "Creative submission", submission.id))
         
         # Viral potential bonus
         viral_potential = analysis_results.get('viral_potential', 0.0)
         if viral_potential > 0.8:
             viral_bonus = self.point_values['viral_submission']
-            await self.award_points(user_id, viral_bonus, "Viral potential submission", submission.id)
+            awards.append(PendingAward(viral_bonus, "Viral potential submission", submission.id))
         
         # Scene mastery tracking
-        await self.track_scene_mastery(user_id, submission.scene_name)
+        mastery_award = await self.get_scene_mastery_award(user_id, submission.scene_name)
+        if mastery_award:
+            awards.append(mastery_award)
+        
+        await self.award_points_batch(
+            user_id, awards, new_specialties=[submission.scene_name] if mastery_award else None
+        )
     
-    async def track_scene_mastery(self, user_id: str, scene_name: str):
-        """Track and reward scene mastery"""
+    async def get_scene_mastery_award(self, user_id: str, scene_name: str) -> Optional[PendingAward]:
+        """Scene mastery award if the user just reached a milestone for the scene"""
         # Count submissions for this scene
-        scene_submissions = await self.get_user_scene_submissions(user_id, scene_name)
+        scene_count = await self.get_user_scene_submission_count(user_id, scene_name)
         
         # Award mastery at milestones
         mastery_milestones = {5: 100, 10: 300, 20: 500}
         
-        if len(scene_submissions) in mastery_milestones:
-            mastery_points = mastery_milestones[len(scene_submissions)]
-            await self.award_points(user_id, mastery_points, f"Scene mastery: {scene_name}")
-            
-            # Add to specialties
-            profile = await self.get_creator_profile(user_id)
-            if profile and scene_name not in profile.specialties:
-                profile.specialties.append(scene_name)
-                await self.store_creator_profile(profile)
+        if scene_count in mastery_milestones:
+            return PendingAward(mastery_milestones[scene_count], f"Scene mastery: {scene_name}")
+        return None
+    
+    async def track_scene_mastery(self, user_id: str, scene_name: str):
+        """Track and reward scene mastery"""
+        mastery_award = await self.get_scene_mastery_award(user_id, scene_name)
+        
+        if mastery_award:
+            # Award points and add to specialties together
+            await self.award_points_batch(user_id, [mastery_award], new_specialties=[scene_name])
     
     async def process_vote_rewards(self, vote_data: Dict):
         """Process rewards for receiving votes"""
-        submission_id = vote_data['submission_id']
-        submission = await self.get_submission(submission_id)
-        
-        if submission:
-            vote_points = self.point_values['vote_received']
-            await self.award_points(submission.user_id, vote_points, "Vote received", submission_id)
+        await self.process_vote_rewards_batch([vote_data])
+    
+    async def process_vote_rewards_batch(self, votes: List[Dict]):
+        """Process rewards for a burst of votes with one reward batch per creator"""
+        vote_points = self.point_values['vote_received']
+        milestones = {10: 20, 50: 100, 100: 300, 500: 1000}
+        
+        awards_by_user: Dict[str, List[PendingAward]] = {}
+        submissions: Dict[str, Optional[Submission]] = {}
+        
+        for vote_data in votes:
+            submission_id = vote_data['submission_id']
+            if submission_id not in submissions:
+                submissions[submission_id] = await self.get_submission(submission_id)
+            submission = submissions[submission_id]
+            
+            if not submission:
+                continue
+            
+            awards = awards_by_user.setdefault(submission.user_id, [])
+            awards.append(PendingAward(vote_points, "Vote received", submission_id))
             
             # Milestone bonuses
             vote_count = vote_data.get('new_vote_count', 0)
-            milestones = {10: 20, 50: 100, 100: 300, 500: 1000}
-            
             if vote_count in milestones:
-                milestone_bonus = milestones[vote_count]
-                await self.award_points(submission.user_id, milestone_bonus, 
-                                      f"Vote milestone: {vote_count} votes", submission_id)
+                awards.append(PendingAward(milestones[vote_count],
+                                           f"Vote milestone: {vote_count} votes", submission_id))
+        
+        for user_id, awards in awards_by_user.items():
+            await self.award_points_batch(user_id, awards)
     
     async def create_collaboration_request(self, requester_id: str, scene_name: str, 
                                          description: str, required_skills: List[str],
@@ -375,7 +462,9 @@ class AdvancedCreatorEconomy:
         # Store collaboration
         await self.store_collaboration_request(collaboration)
         
-        # Find potential matches
+        # Find potential matches, loading stored profiles on first use
+        if self.collaboration_index_source != db.db_path:
+            await self.rebuild_collaboration_index()
         matches = await self.collaboration_matcher.find_matches(collaboration)
         
         # Notify potential collaborators
@@ -383,6 +472,14 @@ class AdvancedCreatorEconomy:
         
         return collaboration
     
+    async def notify_potential_collaborators(self, collaboration: CollaborationRequest, matches: List[str]):
+        """Record the matched creators for a collaboration request"""
+        analytics_service.log_event('collaboration_matched', {
+            'collaboration_id': collaboration.id,
+            'scene_name': collaboration.scene_name,
+            'matches': matches
+        }, user_id=collaboration.requester_id)
+    
     async def apply_for_collaboration(self, collaboration_id: str, applicant_id: str) -> bool:
         """Apply for a collaboration"""
         collaboration = await self.get_collaboration_request(collaboration_id)
@@ -454,18 +551,106 @@ class AdvancedCreatorEconomy:
     # Storage and retrieval methods
     async def store_creator_profile(self, profile: CreatorProfile):
         """Store creator profile in database"""
-        # Implementation would store in database
-        pass
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        
+        self._upsert_creator_profile(cursor, profile)
+        self.ledger.set_tier(cursor, profile.user_id, profile.tier.value)
+        
+        conn.commit()
+        conn.close()
+        
+        self.collaboration_matcher.update_profile(profile)
     
     async def get_creator_profile(self, user_id: str) -> Optional[CreatorProfile]:
         """Get creator profile from database"""
-        # Implementation would retrieve from database
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(CREATOR_PROFILE_QUERY + ' WHERE p.user_id = ?', (RewardTier.EARTHLING.value, user_id))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row:
+            return self._row_to_profile(row)
         return None
     
+    def _row_to_profile(self, row) -> CreatorProfile:
+        """Build a CreatorProfile from a CREATOR_PROFILE_QUERY row"""
+        return CreatorProfile(
+            user_id=row[0], tier=RewardTier(row[1]), total_points=row[2],
+            reputation_score=row[3], specialties=json.loads(row[4] or '[]'),
+            collaboration_rating=row[5], monetization_enabled=bool(row[6]),
+            revenue_share=row[7], badges=json.loads(row[8] or '[]'),
+            achievements=json.loads(row[9] or '[]'), preferred_scenes=json.loads(row[10] or '[]'),
+            availability_status=row[11], portfolio_highlights=json.loads(row[12] or '[]'),
+            social_links=json.loads(row[13] or '{}'), created_at=datetime.fromisoformat(row[14]),
+            updated_at=datetime.fromisoformat(row[15])
+        )
+    
+    async def rebuild_collaboration_index(self) -> int:
+        """Replace the collaboration index with every stored creator profile"""
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute(CREATOR_PROFILE_QUERY, (RewardTier.EARTHLING.value,))
+        self.collaboration_matcher.clear()
+        count = 0
+        for row in cursor:
+            self.collaboration_matcher.update_profile(self._row_to_profile(row))
+            count += 1
+        conn.close()
+        self.collaboration_index_source = db.db_path
+        
+        print(f"🤝 Indexed {count} creators for collaboration matching")
+        return count
+    
     async def store_reward_transaction(self, transaction: RewardTransaction):
         """Store reward transaction in database"""
-        # Implementation would store in database
-        pass
+        await self.store_reward_batch(None, [transaction])
+    
+    async def get_points_balance(self, user_id: str) -> int:
+        """Current points balance from the materialized ledger projection"""
+        balance = self.ledger.get_balance(user_id)
+        return balance['total_points'] if balance else 0
+    
+    async def store_reward_batch(self, profile: Optional[CreatorProfile],
+                                 transactions: List[RewardTransaction]):
+        """Append reward transactions to the ledger and store the updated profile in one database transaction"""
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        
+        try:
+            self.ledger.append(cursor, transactions)
+            
+            if profile:
+                self._upsert_creator_profile(cursor, profile)
+                self.ledger.set_tier(cursor, profile.user_id, profile.tier.value)
+            
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        if profile:
+            self.collaboration_matcher.update_profile(profile)
+    
+    def _upsert_creator_profile(self, cursor, profile: CreatorProfile):
+        """Write a creator profile row; points and tier live in creator_balances"""
+        cursor.execute('''
+            INSERT OR REPLACE INTO creator_profiles (user_id, reputation_score, specialties,
+                collaboration_rating, monetization_enabled, revenue_share, badges, achievements,
+                preferred_scenes, availability_status, portfolio_highlights, social_links,
+                created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (profile.user_id, profile.reputation_score,
+              json.dumps(profile.specialties), profile.collaboration_rating, profile.monetization_enabled,
+              profile.revenue_share, json.dumps(profile.badges), json.dumps(profile.achievements),
+              json.dumps(profile.preferred_scenes), profile.availability_status,
+              json.dumps(profile.portfolio_highlights), json.dumps(profile.social_links),
+              profile.created_at, profile.updated_at))
     
     async def store_collaboration_request(self, collaboration: CollaborationRequest):
         """Store collaboration request in database"""
@@ -480,31 +665,93 @@ class AdvancedCreatorEconomy:
     # Additional helper methods...
     async def get_user_submission_count(self, user_id: str) -> int:
         """Get user's total submission count"""
-        return 0  # Placeholder
+        return db.get_user_submission_count(user_id)
     
-    async def get_user_scene_submissions(self, user_id: str, scene_name: str) -> List:
-        """Get user's submissions for a specific scene"""
-        return []  # Placeholder
+    async def get_user_scene_submission_count(self, user_id: str, scene_name: str) -> int:
+        """Get user's submission count for a specific scene"""
+        return db.get_scene_submission_count(user_id, scene_name)
+    
+    async def repair_submission_counters(self) -> Dict[str, int]:
+        """Rebuild submission counters from the submissions table"""
+        return db.rebuild_submission_counters()
     
     async def get_submission(self, submission_id: str) -> Optional[Submission]:
         """Get submission by ID"""
-        return None  # Placeholder
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT id, user_id, scene_name, title, description, video_url, thumbnail_url,
+                   tools_used, status, created_at, updated_at, vote_count, view_count,
+                   share_count, discord_message_id, processing_data
+            FROM submissions WHERE id = ?
+        ''', (submission_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row:
+            return Submission(
+                id=row[0], user_id=row[1], scene_name=row[2], title=row[3], description=row[4],
+                video_url=row[5], thumbnail_url=row[6], tools_used=json.loads(row[7] or '[]'),
+                status=SubmissionStatus(row[8]), created_at=datetime.fromisoformat(row[9]),
+                updated_at=datetime.fromisoformat(row[10]), vote_count=row[11], view_count=row[12],
+                share_count=row[13], discord_message_id=row[14],
+                processing_data=json.loads(row[15]) if row[15] else None
+            )
+        return None
 
 class CollaborationMatcher:
     """Advanced collaboration matching algorithm"""
     
-    async def find_matches(self, collaboration: CollaborationRequest) -> List[str]:
+    def __init__(self, top_n: int = 20):
+        self.top_n = top_n
+        self.index = CreatorIndex([tier.value for tier in RewardTier])
+    
+    def update_profile(self, profile: CreatorProfile):
+        """Keep the index in step with a changed profile"""
+        self.index.upsert(profile)
+    
+    def remove_profile(self, user_id: str) -> bool:
+        """Drop a creator from matching"""
+        return self.index.remove(user_id)
+    
+    def clear(self):
+        """Drop every creator from matching"""
+        self.index = CreatorIndex([tier.value for tier in RewardTier])
+    
+    async def find_matches(self, collaboration: CollaborationRequest, min_tier: RewardTier = None,
+                           min_rating: float = 0.0) -> List[str]:
         """Find potential collaboration matches"""
-        # Implementation would use ML algorithms to match creators
-        return []
+        matches = self.index.search(
+            collaboration.required_skills,
+            scene=collaboration.scene_name,
+            top_n=self.top_n,
+            min_tier=min_tier.value if min_tier else None,
+            min_rating=min_rating,
+            exclude=[collaboration.requester_id]
+        )
+        return [user_id for user_id, _ in matches]
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Matching index metrics"""
+        return self.index.get_metrics()
 
 class MonetizationSystem:
     """Creator monetization and revenue sharing system"""
     
-    async def process_revenue_share(self, creator_id: str, revenue: Decimal):
-        """Process revenue sharing for creators"""
-        # Implementation would handle payments and revenue distribution
-        pass
+    def __init__(self, revenue_shares: Dict[RewardTier, float]):
+        self.settlement = RevenueSettlement(
+            {tier.value: share for tier, share in revenue_shares.items()},
+            output_dir=os.getenv('HOTPPL_PAYOUT_DIR', 'payouts')
+        )
+    
+    async def process_revenue_share(self, creator_id: str, revenue: Decimal, source: str = None):
+        """Record revenue for a creator; shares are paid out when the period is settled"""
+        self.settlement.record_event(creator_id, revenue, source)
+    
+    async def settle_period(self, period_start: datetime, period_end: datetime) -> Dict[str, Any]:
+        """Settle a period's revenue and write its payout file"""
+        return await asyncio.to_thread(self.settlement.run, period_start, period_end)
 
 # Global creator economy instance
 creator_economy = AdvancedCreatorEconomy()
@@ -8,7 +8,7 @@ import sqlite3
 import json
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Any, Callable, Dict, List, Optional
 from dataclasses import dataclass, asdict
 from enum import Enum
 import uuid
@@ -89,6 +89,7 @@ class Challenge:
 class HotPPLDatabase:
     def __init__(self, db_path: str = "hotppl_platform.db"):
         self.db_path = db_path
+        self.submission_listeners: List[Callable[[Submission], None]] = []  # called after each insert
         self.init_database()
     
     def init_database(self):
@@ -139,6 +140,18 @@ class HotPPLDatabase:
             )
         ''')
         
+        # Vote and share counts are bumped from several writers; stamp the row
+        # so incremental readers (the feature store) see engagement change
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS submissions_touch_engagement
+            AFTER UPDATE OF vote_count, share_count ON submissions
+            WHEN NEW.updated_at IS OLD.updated_at
+            BEGIN
+                UPDATE submissions SET updated_at = strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')
+                WHERE id = NEW.id;
+            END
+        ''')
+        
         # Votes table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS votes (
@@ -198,17 +211,208 @@ class HotPPLDatabase:
             )
         ''')
         
+        # Creator profiles table
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creator_profiles (
+                user_id TEXT PRIMARY KEY,
+                reputation_score REAL DEFAULT 5.0,
+                specialties TEXT, -- JSON array
+                collaboration_rating REAL DEFAULT 5.0,
+                monetization_enabled BOOLEAN DEFAULT FALSE,
+                revenue_share REAL DEFAULT 0.0,
+                badges TEXT, -- JSON array
+                achievements TEXT, -- JSON array
+                preferred_scenes TEXT, -- JSON array
+                availability_status TEXT,
+                portfolio_highlights TEXT, -- JSON array
+                social_links TEXT, -- JSON object
+                created_at TIMESTAMP NOT NULL,
+                updated_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        
+        # Reward transactions ledger (append-only, seq gives replay order)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS reward_transactions (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT UNIQUE NOT NULL,
+                user_id TEXT NOT NULL,
+                reward_type TEXT NOT NULL,
+                amount REAL NOT NULL,
+                reason TEXT,
+                submission_id TEXT,
+                collaboration_id TEXT,
+                metadata TEXT, -- JSON object
+                created_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS reward_transactions_no_update
+            BEFORE UPDATE ON reward_transactions
+            BEGIN SELECT RAISE(ABORT, 'reward_transactions is append-only'); END
+        ''')
+        
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS reward_transactions_no_delete
+            BEFORE DELETE ON reward_transactions
+            BEGIN SELECT RAISE(ABORT, 'reward_transactions is append-only'); END
+        ''')
+        
+        # Creator balances table (materialized from the reward ledger)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS creator_balances (
+                user_id TEXT PRIMARY KEY,
+                total_points INTEGER NOT NULL DEFAULT 0,
+                tier TEXT NOT NULL,
+                last_seq INTEGER NOT NULL DEFAULT 0, -- highest ledger seq projected
+                updated_at TIMESTAMP NOT NULL,
+                FOREIGN KEY (user_id) REFERENCES users (id)
+            )
+        ''')
+        
+        # Per-scene submission counters (per-user totals live in users.total_submissions)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scene_submission_counts (
+                user_id TEXT NOT NULL,
+                scene_name TEXT NOT NULL,
+                submission_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, scene_name)
+            )
+        ''')
+        
+        # Revenue events table (amounts in integer micro-units of the currency)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS revenue_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT UNIQUE NOT NULL,
+                creator_id TEXT NOT NULL,
+                amount_micros INTEGER NOT NULL,
+                currency TEXT NOT NULL,
+                source TEXT,
+                occurred_at TIMESTAMP NOT NULL
+            )
+        ''')
+        
+        # Settlement runs and their per-creator totals (checkpointed by seq)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS settlement_runs (
+                id TEXT PRIMARY KEY,
+                period_start TIMESTAMP NOT NULL,
+                period_end TIMESTAMP NOT NULL,
+                currency TEXT NOT NULL,
+                status TEXT NOT NULL, -- 'running', 'completed'
+                start_seq INTEGER NOT NULL,
+                end_seq INTEGER NOT NULL,
+                last_seq INTEGER NOT NULL,
+                events_processed INTEGER NOT NULL DEFAULT 0,
+                payout_file TEXT,
+                created_at TIMESTAMP NOT NULL,
+                completed_at TIMESTAMP
+            )
+        ''')
+        
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS settlement_totals (
+                run_id TEXT NOT NULL,
+                creator_id TEXT NOT NULL,
+                gross_micros INTEGER NOT NULL DEFAULT 0,
+                tier TEXT,
+                share_bps INTEGER,
+                payout_minor INTEGER,
+                PRIMARY KEY (run_id, creator_id),
+                FOREIGN KEY (run_id) REFERENCES settlement_runs (id)
+            )
+        ''')
+        
+        # Post metric time series: one delta-encoded block per post per UTC day
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS post_metric_partitions (
+                post_id TEXT NOT NULL,
+                day INTEGER NOT NULL, -- days since epoch (UTC)
+                sample_count INTEGER NOT NULL,
+                first_ts INTEGER NOT NULL, -- epoch milliseconds
+                last_ts INTEGER NOT NULL,
+                columns TEXT NOT NULL, -- comma separated metric names
+                dtype TEXT NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (post_id, day)
+            )
+        ''')
+        
+        # Batch-scored model predictions, one row per entity per model version
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS model_predictions (
+                entity_type TEXT NOT NULL, -- 'submissions', 'creators'
+                entity_id TEXT NOT NULL,
+                model TEXT NOT NULL,
+                model_version INTEGER NOT NULL,
+                score REAL NOT NULL,
+                predicted_at TIMESTAMP NOT NULL,
+                PRIMARY KEY (model, model_version, entity_type, entity_id)
+            )
+        ''')
+        
+        # HyperLogLog registers of distinct active users per minute, hour and day
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS active_user_sketches (
+                bucket_seconds INTEGER NOT NULL, -- 60, 3600, 86400
+                bucket_start INTEGER NOT NULL, -- epoch seconds
+                registers BLOB NOT NULL,
+                PRIMARY KEY (bucket_seconds, bucket_start)
+            )
+        ''')
+        
+        # One row per tool a submission lists, so listings can filter by tool through an index
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS submission_tools (
+                tool TEXT NOT NULL,
+                submission_id TEXT NOT NULL,
+                PRIMARY KEY (tool, submission_id)
+            )
+        ''')
+        cursor.execute('SELECT 1 FROM submission_tools LIMIT 1')
+        if cursor.fetchone() is None:
+            cursor.execute('''
+                INSERT OR IGNORE INTO submission_tools (tool, submission_id)
+                SELECT t.value, s.id
+                FROM submissions s, json_each(CASE WHEN json_valid(s.tools_used) THEN s.tools_used END) t
+                WHERE t.type = 'text'
+            ''')
+        
         # Create indexes for performance
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_user_id ON submissions(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_status ON submissions(status)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_created_at ON submissions(created_at)')
+        # Keyset pagination: equality filters first, then the full sort key
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_status_recent ON submissions(status, created_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_status_top ON submissions(status, vote_count, created_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_scene_recent ON submissions(scene_name, status, created_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_submissions_scene_top ON submissions(scene_name, status, vote_count, created_at, id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_submission_tools_submission_id ON submission_tools(submission_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_votes_submission_id ON votes(submission_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_votes_user_id ON votes(user_id)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_analytics_event_type ON analytics(event_type)')
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_analytics_timestamp ON analytics(timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_reward_transactions_user_seq ON reward_transactions(user_id, seq)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_revenue_events_occurred_at ON revenue_events(occurred_at)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_post_metric_partitions_day ON post_metric_partitions(day)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_model_predictions_score ON model_predictions(model, model_version, score)')
+        
+        # Databases from before the counters were maintained have stale user
+        # totals and no scene counters; seed both once from submissions
+        cursor.execute('SELECT 1 FROM scene_submission_counts LIMIT 1')
+        counters_missing = cursor.fetchone() is None
+        cursor.execute('SELECT 1 FROM submissions LIMIT 1')
+        counters_missing = counters_missing and cursor.fetchone() is not None
         
         conn.commit()
         conn.close()
+        
+        if counters_missing:
+            self.rebuild_submission_counters()
     
     def create_user(self, discord_id: str, username: str, email: str = None) -> User:
         """Create a new user"""
@@ -285,11 +489,101 @@ class HotPPLDatabase:
               json.dumps(submission.tools_used), submission.status.value,
               submission.created_at, submission.updated_at))
         
+        cursor.executemany('INSERT OR IGNORE INTO submission_tools (tool, submission_id) VALUES (?, ?)',
+                           [(tool, submission.id) for tool in tools_used])
+        self._adjust_submission_counters(cursor, user_id, scene_name, 1)
+        
         conn.commit()
         conn.close()
         
+        for listener in self.submission_listeners:
+            listener(submission)
+        
         return submission
     
+    def delete_submission(self, submission_id: str) -> bool:
+        """Delete a submission and decrement its counters"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT user_id, scene_name FROM submissions WHERE id = ?', (submission_id,))
+        row = cursor.fetchone()
+        
+        if row:
+            cursor.execute('DELETE FROM submissions WHERE id = ?', (submission_id,))
+            cursor.execute('DELETE FROM submission_tools WHERE submission_id = ?', (submission_id,))
+            self._adjust_submission_counters(cursor, row[0], row[1], -1)
+            conn.commit()
+        
+        conn.close()
+        return row is not None
+    
+    def _adjust_submission_counters(self, cursor, user_id: str, scene_name: str, delta: int):
+        """Apply a submission count change inside the caller's transaction"""
+        cursor.execute('''
+            UPDATE users SET total_submissions = MAX(0, total_submissions + ?) WHERE id = ?
+        ''', (delta, user_id))
+        cursor.execute('''
+            INSERT INTO scene_submission_counts (user_id, scene_name, submission_count)
+            VALUES (?, ?, MAX(0, ?))
+            ON CONFLICT(user_id, scene_name) DO UPDATE SET
+                submission_count = MAX(0, submission_count + ?)
+        ''', (user_id, scene_name, delta, delta))
+    
+    def get_user_submission_count(self, user_id: str) -> int:
+        """Total submissions for a user from the maintained counter"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT total_submissions FROM users WHERE id = ?', (user_id,))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row[0] if row else 0
+    
+    def get_scene_submission_count(self, user_id: str, scene_name: str) -> int:
+        """Submissions for a user in one scene from the maintained counter"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT submission_count FROM scene_submission_counts WHERE user_id = ? AND scene_name = ?
+        ''', (user_id, scene_name))
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row[0] if row else 0
+    
+    def rebuild_submission_counters(self) -> Dict[str, int]:
+        """Repair job: recompute every submission counter from the submissions table"""
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        cursor = conn.cursor()
+        
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('''
+                UPDATE users SET total_submissions =
+                    (SELECT COUNT(*) FROM submissions s WHERE s.user_id = users.id)
+            ''')
+            users_updated = cursor.rowcount
+            
+            cursor.execute('DELETE FROM scene_submission_counts')
+            cursor.execute('''
+                INSERT INTO scene_submission_counts (user_id, scene_name, submission_count)
+                SELECT user_id, scene_name, COUNT(*) FROM submissions GROUP BY user_id, scene_name
+            ''')
+            scene_counters = cursor.rowcount
+            
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+        
+        print(f"🔧 Rebuilt submission counters for {users_updated} users, {scene_counters} scenes")
+        return {'users': users_updated, 'scene_counters': scene_counters}
+    
     def get_leaderboard(self, limit: int = 10) -> List[Dict]:
         """Get current leaderboard"""
         conn = sqlite3.connect(self.db_path)
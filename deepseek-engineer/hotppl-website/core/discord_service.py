@@ -326,6 +326,29 @@ class AdvancedDiscordService:
         
         await channel.send(embed=embed)
     
+    async def post_alert(self, alert: Dict[str, Any]) -> Dict:
+        """Post an anomaly alert to the platform stats channel"""
+        channel = self.channels.get('📈-platform-stats')
+        if not channel:
+            return {'success': False, 'error': 'Platform stats channel not found'}
+
+        embed = discord.Embed(
+            title=f"🚨 {alert['message']}",
+            description=alert['action'],
+            color=0xff3b30 if alert['type'] == 'danger' else 0xffcc00,
+            timestamp=datetime.now()
+        )
+        embed.add_field(name="📈 Value", value=f"{alert['value']:.2f}", inline=True)
+        embed.add_field(name="📊 Baseline", value=f"{alert['baseline']:.2f}", inline=True)
+        embed.add_field(name="📐 Z-Score", value=f"{alert['z_score']:+.1f}", inline=True)
+        embed.set_footer(text="Streaming anomaly detection • HOT PPL")
+
+        try:
+            message = await channel.send(embed=embed)
+            return {'success': True, 'message_id': str(message.id)}
+        except Exception as e:
+            return {'success': False, 'error': str(e)}
+
     def is_connected(self) -> bool:
         """Check if Discord service is connected"""
         return self._connected and self.bot.is_ready()
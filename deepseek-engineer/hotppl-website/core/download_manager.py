@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Download Manager
+Bounded, resumable video downloads for the AI content processing pipeline
+"""
+
+import asyncio
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import aiohttp
+
+class DownloadError(Exception):
+    """Raised when a video cannot be downloaded within the configured limits"""
+
+class DownloadManager:
+    """Downloads submission videos through one shared session.
+
+    Each host gets its own concurrency cap, bodies are streamed in large chunks
+    up to ``max_bytes``, interrupted transfers resume with an HTTP Range request
+    when the server supports it, and the temp file is removed on any failure.
+    """
+
+    def __init__(self, max_bytes: int = None, chunk_size: int = 1024 * 1024,
+                 per_host_limit: int = 4, timeout: float = 300.0,
+                 connect_timeout: float = 10.0, max_resumes: int = 3):
+        self.max_bytes = max_bytes or int(os.getenv('HOTPPL_MAX_VIDEO_BYTES', 500 * 1024 * 1024))
+        self.chunk_size = chunk_size
+        self.per_host_limit = per_host_limit
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=connect_timeout,
+                                             sock_read=connect_timeout * 3)
+        self.max_resumes = max_resumes
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+        # Performance metrics
+        self.metrics = {
+            'downloads_started': 0,
+            'downloads_completed': 0,
+            'downloads_failed': 0,
+            'bytes_downloaded': 0,
+            'resumes': 0,
+            'size_limit_rejections': 0
+        }
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session, creating it on first use"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.per_host_limit)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """Get the concurrency cap for the URL's host"""
+        host = urlparse(url).netloc.lower()
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return self._host_semaphores[host]
+
+    async def download(self, url: str, suffix: str = '.mp4') -> str:
+        """Download a URL to a temp file and return its path; the caller owns cleanup"""
+        fd, path = tempfile.mkstemp(suffix=suffix, prefix='hotppl_')
+        os.close(fd)
+        self.metrics['downloads_started'] += 1
+
+        try:
+            async with self.get_host_semaphore(url):
+                await self._fetch(url, path)
+        except BaseException:
+            self.metrics['downloads_failed'] += 1
+            self.cleanup(path)
+            raise
+
+        self.metrics['downloads_completed'] += 1
+        return path
+
+    @asynccontextmanager
+    async def temporary_download(self, url: str, suffix: str = '.mp4'):
+        """Download a URL and guarantee the temp file is removed afterwards"""
+        path = await self.download(url, suffix)
+        try:
+            yield path
+        finally:
+            self.cleanup(path)
+
+    async def _fetch(self, url: str, path: str):
+        """Stream the body into path, resuming with Range requests after interruptions"""
+        session = await self.get_session()
+        received = 0
+        expected = None
+        resumes = 0
+
+        with open(path, 'wb') as f:
+            while True:
+                headers = {'Range': f'bytes={received}-'} if received else {}
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        if received and response.status != 206:
+                            # Server ignored the Range header; start over
+                            f.seek(0)
+                            f.truncate()
+                            received = 0
+
+                        if response.status not in (200, 206):
+                            raise DownloadError(f"HTTP {response.status} downloading {url}")
+
+                        if expected is None:
+                            expected = self._expected_size(response)
+                            if expected is not None and expected > self.max_bytes:
+                                self.metrics['size_limit_rejections'] += 1
+                                raise DownloadError(f"Video is {expected} bytes, limit is {self.max_bytes}")
+
+                        async for chunk in response.content.iter_chunked(self.chunk_size):
+                            received += len(chunk)
+                            if received > self.max_bytes:
+                                self.metrics['size_limit_rejections'] += 1
+                                raise DownloadError(f"Video exceeds {self.max_bytes} byte limit")
+                            f.write(chunk)
+                            self.metrics['bytes_downloaded'] += len(chunk)
+
+                    if expected is None or received >= expected:
+                        return
+
+                    # Body ended early without a transport error
+                    raise aiohttp.ClientPayloadError(f"Received {received} of {expected} bytes")
+
+                except (aiohttp.ClientPayloadError, aiohttp.ServerDisconnectedError,
+                        aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    if resumes >= self.max_resumes:
+                        raise DownloadError(f"Download of {url} failed after {resumes} resumes: {e}") from e
+                    resumes += 1
+                    self.metrics['resumes'] += 1
+                    f.flush()
+
+    def _expected_size(self, response: aiohttp.ClientResponse) -> Optional[int]:
+        """Total size of the resource from Content-Range or Content-Length"""
+        content_range = response.headers.get('Content-Range')
+        if content_range and '/' in content_range:
+            total = content_range.rsplit('/', 1)[1]
+            if total.isdigit():
+                return int(total)
+        if response.status == 200 and response.content_length is not None:
+            return response.content_length
+        return None
+
+    def cleanup(self, path: str):
+        """Remove a downloaded temp file if it still exists"""
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -5,19 +5,22 @@ Advanced analytics dashboard with predictive insights and revenue optimization
 """
 
 import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, is_dataclass
 import json
-import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
 
 from database import db
+from async_cache import AsyncTTLCache
+from campaign_pipeline import CampaignPipeline, PipelineStage
+from chart_rollups import ChartRollup
+from feature_store import FeatureStore
+from model_training import ModelTrainer
+from batch_predictions import BatchPredictor
 from analytics_service import analytics_service
 from ai_content_processor import ai_processor
 from creator_economy import creator_economy
@@ -66,17 +69,33 @@ class RevenueMetrics:
 
 class EnterpriseAnalyticsSuite:
     def __init__(self):
-        # ML Models for predictions
-        self.viral_predictor = RandomForestRegressor(n_estimators=100)
-        self.user_retention_predictor = RandomForestRegressor(n_estimators=100)
-        self.revenue_predictor = RandomForestRegressor(n_estimators=100)
+        # ML Models for predictions, trained in the background from the feature store
+        self.feature_store = FeatureStore()
+        self.model_trainer = ModelTrainer(self.feature_store)
+        self.viral_predictor = None
+        self.user_retention_predictor = None
+        self.revenue_predictor = None
+        self.batch_predictor = BatchPredictor(self.feature_store)
+        self.prediction_task = None
         
         # Data processors
         self.scaler = StandardScaler()
         
-        # Analytics cache
-        self.analytics_cache = {}
+        # Analytics cache: per-section TTLs (seconds), served stale for one more
+        # TTL while a background rebuild runs
         self.cache_ttl = 300  # 5 minutes
+        self.section_ttls = {
+            'platform_overview': 60,
+            'creator_insights': 300,
+            'content_analytics': 300,
+            'revenue_metrics': 120,
+            'viral_analytics': 60,
+            'predictive_insights': 3600,
+            'charts': 900,
+            'recommendations': 600,
+            'alerts': 60
+        }
+        self.analytics_cache = AsyncTTLCache(ttl=self.cache_ttl, refresh_ahead=15, max_entries=256)
         
         # Real-time metrics
         self.real_time_metrics = {
@@ -89,65 +108,120 @@ class EnterpriseAnalyticsSuite:
         
         # Predictive models trained status
         self.models_trained = False
+        self.load_predictive_models()  # reuse a version persisted by an earlier run
+        
+        # Dashboard sections are built concurrently; one that fails or exceeds
+        # its timeout (seconds) falls back to its last good value
+        self.section_timeouts = {
+            'platform_overview': 5.0,
+            'creator_insights': 10.0,
+            'content_analytics': 10.0,
+            'revenue_metrics': 5.0,
+            'viral_analytics': 5.0,
+            'predictive_insights': 30.0,
+            'charts': 20.0,
+            'recommendations': 10.0,
+            'alerts': 5.0
+        }
+        self.db_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='analytics-db')
+        self.chart_rollup = ChartRollup()
+        self.last_good_sections = {}  # kept across cache invalidation
     
     async def generate_executive_dashboard(self) -> Dict[str, Any]:
         """Generate comprehensive executive dashboard"""
         
         print("📊 Generating Executive Dashboard...")
         
-        # Gather all metrics
-        platform_metrics = await self.get_platform_metrics()
-        creator_insights = await self.get_creator_insights()
-        content_analytics = await self.get_content_analytics()
-        revenue_metrics = await self.get_revenue_metrics()
-        viral_analytics = await self.get_viral_analytics()
-        predictive_insights = await self.get_predictive_insights()
+        builders = {
+            'platform_overview': self.get_platform_metrics,
+            'creator_insights': self.get_creator_insights,
+            'content_analytics': self.get_content_analytics,
+            'revenue_metrics': self.get_revenue_metrics,
+            'viral_analytics': self.get_viral_analytics,
+            'predictive_insights': self.get_predictive_insights,
+            'charts': self.generate_dashboard_charts,
+            'recommendations': self.generate_strategic_recommendations,
+            'alerts': self.generate_alerts
+        }
         
-        # Generate visualizations
-        charts = await self.generate_dashboard_charts()
+        # All sections at once; each falls back to its last good value
+        pipeline = CampaignPipeline([
+            PipelineStage(
+                name,
+                lambda inputs, name=name, builder=builder: self.cached_section(name, builder),
+                timeout=self.section_timeouts.get(name, 10.0),
+                required=False,
+                default=self.last_good_sections.get(name)
+            )
+            for name, builder in builders.items()
+        ])
+        result = await pipeline.run()
+        sections = result.results
+        
+        for name, status in result.statuses.items():
+            if status == 'ok':
+                self.last_good_sections[name] = sections[name]
+        for name in result.failed_stages:
+            print(f"⚠️ Dashboard section {name} {result.statuses[name]}, serving last good value")
         
         dashboard = {
             'timestamp': datetime.now().isoformat(),
-            'platform_overview': asdict(platform_metrics),
-            'creator_insights': asdict(creator_insights),
-            'content_analytics': asdict(content_analytics),
-            'revenue_metrics': asdict(revenue_metrics),
-            'viral_analytics': viral_analytics,
-            'predictive_insights': predictive_insights,
+            'platform_overview': self.section_payload(sections['platform_overview']),
+            'creator_insights': self.section_payload(sections['creator_insights']),
+            'content_analytics': self.section_payload(sections['content_analytics']),
+            'revenue_metrics': self.section_payload(sections['revenue_metrics']),
+            'viral_analytics': sections['viral_analytics'],
+            'predictive_insights': sections['predictive_insights'],
             'real_time_metrics': self.real_time_metrics,
-            'charts': charts,
-            'recommendations': await self.generate_strategic_recommendations(),
-            'alerts': await self.generate_alerts()
-        }
-        
-        # Cache dashboard
-        self.analytics_cache['executive_dashboard'] = {
-            'data': dashboard,
-            'timestamp': datetime.now()
+            'charts': sections['charts'],
+            'recommendations': sections['recommendations'],
+            'alerts': analytics_service.anomaly_detector.active_alerts() + (sections['alerts'] or []),
+            'anomaly_baselines': analytics_service.anomaly_detector.get_baselines(),
+            'section_timings_ms': result.latencies,
+            'section_status': result.statuses,
+            'build_ms': result.total_ms
         }
         
         return dashboard
     
+    async def cached_section(self, section: str, builder) -> Any:
+        """Dashboard section from cache; concurrent requests share one build"""
+        ttl = self.section_ttls.get(section, self.cache_ttl)
+        return await self.analytics_cache.get(section, builder, ttl=ttl, stale_ttl=ttl)
+    
+    @staticmethod
+    def section_payload(value: Any) -> Any:
+        return asdict(value) if is_dataclass(value) else value
+    
+    def invalidate_cache(self, section: str = None):
+        """Force a rebuild of one section, or all of them, on next request"""
+        self.analytics_cache.invalidate(section)
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Cache hit rates plus per-section build times and freshness"""
+        metrics = self.analytics_cache.get_metrics()
+        metrics['sections'] = self.analytics_cache.describe()
+        return metrics
+    
     async def get_platform_metrics(self) -> PlatformMetrics:
         """Get comprehensive platform metrics"""
         
-        # Get user metrics
-        total_users = await self.count_total_users()
-        active_24h = await self.count_active_users(hours=24)
-        active_7d = await self.count_active_users(hours=168)
-        
-        # Get submission metrics
-        total_submissions = await self.count_total_submissions()
-        submissions_24h = await self.count_recent_submissions(hours=24)
-        
-        # Get voting metrics
-        total_votes = await self.count_total_votes()
-        votes_24h = await self.count_recent_votes(hours=24)
-        
-        # Calculate rates
-        engagement_rate = await self.calculate_engagement_rate()
-        retention_rate = await self.calculate_retention_rate()
-        conversion_rate = await self.calculate_conversion_rate()
+        # User, submission and voting counts plus rates, queried concurrently
+        (total_users, active_24h, active_7d,
+         total_submissions, submissions_24h,
+         total_votes, votes_24h,
+         engagement_rate, retention_rate, conversion_rate) = await asyncio.gather(
+            self.count_total_users(),
+            self.count_active_users(hours=24),
+            self.count_active_users(hours=168),
+            self.count_total_submissions(),
+            self.count_recent_submissions(hours=24),
+            self.count_total_votes(),
+            self.count_recent_votes(hours=24),
+            self.calculate_engagement_rate(),
+            self.calculate_retention_rate(),
+            self.calculate_conversion_rate()
+        )
         
         return PlatformMetrics(
             total_users=total_users,
@@ -263,54 +337,25 @@ class EnterpriseAnalyticsSuite:
         }
     
     async def get_predictive_insights(self) -> Dict[str, Any]:
-        """Generate predictive insights using ML models"""
+        """Generate predictive insights from batch-scored model predictions"""
         
         if not self.models_trained:
             await self.train_predictive_models()
         
-        # Predict next 7 days
-        predictions = {
-            'user_growth_7d': await self.predict_user_growth(days=7),
-            'submission_volume_7d': await self.predict_submission_volume(days=7),
-            'revenue_forecast_7d': await self.predict_revenue(days=7),
-            'viral_opportunities': await self.predict_viral_opportunities(),
-            'creator_churn_risk': await self.predict_creator_churn(),
-            'optimal_posting_times': await self.predict_optimal_posting_times()
-        }
+        # Score once per model version; requests only read the prediction table
+        if self.models_trained and self.batch_predictor.scored_version != self.model_trainer.version:
+            await self.run_batch_predictions()
         
-        return predictions
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.db_pool, self.batch_predictor.insights)
     
-    async def generate_dashboard_charts(self) -> Dict[str, str]:
-        """Generate interactive charts for dashboard"""
-        
-        charts = {}
-        
-        # User growth chart
-        user_data = await self.get_user_growth_data()
-        fig_users = px.line(user_data, x='date', y='users', title='User Growth')
-        charts['user_growth'] = fig_users.to_json()
+    async def generate_dashboard_charts(self) -> Dict[str, Dict[str, Any]]:
+        """Roll up chart series into compact arrays keyed by chart spec ID"""
         
-        # Submission volume chart
-        submission_data = await self.get_submission_volume_data()
-        fig_submissions = px.bar(submission_data, x='date', y='submissions', title='Daily Submissions')
-        charts['submission_volume'] = fig_submissions.to_json()
-        
-        # Revenue chart
-        revenue_data = await self.get_revenue_data()
-        fig_revenue = px.line(revenue_data, x='date', y='revenue', title='Revenue Growth')
-        charts['revenue_growth'] = fig_revenue.to_json()
-        
-        # Engagement heatmap
-        engagement_data = await self.get_engagement_heatmap_data()
-        fig_engagement = px.imshow(engagement_data, title='Engagement Heatmap')
-        charts['engagement_heatmap'] = fig_engagement.to_json()
-        
-        # Viral content distribution
-        viral_data = await self.get_viral_distribution_data()
-        fig_viral = px.pie(viral_data, values='count', names='platform', title='Viral Content by Platform')
-        charts['viral_distribution'] = fig_viral.to_json()
-        
-        return charts
+        # The rollup is a handful of aggregate queries; clients render from the spec
+        loop = asyncio.get_running_loop()
+        payload = await loop.run_in_executor(self.db_pool, self.chart_rollup.refresh)
+        return payload.charts
     
     async def generate_strategic_recommendations(self) -> List[Dict[str, str]]:
         """Generate AI-powered strategic recommendations"""
@@ -318,9 +363,9 @@ class EnterpriseAnalyticsSuite:
         recommendations = []
         
         # Analyze current metrics
-        platform_metrics = await self.get_platform_metrics()
-        creator_insights = await self.get_creator_insights()
-        content_analytics = await self.get_content_analytics()
+        platform_metrics = await self.cached_section('platform_overview', self.get_platform_metrics)
+        creator_insights = await self.cached_section('creator_insights', self.get_creator_insights)
+        content_analytics = await self.cached_section('content_analytics', self.get_content_analytics)
         
         # User growth recommendations
         if platform_metrics.active_users_24h < platform_metrics.total_users * 0.1:
@@ -354,19 +399,10 @@ class EnterpriseAnalyticsSuite:
     async def generate_alerts(self) -> List[Dict[str, str]]:
         """Generate real-time alerts for important events"""
         
+        # Metric spikes and drops come from the streaming anomaly detector and
+        # are merged in live when the dashboard is assembled
         alerts = []
         
-        # Check for anomalies
-        current_metrics = await self.get_platform_metrics()
-        
-        # Sudden drop in submissions
-        if current_metrics.submissions_24h < await self.get_average_daily_submissions() * 0.5:
-            alerts.append({
-                'type': 'warning',
-                'message': 'Submission volume dropped significantly in last 24h',
-                'action': 'Investigate potential issues with submission flow'
-            })
-        
         # Viral content detected
         viral_count = await self.count_viral_posts(hours=1)
         if viral_count > 0:
@@ -387,46 +423,113 @@ class EnterpriseAnalyticsSuite:
         
         return alerts
     
-    async def train_predictive_models(self):
+    async def train_predictive_models(self, full: bool = False):
         """Train ML models for predictions"""
         
         print("🤖 Training predictive models...")
         
-        # Get historical data
-        historical_data = await self.get_historical_data()
-        
-        if len(historical_data) > 100:  # Need sufficient data
-            # Prepare features and targets
-            features, targets = self.prepare_ml_data(historical_data)
-            
-            # Train models
-            self.viral_predictor.fit(features, targets['viral_score'])
-            self.user_retention_predictor.fit(features, targets['retention'])
-            self.revenue_predictor.fit(features, targets['revenue'])
-            
-            self.models_trained = True
-            print("✅ Predictive models trained successfully")
+        # Incremental feature refresh, then warm-started fits in the training process;
+        # full rebuilds the features and fits from scratch
+        manifest = await self.model_trainer.train(full=full)
+        
+        if manifest is not None:
+            self.load_predictive_models()
+            print(f"✅ Predictive models trained successfully (version {manifest['version']})")
         else:
             print("⚠️ Insufficient data for model training")
     
+    def load_predictive_models(self):
+        """Swap in the latest trained model version, memory-mapped"""
+        models = self.model_trainer.load_models()
+        if models:
+            self.viral_predictor = models['viral']
+            self.user_retention_predictor = models['retention']
+            self.revenue_predictor = models['revenue']
+            self.models_trained = True
+    
+    async def run_batch_predictions(self) -> Dict[str, int]:
+        """Score recent submissions and creators with the loaded models"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.db_pool, self.feature_store.refresh)
+        models = {
+            'viral': self.viral_predictor,
+            'retention': self.user_retention_predictor,
+            'revenue': self.revenue_predictor
+        }
+        return await loop.run_in_executor(self.db_pool, self.batch_predictor.run, models,
+                                          self.model_trainer.version)
+    
+    async def run_prediction_round(self) -> Dict[str, int]:
+        """One scheduled round: retrain when the data has moved on, then re-score.
+        Once the current version ages out the features are rebuilt in full"""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.db_pool, self.feature_store.refresh)
+        if not self.models_trained or self.model_trainer.retrain_due():
+            await self.train_predictive_models(full=self.model_trainer.expired())
+        if not self.models_trained:
+            return {}
+        return await self.run_batch_predictions()
+    
+    def start_prediction_schedule(self, interval: float = 3600.0) -> asyncio.Task:
+        """Retrain as needed and re-score recent entities every interval seconds"""
+        async def run():
+            while True:
+                try:
+                    await self.run_prediction_round()
+                except Exception as e:
+                    print(f"⚠️ Batch prediction run failed: {e}")
+                await asyncio.sleep(interval)
+        
+        self.prediction_task = asyncio.create_task(run())
+        return self.prediction_task
+    
+    def stop_prediction_schedule(self):
+        if self.prediction_task is not None:
+            self.prediction_task.cancel()
+            self.prediction_task = None
+    
+    async def query_scalar(self, sql: str, params: Tuple = ()) -> Any:
+        """Run a single-value query on the DB thread pool"""
+        def run():
+            conn = sqlite3.connect(db.db_path)
+            try:
+                return conn.execute(sql, params).fetchone()[0]
+            finally:
+                conn.close()
+        return await asyncio.get_running_loop().run_in_executor(self.db_pool, run)
+    
+    def close(self):
+        """Shut down the DB thread pool and training process"""
+        self.db_pool.shutdown(wait=False)
+        self.model_trainer.close()
+    
     # Helper methods (simplified implementations)
     async def count_total_users(self) -> int:
-        return 1250  # Placeholder
+        return await self.query_scalar('SELECT COUNT(*) FROM users')
     
     async def count_active_users(self, hours: int) -> int:
-        return 89  # Placeholder
+        # Distinct users with logged events, merged from in-memory sketches
+        return analytics_service.active_users.count(datetime.now() - timedelta(hours=hours))
     
     async def count_total_submissions(self) -> int:
-        return 456  # Placeholder
+        return await self.query_scalar('SELECT COUNT(*) FROM submissions')
+    
+    async def count_viral_posts(self, hours: int) -> int:
+        since = datetime.now() - timedelta(hours=hours)
+        return await self.query_scalar(
+            "SELECT COUNT(*) FROM analytics WHERE event_type = 'post_went_viral' AND timestamp >= ?", (since,)
+        )
     
     async def count_recent_submissions(self, hours: int) -> int:
-        return 23  # Placeholder
+        since = datetime.now() - timedelta(hours=hours)
+        return await self.query_scalar('SELECT COUNT(*) FROM submissions WHERE created_at >= ?', (since,))
     
     async def count_total_votes(self) -> int:
-        return 3420  # Placeholder
+        return await self.query_scalar('SELECT COUNT(*) FROM votes')
     
     async def count_recent_votes(self, hours: int) -> int:
-        return 156  # Placeholder
+        since = datetime.now() - timedelta(hours=hours)
+        return await self.query_scalar('SELECT COUNT(*) FROM votes WHERE created_at >= ?', (since,))
     
     async def calculate_engagement_rate(self) -> float:
         return 0.67  # Placeholder
@@ -437,6 +540,10 @@ class EnterpriseAnalyticsSuite:
     async def calculate_conversion_rate(self) -> float:
         return 0.12  # Placeholder
     
+    async def calculate_creator_churn_risk(self) -> float:
+        insights = await self.cached_section('predictive_insights', self.get_predictive_insights)
+        return insights['average_churn_risk']
+    
     async def get_top_creators_analysis(self) -> List[Dict]:
         return [
             {'username': 'AlienBecca', 'submissions': 15, 'total_votes': 1250, 'viral_count': 3},
@@ -454,19 +561,6 @@ class EnterpriseAnalyticsSuite:
     
     async def calculate_recent_revenue(self, hours: int) -> float:
         return 234.75  # Placeholder
-    
-    async def get_historical_data(self) -> List[Dict]:
-        return []  # Placeholder
-    
-    def prepare_ml_data(self, data: List[Dict]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
-        # Placeholder ML data preparation
-        features = np.random.rand(100, 10)
-        targets = {
-            'viral_score': np.random.rand(100),
-            'retention': np.random.rand(100),
-            'revenue': np.random.rand(100) * 1000
-        }
-        return features, targets
 
 # Global enterprise analytics instance
 enterprise_analytics = EnterpriseAnalyticsSuite()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Feature Store
+Incrementally maintained per-submission and per-creator feature matrices for the predictive models
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from database import db
+
+SUBMISSION_COLUMNS = ['title_length', 'description_length', 'tools_count', 'hour', 'weekday', 'engagement',
+                      'created_day']
+SUBMISSION_FEATURES = SUBMISSION_COLUMNS[:5]
+
+CREATOR_COLUMNS = ['total_votes_given', 'total_votes_received', 'reputation_score', 'is_verified',
+                   'created_day', 'last_active_day', 'revenue']
+CREATOR_FEATURES = CREATOR_COLUMNS[:5] + ['submissions', 'mean_engagement']
+
+RETENTION_WINDOW_DAYS = 7
+EPOCH = datetime(1970, 1, 1)
+
+# Each refresh reads only rows past the stored watermarks: submissions by
+# updated_at, users by created_at/last_active and revenue by event seq, so
+# writers that change a row must bump those columns (a trigger does it for
+# vote and share counts). Deleted rows are only dropped by a full rebuild,
+# which the trainer runs whenever a model version ages out. Rows live in float32
+# matrices grown by doubling (trees train on float32, so no copy is made).
+# Submissions point at their creator's row; creator columns are joined onto
+# submission features at read time, and per-creator submission counts and
+# mean engagement are aggregated from the submission matrix, so a creator
+# update never rewrites their submissions. Engagement is also the submission
+# model's target, so a submission row's mean_engagement covers the creator's
+# other submissions only; otherwise the label leaks into its own features.
+# Days count from the Unix epoch.
+
+class FeatureTable:
+    def __init__(self, columns: List[str], capacity: int = 1024):
+        self.columns = columns
+        self.column_index = {name: i for i, name in enumerate(columns)}
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.values = np.zeros((capacity, len(columns)), dtype=np.float32)
+        self.parents = np.zeros(capacity, dtype=np.int64)  # row in the parent table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def rows_for(self, ids: List[str]) -> np.ndarray:
+        """Row index of each id, appending zeroed rows for new ids"""
+        rows = np.empty(len(ids), dtype=np.int64)
+        for i, entity_id in enumerate(ids):
+            row = self.index.get(entity_id)
+            if row is None:
+                row = self.index[entity_id] = len(self.ids)
+                self.ids.append(entity_id)
+            rows[i] = row
+
+        if len(self.ids) > len(self.values):
+            capacity = max(len(self.ids), 2 * len(self.values))
+            values = np.zeros((capacity, len(self.columns)), dtype=np.float32)
+            values[:len(self.values)] = self.values
+            parents = np.zeros(capacity, dtype=np.int64)
+            parents[:len(self.parents)] = self.parents
+            self.values, self.parents = values, parents
+        return rows
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:len(self.ids), self.column_index[name]]
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self.values[:len(self.ids)]
+
+class FeatureStore:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._reset()
+
+        self.metrics = {
+            'refreshes': 0,
+            'submission_rows_read': 0,
+            'creator_rows_read': 0,
+            'revenue_events_read': 0
+        }
+
+    def _reset(self):
+        self.submissions = FeatureTable(SUBMISSION_COLUMNS)
+        self.creators = FeatureTable(CREATOR_COLUMNS)
+        self.watermarks = {'submissions': '', 'users': '', 'revenue_seq': 0}
+
+    def refresh(self, full: bool = False) -> Dict[str, int]:
+        """Pull rows changed since the last refresh; full=True rebuilds from scratch"""
+        with self.lock:
+            if full:
+                self._reset()
+            conn = sqlite3.connect(db.db_path)
+            try:
+                cursor = conn.cursor()
+                counts = {
+                    'creators': self._refresh_creators(cursor),
+                    'submissions': self._refresh_submissions(cursor),
+                    'revenue_events': self._refresh_revenue(cursor)
+                }
+            finally:
+                conn.close()
+
+            self.metrics['refreshes'] += 1
+            self.metrics['creator_rows_read'] += counts['creators']
+            self.metrics['submission_rows_read'] += counts['submissions']
+            self.metrics['revenue_events_read'] += counts['revenue_events']
+            return counts
+
+    def _refresh_creators(self, cursor) -> int:
+        since = self.watermarks['users']
+        cursor.execute('''
+            SELECT id, total_votes_given, total_votes_received, reputation_score, is_verified,
+                   julianday(created_at) - 2440587.5, julianday(last_active) - 2440587.5,
+                   MAX(created_at, last_active)
+            FROM users WHERE created_at >= ? OR last_active >= ?
+        ''', (since, since))
+        rows = cursor.fetchall()
+        if rows:
+            creator_rows = self.creators.rows_for([row[0] for row in rows])
+            self.creators.values[creator_rows, :6] = np.array([row[1:7] for row in rows], dtype=np.float32)
+            self.watermarks['users'] = max(since, max(row[7] for row in rows))
+        return len(rows)
+
+    def _refresh_submissions(self, cursor) -> int:
+        since = self.watermarks['submissions']
+        cursor.execute('''
+            SELECT id, user_id, length(title), length(COALESCE(description, '')),
+                   COALESCE(json_array_length(tools_used), 0),
+                   CAST(strftime('%H', created_at) AS INTEGER), CAST(strftime('%w', created_at) AS INTEGER),
+                   vote_count + 3 * share_count, julianday(created_at) - 2440587.5, updated_at
+            FROM submissions WHERE updated_at >= ?
+        ''', (since,))
+        rows = cursor.fetchall()
+        if rows:
+            submission_rows = self.submissions.rows_for([row[0] for row in rows])
+            values = np.array([row[2:9] for row in rows], dtype=np.float32)
+            engagement = self.submissions.column_index['engagement']
+            values[:, engagement] = np.log1p(values[:, engagement])
+            self.submissions.values[submission_rows] = values
+            self.submissions.parents[submission_rows] = self.creators.rows_for([row[1] for row in rows])
+            self.watermarks['submissions'] = max(since, max(row[9] for row in rows))
+        return len(rows)
+
+    def _refresh_revenue(self, cursor) -> int:
+        cursor.execute('''
+            SELECT seq, creator_id, amount_micros FROM revenue_events WHERE seq > ? ORDER BY seq
+        ''', (self.watermarks['revenue_seq'],))
+        rows = cursor.fetchall()
+        if rows:
+            creator_rows = self.creators.rows_for([row[1] for row in rows])
+            revenue = self.creators.column_index['revenue']
+            np.add.at(self.creators.values[:, revenue], creator_rows,
+                      np.array([row[2] for row in rows], dtype=np.float64) / 1_000_000)
+            self.watermarks['revenue_seq'] = rows[-1][0]
+        return len(rows)
+
+    def creator_features(self, now: datetime = None) -> Tuple[List[str], np.ndarray, Dict[str, np.ndarray]]:
+        """Creator ids, feature matrix and the retention and revenue targets"""
+        now = now or datetime.now()
+        submissions, engagement = self._creator_totals()
+        mean_engagement = (engagement / np.maximum(submissions, 1)).astype(np.float32)
+
+        features = np.column_stack([self.creators.matrix[:, :5], submissions, mean_engagement])
+        cutoff = (now - timedelta(days=RETENTION_WINDOW_DAYS) - EPOCH).total_seconds() / 86400
+        targets = {
+            'retention': (self.creators.column('last_active_day') >= cutoff).astype(np.float32),
+            'revenue': self.creators.column('revenue').copy()
+        }
+        return list(self.creators.ids), features, targets
+
+    def submission_features(self, now: datetime = None) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """Submission ids, features joined with their creator's, and the engagement target"""
+        _, creator_features, _ = self.creator_features(now)
+        parents = self.submissions.parents[:len(self.submissions)]
+        features = np.hstack([self.submissions.matrix[:, :len(SUBMISSION_FEATURES)], creator_features[parents]])
+
+        # Leave each row's own engagement out of its creator's mean
+        submissions, engagement = self._creator_totals()
+        own = self.submissions.column('engagement')
+        others = submissions[parents] - 1
+        column = len(SUBMISSION_FEATURES) + CREATOR_FEATURES.index('mean_engagement')
+        features[:, column] = (engagement[parents] - own) / np.maximum(others, 1)
+        return list(self.submissions.ids), features, own.copy()
+
+    def _creator_totals(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Submission count and engagement sum per creator row"""
+        count = len(self.creators)
+        parents = self.submissions.parents[:len(self.submissions)]
+        submissions = np.bincount(parents, minlength=count).astype(np.float32)
+        engagement = np.bincount(parents, weights=self.submissions.column('engagement'), minlength=count)
+        return submissions, engagement
+
+    def get_metrics(self) -> Dict[str, int]:
+        metrics = dict(self.metrics)
+        metrics['submissions'] = len(self.submissions)
+        metrics['creators'] = len(self.creators)
+        return metrics
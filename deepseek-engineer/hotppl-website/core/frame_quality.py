@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Frame Quality Scoring
+Vectorized sharpness, exposure, color and motion metrics over stacked video frames
+"""
+
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy as np
+
+# A contiguous (N,H,W,C) batch is also one (N*H,W,C) "tall" image, so single
+# OpenCV calls can process every frame at once. Per-frame results are read back
+# by reshaping and dropping the rows where a kernel straddles two frames.
+# Reductions use cv2.meanStdDev/calcHist on per-frame views of the batch
+# result, which avoids the float64 temporaries NumPy would allocate.
+# Sharpness is always measured at full resolution: area downscaling smooths
+# away the high frequencies the Laplacian responds to, so its variance would
+# no longer be on the scale summarize_quality normalizes by.
+
+def stack_frames(frames: List[np.ndarray]) -> np.ndarray:
+    """Stack equally sized BGR frames into an (N,H,W,C) uint8 array"""
+    return np.ascontiguousarray(np.stack(frames), dtype=np.uint8)
+
+def downscale_frames(frames: np.ndarray, max_side: int) -> np.ndarray:
+    """Area-downscale the batch by an integer factor so the longest side fits max_side"""
+    n, height, width, channels = frames.shape
+    factor = int(np.ceil(max(height, width) / max_side))
+    if factor <= 1:
+        return frames
+
+    # Crop to a multiple of the factor so no output row mixes two frames
+    height, width = (height // factor) * factor, (width // factor) * factor
+    tall = np.ascontiguousarray(frames[:, :height, :width]).reshape(n * height, width, channels)
+    small = cv2.resize(tall, (width // factor, n * height // factor), interpolation=cv2.INTER_AREA)
+    return small.reshape(n, height // factor, width // factor, channels)
+
+def to_gray(frames: np.ndarray) -> np.ndarray:
+    """Luma of every frame as (N,H,W) uint8"""
+    n, height, width, channels = frames.shape
+    tall = cv2.cvtColor(frames.reshape(n * height, width, channels), cv2.COLOR_BGR2GRAY)
+    return tall.reshape(n, height, width)
+
+def frame_mean_std(stack: np.ndarray):
+    """Per-frame mean and standard deviation of an (N,H,W) single-channel batch"""
+    stats = np.array([cv2.meanStdDev(frame) for frame in stack]).reshape(len(stack), 2)
+    return stats[:, 0], stats[:, 1]
+
+def laplacian_variance(gray: np.ndarray) -> np.ndarray:
+    """Per-frame variance of the Laplacian, ignoring the one-pixel border"""
+    n, height, width = gray.shape
+    # |Laplacian| of uint8 input is at most 4 * 255, so int16 is exact and much faster than float
+    laplacian = cv2.Laplacian(gray.reshape(n * height, width), cv2.CV_16S)
+    interior = laplacian.reshape(n, height, width)[:, 1:-1, 1:-1]
+    _, std = frame_mean_std(interior)
+    return std ** 2
+
+def color_histograms(frames: np.ndarray, bins: int = 32) -> np.ndarray:
+    """Normalized per-frame, per-channel histograms as (N,C,bins)"""
+    n, _, _, channels = frames.shape
+    counts = np.array([[cv2.calcHist([frame], [channel], None, [bins], [0, 256]).ravel()
+                        for channel in range(channels)] for frame in frames])
+    return counts / counts.sum(axis=2, keepdims=True)
+
+def frame_motion(gray: np.ndarray) -> np.ndarray:
+    """Mean absolute luma difference between consecutive frames, (N-1,)"""
+    n, height, width = gray.shape
+    if n < 2:
+        return np.zeros(0, dtype=np.float64)
+    diff = cv2.absdiff(gray[1:].reshape(-1, width), gray[:-1].reshape(-1, width))
+    means, _ = frame_mean_std(diff.reshape(n - 1, height, width))
+    return means
+
+def colorfulness(frames: np.ndarray) -> np.ndarray:
+    """Per-frame colorfulness (Hasler & Süsstrunk) from opponent channels"""
+    n, height, width, channels = frames.shape
+    b, g, r = cv2.split(frames.reshape(n * height, width, channels))
+    rg = cv2.subtract(r, g, dtype=cv2.CV_32F)
+    yb = cv2.subtract(cv2.addWeighted(r, 0.5, g, 0.5, 0, dtype=cv2.CV_32F), b, dtype=cv2.CV_32F)
+
+    rg_mean, rg_std = frame_mean_std(rg.reshape(n, height, width))
+    yb_mean, yb_std = frame_mean_std(yb.reshape(n, height, width))
+    return np.hypot(rg_std, yb_std) + 0.3 * np.hypot(rg_mean, yb_mean)
+
+def score_frame_batch(frames: np.ndarray, max_side: Optional[int] = None,
+                      histogram_bins: int = 32) -> Dict[str, Any]:
+    """Compute all frame-level quality metrics for an (N,H,W,C) uint8 batch"""
+    gray = to_gray(frames)
+    sharpness = laplacian_variance(gray)
+    if max_side:
+        frames = downscale_frames(frames, max_side)
+        gray = to_gray(frames)
+    brightness, contrast = frame_mean_std(gray)
+
+    return {
+        'sharpness': sharpness,
+        'brightness': brightness,
+        'contrast': contrast,
+        'colorfulness': colorfulness(frames),
+        'histograms': color_histograms(frames, histogram_bins),
+        'motion': frame_motion(gray)
+    }
+
+def summarize_quality(scores: Dict[str, Any]) -> Dict[str, float]:
+    """Collapse per-frame metrics into the 0-1 scores used by the content processor"""
+    sharpness = float(np.mean(scores['sharpness']))
+    brightness = float(np.mean(scores['brightness']))
+    contrast = float(np.mean(scores['contrast']))
+    motion = float(np.mean(scores['motion'])) if len(scores['motion']) else 0.0
+
+    return {
+        'sharpness': sharpness,
+        'brightness': brightness,
+        'contrast': contrast,
+        'motion': motion,
+        'sharpness_score': min(1.0, sharpness / 1000.0),
+        'brightness_score': 1.0 - abs(brightness - 128) / 128,
+        'contrast_score': min(1.0, contrast / 64.0),
+        'colorfulness_score': min(1.0, float(np.mean(scores['colorfulness'])) / 100.0)
+    }
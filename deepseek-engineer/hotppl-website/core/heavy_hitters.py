@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Heavy Hitters
+Streaming Space-Saving top-K summaries per dimension and day
+"""
+
+import heapq
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+DEFAULT_CAPACITY = 200
+RETENTION_DAYS = 8  # the 7-day windows plus today
+
+# Each dimension (scenes, tools, active users, commands) keeps one
+# Space-Saving summary per local day plus one for all time. A summary
+# tracks at most capacity keys; a new key beyond that replaces the smallest
+# counter and inherits its count, so every count is an overestimate by at
+# most the summary's minimum and any key with a true count above it is
+# guaranteed to be present. A window merges its days' summaries. Deleted
+# rows are never subtracted; load() replaces a dimension with exact counts
+# from SQL, which is how periodic reconciliation removes that drift.
+
+class SpaceSaving:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.counts: Dict[Hashable, int] = {}
+        self.heap: List[Tuple[int, Hashable]] = []  # (count, key), stale entries skipped lazily
+
+    @classmethod
+    def from_counts(cls, counts: Iterable[Tuple[Hashable, int]], capacity: int = DEFAULT_CAPACITY) -> 'SpaceSaving':
+        """Summary holding the exact counts of the capacity most frequent keys"""
+        summary = cls(capacity)
+        summary.counts = dict(heapq.nlargest(capacity, counts, key=lambda item: item[1]))
+        summary.heap = [(count, key) for key, count in summary.counts.items()]
+        heapq.heapify(summary.heap)
+        return summary
+
+    def add(self, key: Hashable, count: int = 1):
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+        else:
+            evicted_count = self._pop_min()
+            self.counts[key] = evicted_count + count
+        heapq.heappush(self.heap, (self.counts[key], key))
+        if len(self.heap) > 4 * self.capacity:
+            self.heap = [(c, k) for k, c in self.counts.items()]
+            heapq.heapify(self.heap)
+
+    def _pop_min(self) -> int:
+        while True:
+            count, key = heapq.heappop(self.heap)
+            if self.counts.get(key) == count:
+                del self.counts[key]
+                return count
+
+    def min_count(self) -> int:
+        """Largest count a key missing from the summary could have"""
+        if len(self.counts) < self.capacity:
+            return 0
+        while self.counts.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0]
+
+    def top(self, limit: int) -> List[Tuple[Hashable, int]]:
+        return heapq.nlargest(limit, self.counts.items(), key=lambda item: item[1])
+
+def merge_summaries(summaries: List[SpaceSaving]) -> Dict[Hashable, int]:
+    """Upper-bound counts over several summaries"""
+    floor = sum(summary.min_count() for summary in summaries)
+    totals = defaultdict(lambda: floor)
+    for summary in summaries:
+        minimum = summary.min_count()
+        for key, count in summary.counts.items():
+            totals[key] += count - minimum
+    return totals
+
+class HeavyHitters:
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, retention_days: int = RETENTION_DAYS):
+        self.capacity = capacity
+        self.retention_days = retention_days
+        self.daily: Dict[str, Dict[int, SpaceSaving]] = defaultdict(dict)  # dimension -> date ordinal -> summary
+        self.totals: Dict[str, SpaceSaving] = {}
+        self.lock = threading.Lock()
+
+        self.metrics = {
+            'updates': 0,
+            'queries': 0,
+            'reconciliations': 0
+        }
+
+    def add(self, dimension: str, key: Hashable, when: datetime = None, count: int = 1):
+        day = (when or datetime.now()).date().toordinal()
+        with self.lock:
+            days = self.daily[dimension]
+            summary = days.get(day)
+            if summary is None:
+                summary = days[day] = SpaceSaving(self.capacity)
+                newest = max(days)
+                for old in [old for old in days if old <= newest - self.retention_days]:
+                    del days[old]  # a backdated day may be dropped at once; all time still counts it
+            summary.add(key, count)
+            self._total(dimension).add(key, count)
+            self.metrics['updates'] += 1
+
+    def top(self, dimension: str, limit: int = 5, since: datetime = None) -> List[Tuple[Hashable, int]]:
+        """Most frequent keys since a day (inclusive), or of all time"""
+        with self.lock:
+            self.metrics['queries'] += 1
+            if since is None:
+                return self._total(dimension).top(limit)
+            first_day = since.date().toordinal()
+            summaries = [summary for day, summary in self.daily[dimension].items() if day >= first_day]
+            if len(summaries) == 1:
+                return summaries[0].top(limit)
+            totals = merge_summaries(summaries)
+        return heapq.nlargest(limit, totals.items(), key=lambda item: item[1])
+
+    def load(self, dimension: str, daily_rows: Iterable[Tuple[str, Hashable, int]],
+             total_rows: Optional[Iterable[Tuple[Hashable, int]]] = None):
+        """Replace a dimension with exact (YYYY-MM-DD, key, count) and optional all-time (key, count) rows"""
+        by_day = defaultdict(list)
+        for day, key, count in daily_rows:
+            by_day[date.fromisoformat(day).toordinal()].append((key, count))
+        days = {day: SpaceSaving.from_counts(counts, self.capacity) for day, counts in by_day.items()}
+        if total_rows is not None:
+            totals = SpaceSaving.from_counts(total_rows, self.capacity)
+
+        with self.lock:
+            self.daily[dimension] = days
+            if total_rows is not None:
+                self.totals[dimension] = totals
+            self.metrics['reconciliations'] += 1
+
+    def _total(self, dimension: str) -> SpaceSaving:
+        if dimension not in self.totals:
+            self.totals[dimension] = SpaceSaving(self.capacity)
+        return self.totals[dimension]
+
+    def get_metrics(self) -> Dict[str, int]:
+        metrics = dict(self.metrics)
+        metrics['tracked_keys'] = sum(len(summary.counts) for days in self.daily.values()
+                                      for summary in days.values())
+        return metrics
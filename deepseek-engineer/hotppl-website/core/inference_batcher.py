@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Inference Batcher
+Dynamic micro-batching for the transformers pipelines used by the AI content processor
+"""
+
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+class InferenceBatcher:
+    """Collects inference requests from concurrent submissions and runs them as one batch.
+
+    A batch is flushed as soon as ``max_batch_size`` requests are waiting or the
+    oldest request has waited ``max_wait_ms``. ``infer_fn`` receives a list of
+    inputs and must return one result per input, in order (transformers
+    pipelines already behave this way when called with a list).
+    """
+
+    def __init__(self, name: str, infer_fn: Callable[[List[Any]], List[Any]],
+                 max_batch_size: int = 8, max_wait_ms: float = 20.0,
+                 executor: Optional[ThreadPoolExecutor] = None):
+        self.name = name
+        self.infer_fn = infer_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        # Inference is CPU-bound; one worker thread keeps batches serialized per model
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batcher-{name}")
+
+        self._pending: Deque[Tuple[Any, asyncio.Future, float]] = deque()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Performance metrics
+        self.metrics = {
+            'requests': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'average_batch_size': 0.0,
+            'max_batch_size_seen': 0,
+            'batch_size_distribution': {},
+            'average_queue_wait_ms': 0.0,
+            'max_queue_wait_ms': 0.0,
+            'average_inference_ms': 0.0
+        }
+
+    async def submit(self, item: Any) -> Any:
+        """Queue one input for batched inference and wait for its result"""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker()
+
+        future = loop.create_future()
+        self._pending.append((item, future, time.perf_counter()))
+        self.metrics['requests'] += 1
+        self._wakeup.set()
+
+        return await future
+
+    def _ensure_worker(self):
+        """Start the batching loop on first use"""
+        if self._worker is None or self._worker.done():
+            self._wakeup = asyncio.Event()
+            self._worker = asyncio.create_task(self._batch_loop())
+
+    async def _batch_loop(self):
+        """Flush pending requests in batches for as long as the batcher is in use"""
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            # Give concurrent submissions a chance to join the batch
+            deadline = self._pending[0][2] + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+
+            batch = [self._pending.popleft()
+                     for _ in range(min(self.max_batch_size, len(self._pending)))]
+            await self._run_batch(batch)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future, float]]):
+        """Run one batch through the model and route results back to the callers"""
+        started = time.perf_counter()
+        waits = [(started - enqueued) * 1000 for _, _, enqueued in batch]
+        inputs = [item for item, _, _ in batch]
+
+        try:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.executor, self.infer_fn, inputs)
+
+            if len(results) != len(inputs):
+                raise ValueError(f"{self.name} returned {len(results)} results for {len(inputs)} inputs")
+
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+        except Exception as e:
+            self.metrics['failed_batches'] += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+        self.update_metrics(len(batch), waits, (time.perf_counter() - started) * 1000)
+
+    def update_metrics(self, batch_size: int, waits_ms: List[float], inference_ms: float):
+        """Update batching metrics"""
+        batches = self.metrics['batches'] + 1
+        self.metrics['batches'] = batches
+
+        distribution = self.metrics['batch_size_distribution']
+        distribution[batch_size] = distribution.get(batch_size, 0) + 1
+        self.metrics['max_batch_size_seen'] = max(self.metrics['max_batch_size_seen'], batch_size)
+
+        # Running averages, weighted per batch or per request as appropriate
+        avg_size = self.metrics['average_batch_size']
+        self.metrics['average_batch_size'] = (avg_size * (batches - 1) + batch_size) / batches
+
+        avg_inference = self.metrics['average_inference_ms']
+        self.metrics['average_inference_ms'] = (avg_inference * (batches - 1) + inference_ms) / batches
+
+        served = sum(self.metrics['batch_size_distribution'][size] * size for size in distribution)
+        previous = served - batch_size
+        avg_wait = self.metrics['average_queue_wait_ms']
+        self.metrics['average_queue_wait_ms'] = (avg_wait * previous + sum(waits_ms)) / served
+        self.metrics['max_queue_wait_ms'] = max(self.metrics['max_queue_wait_ms'], max(waits_ms))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get a snapshot of batching metrics"""
+        return {
+            **self.metrics,
+            'batch_size_distribution': dict(self.metrics['batch_size_distribution']),
+            'pending': len(self._pending)
+        }
+
+    async def stop(self):
+        """Stop the batching loop and release the inference thread"""
+        if self._worker and not self._worker.done():
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        self._worker = None
+
+        while self._pending:
+            _, future, _ = self._pending.popleft()
+            if not future.done():
+                future.cancel()
+
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Durable Job Queue
+SQLite-backed, crash-safe work queue with visibility timeouts, retries and dead-lettering
+"""
+
+import json
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+class JobLane:
+    PRIORITY = 'priority'
+    REGULAR = 'regular'
+
+# Lower rank is claimed first
+LANE_RANK = {JobLane.PRIORITY: 0, JobLane.REGULAR: 1}
+
+@dataclass
+class Job:
+    id: int
+    lane: str
+    payload: Dict[str, Any]
+    attempts: int
+    created_at: float
+    lease_id: str
+
+class DurableJobQueue:
+    """Persistent job queue shared by the AI processing workers.
+
+    A claimed job is leased for ``visibility_timeout`` seconds. If the worker
+    neither acks nor nacks it in time (for example because the process died),
+    the job becomes claimable again. Every claim carries a fresh ``lease_id``
+    that ack, nack and extend_lease must present, so a worker whose lease ran
+    out and was re-claimed by another cannot finish or fail the new attempt.
+    Failed jobs are retried with exponential backoff and moved to the
+    dead-letter state after ``max_attempts``.
+    """
+
+    def __init__(self, db_path: str = "hotppl_jobs.db", visibility_timeout: float = 600.0,
+                 max_attempts: int = 5, base_backoff: float = 2.0, max_backoff: float = 300.0):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+
+        # One connection in WAL mode; writes are serialized by the lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+
+        self.init_queue()
+
+    def init_queue(self):
+        """Initialize the jobs table"""
+        with self._lock:
+            self._conn.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    lane TEXT NOT NULL,
+                    lane_rank INTEGER NOT NULL,
+                    payload TEXT NOT NULL, -- JSON object
+                    status TEXT NOT NULL, -- 'ready', 'leased', 'dead'
+                    attempts INTEGER DEFAULT 0,
+                    available_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    lease_id TEXT,
+                    last_error TEXT
+                )
+            ''')
+            columns = {row[1] for row in self._conn.execute('PRAGMA table_info(jobs)')}
+            if 'lease_id' not in columns:
+                self._conn.execute('ALTER TABLE jobs ADD COLUMN lease_id TEXT')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(status, lane_rank, available_at)')
+
+    def enqueue(self, payload: Dict[str, Any], lane: str = JobLane.REGULAR) -> int:
+        """Persist a job and return its ID"""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute('''
+                INSERT INTO jobs (lane, lane_rank, payload, status, available_at, created_at)
+                VALUES (?, ?, ?, 'ready', ?, ?)
+            ''', (lane, LANE_RANK[lane], json.dumps(payload, default=str), now, now))
+            return cursor.lastrowid
+
+    def enqueue_many(self, payloads: List[Dict[str, Any]], lane: str = JobLane.REGULAR) -> int:
+        """Persist many jobs in one transaction"""
+        now = time.time()
+        rows = [(lane, LANE_RANK[lane], json.dumps(payload, default=str), now, now) for payload in payloads]
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._conn.executemany('''
+                    INSERT INTO jobs (lane, lane_rank, payload, status, available_at, created_at)
+                    VALUES (?, ?, ?, 'ready', ?, ?)
+                ''', rows)
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return len(rows)
+
+    def claim(self, lane: str = None) -> Optional[Job]:
+        """Lease the next available job, highest-priority lane first"""
+        now = time.time()
+        lane_filter = 'AND lane = ?' if lane else ''
+        params = (now, lane) if lane else (now,)
+
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._expire_leases(now)
+
+                row = self._conn.execute(f'''
+                    SELECT id, lane, payload, attempts, created_at FROM jobs
+                    WHERE status = 'ready' AND available_at <= ? {lane_filter}
+                    ORDER BY lane_rank, available_at, id
+                    LIMIT 1
+                ''', params).fetchone()
+
+                if row is None:
+                    self._conn.execute('COMMIT')
+                    return None
+
+                lease_id = uuid.uuid4().hex
+                self._conn.execute('''
+                    UPDATE jobs SET status = 'leased', attempts = attempts + 1, available_at = ?, lease_id = ?
+                    WHERE id = ?
+                ''', (now + self.visibility_timeout, lease_id, row[0]))
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+        return Job(id=row[0], lane=row[1], payload=json.loads(row[2]),
+                   attempts=row[3] + 1, created_at=row[4], lease_id=lease_id)
+
+    def _expire_leases(self, now: float):
+        """Make jobs whose lease ran out claimable again, or dead-letter them"""
+        self._conn.execute('''
+            UPDATE jobs SET status = 'dead', lease_id = NULL, last_error = 'visibility timeout exceeded'
+            WHERE status = 'leased' AND available_at <= ? AND attempts >= ?
+        ''', (now, self.max_attempts))
+        self._conn.execute('''
+            UPDATE jobs SET status = 'ready', lease_id = NULL
+            WHERE status = 'leased' AND available_at <= ?
+        ''', (now,))
+
+    def ack(self, job_id: int, lease_id: str) -> bool:
+        """Mark a job as done and remove it; False if the lease was lost to another worker"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                DELETE FROM jobs WHERE id = ? AND status = 'leased' AND lease_id = ?
+            ''', (job_id, lease_id))
+            return cursor.rowcount == 1
+
+    def nack(self, job_id: int, lease_id: str, error: str = None) -> str:
+        """Record a failed attempt; returns the job's new status ('ready' or 'dead'),
+        or 'lost' if the lease is no longer held"""
+        with self._lock:
+            row = self._conn.execute('''
+                SELECT attempts FROM jobs WHERE id = ? AND status = 'leased' AND lease_id = ?
+            ''', (job_id, lease_id)).fetchone()
+            if row is None:
+                return 'lost'
+
+            attempts = row[0]
+            if attempts >= self.max_attempts:
+                self._conn.execute('''
+                    UPDATE jobs SET status = 'dead', lease_id = NULL, last_error = ? WHERE id = ?
+                ''', (error, job_id))
+                return 'dead'
+
+            self._conn.execute('''
+                UPDATE jobs SET status = 'ready', lease_id = NULL, available_at = ?, last_error = ? WHERE id = ?
+            ''', (time.time() + self.backoff_delay(attempts), error, job_id))
+            return 'ready'
+
+    def extend_lease(self, job_id: int, lease_id: str, seconds: float = None) -> bool:
+        """Push a held lease's expiry out by seconds (default: the visibility timeout)
+        so long-running work is not reclaimed; False if the lease was lost"""
+        seconds = self.visibility_timeout if seconds is None else seconds
+        with self._lock:
+            cursor = self._conn.execute('''
+                UPDATE jobs SET available_at = ?
+                WHERE id = ? AND status = 'leased' AND lease_id = ?
+            ''', (time.time() + seconds, job_id, lease_id))
+            return cursor.rowcount == 1
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Exponential backoff with jitter for the given number of failed attempts"""
+        delay = min(self.max_backoff, self.base_backoff * (2 ** (attempts - 1)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """List dead-lettered jobs for inspection"""
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT id, lane, payload, attempts, last_error, created_at FROM jobs
+                WHERE status = 'dead' ORDER BY id LIMIT ?
+            ''', (limit,)).fetchall()
+
+        return [{'id': row[0], 'lane': row[1], 'payload': json.loads(row[2]),
+                 'attempts': row[3], 'last_error': row[4], 'created_at': row[5]} for row in rows]
+
+    def requeue_dead(self, job_id: int) -> bool:
+        """Give a dead-lettered job a fresh set of attempts"""
+        with self._lock:
+            cursor = self._conn.execute('''
+                UPDATE jobs SET status = 'ready', attempts = 0, available_at = ?
+                WHERE id = ? AND status = 'dead'
+            ''', (time.time(), job_id))
+            return cursor.rowcount == 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth per lane and state, plus the age of the oldest waiting job"""
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute('''
+                SELECT lane, status, COUNT(*), MIN(created_at) FROM jobs GROUP BY lane, status
+            ''').fetchall()
+
+        depth = {lane: {'ready': 0, 'leased': 0, 'dead': 0} for lane in LANE_RANK}
+        oldest = None
+        for lane, status, count, created_at in rows:
+            depth.setdefault(lane, {})[status] = count
+            if status != 'dead' and (oldest is None or created_at < oldest):
+                oldest = created_at
+
+        return {
+            'depth': depth,
+            'pending': sum(d['ready'] + d['leased'] for d in depth.values()),
+            'dead_letters': sum(d['dead'] for d in depth.values()),
+            'oldest_job_age_seconds': now - oldest if oldest else 0.0
+        }
+
+    def close(self):
+        """Close the queue database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Metrics Polling Scheduler
+Adaptive, rate-limited polling of social post metrics across platforms
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+# Posts wait in a min-heap keyed by their next poll time. Each poll adapts the
+# post's interval: fast growth halves it, stagnation doubles it, and the
+# interval never exceeds age_factor times the post's age, so young posts are
+# polled often whatever their growth. Posts past max_age drop out. Due posts
+# are grouped per platform and sent as batch requests where the API offers
+# get_post_metrics_batch. Every request spends a token from the platform's
+# bucket; when a bucket is empty the affected posts are pushed back to the
+# moment a token frees up instead of blocking.
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate  # tokens per second
+        self.burst = burst
+        self.tokens = burst
+        self.updated: Optional[float] = None
+
+    def _refill(self, now: float):
+        if self.updated is not None:
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, now: float, tokens: float = 1.0) -> bool:
+        self._refill(now)
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def next_available(self, now: float, tokens: float = 1.0) -> float:
+        """Time at which the bucket will hold enough tokens"""
+        self._refill(now)
+        return now + max(0.0, tokens - self.tokens) / self.rate
+
+@dataclass(order=True)
+class ScheduledPoll:
+    due: float
+    seq: int
+    post_id: str = field(compare=False)
+
+@dataclass
+class TrackedPost:
+    post: Any  # SocialPost
+    added_at: float
+    interval: float
+    last_total: Optional[int] = None
+    polls: int = 0
+    failures: int = 0
+
+class MetricsPollingScheduler:
+    def __init__(self, platform_apis: Dict[Hashable, Any],
+                 on_metrics: Callable[[Any, Dict[str, int]], Awaitable[None]],
+                 rate_limits: Dict[Hashable, Tuple[float, float]] = None,
+                 min_interval: float = 60.0, max_interval: float = 6 * 3600.0,
+                 max_age: float = 7 * 86400.0, age_factor: float = 0.1,
+                 fast_growth: float = 0.2, stale_growth: float = 0.01,
+                 max_concurrency: int = 16, default_rate: Tuple[float, float] = (1.0, 5.0),
+                 clock: Callable[[], float] = time.monotonic):
+        self.platform_apis = platform_apis
+        self.on_metrics = on_metrics
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_age = max_age
+        self.age_factor = age_factor
+        self.fast_growth = fast_growth
+        self.stale_growth = stale_growth
+        self.clock = clock
+
+        rate_limits = rate_limits or {}
+        self.buckets = {platform: TokenBucket(*rate_limits.get(platform, default_rate))
+                        for platform in platform_apis}
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.heap: List[ScheduledPoll] = []
+        self.tracked: Dict[str, TrackedPost] = {}
+        self.counter = itertools.count()
+        self.wakeup = asyncio.Event()
+        self.stopping = False
+
+        self.metrics = {
+            'tracked_posts': 0,
+            'polls': 0,
+            'requests': 0,
+            'batched_requests': 0,
+            'rate_limited': 0,
+            'failures': 0,
+            'expired_posts': 0
+        }
+
+    def add_post(self, post: Any, delay: float = 0.0):
+        """Start tracking a posted SocialPost"""
+        now = self.clock()
+        if post.id not in self.tracked:
+            self.metrics['tracked_posts'] += 1
+        self.tracked[post.id] = TrackedPost(post=post, added_at=now, interval=self.min_interval)
+        self._push(post.id, now + delay)
+        self.wakeup.set()
+
+    def remove_post(self, post_id: str) -> bool:
+        """Stop tracking a post; its heap entry is discarded lazily"""
+        if self.tracked.pop(post_id, None) is None:
+            return False
+        self.metrics['tracked_posts'] -= 1
+        return True
+
+    def _push(self, post_id: str, due: float):
+        heapq.heappush(self.heap, ScheduledPoll(due, next(self.counter), post_id))
+
+    def next_due(self) -> Optional[float]:
+        """Due time of the earliest live entry"""
+        while self.heap and self.heap[0].post_id not in self.tracked:
+            heapq.heappop(self.heap)
+        return self.heap[0].due if self.heap else None
+
+    def _pop_due(self, now: float) -> Dict[Hashable, List[TrackedPost]]:
+        """Remove every due entry, grouped by platform"""
+        due: Dict[Hashable, List[TrackedPost]] = {}
+        seen = set()
+        while self.heap and self.heap[0].due <= now:
+            entry = heapq.heappop(self.heap)
+            tracked = self.tracked.get(entry.post_id)
+            if tracked is None or entry.post_id in seen:
+                continue
+            seen.add(entry.post_id)
+
+            if now - tracked.added_at > self.max_age:
+                self.remove_post(entry.post_id)
+                self.metrics['expired_posts'] += 1
+                continue
+            due.setdefault(tracked.post.platform, []).append(tracked)
+        return due
+
+    async def run_once(self) -> int:
+        """Poll every due post; returns the number of posts polled"""
+        now = self.clock()
+        requests = []
+
+        for platform, posts in self._pop_due(now).items():
+            api = self.platform_apis[platform]
+            batch_size = getattr(api, 'max_batch_size', 1) if hasattr(api, 'get_post_metrics_batch') else 1
+            bucket = self.buckets[platform]
+
+            for i in range(0, len(posts), batch_size):
+                batch = posts[i:i + batch_size]
+                if bucket.try_acquire(now):
+                    requests.append(self._poll_batch(api, batch))
+                else:
+                    # Out of budget: retry the rest of this platform when a token is free
+                    retry_at = bucket.next_available(now)
+                    for tracked in posts[i:]:
+                        self._push(tracked.post.id, retry_at)
+                    self.metrics['rate_limited'] += len(posts) - i
+                    break
+
+        polled = await asyncio.gather(*requests)
+        return sum(polled)
+
+    async def _poll_batch(self, api: Any, batch: List[TrackedPost]) -> int:
+        async with self.semaphore:
+            self.metrics['requests'] += 1
+            try:
+                if len(batch) > 1:
+                    self.metrics['batched_requests'] += 1
+                    results = await api.get_post_metrics_batch([t.post.platform_post_id for t in batch])
+                else:
+                    results = {batch[0].post.platform_post_id:
+                               await api.get_post_metrics(batch[0].post.platform_post_id)}
+            except Exception as e:
+                print(f"❌ Metrics poll failed for {len(batch)} posts: {e}")
+                self.metrics['failures'] += 1
+                for tracked in batch:
+                    tracked.failures += 1
+                    self._reschedule(tracked, growth=None)
+                return 0
+
+        for tracked in batch:
+            current = results.get(tracked.post.platform_post_id)
+            if current is None:
+                self._reschedule(tracked, growth=None)
+                continue
+
+            total = sum(v for v in current.values() if isinstance(v, (int, float)))
+            growth = None
+            if tracked.last_total is not None:
+                growth = (total - tracked.last_total) / max(tracked.last_total, 1)
+            tracked.last_total = total
+            tracked.polls += 1
+            tracked.failures = 0
+            self.metrics['polls'] += 1
+
+            try:
+                await self.on_metrics(tracked.post, current)
+            except Exception as e:
+                print(f"❌ Error applying metrics for {tracked.post.id}: {e}")
+            self._reschedule(tracked, growth)
+        return len(batch)
+
+    def _reschedule(self, tracked: TrackedPost, growth: Optional[float]):
+        """Adapt the poll interval to the post's growth and requeue it"""
+        if tracked.post.id not in self.tracked:
+            return
+
+        if growth is None:
+            # First sample or failed poll: keep young posts close, back off failures
+            if tracked.failures:
+                tracked.interval = min(self.max_interval, tracked.interval * 2)
+        elif growth >= self.fast_growth:
+            tracked.interval = max(self.min_interval, tracked.interval / 2)
+        elif growth <= self.stale_growth:
+            tracked.interval = min(self.max_interval, tracked.interval * 2)
+
+        now = self.clock()
+        age_cap = max(self.min_interval, (now - tracked.added_at) * self.age_factor)
+        tracked.interval = min(tracked.interval, age_cap)
+        self._push(tracked.post.id, now + tracked.interval)
+
+    def stop(self):
+        """Ask run() to return"""
+        self.stopping = True
+        self.wakeup.set()
+
+    async def run(self):
+        """Poll until stop() is called, sleeping until the next post is due"""
+        self.stopping = False
+        while not self.stopping:
+            next_due = self.next_due()
+            timeout = self.max_interval if next_due is None else max(0.0, next_due - self.clock())
+            if timeout > 0:
+                self.wakeup.clear()
+                if self.stopping:
+                    break
+                try:
+                    await asyncio.wait_for(self.wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self.run_once()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Scheduler metrics"""
+        metrics = dict(self.metrics)
+        metrics['queue_depth'] = len(self.heap)
+        return metrics
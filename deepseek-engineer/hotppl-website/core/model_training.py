@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Model Training
+Background, warm-started training of the predictive models with memory-mapped model files
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+from feature_store import FeatureStore
+
+# (feature matrix, target) each model trains on
+MODEL_DATASETS = {
+    'viral': ('submissions', 'engagement'),
+    'retention': ('creators', 'retention'),
+    'revenue': ('creators', 'revenue')
+}
+
+MIN_TRAINING_ROWS = 100
+MIN_SAMPLES_LEAF = 5  # keeps fully grown trees, and model files, small
+RETRAIN_GROWTH = 0.1  # retrain once a dataset has 10% more rows than the current version saw
+RETRAIN_MAX_AGE = timedelta(hours=24)  # and at least daily, since targets change on existing rows
+
+# Training runs in one background process so the event loop and the web
+# process never pay for it; inside that process each forest fits its trees
+# with n_jobs threads. Feature matrices are handed over as .npy files and
+# memory-mapped, not pickled. Forests are warm-started: a retrain keeps the
+# existing trees and fits trees_per_round new ones on the current data,
+# until max_trees is reached and the forest is rebuilt from scratch. Each
+# training round is a new model version; models are written with joblib and
+# loaded memory-mapped, so loading is cheap and the tree arrays are shared
+# by every process that loads the same version.
+
+def train_model(name: str, features_path: str, target_path: str, model_path: str,
+                previous_path: Optional[str], initial_trees: int, trees_per_round: int,
+                max_trees: int, n_jobs: int) -> Dict[str, Any]:
+    """Fit one model from memory-mapped arrays and save it; runs in the training process"""
+    features = np.load(features_path, mmap_mode='r')
+    target = np.load(target_path, mmap_mode='r')
+
+    model = None
+    if previous_path and os.path.exists(previous_path):
+        model = joblib.load(previous_path)
+        if model.n_features_in_ != features.shape[1] or model.n_estimators + trees_per_round > max_trees:
+            model = None
+    if model is None:
+        model = RandomForestRegressor(n_estimators=initial_trees, min_samples_leaf=MIN_SAMPLES_LEAF,
+                                      warm_start=True, n_jobs=n_jobs)
+        warm_started = False
+    else:
+        model.n_estimators += trees_per_round
+        model.n_jobs = n_jobs
+        warm_started = True
+
+    start = time.perf_counter()
+    model.fit(features, target)
+    fit_ms = (time.perf_counter() - start) * 1000
+
+    joblib.dump(model, model_path)
+    return {'model': name, 'path': model_path, 'rows': int(features.shape[0]), 'trees': model.n_estimators,
+            'warm_started': warm_started, 'fit_ms': fit_ms}
+
+class ModelTrainer:
+    def __init__(self, feature_store: FeatureStore, model_dir: str = None, initial_trees: int = 100,
+                 trees_per_round: int = 20, max_trees: int = 200, n_jobs: int = -1,
+                 min_rows: int = MIN_TRAINING_ROWS, retrain_growth: float = RETRAIN_GROWTH,
+                 retrain_max_age: timedelta = RETRAIN_MAX_AGE):
+        self.feature_store = feature_store
+        self.model_dir = model_dir or os.getenv(
+            'HOTPPL_MODEL_DIR',
+            os.path.join(tempfile.gettempdir(), 'hotppl_models')
+        )
+        os.makedirs(self.model_dir, exist_ok=True)
+        self.manifest_path = os.path.join(self.model_dir, 'manifest.json')
+
+        self.initial_trees = initial_trees
+        self.trees_per_round = trees_per_round
+        self.max_trees = max_trees
+        self.n_jobs = n_jobs
+        self.min_rows = min_rows
+        self.retrain_growth = retrain_growth
+        self.retrain_max_age = retrain_max_age
+
+        self.pool: Optional[ProcessPoolExecutor] = None  # started on first training round
+        self.manifest = self.read_manifest()
+
+        self.metrics = {
+            'rounds': 0,
+            'skipped_rounds': 0,
+            'warm_starts': 0,
+            'last_round_ms': 0.0
+        }
+
+    @property
+    def version(self) -> int:
+        return self.manifest.get('version', 0)
+
+    def read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def expired(self, now: datetime = None) -> bool:
+        """Whether there is no current version or it has outlived the maximum age"""
+        if not self.manifest:
+            return True
+        return (now or datetime.now()) - datetime.fromisoformat(self.manifest['trained_at']) >= self.retrain_max_age
+
+    def retrain_due(self, now: datetime = None) -> bool:
+        """Whether the refreshed feature store has outgrown, or outlived, the current version"""
+        if self.expired(now):
+            return True
+        rows = {'submissions': len(self.feature_store.submissions), 'creators': len(self.feature_store.creators)}
+        return any(rows[dataset] >= (1 + self.retrain_growth) * self.manifest['models'][name]['rows']
+                   for name, (dataset, _) in MODEL_DATASETS.items() if name in self.manifest['models'])
+
+    async def train(self, full: bool = False, now: datetime = None) -> Optional[Dict[str, Any]]:
+        """Refresh features and train a new model version; None when there is too little data.
+        full=True rebuilds the feature store and fits from scratch, dropping deleted rows"""
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.feature_store.refresh, full)
+
+        _, creator_features, creator_targets = self.feature_store.creator_features(now)
+        _, submission_features, engagement = self.feature_store.submission_features(now)
+        datasets = {
+            'submissions': (submission_features, {'engagement': engagement}),
+            'creators': (creator_features, creator_targets)
+        }
+        if min(len(features) for features, _ in datasets.values()) < self.min_rows:
+            self.metrics['skipped_rounds'] += 1
+            return None
+
+        version = self.version + 1
+        paths = {}
+        for dataset, (features, targets) in datasets.items():
+            paths[dataset] = self.array_path(dataset, version)
+            np.save(paths[dataset], features)
+            for target_name, target in targets.items():
+                paths[target_name] = self.array_path(target_name, version)
+                np.save(paths[target_name], target)
+
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers=1)
+        previous = {} if full else self.manifest.get('models', {})
+        reports = await asyncio.gather(*(
+            loop.run_in_executor(self.pool, train_model, name, paths[dataset], paths[target],
+                                 self.model_path(name, version), previous.get(name, {}).get('path'),
+                                 self.initial_trees, self.trees_per_round, self.max_trees, self.n_jobs)
+            for name, (dataset, target) in MODEL_DATASETS.items()
+        ))
+
+        manifest = {
+            'version': version,
+            'trained_at': datetime.now().isoformat(),
+            'models': {report['model']: report for report in reports}
+        }
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+        self.remove_version(self.version - 1)  # keep the outgoing version for current readers
+        for path in paths.values():
+            os.remove(path)
+        self.manifest = manifest
+
+        self.metrics['rounds'] += 1
+        self.metrics['warm_starts'] += sum(report['warm_started'] for report in reports)
+        self.metrics['last_round_ms'] = (time.perf_counter() - start) * 1000
+        return manifest
+
+    def load_models(self) -> Dict[str, RandomForestRegressor]:
+        """Current model version, memory-mapped"""
+        return {name: joblib.load(model['path'], mmap_mode='r')
+                for name, model in self.manifest.get('models', {}).items()}
+
+    def array_path(self, name: str, version: int) -> str:
+        return os.path.join(self.model_dir, f'{name}-v{version}.npy')
+
+    def model_path(self, name: str, version: int) -> str:
+        return os.path.join(self.model_dir, f'{name}-v{version}.joblib')
+
+    def remove_version(self, version: int):
+        """Delete one version's model files"""
+        for name in MODEL_DATASETS:
+            path = self.model_path(name, version)
+            if version > 0 and os.path.exists(path):
+                os.remove(path)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True)
+            self.pool = None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        metrics['version'] = self.version
+        return metrics
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Points Ledger
+Append-only reward ledger with incrementally projected creator balances
+"""
+
+import json
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from database import db
+
+DEFAULT_TIER = 'earthling'
+POINTS_TYPE = 'points'
+
+# reward_transactions is the source of truth and only ever grows; triggers in
+# the schema reject UPDATE and DELETE. creator_balances is a projection of it:
+# every append folds the new rows into the per-user totals inside the same
+# SQLite transaction, so balance reads are a primary key lookup. replay()
+# recomputes the projection from the ledger with a single grouped scan,
+# which verify() and rebuild() use for audits.
+
+class PointsLedger:
+    def __init__(self):
+        self.metrics = {
+            'transactions_appended': 0,
+            'points_appended': 0,
+            'replays': 0,
+            'last_replay_ms': 0.0,
+            'last_replay_transactions': 0,
+            'drift_detected': 0
+        }
+
+    def append(self, cursor: sqlite3.Cursor, transactions: Iterable) -> int:
+        """Append reward transactions and project them into balances; returns the last seq"""
+        transactions = list(transactions)
+        if not transactions:
+            return 0
+
+        cursor.executemany('''
+            INSERT INTO reward_transactions (id, user_id, reward_type, amount, reason,
+                                             submission_id, collaboration_id, metadata, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(t.id, t.user_id, t.reward_type.value, t.amount, t.reason, t.submission_id,
+               t.collaboration_id, json.dumps(t.metadata), t.created_at) for t in transactions])
+        last_seq = cursor.execute('SELECT last_insert_rowid()').fetchone()[0]
+
+        # Fold the batch into one delta per user
+        deltas: Dict[str, int] = {}
+        for t in transactions:
+            if t.reward_type.value == POINTS_TYPE:
+                deltas[t.user_id] = deltas.get(t.user_id, 0) + int(t.amount)
+
+        now = datetime.now()
+        cursor.executemany('''
+            INSERT INTO creator_balances (user_id, total_points, tier, last_seq, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                total_points = total_points + excluded.total_points,
+                last_seq = excluded.last_seq,
+                updated_at = excluded.updated_at
+        ''', [(user_id, points, DEFAULT_TIER, last_seq, now) for user_id, points in deltas.items()])
+
+        self.metrics['transactions_appended'] += len(transactions)
+        self.metrics['points_appended'] += sum(deltas.values())
+        return last_seq
+
+    def set_tier(self, cursor: sqlite3.Cursor, user_id: str, tier: str):
+        """Record a user's current tier next to their balance"""
+        cursor.execute('''
+            INSERT INTO creator_balances (user_id, total_points, tier, last_seq, updated_at)
+            VALUES (?, 0, ?, 0, ?)
+            ON CONFLICT(user_id) DO UPDATE SET tier = excluded.tier, updated_at = excluded.updated_at
+        ''', (user_id, tier, datetime.now()))
+
+    def get_balance(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Materialized balance and tier for a user"""
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT total_points, tier, last_seq FROM creator_balances WHERE user_id = ?
+        ''', (user_id,))
+        row = cursor.fetchone()
+        conn.close()
+
+        if row:
+            return {'user_id': user_id, 'total_points': row[0], 'tier': row[1], 'last_seq': row[2]}
+        return None
+
+    def replay(self, user_id: str = None, up_to_seq: int = None) -> Dict[str, int]:
+        """Recompute point balances from the ledger"""
+        conn = sqlite3.connect(db.db_path)
+        balances = self._replay(conn.cursor(), user_id, up_to_seq)
+        conn.close()
+        return balances
+
+    def _replay(self, cursor: sqlite3.Cursor, user_id: str = None,
+                up_to_seq: int = None) -> Dict[str, int]:
+        """Grouped scan of the ledger on an open cursor"""
+        start = time.perf_counter()
+
+        query = '''
+            SELECT user_id, SUM(CAST(amount AS INTEGER)), COUNT(*)
+            FROM reward_transactions WHERE reward_type = ?
+        '''
+        params: List[Any] = [POINTS_TYPE]
+        if user_id is not None:
+            query += ' AND user_id = ?'
+            params.append(user_id)
+        if up_to_seq is not None:
+            query += ' AND seq <= ?'
+            params.append(up_to_seq)
+        query += ' GROUP BY user_id'
+
+        balances = {}
+        transaction_count = 0
+        for row_user_id, points, count in cursor.execute(query, params):
+            balances[row_user_id] = points
+            transaction_count += count
+
+        self.metrics['replays'] += 1
+        self.metrics['last_replay_ms'] = (time.perf_counter() - start) * 1000
+        self.metrics['last_replay_transactions'] = transaction_count
+        return balances
+
+    def verify(self, user_id: str = None) -> Dict[str, Tuple[int, int]]:
+        """Compare materialized balances with a ledger replay; returns {user_id: (stored, replayed)} for drift"""
+        conn = sqlite3.connect(db.db_path, isolation_level=None)
+        cursor = conn.cursor()
+
+        # Read both sides from one snapshot
+        cursor.execute('BEGIN')
+        replayed = self._replay(cursor, user_id)
+        if user_id is not None:
+            cursor.execute('SELECT user_id, total_points FROM creator_balances WHERE user_id = ?', (user_id,))
+        else:
+            cursor.execute('SELECT user_id, total_points FROM creator_balances')
+        stored = dict(cursor.fetchall())
+        cursor.execute('COMMIT')
+        conn.close()
+
+        drift = {}
+        for key in stored.keys() | replayed.keys():
+            if stored.get(key, 0) != replayed.get(key, 0):
+                drift[key] = (stored.get(key, 0), replayed.get(key, 0))
+
+        if drift:
+            self.metrics['drift_detected'] += len(drift)
+            print(f"⚠️ Points ledger drift for {len(drift)} creators")
+        return drift
+
+    def rebuild(self) -> int:
+        """Rebuild every materialized balance from the ledger; returns the number of balances written"""
+        conn = sqlite3.connect(db.db_path, isolation_level=None)
+        cursor = conn.cursor()
+
+        try:
+            # Hold the write lock so no append lands between the replay and the rewrite
+            cursor.execute('BEGIN IMMEDIATE')
+            last_seq = cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM reward_transactions').fetchone()[0]
+            balances = self._replay(cursor, up_to_seq=last_seq)
+            now = datetime.now()
+
+            cursor.execute('UPDATE creator_balances SET total_points = 0, last_seq = ?, updated_at = ?',
+                           (last_seq, now))
+            cursor.executemany('''
+                INSERT INTO creator_balances (user_id, total_points, tier, last_seq, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    total_points = excluded.total_points,
+                    last_seq = excluded.last_seq,
+                    updated_at = excluded.updated_at
+            ''', [(user_id, points, DEFAULT_TIER, last_seq, now) for user_id, points in balances.items()])
+
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        return len(balances)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Ledger metrics"""
+        return dict(self.metrics)
@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Post Metrics Store
+Compact, day-partitioned time series of social post metric samples
+"""
+
+import sqlite3
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from database import db
+
+MS_PER_DAY = 86_400_000
+DEFAULT_COLUMNS = ('views', 'likes', 'shares', 'comments', 'engagement_rate', 'reach')
+DEFAULT_SCALES = {'engagement_rate': 10_000}  # fractional metrics, stored to 4 decimal places
+DELTA_DTYPES = (np.int8, np.int16, np.int32, np.int64)
+
+# Samples are integer columns (timestamp in epoch ms, then one per metric)
+# buffered in memory and flushed into one block per post per UTC day. A block
+# stores each column's first value followed by successive differences, in the
+# narrowest integer type that holds them, zlib compressed; slowly growing
+# counters polled at steady intervals shrink to a few bytes per sample.
+# Flushing merges new samples into the day's block, so a post has at most one
+# row per day and range queries read only the days they cover. Metrics missing
+# from a sample carry the post's previous value forward. Fractional metrics
+# are stored as fixed point, value x scale rounded, and divided back on read;
+# the scale is recorded with the block's column names ("engagement_rate@10000")
+# so blocks written with another scale are converted when decoded.
+
+def encode_block(block: np.ndarray) -> Tuple[str, bytes]:
+    """Delta encode a (columns, samples) int64 block"""
+    bases = np.ascontiguousarray(block[:, 0], dtype=np.int64)
+    deltas = np.diff(block, axis=1)
+    dtype = np.int64
+    if deltas.size:
+        low, high = deltas.min(), deltas.max()
+        dtype = next(t for t in DELTA_DTYPES if np.iinfo(t).min <= low and high <= np.iinfo(t).max)
+    payload = bases.tobytes() + np.ascontiguousarray(deltas, dtype=dtype).tobytes()
+    return np.dtype(dtype).name, zlib.compress(payload, 6)
+
+def decode_block(dtype: str, data: bytes, columns: int, samples: int) -> np.ndarray:
+    """Inverse of encode_block"""
+    raw = zlib.decompress(data)
+    bases = np.frombuffer(raw, dtype=np.int64, count=columns)
+    deltas = np.frombuffer(raw, dtype=dtype, offset=columns * 8).reshape(columns, samples - 1)
+    block = np.empty((columns, samples), dtype=np.int64)
+    block[:, 0] = bases
+    block[:, 1:] = deltas
+    return np.cumsum(block, axis=1, out=block)
+
+def velocity(timestamps: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-second rate of change, reported at the end of each interval"""
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    dt = np.diff(timestamps)
+    rates = np.diff(np.asarray(values, dtype=np.float64)) / np.where(dt > 0, dt, np.nan)
+    keep = dt > 0
+    return timestamps[1:][keep], rates[keep]
+
+def acceleration(timestamps: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-second change of velocity"""
+    return velocity(*velocity(timestamps, values))
+
+def to_day(moment: Any) -> int:
+    """Day number (days since epoch, UTC) of a datetime or epoch seconds"""
+    if isinstance(moment, datetime):
+        moment = moment.timestamp()
+    return int(moment * 1000) // MS_PER_DAY
+
+class PostMetricsStore:
+    def __init__(self, columns: Iterable[str] = DEFAULT_COLUMNS, flush_threshold: int = 10_000,
+                 scales: Dict[str, int] = None):
+        self.columns = tuple(columns)
+        self.column_index = {name: i for i, name in enumerate(self.columns)}
+        scales = DEFAULT_SCALES if scales is None else scales
+        self.scales = tuple(int(scales.get(name, 1)) for name in self.columns)
+        self.column_spec = ','.join(name if scale == 1 else f'{name}@{scale}'
+                                    for name, scale in zip(self.columns, self.scales))
+        self.flush_threshold = flush_threshold
+
+        self.buffer: Dict[str, List[Tuple[int, ...]]] = {}
+        self.buffered = 0
+        self.last_values: Dict[str, List[int]] = {}
+
+        self.metrics = {
+            'samples_appended': 0,
+            'samples_flushed': 0,
+            'partitions_written': 0,
+            'bytes_written': 0,
+            'flushes': 0
+        }
+
+    def append(self, post_id: str, metrics: Dict[Any, Any], timestamp: float = None):
+        """Buffer one sample; metric keys may be names or enums with a .value"""
+        values = self.last_values.get(post_id)
+        if values is None:
+            values = self.last_values[post_id] = [0] * len(self.columns)
+        for key, value in metrics.items():
+            i = self.column_index.get(getattr(key, 'value', key))
+            if i is not None:
+                values[i] = int(round(value * self.scales[i]))
+
+        ts = int(round((time.time() if timestamp is None else timestamp) * 1000))
+        self.buffer.setdefault(post_id, []).append((ts, *values))
+        self.buffered += 1
+        self.metrics['samples_appended'] += 1
+
+        if self.buffered >= self.flush_threshold:
+            self.flush()
+
+    def flush(self) -> int:
+        """Merge buffered samples into their day partitions; returns samples written"""
+        if not self.buffer:
+            return 0
+
+        conn = sqlite3.connect(db.db_path, isolation_level=None)
+        cursor = conn.cursor()
+        written = 0
+        try:
+            cursor.execute('BEGIN IMMEDIATE')
+            for post_id, rows in self.buffer.items():
+                block = np.array(rows, dtype=np.int64).T
+                days = block[0] // MS_PER_DAY
+                for day in np.unique(days):
+                    self._merge_partition(cursor, post_id, int(day), block[:, days == day])
+                written += len(rows)
+            cursor.execute('COMMIT')
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+
+        self.buffer.clear()
+        self.buffered = 0
+        self.metrics['samples_flushed'] += written
+        self.metrics['flushes'] += 1
+        return written
+
+    def _merge_partition(self, cursor: sqlite3.Cursor, post_id: str, day: int, block: np.ndarray):
+        cursor.execute('''
+            SELECT sample_count, columns, dtype, data FROM post_metric_partitions WHERE post_id = ? AND day = ?
+        ''', (post_id, day))
+        row = cursor.fetchone()
+        if row:
+            block = np.concatenate([self._decode_row(*row), block], axis=1)
+        if np.any(np.diff(block[0]) < 0):
+            block = block[:, np.argsort(block[0], kind='stable')]
+
+        dtype, data = encode_block(block)
+        cursor.execute('''
+            INSERT OR REPLACE INTO post_metric_partitions
+                (post_id, day, sample_count, first_ts, last_ts, columns, dtype, data)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (post_id, day, block.shape[1], int(block[0, 0]), int(block[0, -1]),
+              self.column_spec, dtype, data))
+        self.metrics['partitions_written'] += 1
+        self.metrics['bytes_written'] += len(data)
+
+    def _decode_row(self, sample_count: int, columns: str, dtype: str, data: bytes) -> np.ndarray:
+        """Decode a stored block, aligning its columns and scales with this store's"""
+        stored = columns.split(',')
+        block = decode_block(dtype, data, len(stored) + 1, sample_count)
+        if columns == self.column_spec:
+            return block
+
+        aligned = np.zeros((len(self.columns) + 1, sample_count), dtype=np.int64)
+        aligned[0] = block[0]
+        for i, spec in enumerate(stored):
+            name, _, scale = spec.partition('@')
+            if name in self.column_index:
+                j = self.column_index[name]
+                values = block[i + 1]
+                if int(scale or 1) != self.scales[j]:
+                    values = np.round(values * (self.scales[j] / int(scale or 1))).astype(np.int64)
+                aligned[j + 1] = values
+        return aligned
+
+    def _load(self, post_id: str, start_ms: Optional[int], end_ms: Optional[int]) -> np.ndarray:
+        """All samples for a post in [start_ms, end_ms), stored and buffered, in time order"""
+        first_day = start_ms // MS_PER_DAY if start_ms is not None else -2 ** 62
+        last_day = (end_ms - 1) // MS_PER_DAY if end_ms is not None else 2 ** 62
+
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT sample_count, columns, dtype, data FROM post_metric_partitions
+            WHERE post_id = ? AND day BETWEEN ? AND ? ORDER BY day
+        ''', (post_id, first_day, last_day))
+        blocks = [self._decode_row(*row) for row in cursor.fetchall()]
+        conn.close()
+
+        if post_id in self.buffer:
+            blocks.append(np.array(self.buffer[post_id], dtype=np.int64).T)
+        if not blocks:
+            return np.empty((len(self.columns) + 1, 0), dtype=np.int64)
+
+        block = np.concatenate(blocks, axis=1)
+        if np.any(np.diff(block[0]) < 0):
+            block = block[:, np.argsort(block[0], kind='stable')]
+        keep = np.ones(block.shape[1], dtype=bool)
+        if start_ms is not None:
+            keep &= block[0] >= start_ms
+        if end_ms is not None:
+            keep &= block[0] < end_ms
+        return block[:, keep]
+
+    def get_series(self, post_id: str, start: float = None, end: float = None,
+                   columns: Iterable[str] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """Timestamps (epoch seconds) and metric arrays for samples in [start, end)"""
+        block = self._load(post_id, self._ms(start), self._ms(end))
+        columns = self.columns if columns is None else tuple(columns)
+        return block[0] / 1000.0, {name: self._unscale(name, block[self.column_index[name] + 1])
+                                   for name in columns}
+
+    def downsample(self, post_id: str, bucket_seconds: float, start: float = None, end: float = None,
+                   how: str = 'last', columns: Iterable[str] = None) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """One value per time bucket: 'last' (counters), 'max' or 'mean'; timestamps are bucket starts"""
+        block = self._load(post_id, self._ms(start), self._ms(end))
+        columns = self.columns if columns is None else tuple(columns)
+        rows = [self.column_index[name] + 1 for name in columns]
+        if block.shape[1] == 0:
+            return np.empty(0), {name: np.empty(0, dtype=np.int64) for name in columns}
+
+        bucket_ms = int(bucket_seconds * 1000)
+        buckets = block[0] // bucket_ms
+        starts = np.flatnonzero(np.r_[True, np.diff(buckets) != 0])
+        values = block[rows]
+
+        if how == 'last':
+            ends = np.r_[starts[1:], block.shape[1]] - 1
+            reduced = values[:, ends]
+        elif how == 'max':
+            reduced = np.maximum.reduceat(values, starts, axis=1)
+        elif how == 'mean':
+            counts = np.diff(np.r_[starts, block.shape[1]])
+            reduced = np.add.reduceat(values, starts, axis=1) / counts
+        else:
+            raise ValueError(f"Unknown downsampling method: {how}")
+
+        return buckets[starts] * bucket_ms / 1000.0, {name: self._unscale(name, series)
+                                                      for name, series in zip(columns, reduced)}
+
+    def velocity(self, post_id: str, column: str, start: float = None, end: float = None,
+                 bucket_seconds: float = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-second growth of a metric, optionally on downsampled data"""
+        timestamps, values = self._column(post_id, column, start, end, bucket_seconds)
+        return velocity(timestamps, values)
+
+    def acceleration(self, post_id: str, column: str, start: float = None, end: float = None,
+                     bucket_seconds: float = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Per-second change in a metric's growth rate"""
+        timestamps, values = self._column(post_id, column, start, end, bucket_seconds)
+        return acceleration(timestamps, values)
+
+    def _unscale(self, name: str, values: np.ndarray) -> np.ndarray:
+        """Stored fixed-point values as metric values"""
+        scale = self.scales[self.column_index[name]]
+        return values if scale == 1 else values / scale
+
+    def _column(self, post_id, column, start, end, bucket_seconds):
+        if bucket_seconds:
+            timestamps, series = self.downsample(post_id, bucket_seconds, start, end, columns=[column])
+        else:
+            timestamps, series = self.get_series(post_id, start, end, columns=[column])
+        return timestamps, series[column]
+
+    def drop_before(self, moment: Any) -> int:
+        """Delete whole day partitions older than moment (datetime or epoch seconds)"""
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM post_metric_partitions WHERE day < ?', (to_day(moment),))
+        deleted = cursor.rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Partition count, stored samples and encoded size"""
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COUNT(*), COALESCE(SUM(sample_count), 0), COALESCE(SUM(LENGTH(data)), 0)
+            FROM post_metric_partitions
+        ''')
+        partitions, samples, data_bytes = cursor.fetchone()
+        conn.close()
+        return {
+            'partitions': partitions,
+            'samples': samples,
+            'data_bytes': data_bytes,
+            'bytes_per_sample': data_bytes / samples if samples else 0.0,
+            'buffered_samples': self.buffered
+        }
+
+    @staticmethod
+    def _ms(moment: Optional[float]) -> Optional[int]:
+        return None if moment is None else int(round(moment * 1000))
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Store metrics"""
+        return dict(self.metrics)
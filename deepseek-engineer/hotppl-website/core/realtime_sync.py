@@ -30,6 +30,7 @@ class SyncEventType(Enum):
     CHALLENGE_STARTED = "challenge_started"
     TRENDING_UPDATED = "trending_updated"
     LIVE_STATS_UPDATED = "live_stats_updated"
+    ANOMALY_DETECTED = "anomaly_detected"
 
 @dataclass
 class SyncEvent:
@@ -70,6 +71,9 @@ class RealTimeSyncEngine:
             'active_connections': 0
         }
         
+        # Last trending ranking broadcast
+        self.last_trending_ids: List[str] = []
+        
         # Setup event handlers
         self.setup_event_handlers()
         
@@ -94,6 +98,7 @@ class RealTimeSyncEngine:
         # System events
         self.register_handler(SyncEventType.LIVE_STATS_UPDATED, self.handle_live_stats_updated)
         self.register_handler(SyncEventType.TRENDING_UPDATED, self.handle_trending_updated)
+        self.register_handler(SyncEventType.ANOMALY_DETECTED, self.handle_anomaly_detected)
     
     def register_handler(self, event_type: SyncEventType, handler: Callable):
         """Register an event handler"""
@@ -106,9 +111,11 @@ class RealTimeSyncEngine:
         print("🔄 Starting Real-Time Sync Engine...")
         
         self.running = True
+        analytics_service.anomaly_detector.subscribe(self.on_anomaly_alert)
         
         # Start background tasks
         tasks = [
+            asyncio.create_task(analytics_service.anomaly_detector.run()),
             asyncio.create_task(self.process_website_to_discord()),
             asyncio.create_task(self.process_discord_to_website()),
             asyncio.create_task(self.websocket_server()),
@@ -197,6 +204,9 @@ class RealTimeSyncEngine:
         # Update leaderboard
         await self.update_live_leaderboard()
         
+        # Re-rank trending
+        await self.record_trending_vote(event, 1.0)
+        
         # Check for milestones
         await self.check_vote_milestones(vote_data)
     
@@ -208,6 +218,18 @@ class RealTimeSyncEngine:
         # Update vote counts
         # Refresh leaderboard
         await self.update_live_leaderboard()
+        
+        # Re-rank trending
+        await self.record_trending_vote(event, -1.0)
+    
+    async def record_trending_vote(self, event: SyncEvent, weight: float):
+        """Feed a cast (+1) or removed (-1) vote to the trending index and broadcast any re-rank"""
+        submission_id = event.submission_id or event.data.get('submission_id')
+        if not submission_id:
+            return
+        
+        analytics_service.trending.record_vote(submission_id, event.timestamp.timestamp(), weight)
+        await self.analyze_trending_content()
     
     async def handle_leaderboard_updated(self, event: SyncEvent):
         """Handle leaderboard updates"""
@@ -265,6 +287,27 @@ class RealTimeSyncEngine:
         # Update social media
         pass
     
+    def on_anomaly_alert(self, alert):
+        """Anomaly detector listener; fans new alerts out like any other sync event"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # raised outside the engine's loop, the dashboard still lists it
+        
+        loop.create_task(self.emit_event(SyncEvent(
+            id=alert.id,
+            event_type=SyncEventType.ANOMALY_DETECTED,
+            data=alert.to_dict(),
+            source='system',
+            timestamp=datetime.now(),
+            priority=5
+        )))
+    
+    async def handle_anomaly_detected(self, event: SyncEvent):
+        """Post anomaly alerts to Discord"""
+        if discord_service.is_connected():
+            await discord_service.post_alert(event.data)
+    
     async def broadcast_to_websockets(self, event: SyncEvent):
         """Broadcast event to all WebSocket connections"""
         if not self.websocket_connections:
@@ -406,9 +449,20 @@ class RealTimeSyncEngine:
         }
     
     async def analyze_trending_content(self):
-        """Analyze and update trending content"""
-        # Trending analysis logic
-        pass
+        """Broadcast trending content when the ranking changes"""
+        trending = analytics_service.get_trending_submissions(limit=10)
+        trending_ids = [item['id'] for item in trending]
+        if trending_ids == self.last_trending_ids:
+            return
+        
+        self.last_trending_ids = trending_ids
+        await self.emit_event(SyncEvent(
+            id=str(uuid.uuid4()),
+            event_type=SyncEventType.TRENDING_UPDATED,
+            data={'trending': trending},
+            source='system',
+            timestamp=datetime.now()
+        ))
     
     async def metrics_collector(self):
         """Collect and report performance metrics"""
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Revenue Settlement
+Checkpointed, integer-exact revenue share settlement with payout file export
+"""
+
+import csv
+import os
+import sqlite3
+import time
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from database import db
+
+MICROS_PER_UNIT = 1_000_000
+BASIS_POINTS = 10_000
+DEFAULT_TIER = 'earthling'
+
+# Revenue events are stored in integer micro-units so sub-cent ad revenue
+# sums exactly. A run aggregates a period's events per creator in seq-range
+# chunks; each chunk's totals and the run's last_seq are committed together,
+# so a crashed run resumes from its checkpoint without double counting.
+# Shares are applied once per creator total with integer basis points and
+# floored to the currency's minor unit; the remainder stays with the platform.
+
+def to_micros(amount: Decimal) -> int:
+    """Exact conversion of a currency amount to integer micro-units"""
+    micros = Decimal(amount) * MICROS_PER_UNIT
+    if micros != micros.to_integral_value():
+        raise ValueError(f"Amount {amount} is finer than one micro-unit")
+    return int(micros)
+
+def share_to_bps(share: float) -> int:
+    """Revenue share fraction as integer basis points"""
+    return int(Decimal(str(share)) * BASIS_POINTS)
+
+def format_amount(value: int, exponent: int) -> str:
+    """Render an integer amount with the given number of decimal places"""
+    return str(Decimal(value).scaleb(-exponent))
+
+class RevenueSettlement:
+    def __init__(self, revenue_shares: Dict[str, float], output_dir: str = 'payouts',
+                 chunk_size: int = 250_000, currency: str = 'USD', minor_exponent: int = 2):
+        self.share_bps = {tier: share_to_bps(share) for tier, share in revenue_shares.items()}
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size
+        self.currency = currency
+        self.minor_exponent = minor_exponent
+        self.micros_per_minor = MICROS_PER_UNIT // 10 ** minor_exponent
+
+        self.metrics = {
+            'events_recorded': 0,
+            'runs_completed': 0,
+            'runs_resumed': 0,
+            'last_run_events': 0,
+            'last_run_seconds': 0.0,
+            'last_run_events_per_second': 0.0
+        }
+
+    def record_event(self, creator_id: str, amount: Decimal, source: str = None,
+                     occurred_at: datetime = None) -> str:
+        """Record one revenue event for a creator"""
+        event_id = str(uuid.uuid4())
+        self.record_events([(event_id, creator_id, to_micros(amount), source, occurred_at or datetime.now())])
+        return event_id
+
+    def record_events(self, events: Iterable[Tuple[str, str, int, Optional[str], datetime]]):
+        """Bulk insert (id, creator_id, amount_micros, source, occurred_at) events"""
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+
+        cursor.executemany('''
+            INSERT INTO revenue_events (id, creator_id, amount_micros, currency, source, occurred_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', ((event_id, creator_id, amount_micros, self.currency, source, occurred_at)
+              for event_id, creator_id, amount_micros, source, occurred_at in events))
+        self.metrics['events_recorded'] += cursor.rowcount
+
+        conn.commit()
+        conn.close()
+
+    def run_id(self, period_start: datetime, period_end: datetime) -> str:
+        return f"{period_start:%Y%m%dT%H%M%S}-{period_end:%Y%m%dT%H%M%S}-{self.currency}"
+
+    def run(self, period_start: datetime, period_end: datetime) -> Dict[str, Any]:
+        """Settle all revenue in [period_start, period_end), resuming an interrupted run"""
+        start = time.perf_counter()
+        run_id = self.run_id(period_start, period_end)
+
+        conn = sqlite3.connect(db.db_path)
+        cursor = conn.cursor()
+
+        try:
+            run = self._load_run(cursor, run_id)
+            if run is None:
+                run = self._start_run(cursor, run_id, period_start, period_end)
+                conn.commit()
+            elif run['status'] == 'completed':
+                return self._summary(cursor, run_id)
+            else:
+                self.metrics['runs_resumed'] += 1
+                print(f"🔁 Resuming settlement {run_id} from seq {run['last_seq']}")
+
+            events = self._aggregate(conn, cursor, run, period_start, period_end)
+            self._finalize(conn, cursor, run_id)
+            summary = self._summary(cursor, run_id)
+        finally:
+            conn.close()
+
+        elapsed = time.perf_counter() - start
+        self.metrics['runs_completed'] += 1
+        self.metrics['last_run_events'] = events
+        self.metrics['last_run_seconds'] = elapsed
+        self.metrics['last_run_events_per_second'] = events / elapsed if elapsed > 0 else 0.0
+
+        print(f"💸 Settled {run_id}: {summary['creators_paid']} creators, "
+              f"{summary['total_payout']} {self.currency}")
+        return summary
+
+    def _load_run(self, cursor: sqlite3.Cursor, run_id: str) -> Optional[Dict[str, Any]]:
+        cursor.execute('''
+            SELECT status, start_seq, end_seq, last_seq FROM settlement_runs WHERE id = ?
+        ''', (run_id,))
+        row = cursor.fetchone()
+        if row:
+            return {'id': run_id, 'status': row[0], 'start_seq': row[1], 'end_seq': row[2], 'last_seq': row[3]}
+        return None
+
+    def _start_run(self, cursor: sqlite3.Cursor, run_id: str, period_start: datetime,
+                   period_end: datetime) -> Dict[str, Any]:
+        """Create a run pinned to the seq range of the period's events"""
+        cursor.execute('''
+            SELECT MIN(seq), MAX(seq) FROM revenue_events
+            WHERE occurred_at >= ? AND occurred_at < ? AND currency = ?
+        ''', (period_start, period_end, self.currency))
+        first_seq, end_seq = cursor.fetchone()
+        start_seq = (first_seq or 1) - 1
+        end_seq = end_seq or 0
+
+        cursor.execute('''
+            INSERT INTO settlement_runs (id, period_start, period_end, currency, status,
+                                         start_seq, end_seq, last_seq, created_at)
+            VALUES (?, ?, ?, ?, 'running', ?, ?, ?, ?)
+        ''', (run_id, period_start, period_end, self.currency, start_seq, end_seq, start_seq, datetime.now()))
+
+        return {'id': run_id, 'status': 'running', 'start_seq': start_seq, 'end_seq': end_seq, 'last_seq': start_seq}
+
+    def _aggregate(self, conn: sqlite3.Connection, cursor: sqlite3.Cursor, run: Dict[str, Any],
+                   period_start: datetime, period_end: datetime) -> int:
+        """Fold events into per-creator gross totals, committing a checkpoint per chunk"""
+        events = 0
+        last_seq = run['last_seq']
+
+        while last_seq < run['end_seq']:
+            chunk_end = min(last_seq + self.chunk_size, run['end_seq'])
+
+            cursor.execute('''
+                SELECT creator_id, SUM(amount_micros), COUNT(*) FROM revenue_events
+                WHERE seq > ? AND seq <= ? AND occurred_at >= ? AND occurred_at < ? AND currency = ?
+                GROUP BY creator_id
+            ''', (last_seq, chunk_end, period_start, period_end, self.currency))
+            totals = cursor.fetchall()
+
+            cursor.executemany('''
+                INSERT INTO settlement_totals (run_id, creator_id, gross_micros) VALUES (?, ?, ?)
+                ON CONFLICT(run_id, creator_id) DO UPDATE SET gross_micros = gross_micros + excluded.gross_micros
+            ''', [(run['id'], creator_id, gross) for creator_id, gross, _ in totals])
+
+            chunk_events = sum(count for _, _, count in totals)
+            cursor.execute('''
+                UPDATE settlement_runs SET last_seq = ?, events_processed = events_processed + ? WHERE id = ?
+            ''', (chunk_end, chunk_events, run['id']))
+            conn.commit()
+
+            events += chunk_events
+            last_seq = chunk_end
+
+        return events
+
+    def _finalize(self, conn: sqlite3.Connection, cursor: sqlite3.Cursor, run_id: str):
+        """Apply tier shares to creator totals and write the payout file"""
+        cursor.execute('''
+            SELECT t.creator_id, t.gross_micros, COALESCE(b.tier, ?)
+            FROM settlement_totals t LEFT JOIN creator_balances b ON b.user_id = t.creator_id
+            WHERE t.run_id = ? ORDER BY t.creator_id
+        ''', (DEFAULT_TIER, run_id))
+
+        payouts = []
+        for creator_id, gross_micros, tier in cursor.fetchall():
+            bps = self.share_bps.get(tier, 0)
+            payout_minor = max(gross_micros, 0) * bps // BASIS_POINTS // self.micros_per_minor
+            payouts.append((creator_id, gross_micros, tier, bps, payout_minor))
+
+        payout_file = self._write_payout_file(run_id, payouts)
+
+        cursor.executemany('''
+            UPDATE settlement_totals SET tier = ?, share_bps = ?, payout_minor = ?
+            WHERE run_id = ? AND creator_id = ?
+        ''', [(tier, bps, payout_minor, run_id, creator_id)
+              for creator_id, _, tier, bps, payout_minor in payouts])
+        cursor.execute('''
+            UPDATE settlement_runs SET status = 'completed', payout_file = ?, completed_at = ? WHERE id = ?
+        ''', (payout_file, datetime.now(), run_id))
+        conn.commit()
+
+    def _write_payout_file(self, run_id: str, payouts) -> str:
+        """Write payouts as CSV, replacing any partial file atomically"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"payouts_{run_id}.csv")
+        tmp_path = path + '.tmp'
+
+        with open(tmp_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['creator_id', 'tier', 'gross', 'share_bps', 'payout', 'currency'])
+            for creator_id, gross_micros, tier, bps, payout_minor in payouts:
+                if payout_minor > 0:
+                    writer.writerow([creator_id, tier, format_amount(gross_micros, 6), bps,
+                                     format_amount(payout_minor, self.minor_exponent), self.currency])
+
+        os.replace(tmp_path, path)
+        return path
+
+    def _summary(self, cursor: sqlite3.Cursor, run_id: str) -> Dict[str, Any]:
+        cursor.execute('''
+            SELECT r.events_processed, r.payout_file, COUNT(t.creator_id),
+                   COALESCE(SUM(t.gross_micros), 0), COALESCE(SUM(t.payout_minor), 0),
+                   COALESCE(SUM(t.payout_minor > 0), 0)
+            FROM settlement_runs r LEFT JOIN settlement_totals t ON t.run_id = r.id
+            WHERE r.id = ? GROUP BY r.id
+        ''', (run_id,))
+        events, payout_file, creators, gross_micros, payout_minor, creators_paid = cursor.fetchone()
+
+        # Gross kept to the minor unit here; the exact figure is in settlement_totals
+        platform_minor = gross_micros // self.micros_per_minor - payout_minor
+        return {
+            'run_id': run_id,
+            'events': events,
+            'creators': creators,
+            'creators_paid': creators_paid,
+            'total_gross': format_amount(gross_micros, 6),
+            'total_payout': format_amount(payout_minor, self.minor_exponent),
+            'platform_share': format_amount(platform_minor, self.minor_exponent),
+            'payout_file': payout_file
+        }
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Settlement metrics"""
+        return dict(self.metrics)
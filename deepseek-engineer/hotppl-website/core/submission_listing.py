@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Submission Listing
+Keyset-paginated submission listings with opaque cursors
+"""
+
+import base64
+import json
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from database import db, SubmissionStatus
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Sort name -> key columns, all descending; id breaks ties so the key is unique
+SORT_KEYS = {
+    'recent': ('created_at', 'id'),
+    'top': ('vote_count', 'created_at', 'id')
+}
+KEY_TYPES = {'vote_count': int, 'created_at': str, 'id': str}
+
+# Pages are found by seeking, not by skipping: a cursor holds the sort key
+# of the last row served and the next page is the rows strictly after it,
+# WHERE (vote_count, created_at, id) < (?, ?, ?). With the status (and
+# scene) equality filters leading a composite index on the sort key, every
+# page is an index range read of limit + 1 rows, so page 5000 costs what page
+# 1 does, where OFFSET walks and discards every earlier row. For
+# sort=recent the key never changes, so rows inserted while a client pages
+# are neither repeated nor skipped relative to the cursor. For sort=top the
+# key includes vote_count, which moves while a client pages: a row re-voted
+# across the cursor can be served twice or not at all. The tool filter goes
+# through submission_tools, maintained alongside submissions. There is no
+# total: counting would be the scan this avoids.
+
+class InvalidCursor(ValueError):
+    pass
+
+def encode_cursor(sort: str, key: List[Any]) -> str:
+    payload = json.dumps([sort] + list(key), separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def _valid_key_value(column: str, value: Any) -> bool:
+    # bool is an int subclass but never a vote count; ints must fit SQLite's 64 bits
+    if type(value) is not KEY_TYPES[column]:
+        return False
+    return type(value) is not int or -2 ** 63 <= value < 2 ** 63
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    """Sort key stored in a cursor issued for sort"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        raise InvalidCursor('Malformed cursor')
+    if not isinstance(payload, list) or len(payload) != len(SORT_KEYS[sort]) + 1 or payload[0] != sort:
+        raise InvalidCursor(f'Cursor was not issued for sort={sort}')
+    key = payload[1:]
+    if not all(_valid_key_value(column, value) for column, value in zip(SORT_KEYS[sort], key)):
+        raise InvalidCursor('Malformed cursor')
+    return key
+
+def list_submissions(status: str = SubmissionStatus.APPROVED.value, scene: Optional[str] = None,
+                     tool: Optional[str] = None, sort: str = 'recent', limit: int = DEFAULT_PAGE_SIZE,
+                     cursor: Optional[str] = None) -> Dict[str, Any]:
+    """One page of submissions and the cursor for the next, if any.
+
+    sort=top pages over live vote counts: a submission whose votes change
+    while a client pages can appear on two pages or on none.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f'Unknown sort: {sort}')
+    if status not in {s.value for s in SubmissionStatus}:
+        raise ValueError(f'Unknown status: {status}')
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    columns = SORT_KEYS[sort]
+
+    conditions = ['s.status = ?']
+    params: List[Any] = [status]
+    if scene:
+        conditions.append('s.scene_name = ?')
+        params.append(scene)
+    if tool:
+        conditions.append('s.id IN (SELECT submission_id FROM submission_tools WHERE tool = ?)')
+        params.append(tool)
+    if cursor:
+        key = decode_cursor(cursor, sort)
+        conditions.append(f"({', '.join('s.' + c for c in columns)}) < ({', '.join('?' * len(columns))})")
+        params.extend(key)
+    params.append(limit + 1)
+
+    conn = sqlite3.connect(db.db_path)
+    try:
+        rows = conn.execute(f'''
+            SELECT s.id, s.user_id, u.username, s.scene_name, s.title, s.description, s.video_url,
+                   s.thumbnail_url, s.tools_used, s.status, s.created_at, s.vote_count, s.view_count,
+                   s.share_count
+            FROM submissions s
+            JOIN users u ON s.user_id = u.id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {', '.join('s.' + c + ' DESC' for c in columns)}
+            LIMIT ?
+        ''', params).fetchall()
+    finally:
+        conn.close()
+
+    submissions = [{
+        'id': row[0],
+        'user_id': row[1],
+        'username': row[2],
+        'scene_name': row[3],
+        'title': row[4],
+        'description': row[5],
+        'video_url': row[6],
+        'thumbnail_url': row[7],
+        'tools_used': json.loads(row[8]) if row[8] else [],
+        'status': row[9],
+        'created_at': row[10],
+        'vote_count': row[11],
+        'view_count': row[12],
+        'share_count': row[13]
+    } for row in rows[:limit]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = submissions[-1]
+        next_cursor = encode_cursor(sort, [last[c] for c in columns])
+
+    return {
+        'submissions': submissions,
+        'pagination': {
+            'sort': sort,
+            'limit': limit,
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
+        }
+    }
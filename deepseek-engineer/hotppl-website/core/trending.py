@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Trending
+Exponentially decayed vote scores kept in rank order for trending-now reads
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+HALF_LIFE_SECONDS = 6 * 3600
+MIN_SCORE = 0.05  # decayed votes below which a submission leaves the index
+LOOKBACK_HALF_LIVES = 10  # votes older than this weigh under 1/1000 and are not reloaded
+RENORMALIZE_EXPONENT = 50.0
+
+# A submission's score is the sum of its votes, each worth
+# 2^-(age / half-life). Rather than decaying every score as time passes, a
+# vote at time t adds e^(λ(t - epoch)) to a stored key, and the score now is
+# key · e^(-λ(now - epoch)): the same factor for every submission, so the
+# order of the keys is the order of the scores and never changes between
+# votes. A vote re-inserts one entry into a bisect-sorted list: the search is
+# O(log n) but the delete and insert shift the list's tail, O(n) pointer
+# moves per vote (a memmove, cheap at the tens of thousands of submissions a
+# trending window holds). Trending now is a slice of the list's tail, O(k)
+# for k rows. Brand-new posts need no special case: there is no division by
+# age. Keys grow with e^(λt), so once the exponent reaches
+# RENORMALIZE_EXPONENT all keys are rescaled and the epoch moved to now;
+# submissions whose score fell below MIN_SCORE are dropped from the front.
+
+class TrendingIndex:
+    def __init__(self, half_life: float = HALF_LIFE_SECONDS, min_score: float = MIN_SCORE,
+                 clock: Callable[[], float] = time.time):
+        self.half_life = half_life
+        self.decay = math.log(2) / half_life
+        self.min_score = min_score
+        self.clock = clock
+        self.epoch = clock()
+        self.keys: Dict[str, float] = {}
+        self.ranked: List[Tuple[float, str]] = []  # (key, submission_id), ascending
+        self.lock = threading.Lock()
+
+        self.metrics = {
+            'votes': 0,
+            'renormalizations': 0,
+            'pruned': 0
+        }
+
+    def record_vote(self, submission_id: str, when: float = None, weight: float = 1.0):
+        """Add a vote (negative weight for a removed vote) at when; O(log n) search plus an O(n) list shift"""
+        when = self.clock() if when is None else when
+        with self.lock:
+            if self.decay * (when - self.epoch) > RENORMALIZE_EXPONENT:
+                self._renormalize(when)
+
+            key = self.keys.get(submission_id)
+            if key is not None:
+                del self.ranked[bisect_left(self.ranked, (key, submission_id))]
+            key = (key or 0.0) + weight * math.exp(self.decay * (when - self.epoch))
+            if key > 0:
+                self.keys[submission_id] = key
+                insort(self.ranked, (key, submission_id))
+            else:
+                self.keys.pop(submission_id, None)  # removals can only take a score back to zero
+            self.metrics['votes'] += 1
+
+    def score(self, submission_id: str, now: float = None) -> float:
+        """Decayed vote count of a submission at now"""
+        now = self.clock() if now is None else now
+        return self.keys.get(submission_id, 0.0) * math.exp(-self.decay * (now - self.epoch))
+
+    def top(self, limit: int = 10, now: float = None) -> List[Tuple[str, float]]:
+        """(submission_id, decayed score) of the highest scores, best first"""
+        now = self.clock() if now is None else now
+        with self.lock:
+            self._prune(now)
+            scale = math.exp(-self.decay * (now - self.epoch))
+            return [(submission_id, key * scale) for key, submission_id in reversed(self.ranked[-limit:])]
+
+    def _prune(self, now: float):
+        """Drop submissions whose score decayed below min_score"""
+        threshold = self.min_score * math.exp(self.decay * (now - self.epoch))
+        cut = bisect_left(self.ranked, (threshold,))
+        for _, submission_id in self.ranked[:cut]:
+            del self.keys[submission_id]
+        del self.ranked[:cut]
+        self.metrics['pruned'] += cut
+
+    def _renormalize(self, now: float):
+        """Rescale keys to a new epoch; order is unchanged"""
+        self._prune(now)
+        scale = math.exp(-self.decay * (now - self.epoch))
+        self.ranked = [(key * scale, submission_id) for key, submission_id in self.ranked]
+        self.keys = {submission_id: key for key, submission_id in self.ranked}
+        self.epoch = now
+        self.metrics['renormalizations'] += 1
+
+    def rebuild(self, votes: Iterable[Tuple[str, float]], now: float = None):
+        """Replace the index with (submission_id, vote time) pairs"""
+        now = self.clock() if now is None else now
+        keys = {}
+        for submission_id, when in votes:
+            keys[submission_id] = keys.get(submission_id, 0.0) + math.exp(self.decay * (when - now))
+        with self.lock:
+            self.epoch = now
+            self.keys = keys
+            self.ranked = sorted((key, submission_id) for submission_id, key in keys.items())
+            self._prune(now)
+
+    def rank_of(self, submission_id: str) -> Optional[int]:
+        """1-based trending position, or None when not in the index"""
+        key = self.keys.get(submission_id)
+        if key is None:
+            return None
+        return len(self.ranked) - bisect_left(self.ranked, (key, submission_id))
+
+    def get_metrics(self) -> Dict[str, int]:
+        metrics = dict(self.metrics)
+        metrics['tracked_submissions'] = len(self.ranked)
+        return metrics
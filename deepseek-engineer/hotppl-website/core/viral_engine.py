@@ -8,7 +8,7 @@ import asyncio
 import aiohttp
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 import uuid
 import json
@@ -18,7 +18,11 @@ from urllib.parse import urlencode
 
 from database import db, Submission, User
 from analytics_service import analytics_service
-from ai_content_processor import ai_processor
+from async_cache import AsyncTTLCache
+from campaign_pipeline import CampaignPipeline, PipelineError, PipelineStage, fan_out
+from metrics_scheduler import MetricsPollingScheduler
+from post_metrics_store import PostMetricsStore
+from viral_scoring import ViralScorer
 
 class Platform(Enum):
     TIKTOK = "tiktok"
@@ -35,6 +39,18 @@ class PostStatus(Enum):
     FAILED = "failed"
     VIRAL = "viral"
 
+# Scene hashtag table, built once at import
+SCENE_HASHTAGS = {
+    "The Arrival": ['#alien', '#arrival', '#scifi', '#ufo'],
+    "DJ Reveal": ['#dj', '#music', '#reveal', '#party'],
+    "Tracksuit Encounter": ['#tracksuit', '#fashion', '#encounter'],
+    "Siri Consultation": ['#siri', '#ai', '#consultation', '#tech'],
+    "Final Judgment": ['#judgment', '#finale', '#dramatic']
+}
+
+# Served when trending hashtags are not cached yet and the fetch is slow
+FALLBACK_TRENDING_HASHTAGS = ['#hotppl', '#viral', '#creative']
+
 class ViralMetric(Enum):
     VIEWS = "views"
     LIKES = "likes"
@@ -88,6 +104,8 @@ class ViralCampaign:
     roi: float
     status: str
     created_at: datetime
+    stage_latencies: Dict[str, float] = field(default_factory=dict)  # milliseconds
+    failed_stages: List[str] = field(default_factory=list)
 
 class CrossPlatformViralEngine:
     def __init__(self):
@@ -124,6 +142,43 @@ class CrossPlatformViralEngine:
             Platform.TWITTER: {'views': 10000, 'likes': 1000},
             Platform.REDDIT: {'upvotes': 1000, 'comments': 100}
         }
+        
+        # Scoring formulas and thresholds compiled for single and bulk scoring;
+        # call viral_scorer.compile() after changing viral_thresholds
+        self.viral_scorer = ViralScorer([metric.value for metric in ViralMetric], self.viral_thresholds)
+        
+        # Campaign launch stage timeouts (seconds)
+        self.stage_timeouts = {
+            'viral_analysis': 15.0,
+            'content_variations': 10.0,
+            'hashtag_strategy': 10.0,
+            'posting_schedule': 5.0,
+            'influencers': 10.0,
+            'store_campaign': 5.0,
+            'schedule_posts': 15.0,
+            'influencer_outreach': 15.0,
+            'platform_call': 8.0,  # each per-platform call inside a fanned-out stage
+            'trending_hashtags': 0.5  # cold-cache wait before posting with fallback hashtags
+        }
+        
+        # Trending hashtags per platform: fresh for 15 minutes, then served stale
+        # for up to an hour while a background refresh runs
+        self.hashtag_cache = AsyncTTLCache(ttl=900, stale_ttl=3600, refresh_ahead=60, max_entries=64)
+        
+        # Metrics polling budget per platform API: (requests per second, burst)
+        self.metrics_rate_limits = {
+            Platform.TIKTOK: (5.0, 20.0),
+            Platform.INSTAGRAM: (2.0, 10.0),
+            Platform.YOUTUBE_SHORTS: (3.0, 10.0),
+            Platform.TWITTER: (5.0, 15.0),
+            Platform.REDDIT: (1.0, 5.0)
+        }
+        self.metrics_scheduler = MetricsPollingScheduler(
+            self.platform_apis, self.apply_post_metrics, rate_limits=self.metrics_rate_limits
+        )
+        
+        # Metric history per post for growth charts and velocity
+        self.metrics_store = PostMetricsStore([metric.value for metric in ViralMetric])
     
     async def launch_viral_campaign(self, submission: Submission, user: User, 
                                   target_platforms: List[Platform] = None) -> ViralCampaign:
@@ -134,64 +189,137 @@ class CrossPlatformViralEngine:
         
         print(f"🚀 Launching viral campaign for: {submission.title}")
         
-        # Analyze viral potential
-        viral_analysis = await self.viral_predictor.analyze_viral_potential(submission)
-        
-        # Generate platform-specific content
-        content_variations = await self.content_optimizer.create_platform_variations(
-            submission, target_platforms
-        )
-        
-        # Optimize hashtags for each platform
-        hashtag_strategy = await self.hashtag_optimizer.generate_hashtag_strategy(
-            submission, target_platforms
-        )
-        
-        # Calculate optimal posting schedule
-        posting_schedule = await self.calculate_optimal_schedule(target_platforms, viral_analysis)
-        
-        # Find relevant influencers
-        influencer_targets = await self.influencer_matcher.find_relevant_influencers(
-            submission, target_platforms
-        )
-        
-        # Create campaign
         campaign = ViralCampaign(
             id=str(uuid.uuid4()),
             submission_id=submission.id,
-            target_platforms=target_platforms,
-            content_variations=content_variations,
-            hashtag_strategy=hashtag_strategy,
-            posting_schedule=posting_schedule,
-            influencer_targets=[inf.id for inf in influencer_targets],
-            budget=self.calculate_campaign_budget(viral_analysis, target_platforms),
-            expected_reach=viral_analysis.get('expected_reach', 10000),
+            target_platforms=list(target_platforms),
+            content_variations={},
+            hashtag_strategy={},
+            posting_schedule={},
+            influencer_targets=[],
+            budget=0.0,
+            expected_reach=0,
             actual_metrics={},
             roi=0.0,
             status='active',
             created_at=datetime.now()
         )
+        platform_errors = []
+        
+        async def per_platform(stage: str, fn) -> Dict[Platform, Any]:
+            results, errors = await fan_out(target_platforms, fn, self.stage_timeouts['platform_call'])
+            platform_errors.extend(f"{stage}:{platform.value}" for platform in errors)
+            return results
+        
+        async def content_for(platform: Platform) -> str:
+            variations = await self.content_optimizer.create_platform_variations(submission, [platform])
+            return variations[platform]
         
-        # Store campaign
-        await self.store_viral_campaign(campaign)
+        async def hashtags_for(platform: Platform) -> List[str]:
+            strategy = await self.hashtag_optimizer.generate_hashtag_strategy(submission, [platform])
+            return strategy[platform]
         
-        # Schedule posts
-        await self.schedule_campaign_posts(campaign)
+        async def schedule_for(platform: Platform) -> datetime:
+            return await self.schedule_optimal_posting_time(platform)
         
-        # Initiate influencer outreach
-        await self.initiate_influencer_outreach(campaign, influencer_targets)
+        async def build_campaign(inputs: Dict[str, Any]) -> ViralCampaign:
+            viral_analysis = inputs['viral_analysis']
+            
+            # Platforms without content are dropped; missing hashtags fall back to the brand tag
+            campaign.content_variations = inputs['content_variations']
+            campaign.target_platforms = [p for p in target_platforms if p in campaign.content_variations]
+            campaign.hashtag_strategy = {p: inputs['hashtag_strategy'].get(p, ['#hotppl'])
+                                         for p in campaign.target_platforms}
+            campaign.posting_schedule = {p: t for p, t in inputs['posting_schedule'].items()
+                                         if p in campaign.content_variations}
+            campaign.influencer_targets = [inf.id for inf in inputs['influencers']]
+            campaign.budget = self.calculate_campaign_budget(viral_analysis, campaign.target_platforms)
+            campaign.expected_reach = viral_analysis.get('expected_reach', 10000)
+            
+            if not campaign.target_platforms:
+                raise RuntimeError("no platform content could be generated")
+            
+            # Store campaign
+            await self.store_viral_campaign(campaign)
+            return campaign
+        
+        def stage(name: str, run, **kwargs) -> PipelineStage:
+            return PipelineStage(name, run, timeout=self.stage_timeouts[name], **kwargs)
+        
+        pipeline = CampaignPipeline([
+            # Analyze viral potential
+            stage('viral_analysis', lambda _: self.viral_predictor.analyze_viral_potential(submission)),
+            # Platform-specific content, hashtags and posting times, fanned out per platform
+            stage('content_variations', lambda _: per_platform('content_variations', content_for)),
+            stage('hashtag_strategy', lambda _: per_platform('hashtag_strategy', hashtags_for),
+                  required=False, default={}),
+            stage('posting_schedule', lambda _: per_platform('posting_schedule', schedule_for),
+                  required=False, default={}),
+            # Find relevant influencers
+            stage('influencers', lambda _: self.influencer_matcher.find_relevant_influencers(
+                submission, target_platforms), required=False, default=[]),
+            stage('store_campaign', build_campaign,
+                  depends_on=['viral_analysis', 'content_variations', 'hashtag_strategy',
+                              'posting_schedule', 'influencers']),
+            # Schedule posts and reach out to influencers once the campaign exists
+            stage('schedule_posts', lambda _: self.schedule_campaign_posts(campaign, submission),
+                  depends_on=['store_campaign'], required=False),
+            stage('influencer_outreach', lambda inputs: self.initiate_influencer_outreach(
+                campaign, inputs['influencers']), depends_on=['store_campaign', 'influencers'],
+                  required=False)
+        ])
+        
+        try:
+            result = await pipeline.run()
+        except PipelineError as e:
+            print(f"❌ Viral campaign for {submission.title} failed: {e}")
+            raise
+        
+        campaign.stage_latencies = dict(result.latencies, total=result.total_ms)
+        campaign.failed_stages = result.failed_stages + platform_errors
+        if campaign.failed_stages:
+            print(f"⚠️ Campaign {campaign.id} launched with failed stages: {', '.join(campaign.failed_stages)}")
         
         # Log campaign launch
         analytics_service.log_event('viral_campaign_launched', {
             'campaign_id': campaign.id,
             'submission_id': submission.id,
-            'platforms': [p.value for p in target_platforms],
+            'platforms': [p.value for p in campaign.target_platforms],
             'expected_reach': campaign.expected_reach,
-            'budget': campaign.budget
+            'budget': campaign.budget,
+            'stage_latencies': campaign.stage_latencies,
+            'failed_stages': campaign.failed_stages
         })
         
         return campaign
     
+    def calculate_campaign_budget(self, viral_analysis: Dict, platforms: List[Platform]) -> float:
+        """Budget scaled by viral probability across the target platforms"""
+        return round(100.0 * len(platforms) * (0.5 + viral_analysis.get('viral_probability', 0.0)), 2)
+    
+    async def schedule_campaign_posts(self, campaign: ViralCampaign, submission: Submission) -> List[SocialPost]:
+        """Create scheduled posts for every campaign platform concurrently"""
+        posts = [
+            SocialPost(
+                id=str(uuid.uuid4()),
+                submission_id=campaign.submission_id,
+                platform=platform,
+                content=campaign.content_variations[platform],
+                media_url=submission.video_url,
+                hashtags=campaign.hashtag_strategy.get(platform, []),
+                scheduled_time=campaign.posting_schedule.get(platform),
+                posted_time=None,
+                status=PostStatus.SCHEDULED,
+                platform_post_id=None,
+                metrics={metric: 0 for metric in ViralMetric},
+                viral_score=0.0,
+                created_at=datetime.now()
+            )
+            for platform in campaign.target_platforms
+        ]
+        await asyncio.gather(*(self.store_social_post(post) for post in posts))
+        return posts
+    
     async def auto_post_to_platform(self, submission: Submission, platform: Platform, 
                                    content: str, hashtags: List[str]) -> SocialPost:
         """Automatically post content to specified platform"""
@@ -253,6 +381,18 @@ class CrossPlatformViralEngine:
         
         return social_post
     
+    async def schedule_metrics_tracking(self, social_post: SocialPost):
+        """Hand a posted SocialPost to the adaptive metrics poller"""
+        self.metrics_scheduler.add_post(social_post)
+    
+    def start_metrics_tracking(self) -> asyncio.Task:
+        """Run the metrics poller in the background of the current event loop"""
+        return asyncio.create_task(self.metrics_scheduler.run())
+    
+    def stop_metrics_tracking(self):
+        self.metrics_scheduler.stop()
+        self.metrics_store.flush()
+    
     async def track_viral_performance(self, social_post: SocialPost):
         """Track and analyze viral performance"""
         
@@ -261,88 +401,52 @@ class CrossPlatformViralEngine:
             
             # Get current metrics
             current_metrics = await platform_api.get_post_metrics(social_post.platform_post_id)
-            
-            # Update post metrics
-            for metric, value in current_metrics.items():
-                if metric in [m.value for m in ViralMetric]:
-                    social_post.metrics[ViralMetric(metric)] = value
-            
-            # Calculate viral score
-            social_post.viral_score = self.calculate_viral_score(social_post)
-            
-            # Check if post has gone viral
-            if self.is_viral(social_post):
-                social_post.status = PostStatus.VIRAL
-                await self.handle_viral_post(social_post)
-            
-            # Store updated metrics
-            await self.store_social_post(social_post)
-            
-            # Log metrics update
-            analytics_service.log_event('viral_metrics_updated', {
-                'post_id': social_post.id,
-                'platform': social_post.platform.value,
-                'viral_score': social_post.viral_score,
-                'metrics': {k.value: v for k, v in social_post.metrics.items()}
-            })
-            
+            await self.apply_post_metrics(social_post, current_metrics)
+        
         except Exception as e:
             print(f"❌ Error tracking metrics for {social_post.id}: {e}")
     
-    def calculate_viral_score(self, social_post: SocialPost) -> float:
-        """Calculate viral score based on platform-specific metrics"""
+    async def apply_post_metrics(self, social_post: SocialPost, current_metrics: Dict):
+        """Apply a metrics snapshot to a post and react if it has gone viral"""
         
-        platform = social_post.platform
-        metrics = social_post.metrics
+        # Update post metrics
+        for metric, value in current_metrics.items():
+            if metric in [m.value for m in ViralMetric]:
+                social_post.metrics[ViralMetric(metric)] = value
         
-        # Platform-specific scoring algorithms
-        if platform == Platform.TIKTOK:
-            views = metrics.get(ViralMetric.VIEWS, 0)
-            likes = metrics.get(ViralMetric.LIKES, 0)
-            shares = metrics.get(ViralMetric.SHARES, 0)
-            
-            # TikTok viral formula
-            engagement_rate = (likes + shares * 3) / max(views, 1)
-            viral_score = min(1.0, (views / 100000) * 0.6 + engagement_rate * 0.4)
-            
-        elif platform == Platform.INSTAGRAM:
-            likes = metrics.get(ViralMetric.LIKES, 0)
-            comments = metrics.get(ViralMetric.COMMENTS, 0)
-            shares = metrics.get(ViralMetric.SHARES, 0)
-            
-            # Instagram viral formula
-            engagement = likes + comments * 2 + shares * 3
-            viral_score = min(1.0, engagement / 50000)
-            
-        elif platform == Platform.YOUTUBE_SHORTS:
-            views = metrics.get(ViralMetric.VIEWS, 0)
-            likes = metrics.get(ViralMetric.LIKES, 0)
-            
-            # YouTube Shorts viral formula
-            viral_score = min(1.0, (views / 100000) * 0.7 + (likes / views) * 0.3 if views > 0 else 0)
-            
-        else:
-            # Generic viral score
-            total_engagement = sum(metrics.values())
-            viral_score = min(1.0, total_engagement / 10000)
+        # Calculate viral score
+        social_post.viral_score = self.calculate_viral_score(social_post)
         
-        return viral_score
+        # Check if post has gone viral (only react the first time)
+        if social_post.status != PostStatus.VIRAL and self.is_viral(social_post):
+            social_post.status = PostStatus.VIRAL
+            await self.handle_viral_post(social_post)
+        
+        # Store updated metrics
+        await self.store_social_post(social_post)
+        
+        # Log metrics update
+        analytics_service.log_event('viral_metrics_updated', {
+            'post_id': social_post.id,
+            'platform': social_post.platform.value,
+            'viral_score': social_post.viral_score,
+            'metrics': {k.value: v for k, v in social_post.metrics.items()}
+        })
+    
+    def calculate_viral_score(self, social_post: SocialPost) -> float:
+        """Calculate viral score based on platform-specific metrics"""
+        return self.viral_scorer.score(social_post.platform, social_post.metrics)
     
     def is_viral(self, social_post: SocialPost) -> bool:
         """Determine if a post has gone viral"""
-        
-        platform = social_post.platform
-        metrics = social_post.metrics
-        thresholds = self.viral_thresholds.get(platform, {})
-        
-        # Check if any metric exceeds viral threshold
-        for metric_name, threshold in thresholds.items():
-            metric_enum = ViralMetric(metric_name) if metric_name in [m.value for m in ViralMetric] else None
-            if metric_enum and metrics.get(metric_enum, 0) >= threshold:
-                return True
-        
-        # Also check viral score
-        return social_post.viral_score >= 0.8
+        return self.viral_scorer.is_viral(social_post.platform, social_post.metrics, social_post.viral_score)
+    
+    def score_posts(self, posts: List[SocialPost]) -> List[bool]:
+        """Re-score many posts at once; updates viral_score and returns viral flags"""
+        scores, viral = self.viral_scorer.score_posts(posts)
+        for post, score in zip(posts, scores.tolist()):
+            post.viral_score = score
+        return viral.tolist()
     
     async def handle_viral_post(self, social_post: SocialPost):
         """Handle a post that has gone viral"""
@@ -437,7 +541,12 @@ class CrossPlatformViralEngine:
         pass
     
     async def store_social_post(self, post: SocialPost):
-        """Store social post in database"""
+        """Record the post's latest metrics snapshot in its time series"""
+        if post.metrics:
+            self.metrics_store.append(post.id, post.metrics)
+    
+    async def initiate_influencer_outreach(self, campaign: ViralCampaign, influencers: List[InfluencerProfile]):
+        """Contact matched influencers about the campaign"""
         pass
     
     async def prepare_media_for_platform(self, video_url: str, platform: Platform) -> Dict:
@@ -445,26 +554,46 @@ class CrossPlatformViralEngine:
         return {'url': video_url, 'type': 'video'}
     
     async def get_trending_hashtags(self, platform: Platform) -> List[str]:
-        """Get current trending hashtags for platform"""
+        """Get current trending hashtags for platform from the cache"""
+        lookup = asyncio.ensure_future(
+            self.hashtag_cache.get(platform, lambda: self.fetch_trending_hashtags(platform))
+        )
+        try:
+            # A cold fetch keeps running and fills the cache if we stop waiting
+            return await asyncio.wait_for(asyncio.shield(lookup), self.stage_timeouts['trending_hashtags'])
+        except asyncio.TimeoutError:
+            print(f"⚠️ Trending hashtags for {platform.value} not ready, using fallback")
+            return list(FALLBACK_TRENDING_HASHTAGS)
+        except Exception as e:
+            print(f"❌ Error fetching trending hashtags for {platform.value}: {e}")
+            return list(FALLBACK_TRENDING_HASHTAGS)
+    
+    async def fetch_trending_hashtags(self, platform: Platform) -> List[str]:
+        """Fetch current trending hashtags from the platform"""
         return ['#hotppl', '#musicvideo', '#viral', '#creative']
     
+    async def warm_hashtag_cache(self, platforms: List[Platform] = None):
+        """Load trending hashtags for platforms ahead of posting"""
+        platforms = platforms or list(self.platform_apis)
+        await asyncio.gather(*(self.hashtag_cache.get(platform, lambda p=platform: self.fetch_trending_hashtags(p))
+                               for platform in platforms), return_exceptions=True)
+    
+    def get_hashtag_cache_metrics(self) -> Dict[str, Any]:
+        """Trending hashtag cache hit/miss metrics"""
+        return self.hashtag_cache.get_metrics()
+    
     async def extract_content_keywords(self, submission: Submission) -> List[str]:
         """Extract keywords from submission content"""
         return submission.scene_name.lower().split()
     
     def get_scene_hashtags(self, scene_name: str) -> List[str]:
         """Get hashtags specific to the scene"""
-        scene_hashtags = {
-            "The Arrival": ['#alien', '#arrival', '#scifi', '#ufo'],
-            "DJ Reveal": ['#dj', '#music', '#reveal', '#party'],
-            "Tracksuit Encounter": ['#tracksuit', '#fashion', '#encounter'],
-            "Siri Consultation": ['#siri', '#ai', '#consultation', '#tech'],
-            "Final Judgment": ['#judgment', '#finale', '#dramatic']
-        }
-        return scene_hashtags.get(scene_name, [])
+        return list(SCENE_HASHTAGS.get(scene_name, []))
 
 # Platform API classes (simplified implementations)
 class TikTokAPI:
+    max_batch_size = 20  # video query accepts up to 20 ids
+    
     async def create_post(self, content: str, media_data: Dict, hashtags: List[str]) -> Dict:
         # TikTok API implementation
         return {'success': True, 'post_id': f'tiktok_{uuid.uuid4().hex[:8]}'}
@@ -472,6 +601,9 @@ class TikTokAPI:
     async def get_post_metrics(self, post_id: str) -> Dict:
         # Mock metrics for demo
         return {'views': 15000, 'likes': 1200, 'shares': 89, 'comments': 156}
+    
+    async def get_post_metrics_batch(self, post_ids: List[str]) -> Dict[str, Dict]:
+        return {post_id: await self.get_post_metrics(post_id) for post_id in post_ids}
 
 class InstagramAPI:
     async def create_post(self, content: str, media_data: Dict, hashtags: List[str]) -> Dict:
@@ -481,11 +613,16 @@ class InstagramAPI:
         return {'likes': 850, 'comments': 67, 'shares': 23, 'reach': 5600}
 
 class YouTubeShortsAPI:
+    max_batch_size = 50  # videos.list accepts up to 50 ids
+    
     async def create_post(self, content: str, media_data: Dict, hashtags: List[str]) -> Dict:
         return {'success': True, 'post_id': f'yt_{uuid.uuid4().hex[:8]}'}
     
     async def get_post_metrics(self, post_id: str) -> Dict:
         return {'views': 8900, 'likes': 445, 'comments': 78, 'shares': 34}
+    
+    async def get_post_metrics_batch(self, post_ids: List[str]) -> Dict[str, Dict]:
+        return {post_id: await self.get_post_metrics(post_id) for post_id in post_ids}
 
 class TwitterAPI:
     async def create_post(self, content: str, media_data: Dict, hashtags: List[str]) -> Dict:
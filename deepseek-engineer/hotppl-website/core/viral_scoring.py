@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+HOT PPL Viral Scoring
+Table-driven viral scores and thresholds, scalar and vectorized
+"""
+
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+VIRAL_SCORE_THRESHOLD = 0.8
+
+# score = min(1, sum(linear[m] * x[m]) + sum(ratio[m] * x[m]) / max(x[ratio_over], 1))
+# and 0 when the platform requires a metric that is still zero.
+SCORING_FORMULAS = {
+    'tiktok': {
+        'linear': {'views': 0.6 / 100_000},
+        'ratio': {'likes': 0.4, 'shares': 3 * 0.4}  # engagement rate, shares weighted 3x
+    },
+    'instagram': {
+        'linear': {'likes': 1 / 50_000, 'comments': 2 / 50_000, 'shares': 3 / 50_000}
+    },
+    'youtube_shorts': {
+        'linear': {'views': 0.7 / 100_000},
+        'ratio': {'likes': 0.3},
+        'requires': 'views'
+    }
+}
+DEFAULT_FORMULA_SCALE = 1 / 10_000  # other platforms: total engagement / 10k
+
+# Formulas and per-platform thresholds are compiled into coefficient arrays
+# with one row per platform plus a final row for platforms without a formula.
+# Scoring a batch is then a row gather and a few elementwise operations over
+# an (n_posts, n_metrics) matrix; thresholds a platform does not set are
+# +inf, and names that are not metric columns (e.g. Reddit upvotes) are
+# ignored, as the per-post checks always did.
+
+class ViralScorer:
+    def __init__(self, columns: Sequence[str], thresholds: Mapping[Any, Mapping[str, float]],
+                 formulas: Mapping[str, Dict[str, Any]] = None):
+        self.columns = tuple(columns)
+        self.column_index = {name: i for i, name in enumerate(self.columns)}
+        self.thresholds = thresholds
+        self.formulas = SCORING_FORMULAS if formulas is None else formulas
+        self.compile()
+
+    def compile(self):
+        """Build coefficient arrays from the formulas and current thresholds"""
+        platforms = sorted(set(self.formulas) | {getattr(p, 'value', p) for p in self.thresholds})
+        self.platform_index = {platform: i for i, platform in enumerate(platforms)}
+        rows, width = len(platforms) + 1, len(self.columns)
+
+        self.linear = np.zeros((rows, width))
+        self.ratio = np.zeros((rows, width))
+        self.ratio_over = np.full(rows, self.column_index.get('views', 0))
+        self.required = np.full(rows, -1)
+        self.threshold_matrix = np.full((rows, width), np.inf)
+
+        for platform, i in self.platform_index.items():
+            formula = self.formulas.get(platform)
+            if formula is None:
+                self.linear[i] = DEFAULT_FORMULA_SCALE
+            else:
+                for name, weight in formula.get('linear', {}).items():
+                    self.linear[i, self.column_index[name]] = weight
+                for name, weight in formula.get('ratio', {}).items():
+                    self.ratio[i, self.column_index[name]] = weight
+                if 'ratio_over' in formula:
+                    self.ratio_over[i] = self.column_index[formula['ratio_over']]
+                if 'requires' in formula:
+                    self.required[i] = self.column_index[formula['requires']]
+        self.linear[-1] = DEFAULT_FORMULA_SCALE
+
+        for platform, limits in self.thresholds.items():
+            i = self.platform_index[getattr(platform, 'value', platform)]
+            for name, threshold in limits.items():
+                if name in self.column_index:
+                    self.threshold_matrix[i, self.column_index[name]] = threshold
+
+        # Plain-list copies for the single-post path, where NumPy overhead dominates
+        self._rows = list(zip(self.linear.tolist(), self.ratio.tolist(), self.ratio_over.tolist(),
+                              self.required.tolist(), self.threshold_matrix.tolist()))
+
+    def platform_code(self, platform: Any) -> int:
+        return self.platform_index.get(getattr(platform, 'value', platform), len(self.platform_index))
+
+    def vector(self, metrics: Mapping[Any, float]) -> List[float]:
+        """Metric dict (names or enums) as a row in column order"""
+        row = [0.0] * len(self.columns)
+        for key, value in metrics.items():
+            i = self.column_index.get(getattr(key, 'value', key))
+            if i is not None:
+                row[i] = value
+        return row
+
+    def score(self, platform: Any, metrics: Mapping[Any, float]) -> float:
+        """Viral score of one post"""
+        linear, ratio, over, required, _ = self._rows[self.platform_code(platform)]
+        x = self.vector(metrics)
+        if required >= 0 and x[required] <= 0:
+            return 0.0
+
+        linear_part = sum(w * v for w, v in zip(linear, x) if w)
+        ratio_part = sum(w * v for w, v in zip(ratio, x) if w) / max(x[over], 1)
+        return min(1.0, linear_part + ratio_part)
+
+    def is_viral(self, platform: Any, metrics: Mapping[Any, float], score: float) -> bool:
+        """Any metric at its platform threshold, or a high enough score"""
+        limits = self._rows[self.platform_code(platform)][4]
+        x = self.vector(metrics)
+        return any(v >= t for v, t in zip(x, limits)) or score >= VIRAL_SCORE_THRESHOLD
+
+    def score_batch(self, codes: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Scores and viral flags for platform codes (n,) and metric values (n, columns)"""
+        codes = np.asarray(codes, dtype=np.intp)
+        values = np.asarray(values, dtype=np.float64)
+        rows = np.arange(len(codes))
+
+        linear = np.einsum('ij,ij->i', values, self.linear[codes])
+        ratio = np.einsum('ij,ij->i', values, self.ratio[codes])
+        ratio /= np.maximum(values[rows, self.ratio_over[codes]], 1)
+        scores = np.minimum(1.0, linear + ratio)
+
+        required = self.required[codes]
+        missing = (required >= 0) & (values[rows, np.maximum(required, 0)] <= 0)
+        scores[missing] = 0.0
+
+        viral = (values >= self.threshold_matrix[codes]).any(axis=1) | (scores >= VIRAL_SCORE_THRESHOLD)
+        return scores, viral
+
+    def score_posts(self, posts: Iterable[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """Score objects with .platform and .metrics in one vectorized pass"""
+        posts = list(posts)
+        codes = [self.platform_code(post.platform) for post in posts]
+        values = [self.vector(post.metrics) for post in posts]
+        return self.score_batch(np.array(codes, dtype=np.intp),
+                                np.array(values, dtype=np.float64).reshape(len(posts), len(self.columns)))
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Test HyperLogLog active-user sketches
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from active_users import ActiveUserSketches, HyperLogLog
+
+def use_temp_database(tmp):
+    db.db_path = os.path.join(tmp, 'platform.db')
+    db.init_database()
+
+def random_activity(events, users, days, seed=1):
+    """(user_id, timestamp) pairs spread over the last days"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    user_ids = [f'user-{i}' for i in range(users)]
+    return [(rng.choice(user_ids), now - timedelta(seconds=rng.uniform(0, days * 86400))) for _ in range(events)]
+
+def exact_count(activity, since):
+    return len({user_id for user_id, when in activity if when >= since})
+
+def test_window_counts_within_error_bound():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        sketches = ActiveUserSketches(flush_interval=3600)
+        activity = random_activity(events=60000, users=30000, days=10)
+        for user_id, when in activity:
+            sketches.add(user_id, when)
+
+        now = datetime.now()
+        bound = 3 * HyperLogLog().relative_error
+        for window in (timedelta(minutes=30), timedelta(hours=1), timedelta(hours=24), timedelta(days=7),
+                       timedelta(days=9, hours=5, minutes=17)):
+            exact = exact_count(activity, now - window)
+            approx = sketches.count(now - window)
+            assert abs(approx - exact) <= bound * exact + 2, (window, exact, approx)
+    print(f"✅ Windows from 30 minutes to 9 days within {bound:.1%} of exact distinct counts")
+
+def test_repeat_activity_counted_once():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        sketches = ActiveUserSketches()
+        now = datetime.now()
+        for minutes in range(0, 600, 7):
+            for user_id in ('alice', 'bob', 'carol'):
+                sketches.add(user_id, now - timedelta(minutes=minutes))
+        sketches.add('dave', now - timedelta(days=3))
+
+        assert sketches.count(now - timedelta(hours=1)) == 3
+        assert sketches.count(now - timedelta(hours=12)) == 3
+        assert sketches.count(now - timedelta(days=4)) == 4
+        assert sketches.count(now - timedelta(days=4), now - timedelta(days=2)) == 1
+    print("✅ Users active in many minutes are counted once per window")
+
+def test_sketches_survive_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        activity = random_activity(events=5000, users=2000, days=3, seed=2)
+        sketches = ActiveUserSketches()
+        for user_id, when in activity:
+            sketches.add(user_id, when)
+        sketches.flush()
+        since = datetime.now() - timedelta(days=2)
+        before = sketches.count(since)
+
+        restarted = ActiveUserSketches()
+        after = restarted.count(since)
+        conn = sqlite3.connect(db.db_path)
+        rows = dict(conn.execute('''
+            SELECT bucket_seconds, COUNT(*) FROM active_user_sketches GROUP BY bucket_seconds
+        ''').fetchall())
+        conn.close()
+
+    assert after == before and restarted.get_metrics()['sketches'] == sum(rows.values())
+    assert rows[86400] <= 4 and rows[3600] <= 73
+    print(f"✅ Sketches persisted and reloaded ({rows[60]} minute, {rows[3600]} hour, {rows[86400]} day)")
+
+def test_backfill_from_logged_events():
+    from analytics_service import analytics_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        for i in range(40):
+            analytics_service.log_event('user_login', {}, user_id=f'user-{i % 25}')
+        live = analytics_service.active_users.count(datetime.now() - timedelta(hours=1))
+
+        conn = sqlite3.connect(db.db_path)
+        conn.execute('DELETE FROM active_user_sketches')  # as before sketches existed
+        conn.commit()
+        conn.close()
+        backfilled = ActiveUserSketches().count(datetime.now() - timedelta(hours=1))
+    assert live == backfilled == 25
+    print("✅ log_event maintains the sketches; an empty sketch table is backfilled from analytics")
+
+def benchmark_active_user_queries(events=300000, users=50000):
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        activity = random_activity(events, users, days=30, seed=3)
+        conn = sqlite3.connect(db.db_path)
+        conn.executemany('''
+            INSERT INTO analytics (id, event_type, event_data, user_id, timestamp) VALUES (?, 'page_view', '{}', ?, ?)
+        ''', [(str(uuid.uuid4()), user_id, when) for user_id, when in activity])
+        conn.commit()
+
+        sketches = ActiveUserSketches()
+        start = time.perf_counter()
+        sketches.count(datetime.now())  # first use backfills from analytics
+        backfill_ms = (time.perf_counter() - start) * 1000
+
+        now = datetime.now()
+        for label, window in (('DAU', timedelta(days=1)), ('WAU', timedelta(days=7)), ('MAU', timedelta(days=30))):
+            start = time.perf_counter()
+            exact = conn.execute('''
+                SELECT COUNT(DISTINCT user_id) FROM analytics WHERE timestamp >= ? AND user_id IS NOT NULL
+            ''', (now - window,)).fetchone()[0]
+            sql_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            for _ in range(100):
+                approx = sketches.count(now - window)
+            sketch_us = (time.perf_counter() - start) * 1e6 / 100
+            print(f"⏱️ {label}: COUNT(DISTINCT) {exact} in {sql_ms:.0f}ms; sketch {approx} "
+                  f"({(approx - exact) / exact:+.1%}) in {sketch_us:.0f}µs")
+        conn.close()
+    print(f"⏱️ Backfilled {events} events into {sketches.get_metrics()['sketches']} sketches in {backfill_ms:.0f}ms")
+
+if __name__ == "__main__":
+    print("🧪 Testing active user sketches...")
+    test_window_counts_within_error_bound()
+    test_repeat_activity_counted_once()
+    test_sketches_survive_restart()
+    test_backfill_from_logged_events()
+    benchmark_active_user_queries()
+    print("🎉 All active user sketch tests passed!")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Test the content-addressed analysis cache
+"""
+
+import os
+import sys
+import tempfile
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from analysis_cache import AnalysisCache
+
+def write_video(path, size=(160, 120), seed=0, frames=24):
+    """Write a short synthetic clip with a moving gradient"""
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 24, size)
+    rng = np.random.default_rng(seed)
+    base = rng.integers(0, 255, size=(12, 16, 3), dtype=np.uint8)
+    for i in range(frames):
+        frame = cv2.resize(np.roll(base, i // 4, axis=1), size, interpolation=cv2.INTER_CUBIC)
+        writer.write(frame)
+    writer.release()
+    return path
+
+def test_exact_and_near_duplicate_hits():
+    """Same bytes hit exactly; a resized re-encode hits the perceptual hash"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(cache_dir=os.path.join(tmp, 'cache'))
+        original = write_video(os.path.join(tmp, 'original.avi'))
+        resized = write_video(os.path.join(tmp, 'resized.avi'), size=(320, 240))
+        different = write_video(os.path.join(tmp, 'different.avi'), seed=42)
+
+        fingerprint, cached = cache.lookup(original)
+        assert cached is None
+        cache.store(fingerprint, {'visual_analysis': {'frame_count': 10},
+                                  'audio_analysis': {'tempo': np.float64(120.0)},
+                                  'technical_analysis': {'overall_score': 0.8}})
+
+        _, cached = cache.lookup(original)
+        assert cached['audio_analysis']['tempo'] == 120.0
+
+        _, cached = cache.lookup(resized)
+        assert cached is not None and cached['visual_analysis']['frame_count'] == 10
+
+        _, cached = cache.lookup(different)
+        assert cached is None
+
+        metrics = cache.get_metrics()
+        print(f"Cache metrics: {metrics}")
+        assert metrics['exact_hits'] == 1
+        assert metrics['near_duplicate_hits'] == 1
+        assert metrics['misses'] == 2
+        assert metrics['hit_rate'] == 0.5
+        print("✅ Exact and near-duplicate lookups work")
+
+def test_lru_eviction_and_persistence():
+    """Least recently used entries are evicted; survivors reload from disk"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_dir = os.path.join(tmp, 'cache')
+        cache = AnalysisCache(cache_dir=cache_dir, max_bytes=2500)
+        paths = [write_video(os.path.join(tmp, f'clip{i}.avi'), seed=i) for i in range(3)]
+        payload = {'visual_analysis': {'blob': 'x' * 1000}}
+
+        fingerprints = []
+        for path in paths[:2]:
+            fingerprint, _ = cache.lookup(path)
+            cache.store(fingerprint, payload)
+            fingerprints.append(fingerprint)
+
+        # Touch the first entry so the second becomes least recently used
+        assert cache.get(fingerprints[0].content_hash) is not None
+
+        fingerprint, _ = cache.lookup(paths[2])
+        cache.store(fingerprint, payload)
+
+        assert cache.get(fingerprints[1].content_hash) is None
+        assert cache.metrics['evictions'] == 1
+
+        reloaded = AnalysisCache(cache_dir=cache_dir, max_bytes=2500)
+        assert reloaded.get_metrics()['entries'] == 2
+        _, cached = reloaded.lookup(paths[0])
+        assert cached is not None
+        print("✅ LRU eviction and reload work")
+
+def test_resubmitted_to_another_scene():
+    """Scene accuracy is not cached, so a second scene cannot inherit the first one's score"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(cache_dir=os.path.join(tmp, 'cache'))
+        clip = write_video(os.path.join(tmp, 'clip.avi'))
+
+        # First submitted to The Arrival
+        fingerprint, cached = cache.lookup(clip)
+        assert cached is None
+        arrival = {'visual_analysis': {'scene_accuracy': 0.92, 'visual_quality': 0.7, 'frame_count': 10},
+                   'audio_analysis': {'tempo': 120.0},
+                   'technical_analysis': {'overall_score': 0.8}}
+        cache.store(fingerprint, arrival)
+        assert arrival['visual_analysis']['scene_accuracy'] == 0.92  # caller's results untouched
+
+        # Same clip re-submitted to DJ Reveal: clip-level results hit, scene must be scored again
+        _, cached = cache.lookup(clip)
+        assert cached is not None
+        assert 'scene_accuracy' not in cached['visual_analysis']
+        assert cached['visual_analysis']['visual_quality'] == 0.7
+        assert cached['technical_analysis']['overall_score'] == 0.8
+        print("✅ Re-submitting a clip to another scene reuses only clip-level results")
+
+if __name__ == "__main__":
+    print("🧪 Testing Analysis Cache...")
+    test_exact_and_near_duplicate_hits()
+    test_lru_eviction_and_persistence()
+    test_resubmitted_to_another_scene()
+    print("\n🎉 All analysis cache tests passed!")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test streaming anomaly detection over the analytics event stream
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from anomaly_detector import StreamingAnomalyDetector
+
+START = 1_800_000_000.0  # bucket-aligned for every default metric
+
+def feed(detector, event_type, per_second, seconds, start, data=None, other=0):
+    """Evenly spaced events of one type (plus other page views) over a time range"""
+    events = [(event_type, data)] * per_second + [('page_view', None)] * other
+    for second in range(seconds):
+        for event, event_data in events:
+            detector.observe(event, event_data, now=start + second + 0.5)
+    return start + seconds
+
+def test_spike_alert_is_deduplicated():
+    detector = StreamingAnomalyDetector(warmup_buckets=10)
+    received = []
+    detector.subscribe(received.append)
+
+    t = feed(detector, 'vote_cast', 2, 300, START)  # 120 votes/minute baseline
+    assert detector.get_metrics()['alerts_raised'] == 0
+    t = feed(detector, 'vote_cast', 20, 30, t)  # brigading: 1200 votes/minute
+    detector.tick(t)
+
+    alerts = detector.active_alerts()
+    assert len(received) == 1 and len(alerts) == 1
+    alert = alerts[0]
+    assert alert['metric'] == 'votes_per_minute' and alert['type'] == 'danger'
+    assert alert['occurrences'] >= 2 and alert['value'] == 1200 and abs(alert['baseline'] - 120) < 1
+    assert detector.get_metrics()['alerts_deduplicated'] == alert['occurrences'] - 1
+    assert received[0].raised_at == t - 20  # raised when the first spiking bucket closed
+
+    t = feed(detector, 'vote_cast', 2, 30, t)
+    detector.tick(t)
+    assert detector.active_alerts() == [] and received[0].resolved
+    print(f"✅ Vote spike raised one alert ({alert['occurrences']} occurrences) and resolved when votes normalised")
+
+def test_stalled_stream_detected_by_tick():
+    detector = StreamingAnomalyDetector(warmup_buckets=10)
+    t = feed(detector, 'submission_created', 1, 1800, START)  # 3600/hour, one per second
+
+    # Nothing arrives after the stall: only the background tick can notice
+    detector.tick(t + 61)
+    alerts = detector.active_alerts()
+    assert [a['metric'] for a in alerts] == ['submissions_per_hour'] and alerts[0]['value'] == 0
+    assert 'drop' in alerts[0]['message']
+    print("✅ Submission stall raised a drop alert on the first tick after the bucket closed")
+
+def test_error_rate_and_latency_only_alert_upwards():
+    detector = StreamingAnomalyDetector(warmup_buckets=10)
+    rng = random.Random(1)
+    t = START
+    for second in range(600):
+        detector.observe('page_view', now=t + second)
+        detector.observe('error_occurred' if rng.random() < 0.02 else 'api_call', now=t + second + 0.1)
+        detector.observe('sync_event_processed', {'latency_ms': 40 + rng.random() * 10}, now=t + second + 0.2)
+    t += 600
+
+    # Fewer errors and faster syncs are not incidents
+    t = feed(detector, 'sync_event_processed', 2, 60, t, data={'latency_ms': 1.0}, other=2)
+    detector.tick(t + 10)
+    assert detector.active_alerts() == []
+
+    t += 10
+    for second in range(20):  # an incident: a third of requests fail and syncs slow down
+        detector.observe('page_view', now=t + second)
+        detector.observe('error_occurred', now=t + second + 0.1)
+        detector.observe('sync_event_processed', {'latency_ms': 900}, now=t + second + 0.2)
+    detector.tick(t + 20)
+    metrics = {alert['metric'] for alert in detector.active_alerts()}
+    assert metrics == {'error_rate', 'sync_latency_ms'}
+    print("✅ Error-rate and sync-latency spikes alert; drops in either do not")
+
+def test_new_alerts_are_rate_limited():
+    detector = StreamingAnomalyDetector(warmup_buckets=10, max_alerts_per_minute=1)
+    t = START
+    for second in range(600):
+        detector.observe('vote_cast', now=t + second)
+        detector.observe('sync_event_processed', {'latency_ms': 50}, now=t + second + 0.5)
+    t += 600
+    for second in range(20):
+        for _ in range(30):
+            detector.observe('vote_cast', now=t + second)
+        detector.observe('sync_event_processed', {'latency_ms': 5000}, now=t + second + 0.5)
+    detector.tick(t + 20)
+
+    metrics = detector.get_metrics()
+    assert metrics['alerts_raised'] == 1 and metrics['alerts_rate_limited'] >= 1
+    print(f"✅ Alert storm capped: 1 alert raised, {metrics['alerts_rate_limited']} rate limited")
+
+def test_analytics_events_feed_detector():
+    from analytics_service import analytics_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        before = analytics_service.anomaly_detector.get_metrics()['events_observed']
+        analytics_service.log_event('vote_cast', {'vote_type': 'fire'})
+        analytics_service.log_event('sync_event_processed', {'latency_ms': 12.5})
+
+    detector = analytics_service.anomaly_detector
+    assert detector.get_metrics()['events_observed'] == before + 2
+    assert set(detector.states) == {'submissions_per_hour', 'votes_per_minute', 'error_rate', 'sync_latency_ms'}
+    print("✅ log_event feeds every event to the streaming detector")
+
+def benchmark_observe(events=200_000):
+    detector = StreamingAnomalyDetector()
+    rng = random.Random(2)
+    types = ['vote_cast'] * 6 + ['page_view'] * 3 + ['submission_created', 'error_occurred']
+    stream = [(rng.choice(types), START + i * 0.01) for i in range(events)]
+
+    start = time.perf_counter()
+    for event_type, now in stream:
+        detector.observe(event_type, None, now)
+    elapsed = time.perf_counter() - start
+
+    state_bytes = sum(sys.getsizeof(state) for state in detector.states.values())
+    print(f"⏱️ Observed {events} events in {elapsed * 1000:.0f}ms ({elapsed / events * 1e6:.1f}µs each); "
+          f"state {len(detector.states)} metrics, {state_bytes} bytes regardless of stream length")
+
+if __name__ == "__main__":
+    print("🧪 Testing streaming anomaly detection...")
+    test_spike_alert_is_deduplicated()
+    test_stalled_stream_detected_by_tick()
+    test_error_rate_and_latency_only_alert_upwards()
+    test_new_alerts_are_rate_limited()
+    test_analytics_events_feed_detector()
+    benchmark_observe()
+    print("🎉 All anomaly detection tests passed!")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test the concurrent viral campaign launch pipeline
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from campaign_pipeline import CampaignPipeline, PipelineError, PipelineStage, fan_out
+from viral_engine import CrossPlatformViralEngine, Platform
+
+def sleeper(seconds, value=None):
+    async def run(inputs):
+        await asyncio.sleep(seconds)
+        return value if value is not None else inputs
+    return run
+
+def failing(inputs):
+    async def run():
+        raise RuntimeError("boom")
+    return run()
+
+def test_independent_stages_overlap():
+    pipeline = CampaignPipeline([
+        PipelineStage('a', sleeper(0.1, 'a')),
+        PipelineStage('b', sleeper(0.1, 'b')),
+        PipelineStage('c', sleeper(0.1, 'c')),
+        PipelineStage('join', sleeper(0.05), depends_on=['a', 'b', 'c'])
+    ])
+    result = asyncio.run(pipeline.run())
+
+    assert result.results['join'] == {'a': 'a', 'b': 'b', 'c': 'c'}
+    assert result.total_ms < 250, result.total_ms
+    assert all(result.latencies[name] >= 95 for name in 'abc')
+    assert result.failed_stages == []
+    print(f"✅ Independent stages overlapped ({result.total_ms:.0f}ms for 350ms of sequential work)")
+
+def test_timeouts_and_partial_failure():
+    pipeline = CampaignPipeline([
+        PipelineStage('slow', sleeper(1.0), timeout=0.05, required=False, default='fallback'),
+        PipelineStage('broken', failing, required=False, default=[]),
+        PipelineStage('after', sleeper(0, None), depends_on=['slow', 'broken'])
+    ])
+    result = asyncio.run(pipeline.run())
+
+    assert result.statuses == {'slow': 'timeout', 'broken': 'failed', 'after': 'ok'}
+    assert result.results['after'] == {'slow': 'fallback', 'broken': []}
+    assert result.latencies['slow'] < 200
+    print("✅ Optional stages fall back to defaults on timeout or error")
+
+def test_required_failure_skips_dependents():
+    pipeline = CampaignPipeline([
+        PipelineStage('broken', failing),
+        PipelineStage('child', sleeper(0), depends_on=['broken']),
+        PipelineStage('sibling', sleeper(0.01, 'ran'))
+    ])
+    try:
+        asyncio.run(pipeline.run())
+        assert False, "expected PipelineError"
+    except PipelineError as e:
+        assert e.stage == 'broken'
+        assert e.result.statuses == {'broken': 'failed', 'child': 'skipped', 'sibling': 'ok'}
+
+    try:
+        CampaignPipeline([PipelineStage('x', sleeper(0), depends_on=['y']),
+                          PipelineStage('y', sleeper(0), depends_on=['x'])])
+        assert False, "expected cycle error"
+    except ValueError:
+        pass
+    print("✅ Required failures skip dependents and cycles are rejected")
+
+def test_fan_out_collects_errors():
+    async def call(key):
+        if key == 'bad':
+            raise ValueError('nope')
+        await asyncio.sleep(0.5 if key == 'slow' else 0)
+        return key.upper()
+
+    results, errors = asyncio.run(fan_out(['ok', 'bad', 'slow'], call, timeout=0.05))
+    assert results == {'ok': 'OK'}
+    assert set(errors) == {'bad', 'slow'}
+    print("✅ Fan-out returns per-key results and errors")
+
+def test_engine_launch_records_latencies():
+    class Submission:
+        id = 'sub-1'
+        title = 'Take'
+        scene_name = 'The Arrival'
+        video_url = 'http://x/v.mp4'
+
+    async def run():
+        engine = CrossPlatformViralEngine()
+        engine.stage_timeouts['platform_call'] = 0.1
+        original = engine.content_optimizer.create_platform_variations
+
+        async def flaky_variations(submission, platforms):
+            if platforms == [Platform.INSTAGRAM]:
+                await asyncio.sleep(1)
+            await asyncio.sleep(0.05)
+            return await original(submission, platforms)
+        engine.content_optimizer.create_platform_variations = flaky_variations
+
+        async def slow_analysis(submission):
+            await asyncio.sleep(0.05)
+            return {'expected_reach': 5000, 'viral_probability': 0.5}
+        engine.viral_predictor.analyze_viral_potential = slow_analysis
+
+        start = time.perf_counter()
+        campaign = await engine.launch_viral_campaign(Submission(), user=None)
+        return campaign, (time.perf_counter() - start) * 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        campaign, elapsed_ms = asyncio.run(run())
+
+    assert campaign.target_platforms == [Platform.TIKTOK, Platform.YOUTUBE_SHORTS]
+    assert campaign.failed_stages == ['content_variations:instagram']
+    assert set(campaign.hashtag_strategy) == {Platform.TIKTOK, Platform.YOUTUBE_SHORTS}
+    assert campaign.expected_reach == 5000 and campaign.budget == 200.0
+    for name in ('viral_analysis', 'content_variations', 'hashtag_strategy', 'posting_schedule',
+                 'influencers', 'store_campaign', 'schedule_posts', 'influencer_outreach', 'total'):
+        assert name in campaign.stage_latencies
+    # Analysis and content (each ~50ms, content capped at the 100ms platform timeout) overlap
+    assert elapsed_ms < 400, elapsed_ms
+    print(f"✅ Campaign launched in {elapsed_ms:.0f}ms with per-stage latencies and partial failure")
+
+if __name__ == "__main__":
+    print("🧪 Testing campaign pipeline...")
+    test_independent_stages_overlap()
+    test_timeouts_and_partial_failure()
+    test_required_failure_skips_dependents()
+    test_fan_out_collects_errors()
+    test_engine_launch_records_latencies()
+    print("🎉 All campaign pipeline tests passed!")
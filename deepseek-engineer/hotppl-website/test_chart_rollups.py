@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Test pre-aggregated dashboard chart rollups and conditional chart requests
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from chart_rollups import CHART_SPECS, ChartRollup
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+def use_temp_database(tmp):
+    db.db_path = os.path.join(tmp, 'platform.db')
+    db.init_database()
+
+def insert_rows(users=(), submissions=(), votes=(), revenue=(), viral=()):
+    """Insert rows by timestamp (plus revenue amount / viral platform)"""
+    conn = sqlite3.connect(db.db_path)
+    conn.executemany('''
+        INSERT INTO users (id, discord_id, username, role, created_at, last_active) VALUES (?, ?, 'u', 'earthling', ?, ?)
+    ''', [(str(uuid.uuid4()), str(uuid.uuid4()), ts, ts) for ts in users])
+    conn.executemany('''
+        INSERT INTO submissions (id, user_id, scene_name, title, video_url, status, created_at, updated_at)
+        VALUES (?, 'u', 'The Arrival', 't', 'http://x/v.mp4', 'approved', ?, ?)
+    ''', [(str(uuid.uuid4()), ts, ts) for ts in submissions])
+    conn.executemany('''
+        INSERT INTO votes (id, submission_id, user_id, vote_type, created_at) VALUES (?, ?, 'u', 'fire', ?)
+    ''', [(str(uuid.uuid4()), str(uuid.uuid4()), ts) for ts in votes])
+    conn.executemany('''
+        INSERT INTO revenue_events (id, creator_id, amount_micros, currency, occurred_at) VALUES (?, 'c', ?, 'USD', ?)
+    ''', [(str(uuid.uuid4()), micros, ts) for ts, micros in revenue])
+    conn.executemany('''
+        INSERT INTO analytics (id, event_type, event_data, timestamp) VALUES (?, 'post_went_viral', ?, ?)
+    ''', [(str(uuid.uuid4()), json.dumps({'platform': platform}), ts) for ts, platform in viral])
+    conn.commit()
+    conn.close()
+
+def test_rollup_series():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        sunday = datetime(2026, 10, 18, 21, 30)
+        insert_rows(
+            users=[NOW - timedelta(days=40), NOW - timedelta(days=9), datetime(2026, 10, 13, 8), NOW, NOW],
+            submissions=[datetime(2026, 10, 15, 1), datetime(2026, 10, 15, 23), NOW, NOW - timedelta(days=8)],
+            votes=[sunday, sunday, sunday + timedelta(hours=1), NOW - timedelta(days=8)],
+            revenue=[(sunday, 1_500_000), (sunday, 250_000), (NOW, 19_990_000)],
+            viral=[(NOW, 'tiktok'), (NOW, 'tiktok'), (sunday, 'instagram'), (NOW - timedelta(days=8), 'tiktok')]
+        )
+        charts = ChartRollup(days=7).build(NOW).charts
+
+    assert charts['user_growth'] == {'spec': 'user_growth.v1', 'start': '2026-10-13', 'values': [3, 3, 3, 3, 3, 3, 5]}
+    assert charts['submission_volume']['values'] == [0, 0, 2, 0, 0, 0, 1]
+    assert charts['revenue_growth']['values'] == [0, 0, 0, 0, 0, 1.75, 19.99]
+    heatmap = charts['engagement_heatmap']['values']
+    assert len(heatmap) == 7 and heatmap[0][21] == 2 and heatmap[0][22] == 1 and sum(map(sum, heatmap)) == 3
+    assert charts['viral_distribution'] == {'spec': 'viral_distribution.v1', 'labels': ['tiktok', 'instagram'],
+                                            'values': [2, 1]}
+    assert all(chart['spec'] in CHART_SPECS for chart in charts.values())
+    print("✅ Rollup produces zero-filled daily arrays, heatmap matrix and platform split")
+
+def test_etag_tracks_data_changes():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        insert_rows(submissions=[NOW])
+        rollup = ChartRollup(days=7)
+        first = rollup.refresh(NOW)
+        again = rollup.refresh(NOW + timedelta(minutes=15))
+        insert_rows(submissions=[NOW + timedelta(minutes=20)])
+        changed = rollup.refresh(NOW + timedelta(minutes=30))
+
+    assert again is first and again.etag == first.etag
+    assert changed.etag != first.etag and changed.charts['submission_volume']['values'][-1] == 2
+    assert json.loads(changed.body) == {'charts': changed.charts}
+    metrics = rollup.get_metrics()
+    assert metrics['rollups'] == 3 and metrics['unchanged_rollups'] == 1
+    print("✅ ETag unchanged until the rolled-up data changes")
+
+def test_conditional_get():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        insert_rows(submissions=[datetime.now()])
+        import api_gateway
+        api_gateway.chart_rollup = ChartRollup()
+        client = api_gateway.app.test_client()
+
+        first = client.get('/api/analytics/charts')
+        etag = first.headers['ETag']
+        assert first.status_code == 200 and first.get_json()['charts']['submission_volume']['values'][-1] == 1
+
+        cached = client.get('/api/analytics/charts', headers={'If-None-Match': etag})
+        assert cached.status_code == 304 and cached.data == b''
+
+        insert_rows(submissions=[datetime.now()])
+        api_gateway.chart_rollup.refresh()
+        updated = client.get('/api/analytics/charts', headers={'If-None-Match': etag})
+        assert updated.status_code == 200 and updated.headers['ETag'] != etag
+
+        specs = client.get('/api/analytics/chart-specs')
+        assert specs.get_json() == CHART_SPECS and 'max-age' in specs.headers['Cache-Control']
+    print("✅ Charts endpoint answers If-None-Match with 304 until data changes")
+
+def benchmark_chart_payloads(days=30, rows=20000):
+    import plotly.express as px
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        rng = random.Random(3)
+        stamps = [NOW - timedelta(minutes=rng.randint(0, days * 24 * 60 - 1)) for _ in range(rows)]
+        insert_rows(users=stamps[:rows // 10], submissions=stamps[:rows // 4], votes=stamps,
+                    revenue=[(ts, rng.randint(1, 5_000_000)) for ts in stamps[:rows // 4]],
+                    viral=[(ts, rng.choice(['tiktok', 'instagram', 'youtube_shorts'])) for ts in stamps[:200]])
+        rollup = ChartRollup(days=days)
+        payload = rollup.build(NOW)
+
+        # The old path: full figures built and serialized on every request
+        charts = payload.charts
+        dates = [(NOW - timedelta(days=days - 1 - i)).strftime('%Y-%m-%d') for i in range(days)]
+
+        def render_figures():
+            figures = {
+                'user_growth': px.line({'date': dates, 'users': charts['user_growth']['values']},
+                                       x='date', y='users', title='User Growth'),
+                'submission_volume': px.bar({'date': dates, 'submissions': charts['submission_volume']['values']},
+                                            x='date', y='submissions', title='Daily Submissions'),
+                'revenue_growth': px.line({'date': dates, 'revenue': charts['revenue_growth']['values']},
+                                          x='date', y='revenue', title='Revenue Growth'),
+                'engagement_heatmap': px.imshow(charts['engagement_heatmap']['values'], title='Engagement Heatmap'),
+                'viral_distribution': px.pie({'platform': charts['viral_distribution']['labels'],
+                                              'count': charts['viral_distribution']['values']},
+                                             values='count', names='platform', title='Viral Content by Platform')
+            }
+            return json.dumps({name: fig.to_json() for name, fig in figures.items()}).encode()
+
+        render_figures()  # first render loads plotly templates
+        start = time.perf_counter()
+        figure_body = render_figures()
+        figure_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for _ in range(20):
+            rollup.build(NOW)
+        rollup_ms = (time.perf_counter() - start) * 1000 / 20
+
+    print(f"⏱️ Figure JSON {len(figure_body) / 1024:.1f}KB in {figure_ms:.0f}ms (render only) vs "
+          f"rollup {len(payload.body) / 1024:.1f}KB in {rollup_ms:.1f}ms (queries included); "
+          f"304 revalidation sends 0 bytes")
+
+if __name__ == "__main__":
+    print("🧪 Testing chart rollups...")
+    test_rollup_series()
+    test_etag_tracks_data_changes()
+    test_conditional_get()
+    benchmark_chart_payloads()
+    print("🎉 All chart rollup tests passed!")
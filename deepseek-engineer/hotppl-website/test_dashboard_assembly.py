@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Test concurrent executive dashboard assembly with per-section fallbacks
+"""
+
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from analytics_service import analytics_service
+from chart_rollups import CHART_IDS
+from enterprise_analytics import (ContentAnalytics, CreatorInsights, EnterpriseAnalyticsSuite,
+                                  PlatformMetrics, RevenueMetrics)
+
+SECTION_BUILDERS = {
+    'platform_overview': 'get_platform_metrics',
+    'creator_insights': 'get_creator_insights',
+    'content_analytics': 'get_content_analytics',
+    'revenue_metrics': 'get_revenue_metrics',
+    'viral_analytics': 'get_viral_analytics',
+    'predictive_insights': 'get_predictive_insights',
+    'charts': 'generate_dashboard_charts',
+    'recommendations': 'generate_strategic_recommendations',
+    'alerts': 'generate_alerts'
+}
+
+SECTION_VALUES = {
+    'platform_overview': lambda: PlatformMetrics(1250, 89, 400, 456, 23, 3420, 156, 0.67, 0.73, 0.12),
+    'creator_insights': lambda: CreatorInsights([], [], 0.8, 120.0, 4.5, 0.6),
+    'content_analytics': lambda: ContentAnalytics([], [], {}, [], 3.2, 0.75),
+    'revenue_metrics': lambda: RevenueMetrics(15420.5, 234.75, 12.3, 4000.0, 11420.5, 0.05),
+    'viral_analytics': lambda: {'viral_posts_24h': 2},
+    'predictive_insights': lambda: {'user_growth_7d': 40},
+    'charts': lambda: {'user_growth': '{"data": []}'},
+    'recommendations': lambda: [{'category': 'User Engagement'}],
+    'alerts': lambda: []
+}
+
+def suite_with_sections(delay=0.1, overrides=None):
+    """Suite whose sections each take `delay` seconds unless overridden"""
+    suite = EnterpriseAnalyticsSuite()
+    overrides = overrides or {}
+
+    def section(name):
+        async def build():
+            if name in overrides:
+                return await overrides[name]()
+            await asyncio.sleep(delay)
+            return SECTION_VALUES[name]()
+        return build
+
+    for name, method in SECTION_BUILDERS.items():
+        setattr(suite, method, section(name))
+    return suite
+
+def test_sections_build_concurrently():
+    suite = suite_with_sections(delay=0.1)
+    dashboard = asyncio.run(suite.generate_executive_dashboard())
+
+    # Nine 100ms sections overlap instead of taking 900ms
+    assert dashboard['build_ms'] < 400, dashboard['build_ms']
+    assert set(dashboard['section_timings_ms']) == set(SECTION_BUILDERS)
+    assert all(ms >= 95 for ms in dashboard['section_timings_ms'].values())
+    assert set(dashboard['section_status'].values()) == {'ok'}
+    assert dashboard['platform_overview']['total_users'] == 1250
+    print(f"✅ Nine sections assembled in {dashboard['build_ms']:.0f}ms with per-section timings")
+
+def test_slow_or_failing_sections_fall_back_to_last_good():
+    state = {'slow': False, 'broken': False}
+
+    async def charts():
+        if state['slow']:
+            await asyncio.sleep(1.0)
+        return {'user_growth': '{"data": [1]}'}
+
+    async def revenue():
+        if state['broken']:
+            raise RuntimeError("revenue DB unavailable")
+        return SECTION_VALUES['revenue_metrics']()
+
+    async def run():
+        suite = suite_with_sections(delay=0.0, overrides={'charts': charts, 'revenue_metrics': revenue})
+        suite.section_timeouts['charts'] = 0.05
+        first = await suite.generate_executive_dashboard()
+
+        suite.invalidate_cache()
+        state['slow'] = state['broken'] = True
+        second = await suite.generate_executive_dashboard()
+
+        # Without any earlier value a failed section is empty rather than fatal
+        fresh = suite_with_sections(delay=0.0, overrides={'revenue_metrics': revenue})
+        third = await fresh.generate_executive_dashboard()
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert second['charts'] == first['charts']
+    assert second['revenue_metrics'] == first['revenue_metrics']
+    assert second['section_status']['charts'] == 'timeout'
+    assert second['section_status']['revenue_metrics'] == 'failed'
+    assert second['section_timings_ms']['charts'] < 200
+    assert third['revenue_metrics'] is None and third['platform_overview'] is not None
+    print("✅ Timed-out and failed sections served from their last good values")
+
+def test_platform_counts_query_on_thread_pool():
+    async def run(suite):
+        return await suite.get_platform_metrics()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        users = [db.create_user(f'discord-{i}', f'user{i}') for i in range(3)]
+        for user in users + users[:1]:
+            analytics_service.log_event('user_login', {}, user_id=user.id)
+        for i in range(5):
+            db.create_submission(users[i % 3].id, 'The Arrival', f'Take {i}', '', 'http://x/v.mp4', [])
+
+        suite = EnterpriseAnalyticsSuite()
+        metrics = asyncio.run(run(suite))
+        suite.close()
+
+    assert (metrics.total_users, metrics.active_users_24h, metrics.total_submissions,
+            metrics.submissions_24h, metrics.total_votes) == (3, 3, 5, 5, 0)
+    print("✅ Platform counts come from the database via the thread pool")
+
+def test_charts_section_serves_rollup_arrays():
+    async def run(suite):
+        return await suite.generate_dashboard_charts()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        user = db.create_user('discord-1', 'user1')
+        db.create_submission(user.id, 'The Arrival', 'Take 1', '', 'http://x/v.mp4', [])
+
+        suite = EnterpriseAnalyticsSuite()
+        charts = asyncio.run(run(suite))
+        suite.close()
+
+    assert set(charts) == set(CHART_IDS)
+    assert charts['user_growth']['values'][-1] == 1 and charts['submission_volume']['values'][-1] == 1
+    assert len(json.dumps(charts)) < 4096
+    print("✅ Charts section serves compact rollup arrays")
+
+if __name__ == "__main__":
+    print("🧪 Testing dashboard assembly...")
+    test_sections_build_concurrently()
+    test_slow_or_failing_sections_fall_back_to_last_good()
+    test_platform_counts_query_on_thread_pool()
+    test_charts_section_serves_rollup_arrays()
+    print("🎉 All dashboard assembly tests passed!")
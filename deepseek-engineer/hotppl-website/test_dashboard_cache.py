@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Test section caching for the executive dashboard
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from enterprise_analytics import (ContentAnalytics, CreatorInsights, EnterpriseAnalyticsSuite,
+                                  PlatformMetrics, RevenueMetrics)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+SECTION_VALUES = {
+    'get_platform_metrics': lambda: PlatformMetrics(1250, 89, 400, 456, 23, 3420, 156, 0.67, 0.73, 0.12),
+    'get_creator_insights': lambda: CreatorInsights([], [], 0.8, 120.0, 4.5, 0.6),
+    'get_content_analytics': lambda: ContentAnalytics([], [], {}, [], 3.2, 0.75),
+    'get_revenue_metrics': lambda: RevenueMetrics(15420.5, 234.75, 12.3, 4000.0, 11420.5, 0.05),
+    'get_viral_analytics': lambda: {'viral_posts_24h': 2},
+    'get_predictive_insights': lambda: {'user_growth_7d': 40},
+    'generate_dashboard_charts': lambda: {'user_growth': '{}'},
+    'generate_strategic_recommendations': lambda: [],
+    'generate_alerts': lambda: []
+}
+
+def instrumented_suite(delay=0.02):
+    """Suite whose section builders count calls and take a little time"""
+    suite = EnterpriseAnalyticsSuite()
+    suite.analytics_cache.clock = clock = FakeClock()
+    builds = {}
+
+    def counted(name, make_value):
+        async def build():
+            builds[name] = builds.get(name, 0) + 1
+            await asyncio.sleep(delay)
+            return make_value()
+        return build
+
+    for name, make_value in SECTION_VALUES.items():
+        setattr(suite, name, counted(name, make_value))
+    return suite, clock, builds
+
+def test_repeat_dashboards_served_from_cache():
+    async def run():
+        suite, clock, builds = instrumented_suite()
+        first = await suite.generate_executive_dashboard()
+        first_builds = dict(builds)
+
+        start = time.perf_counter()
+        second = await suite.generate_executive_dashboard()
+        cached_ms = (time.perf_counter() - start) * 1000
+        return suite, first, second, first_builds, builds, cached_ms
+
+    suite, first, second, first_builds, builds, cached_ms = asyncio.run(run())
+    assert all(count == 1 for count in first_builds.values()), first_builds
+    assert builds == first_builds
+    assert second['charts'] == first['charts'] and second['platform_overview'] == first['platform_overview']
+    metrics = suite.get_cache_metrics()
+    assert metrics['hit_rate'] == 0.5 and set(metrics['sections']) >= set(suite.section_ttls)
+    print(f"✅ Second dashboard served from cache in {cached_ms:.1f}ms (hit rate {metrics['hit_rate']:.2f})")
+
+def test_concurrent_requests_share_one_build():
+    async def run():
+        suite, clock, builds = instrumented_suite()
+        await asyncio.gather(*(suite.generate_executive_dashboard() for _ in range(20)))
+        return suite, builds
+
+    suite, builds = asyncio.run(run())
+    assert all(count == 1 for count in builds.values()), builds
+    assert suite.get_cache_metrics()['coalesced'] > 0
+    print("✅ 20 concurrent dashboard requests built each section once")
+
+def test_per_section_ttls_and_background_refresh():
+    async def run():
+        suite, clock, builds = instrumented_suite()
+        await suite.generate_executive_dashboard()
+
+        # Past the 60s sections' TTL: stale values returned, rebuilt in the background
+        clock.now = 61
+        await suite.generate_executive_dashboard()
+        await suite.analytics_cache.drain()
+        after_minute = dict(builds)
+
+        suite.invalidate_cache('charts')
+        await suite.generate_executive_dashboard()
+        return builds, after_minute
+
+    builds, after_minute = asyncio.run(run())
+    assert after_minute['get_platform_metrics'] == 2 and after_minute['generate_alerts'] == 2
+    assert after_minute['get_creator_insights'] == 1 and after_minute['generate_dashboard_charts'] == 1
+    assert after_minute['get_predictive_insights'] == 1  # models not retrained
+    assert builds['generate_dashboard_charts'] == 2
+    print("✅ Sections expire on their own TTLs and refresh without blocking")
+
+def test_lru_bound():
+    suite = EnterpriseAnalyticsSuite()
+    suite.analytics_cache.max_entries = 3
+
+    async def run():
+        for section in suite.section_ttls:
+            await suite.cached_section(section, lambda: asyncio.sleep(0))
+    asyncio.run(run())
+    assert suite.get_cache_metrics()['entries'] == 3
+    print("✅ Cache size bounded by LRU eviction")
+
+if __name__ == "__main__":
+    print("🧪 Testing dashboard cache...")
+    test_repeat_dashboards_served_from_cache()
+    test_concurrent_requests_share_one_build()
+    test_per_section_ttls_and_background_refresh()
+    test_lru_bound()
+    print("🎉 All dashboard cache tests passed!")
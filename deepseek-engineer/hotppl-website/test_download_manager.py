@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test the bounded, resumable download manager against a local HTTP server
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+from aiohttp import web
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from download_manager import DownloadManager, DownloadError
+
+VIDEO = bytes(range(256)) * 4096  # 1 MiB of fake video
+
+def parse_range(request):
+    """Start offset from a 'bytes=N-' Range header"""
+    header = request.headers.get('Range', '')
+    if header.startswith('bytes='):
+        return int(header[len('bytes='):].split('-')[0])
+    return 0
+
+async def start_server(state):
+    """Serve /video, /flaky (drops the first response halfway), /slow and /missing"""
+
+    async def video(request):
+        start = parse_range(request)
+        if start:
+            return web.Response(body=VIDEO[start:], status=206, headers={
+                'Content-Range': f'bytes {start}-{len(VIDEO) - 1}/{len(VIDEO)}'
+            })
+        return web.Response(body=VIDEO)
+
+    async def flaky(request):
+        start = parse_range(request)
+        state['ranges'].append(start)
+        if start:
+            return await video(request)
+
+        # Promise the whole file, send half, then drop the connection
+        response = web.StreamResponse(headers={'Content-Length': str(len(VIDEO))})
+        await response.prepare(request)
+        await response.write(VIDEO[:len(VIDEO) // 2])
+        request.transport.close()
+        return response
+
+    async def slow(request):
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        await asyncio.sleep(0.05)
+        state['active'] -= 1
+        return web.Response(body=b'x' * 1024)
+
+    app = web.Application()
+    app.router.add_get('/video', video)
+    app.router.add_get('/flaky', flaky)
+    app.router.add_get('/slow', slow)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f'http://127.0.0.1:{port}'
+
+def run_with_server(scenario):
+    """Run an async scenario against a fresh local server"""
+    async def run():
+        state = {'ranges': [], 'active': 0, 'peak': 0}
+        runner, base_url = await start_server(state)
+        try:
+            return await scenario(base_url, state)
+        finally:
+            await runner.cleanup()
+    return asyncio.run(run())
+
+def temp_files():
+    """Names of hotppl temp files currently on disk"""
+    return {name for name in os.listdir(tempfile.gettempdir()) if name.startswith('hotppl_')}
+
+def test_downloads_full_file():
+    async def scenario(base_url, state):
+        manager = DownloadManager(max_bytes=10 * len(VIDEO))
+        async with manager.temporary_download(f'{base_url}/video') as path:
+            with open(path, 'rb') as f:
+                assert f.read() == VIDEO
+        assert not os.path.exists(path)
+        await manager.close()
+
+    run_with_server(scenario)
+    print("✅ Full download and cleanup")
+
+def test_resumes_with_range_request():
+    async def scenario(base_url, state):
+        manager = DownloadManager(max_bytes=10 * len(VIDEO), chunk_size=64 * 1024)
+        path = await manager.download(f'{base_url}/flaky')
+        with open(path, 'rb') as f:
+            assert f.read() == VIDEO
+        manager.cleanup(path)
+        await manager.close()
+        return manager.metrics
+
+    metrics = run_with_server(scenario)
+    assert metrics['resumes'] == 1
+    print(f"✅ Interrupted download resumed: {metrics}")
+
+def test_enforces_max_bytes_and_cleans_up():
+    async def scenario(base_url, state):
+        manager = DownloadManager(max_bytes=len(VIDEO) // 2)
+        before = temp_files()
+        try:
+            await manager.download(f'{base_url}/video')
+            raise AssertionError("oversized download should fail")
+        except DownloadError:
+            pass
+        assert temp_files() == before
+        await manager.close()
+        return manager.metrics
+
+    metrics = run_with_server(scenario)
+    assert metrics['size_limit_rejections'] == 1
+    print("✅ Oversized download rejected without leaking temp files")
+
+def test_http_errors_clean_up():
+    async def scenario(base_url, state):
+        manager = DownloadManager()
+        before = temp_files()
+        try:
+            await manager.download(f'{base_url}/missing')
+            raise AssertionError("404 should fail")
+        except DownloadError:
+            pass
+        assert temp_files() == before
+        await manager.close()
+
+    run_with_server(scenario)
+    print("✅ HTTP error cleaned up")
+
+def test_per_host_concurrency_cap():
+    async def scenario(base_url, state):
+        manager = DownloadManager(per_host_limit=2)
+        paths = await asyncio.gather(*(manager.download(f'{base_url}/slow') for _ in range(6)))
+        for path in paths:
+            manager.cleanup(path)
+        await manager.close()
+        return state['peak']
+
+    peak = run_with_server(scenario)
+    assert peak <= 2
+    print(f"✅ Per-host concurrency capped (peak {peak})")
+
+if __name__ == "__main__":
+    print("🧪 Testing Download Manager...")
+    test_downloads_full_file()
+    test_resumes_with_range_request()
+    test_enforces_max_bytes_and_cleans_up()
+    test_http_errors_clean_up()
+    test_per_host_concurrency_cap()
+    print("\n🎉 All download manager tests passed!")
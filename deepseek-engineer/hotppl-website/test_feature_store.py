@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Test the incremental feature store and background model training
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import joblib
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from feature_store import CREATOR_FEATURES, SUBMISSION_FEATURES, FeatureStore
+from model_training import ModelTrainer
+
+NOW = datetime(2026, 10, 19, 12, 0)
+
+def use_temp_database(tmp):
+    db.db_path = os.path.join(tmp, 'platform.db')
+    db.init_database()
+
+def insert_users(users):
+    """users: (id, votes_received, reputation, created_at, last_active)"""
+    conn = sqlite3.connect(db.db_path)
+    conn.executemany('''
+        INSERT INTO users (id, discord_id, username, role, created_at, last_active, total_votes_received,
+                           reputation_score)
+        VALUES (?, ?, 'u', 'earthling', ?, ?, ?, ?)
+    ''', [(user_id, user_id, created, active, votes, reputation)
+          for user_id, votes, reputation, created, active in users])
+    conn.commit()
+    conn.close()
+
+def insert_submissions(submissions):
+    """submissions: (id, user_id, title, tools, votes, shares, created_at)"""
+    conn = sqlite3.connect(db.db_path)
+    conn.executemany('''
+        INSERT INTO submissions (id, user_id, scene_name, title, video_url, tools_used, status, created_at,
+                                 updated_at, vote_count, share_count)
+        VALUES (?, ?, 'The Arrival', ?, 'http://x/v.mp4', ?, 'approved', ?, ?, ?, ?)
+    ''', [(sub_id, user_id, title, json.dumps(tools), created, created, votes, shares)
+          for sub_id, user_id, title, tools, votes, shares, created in submissions])
+    conn.commit()
+    conn.close()
+
+def seed(creators, submissions, seed=1):
+    rng = random.Random(seed)
+    user_ids = [str(uuid.uuid4()) for _ in range(creators)]
+    insert_users([(user_id, rng.randint(0, 500), rng.randint(0, 50), NOW - timedelta(days=rng.randint(10, 400)),
+                   NOW - timedelta(days=rng.randint(0, 30))) for user_id in user_ids])
+    rows = []
+    for _ in range(submissions):
+        tools = rng.sample(['runway', 'pika', 'sora', 'kling', 'luma'], rng.randint(0, 4))
+        created = NOW - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+        # Engagement depends on the features so the models have something to learn
+        votes = int(len(tools) * 20 + (created.hour in (18, 19, 20, 21)) * 50 + rng.randint(0, 30))
+        rows.append((str(uuid.uuid4()), rng.choice(user_ids), 'x' * rng.randint(5, 60), tools, votes,
+                     rng.randint(0, votes // 5 + 1), created))
+    insert_submissions(rows)
+    return user_ids
+
+def touch_all():
+    """Bump every updated_at past the seeded rows, as a writer would, so an incremental refresh reads them"""
+    conn = sqlite3.connect(db.db_path)
+    conn.execute('UPDATE submissions SET updated_at = ?', (NOW + timedelta(days=1),))
+    conn.commit()
+    conn.close()
+
+def test_incremental_refresh_and_joins():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        insert_users([('alice', 120, 9, NOW - timedelta(days=100), NOW - timedelta(days=1)),
+                      ('bob', 4, 2, NOW - timedelta(days=50), NOW - timedelta(days=20))])
+        insert_submissions([('s1', 'alice', 'Arrival', ['runway', 'pika'], 10, 2, NOW - timedelta(days=3)),
+                            ('s2', 'alice', 'Reveal!', [], 1, 0, NOW - timedelta(days=2)),
+                            ('s3', 'bob', 'Hi', ['sora'], 0, 0, datetime(2026, 10, 18, 21, 30))])
+        conn = sqlite3.connect(db.db_path)
+        conn.execute('''
+            INSERT INTO revenue_events (id, creator_id, amount_micros, currency, occurred_at) VALUES
+            ('r1', 'alice', 1500000, 'USD', ?), ('r2', 'alice', 250000, 'USD', ?)
+        ''', (NOW, NOW))
+        conn.commit()
+        conn.close()
+
+        store = FeatureStore()
+        assert store.refresh() == {'creators': 2, 'submissions': 3, 'revenue_events': 2}
+
+        # Only the new submission, the touched one and the newly active creator are read again
+        insert_submissions([('s4', 'bob', 'Late', ['luma'], 3, 1, NOW)])
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE submissions SET vote_count = 40, updated_at = ? WHERE id = 's2'", (NOW,))
+        conn.execute("UPDATE users SET last_active = ?, reputation_score = 3 WHERE id = 'bob'", (NOW,))
+        conn.commit()
+        conn.close()
+        counts = store.refresh()
+
+        ids, features, engagement = store.submission_features(NOW)
+        creator_ids, creator_features, targets = store.creator_features(NOW)
+
+    # s2, s4 and bob, plus the rows sitting on each watermark
+    assert counts == {'submissions': 3, 'creators': 2, 'revenue_events': 0}
+    assert features.shape == (4, len(SUBMISSION_FEATURES) + len(CREATOR_FEATURES)) and features.dtype == np.float32
+    s3 = features[ids.index('s3')]
+    assert list(s3[:5]) == [2, 0, 1, 21, 0]  # title/description length, tools, hour, Sunday
+    assert engagement[ids.index('s2')] == np.float32(np.log1p(40))
+    assert engagement[ids.index('s1')] == np.float32(np.log1p(16))
+
+    alice, bob = creator_ids.index('alice'), creator_ids.index('bob')
+    by_name = dict(zip(CREATOR_FEATURES, creator_features[bob]))
+    assert by_name['reputation_score'] == 3 and by_name['submissions'] == 2
+    assert creator_features[alice, CREATOR_FEATURES.index('mean_engagement')] == np.float32(
+        (np.log1p(16) + np.log1p(40)) / 2)
+    mean_column = len(SUBMISSION_FEATURES) + CREATOR_FEATURES.index('mean_engagement')
+    assert np.array_equal(np.delete(s3[5:], mean_column - 5),
+                          np.delete(creator_features[bob], mean_column - 5))  # creator columns joined at read time
+    # A submission's creator mean excludes its own engagement, the target
+    assert np.isclose(s3[mean_column], np.log1p(6))  # bob's other submission, s4
+    assert np.isclose(features[ids.index('s2'), mean_column], np.log1p(16))  # alice's s1 only
+    assert list(targets['retention']) == [1, 1] and targets['revenue'][alice] == np.float32(1.75)
+    print("✅ Refresh reads only changed rows and joins creator features at read time")
+
+def test_vote_changes_and_deletions_reach_the_store():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        earlier = datetime.now() - timedelta(days=1)
+        insert_users([('carol', 0, 0, earlier, earlier)])
+        insert_submissions([('s1', 'carol', 'One', [], 2, 0, earlier), ('s2', 'carol', 'Two', [], 0, 0, earlier)])
+        store = FeatureStore()
+        store.refresh()
+
+        # A vote writer that only bumps the count still moves the training target
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE submissions SET vote_count = vote_count + 5, share_count = 1 WHERE id = 's1'")
+        conn.commit()
+        conn.close()
+        store.refresh()
+        ids, _, engagement = store.submission_features()
+        assert engagement[ids.index('s1')] == np.float32(np.log1p(10))
+
+        assert db.delete_submission('s2')
+        store.refresh()
+        assert 's2' in store.submission_features()[0]  # incremental reads cannot see deletes
+        store.refresh(full=True)
+        assert store.submission_features()[0] == ['s1']
+
+        # Training on an aged-out version rebuilds the store the same way
+        db.delete_submission('s1')
+        trainer = ModelTrainer(store, model_dir=os.path.join(tmp, 'models'))
+        assert trainer.expired() and asyncio.run(trainer.train(full=True)) is None
+        assert len(store.submissions) == 0
+    print("✅ Vote and share count changes are re-read; full rebuilds drop deleted submissions")
+
+def test_background_warm_started_training():
+    async def run(trainer):
+        return [await trainer.train(now=NOW) for _ in range(4)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        seed(creators=150, submissions=600)
+        trainer = ModelTrainer(FeatureStore(), model_dir=os.path.join(tmp, 'models'), initial_trees=20,
+                               trees_per_round=10, max_trees=40, n_jobs=2)
+        rounds = asyncio.run(run(trainer))
+        trainer.close()
+
+        models = trainer.load_models()
+        files = sorted(name for name in os.listdir(trainer.model_dir) if name.endswith('.joblib'))
+
+        # A fresh trainer (e.g. after a restart) picks up the persisted version
+        restarted = ModelTrainer(FeatureStore(), model_dir=trainer.model_dir)
+        ids, features, engagement = trainer.feature_store.submission_features(NOW)
+        plain = joblib.load(rounds[-1]['models']['viral']['path'])
+        restored = restarted.load_models()['viral']
+        predictions = restored.predict(features)
+
+        # Retraining is due once the data grows past the version's or the version ages out
+        restarted.feature_store.refresh()
+        unchanged_due = restarted.retrain_due()
+        seed(creators=10, submissions=70, seed=2)
+        touch_all()  # seeded rows are backdated; writers bump updated_at
+        restarted.feature_store.refresh()
+        grown_due = restarted.retrain_due()
+        aged_due = ModelTrainer(FeatureStore(), model_dir=trainer.model_dir).retrain_due(
+            datetime.now() + timedelta(days=2))
+
+    assert [r['version'] for r in rounds] == [1, 2, 3, 4]
+    assert [r['models']['viral']['trees'] for r in rounds] == [20, 30, 40, 20]  # rebuilt at max_trees
+    assert [r['models']['revenue']['warm_started'] for r in rounds] == [False, True, True, False]
+    assert files == ['retention-v3.joblib', 'retention-v4.joblib', 'revenue-v3.joblib', 'revenue-v4.joblib',
+                     'viral-v3.joblib', 'viral-v4.joblib']
+    assert set(models) == {'viral', 'retention', 'revenue'} and restarted.version == 4
+    assert np.allclose(predictions, plain.predict(features))
+    assert np.corrcoef(predictions, engagement)[0, 1] > 0.5
+    assert not unchanged_due and grown_due and aged_due
+    print("✅ Models trained in the background, warm-started, versioned, reloaded after restart and retrained when due")
+
+def test_too_little_data_skips_training():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        seed(creators=5, submissions=20)
+        trainer = ModelTrainer(FeatureStore(), model_dir=os.path.join(tmp, 'models'))
+        assert asyncio.run(trainer.train(now=NOW)) is None
+        assert trainer.version == 0 and trainer.load_models() == {}
+    print("✅ Training skipped below the minimum row count")
+
+def benchmark_training(creators=2000, submissions=20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        user_ids = seed(creators, submissions, seed=2)
+
+        store = FeatureStore()
+        start = time.perf_counter()
+        store.refresh()
+        full_refresh_ms = (time.perf_counter() - start) * 1000
+        insert_submissions([(str(uuid.uuid4()), user_ids[i], 'new', ['runway'], 5, 1, NOW + timedelta(seconds=i))
+                            for i in range(500)])
+        start = time.perf_counter()
+        store.refresh()
+        incremental_ms = (time.perf_counter() - start) * 1000
+
+        trainer = ModelTrainer(store, model_dir=os.path.join(tmp, 'models'))
+        cold = asyncio.run(trainer.train(now=NOW))
+        warm = asyncio.run(trainer.train(now=NOW))
+        trainer.close()
+
+        path = warm['models']['viral']['path']
+        start = time.perf_counter()
+        joblib.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        model = joblib.load(path, mmap_mode='r')
+        mmap_ms = (time.perf_counter() - start) * 1000
+
+        _, features, _ = store.submission_features(NOW)
+        start = time.perf_counter()
+        model.predict(features)
+        batch_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for row in features[:200]:
+            model.predict(row.reshape(1, -1))
+        single_ms = (time.perf_counter() - start) * 1000 / 200
+
+    print(f"⏱️ Features for {submissions} submissions: full refresh {full_refresh_ms:.0f}ms, "
+          f"500 new rows {incremental_ms:.1f}ms")
+    print(f"⏱️ Viral model fit: {cold['models']['viral']['trees']} trees from scratch "
+          f"{cold['models']['viral']['fit_ms']:.0f}ms, warm start +{trainer.trees_per_round} trees "
+          f"{warm['models']['viral']['fit_ms']:.0f}ms (round {trainer.get_metrics()['last_round_ms']:.0f}ms)")
+    print(f"⏱️ Model load {load_ms:.0f}ms, memory-mapped {mmap_ms:.0f}ms; predict {len(features)} rows "
+          f"{batch_ms:.0f}ms vs {single_ms:.1f}ms per single-row call")
+
+if __name__ == "__main__":
+    print("🧪 Testing feature store and model training...")
+    test_incremental_refresh_and_joins()
+    test_vote_changes_and_deletions_reach_the_store()
+    test_background_warm_started_training()
+    test_too_little_data_skips_training()
+    benchmark_training()
+    print("🎉 All feature store and model training tests passed!")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test and benchmark the vectorized frame quality module against the per-frame loop
+"""
+
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from frame_quality import stack_frames, score_frame_batch, summarize_quality, downscale_frames
+
+def make_frames(count=10, height=720, width=1280, seed=0):
+    """Synthetic frames: smooth gradients with noise so sharpness and motion are non-trivial"""
+    rng = np.random.default_rng(seed)
+    base = cv2.resize(rng.integers(0, 255, (18, 32, 3), dtype=np.uint8), (width, height))
+    noise = rng.integers(0, 20, (count, height, width, 3), dtype=np.uint8)
+    return [cv2.add(np.roll(base, i * 8, axis=1), noise[i]) for i in range(count)]
+
+def per_frame_loop(frames):
+    """The original analyze_technical_quality loop"""
+    sharpness_scores, brightness_scores = [], []
+    for frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        sharpness_scores.append(cv2.Laplacian(gray, cv2.CV_64F).var())
+        brightness_scores.append(np.mean(gray))
+    return np.mean(sharpness_scores), np.mean(brightness_scores)
+
+def per_frame_full(frames, bins=32):
+    """Every metric the batch computes, one frame and one OpenCV call at a time"""
+    results, previous = [], None
+    for frame in frames:
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        histograms = [cv2.calcHist([frame], [c], None, [bins], [0, 256]) for c in range(3)]
+        motion = cv2.absdiff(gray, previous).mean() if previous is not None else None
+        b, g, r = (frame[..., c].astype(np.float32) for c in range(3))
+        rg, yb = r - g, 0.5 * (r + g) - b
+        colorfulness = np.hypot(rg.std(), yb.std()) + 0.3 * np.hypot(rg.mean(), yb.mean())
+        results.append((cv2.Laplacian(gray, cv2.CV_64F).var(), gray.mean(), gray.std(),
+                        histograms, motion, colorfulness))
+        previous = gray
+    return results
+
+def test_parity_with_opencv():
+    frames = make_frames(count=4, height=120, width=160)
+    scores = score_frame_batch(stack_frames(frames))
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+
+    for i, frame in enumerate(frames):
+        expected_sharpness = cv2.Laplacian(grays[i], cv2.CV_64F)[1:-1, 1:-1].var()
+        assert np.isclose(scores['sharpness'][i], expected_sharpness, rtol=1e-6)
+        assert np.isclose(scores['brightness'][i], grays[i].mean())
+        assert np.isclose(scores['contrast'][i], grays[i].std())
+
+        for channel in range(3):
+            expected = np.histogram(frame[..., channel], bins=32, range=(0, 256))[0]
+            assert np.allclose(scores['histograms'][i, channel], expected / expected.sum())
+
+    expected_motion = [cv2.absdiff(grays[i + 1], grays[i]).mean() for i in range(len(frames) - 1)]
+    assert np.allclose(scores['motion'], expected_motion)
+
+    expected_colorfulness = [result[5] for result in per_frame_full(frames)]
+    assert np.allclose(scores['colorfulness'], expected_colorfulness, rtol=1e-4)
+    print("✅ Batched metrics match OpenCV per-frame results")
+
+def test_downscale_and_summary():
+    frames = stack_frames(make_frames(count=3, height=720, width=1280))
+    small = downscale_frames(frames, 480)
+    assert small.shape == (3, 240, 426, 3)
+    for i in range(3):
+        expected = cv2.resize(frames[i, :, :1278], (426, 240), interpolation=cv2.INTER_AREA)
+        assert np.array_equal(small[i], expected)
+
+    summary = summarize_quality(score_frame_batch(frames, max_side=480))
+    full = summarize_quality(score_frame_batch(frames))
+    assert summary['sharpness_score'] == full['sharpness_score']  # not rescaled by downscaling
+    for key in ('sharpness_score', 'brightness_score', 'contrast_score', 'colorfulness_score'):
+        assert 0.0 <= summary[key] <= 1.0
+    print("✅ Downscaling and summary scores")
+
+def benchmark(count=10, repeats=5):
+    frames = make_frames(count=count)
+    stacked = stack_frames(frames)
+
+    timings = {}
+    for label, runner in [
+        ('original loop (sharpness + brightness only)', lambda: per_frame_loop(frames)),
+        ('per-frame loop (all metrics)', lambda: per_frame_full(frames)),
+        ('batched, full resolution (all metrics)', lambda: score_frame_batch(stacked)),
+        ('batched, downscaled to 480 (all metrics)', lambda: score_frame_batch(stacked, max_side=480)),
+    ]:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            runner()
+        timings[label] = (time.perf_counter() - start) / repeats * 1000
+        print(f"⏱️ {label}: {timings[label]:.1f}ms for {count} frames at 1280x720")
+    return timings
+
+if __name__ == "__main__":
+    print("🧪 Testing Frame Quality Module...")
+    test_parity_with_opencv()
+    test_downscale_and_summary()
+    benchmark()
+    print("\n🎉 All frame quality tests passed!")
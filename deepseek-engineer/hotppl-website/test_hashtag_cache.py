@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Test the TTL cache behind trending hashtags
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from async_cache import AsyncTTLCache
+from viral_engine import CrossPlatformViralEngine, FALLBACK_TRENDING_HASHTAGS, Platform
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class CountingLoader:
+    def __init__(self, delay=0.0, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return f"value-{self.calls}"
+
+class Submission:
+    scene_name = 'DJ Reveal'
+    title = 'Drop'
+
+def test_ttl_hits_and_misses():
+    async def run():
+        clock = FakeClock()
+        cache = AsyncTTLCache(ttl=10, clock=clock)
+        loader = CountingLoader()
+
+        assert await cache.get('k', loader) == 'value-1'
+        clock.now = 9.9
+        assert await cache.get('k', loader) == 'value-1'
+        clock.now = 10.0
+        assert await cache.get('k', loader) == 'value-2'
+        return cache.get_metrics()
+
+    metrics = asyncio.run(run())
+    assert (metrics['hits'], metrics['misses'], metrics['loads']) == (1, 2, 2)
+    print(f"✅ Entries expire after their TTL (hit rate {metrics['hit_rate']:.2f})")
+
+def test_stale_while_revalidate():
+    async def run():
+        clock = FakeClock()
+        cache = AsyncTTLCache(ttl=10, stale_ttl=30, refresh_ahead=2, clock=clock)
+        loader = CountingLoader(delay=0.05)
+        await cache.get('k', loader)
+
+        # Inside refresh_ahead: fresh value now, reload behind the scenes
+        clock.now = 8.5
+        assert await cache.get('k', loader) == 'value-1'
+        await cache.drain()
+        assert cache.peek('k') == 'value-2'
+
+        # Past the TTL but inside the stale window: no waiting on the slow loader
+        clock.now = 20
+        start = time.perf_counter()
+        assert await cache.get('k', loader) == 'value-2'
+        assert time.perf_counter() - start < 0.01
+        await cache.drain()
+        assert cache.peek('k') == 'value-3'
+
+        # A failed background reload keeps serving the stale value
+        clock.now = 35
+        loader.fail = True
+        assert await cache.get('k', loader) == 'value-3'
+        await cache.drain()
+        assert cache.peek('k') == 'value-3'
+        return cache.get_metrics()
+
+    metrics = asyncio.run(run())
+    assert metrics['stale_hits'] == 2 and metrics['background_refreshes'] == 3
+    assert metrics['refresh_errors'] == 1
+    print("✅ Stale values served immediately while one background refresh runs")
+
+def test_single_flight():
+    async def run():
+        cache = AsyncTTLCache(ttl=60)
+        loader = CountingLoader(delay=0.05)
+        values = await asyncio.gather(*(cache.get('k', loader) for _ in range(50)))
+        assert set(values) == {'value-1'} and loader.calls == 1
+
+        failing = CountingLoader(delay=0.01, fail=True)
+        results = await asyncio.gather(*(cache.get('bad', failing) for _ in range(5)), return_exceptions=True)
+        assert all(isinstance(r, RuntimeError) for r in results) and failing.calls == 1
+        failing.fail = False
+        assert await cache.get('bad', failing) == 'value-2'  # failures are not cached
+        return cache.get_metrics()
+
+    metrics = asyncio.run(run())
+    assert metrics['coalesced'] == 53 and metrics['load_errors'] == 1
+    print("✅ Concurrent misses share one load, including failures")
+
+def test_lru_eviction():
+    async def run():
+        cache = AsyncTTLCache(ttl=60, max_entries=2)
+        for key in ('a', 'b'):
+            await cache.get(key, CountingLoader())
+        await cache.get('a', CountingLoader())  # touch a
+        await cache.get('c', CountingLoader())
+        return cache
+
+    cache = asyncio.run(run())
+    assert list(cache.entries) == ['a', 'c']
+    assert cache.get_metrics()['evictions'] == 1
+    print("✅ Least recently used entries evicted beyond max_entries")
+
+def test_engine_trending_hashtags_never_block_posting():
+    async def run():
+        engine = CrossPlatformViralEngine()
+        engine.stage_timeouts['trending_hashtags'] = 0.05
+        fetches = []
+
+        async def slow_fetch(platform):
+            fetches.append(platform)
+            await asyncio.sleep(0.2)
+            return [f'#{platform.value}_trend', '#hotppl']
+        engine.fetch_trending_hashtags = slow_fetch
+
+        # Cold cache: posting proceeds with the fallback while the fetch completes
+        start = time.perf_counter()
+        first = await engine.optimize_hashtags_realtime(Submission(), Platform.TIKTOK)
+        cold_ms = (time.perf_counter() - start) * 1000
+        assert first[:3] == FALLBACK_TRENDING_HASHTAGS
+
+        await asyncio.sleep(0.25)
+        platforms = [Platform.TIKTOK, Platform.INSTAGRAM, Platform.YOUTUBE_SHORTS]
+        await engine.warm_hashtag_cache(platforms[1:])
+
+        start = time.perf_counter()
+        mixes = await asyncio.gather(*(engine.optimize_hashtags_realtime(Submission(), platforms[i % 3])
+                                       for i in range(300)))
+        warm_ms = (time.perf_counter() - start) * 1000
+        return engine, fetches, mixes, cold_ms, warm_ms
+
+    engine, fetches, mixes, cold_ms, warm_ms = asyncio.run(run())
+    assert cold_ms < 150, cold_ms
+    assert sorted(p.value for p in fetches) == ['instagram', 'tiktok', 'youtube_shorts']
+    assert mixes[0] == ['#tiktok_trend', '#hotppl', 'dj', 'reveal', '#dj', '#music', '#hotppl']
+    metrics = engine.get_hashtag_cache_metrics()
+    assert metrics['hits'] == 300 and metrics['loads'] == 3
+    print(f"✅ Posting never waits on trending fetches (cold {cold_ms:.0f}ms, "
+          f"300 warm optimizations {warm_ms:.1f}ms, {metrics['loads']} fetches)")
+
+if __name__ == "__main__":
+    print("🧪 Testing hashtag cache...")
+    test_ttl_hits_and_misses()
+    test_stale_while_revalidate()
+    test_single_flight()
+    test_lru_eviction()
+    test_engine_trending_hashtags_never_block_posting()
+    print("🎉 All hashtag cache tests passed!")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Test the micro-batched inference layer used by the AI content processor
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from inference_batcher import InferenceBatcher
+
+def fake_pipeline(inputs):
+    """Stand-in for a transformers pipeline: fixed overhead per call"""
+    time.sleep(0.01)
+    return [{'label': 'positive', 'score': len(text) / 100} for text in inputs]
+
+def test_batches_concurrent_requests():
+    """Concurrent submissions should share one pipeline call"""
+    calls = []
+
+    def pipeline(inputs):
+        calls.append(len(inputs))
+        return fake_pipeline(inputs)
+
+    async def run():
+        batcher = InferenceBatcher('text', pipeline, max_batch_size=8, max_wait_ms=50)
+        texts = [f"submission {i}" for i in range(8)]
+        results = await asyncio.gather(*(batcher.submit(text) for text in texts))
+        metrics = batcher.get_metrics()
+        await batcher.stop()
+        return texts, results, metrics
+
+    texts, results, metrics = asyncio.run(run())
+
+    print(f"Pipeline calls: {calls}")
+    assert calls == [8]
+    assert [r['score'] for r in results] == [len(t) / 100 for t in texts]
+    assert metrics['batches'] == 1
+    assert metrics['average_batch_size'] == 8
+    print("✅ Concurrent requests batched")
+
+def test_flushes_on_max_wait():
+    """A lone request must not wait longer than max_wait_ms for company"""
+    async def run():
+        batcher = InferenceBatcher('text', fake_pipeline, max_batch_size=32, max_wait_ms=20)
+        start = time.perf_counter()
+        await batcher.submit("lonely")
+        elapsed = time.perf_counter() - start
+        metrics = batcher.get_metrics()
+        await batcher.stop()
+        return elapsed, metrics
+
+    elapsed, metrics = asyncio.run(run())
+
+    print(f"Single request latency: {elapsed * 1000:.1f}ms")
+    assert elapsed < 0.5
+    assert metrics['batch_size_distribution'] == {1: 1}
+    assert metrics['max_queue_wait_ms'] >= 15
+    print("✅ Partial batch flushed after max wait")
+
+def test_errors_reach_every_caller():
+    """A failing batch should raise in each awaiting coroutine"""
+    def broken(inputs):
+        raise RuntimeError("model exploded")
+
+    async def run():
+        batcher = InferenceBatcher('audio', broken, max_batch_size=4, max_wait_ms=10)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(3)),
+                                       return_exceptions=True)
+        metrics = batcher.get_metrics()
+        await batcher.stop()
+        return results, metrics
+
+    results, metrics = asyncio.run(run())
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert metrics['failed_batches'] == 1
+    print("✅ Batch failure routed to all callers")
+
+def benchmark_throughput():
+    """Compare one-at-a-time calls against batched calls"""
+    requests_count = 64
+
+    async def sequential():
+        for i in range(requests_count):
+            await asyncio.get_running_loop().run_in_executor(None, fake_pipeline, [f"text {i}"])
+
+    async def batched():
+        batcher = InferenceBatcher('text', fake_pipeline, max_batch_size=16, max_wait_ms=10)
+        await asyncio.gather(*(batcher.submit(f"text {i}") for i in range(requests_count)))
+        await batcher.stop()
+
+    for label, runner in [('sequential', sequential), ('batched', batched)]:
+        start = time.perf_counter()
+        asyncio.run(runner())
+        print(f"⏱️ {label}: {time.perf_counter() - start:.3f}s for {requests_count} requests")
+
+if __name__ == "__main__":
+    print("🧪 Testing Inference Batcher...")
+    test_batches_concurrent_requests()
+    test_flushes_on_max_wait()
+    test_errors_reach_every_caller()
+    benchmark_throughput()
+    print("\n🎉 All inference batcher tests passed!")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Test the durable AI processing job queue
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from job_queue import DurableJobQueue, JobLane
+
+def make_queue(tmp, **kwargs):
+    return DurableJobQueue(os.path.join(tmp, 'jobs.db'), **kwargs)
+
+def test_priority_lane_first_and_ack():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        queue.enqueue({'n': 1})
+        queue.enqueue({'n': 2}, lane=JobLane.PRIORITY)
+
+        first = queue.claim()
+        assert first.payload == {'n': 2} and first.lane == JobLane.PRIORITY
+        assert queue.claim(JobLane.PRIORITY) is None
+
+        second = queue.claim(JobLane.REGULAR)
+        assert second.payload == {'n': 1}
+
+        assert queue.ack(first.id, first.lease_id)
+        assert queue.ack(second.id, second.lease_id)
+        assert queue.get_metrics()['pending'] == 0
+        queue.close()
+    print("✅ Priority lane claimed first; acked jobs removed")
+
+def test_survives_restart_and_lease_expiry():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp, visibility_timeout=0.05)
+        queue.enqueue({'submission': 'abc'})
+        claimed = queue.claim()
+        assert claimed is not None
+        queue.close()
+
+        # Worker "crashed" holding the lease; a new process picks it up after the timeout
+        restarted = make_queue(tmp, visibility_timeout=0.05)
+        assert restarted.claim() is None
+        time.sleep(0.06)
+        reclaimed = restarted.claim()
+        assert reclaimed.id == claimed.id and reclaimed.attempts == 2
+        restarted.close()
+    print("✅ Jobs survive restarts and expired leases are reclaimed")
+
+def test_stale_lease_cannot_ack_or_nack():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp, visibility_timeout=0.05)
+        queue.enqueue({'submission': 'slow'})
+        stale = queue.claim()
+        time.sleep(0.06)
+        current = queue.claim()
+        assert current.id == stale.id and current.lease_id != stale.lease_id
+
+        # The first worker finishes late: its ack and nack must not touch the new attempt
+        assert not queue.ack(stale.id, stale.lease_id)
+        assert queue.nack(stale.id, stale.lease_id, 'late') == 'lost'
+        assert not queue.extend_lease(stale.id, stale.lease_id)
+        assert queue.get_metrics()['depth'][JobLane.REGULAR]['leased'] == 1
+
+        # The current holder keeps its lease alive past the original timeout
+        assert queue.extend_lease(current.id, current.lease_id, seconds=10)
+        time.sleep(0.06)
+        assert queue.claim() is None
+        assert queue.ack(current.id, current.lease_id)
+        assert queue.get_metrics()['pending'] == 0
+        queue.close()
+    print("✅ Only the current lease holder can ack, nack or extend a job")
+
+def test_backoff_and_dead_letter():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp, max_attempts=3, base_backoff=0.01, max_backoff=0.02)
+        job_id = queue.enqueue({'submission': 'broken'})
+
+        statuses = []
+        for _ in range(3):
+            job = None
+            deadline = time.time() + 1
+            while job is None and time.time() < deadline:
+                job = queue.claim()
+            statuses.append(queue.nack(job.id, job.lease_id, 'ffmpeg failed'))
+
+        assert statuses == ['ready', 'ready', 'dead']
+        assert queue.claim() is None
+
+        dead = queue.dead_letters()
+        assert dead[0]['id'] == job_id and dead[0]['last_error'] == 'ffmpeg failed'
+        assert queue.get_metrics()['dead_letters'] == 1
+
+        assert queue.requeue_dead(job_id)
+        assert queue.claim().id == job_id
+        queue.close()
+    print("✅ Retries back off and exhausted jobs are dead-lettered")
+
+def test_metrics_report_depth_and_age():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        queue.enqueue({'n': 1}, lane=JobLane.PRIORITY)
+        queue.enqueue_many([{'n': i} for i in range(5)])
+        time.sleep(0.02)
+        queue.claim()
+
+        metrics = queue.get_metrics()
+        assert metrics['depth'][JobLane.PRIORITY] == {'ready': 0, 'leased': 1, 'dead': 0}
+        assert metrics['depth'][JobLane.REGULAR]['ready'] == 5
+        assert metrics['pending'] == 6
+        assert metrics['oldest_job_age_seconds'] >= 0.02
+        queue.close()
+    print("✅ Depth and oldest-job age reported")
+
+def benchmark_enqueue_rate():
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = make_queue(tmp)
+        count = 5000
+
+        start = time.perf_counter()
+        for i in range(count):
+            queue.enqueue({'submission_id': f'sub-{i}', 'title': 'The Arrival'})
+        single = count / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        queue.enqueue_many([{'submission_id': f'sub-{i}'} for i in range(count)])
+        batched = count / (time.perf_counter() - start)
+
+        print(f"⏱️ enqueue: {single:,.0f} jobs/s, enqueue_many: {batched:,.0f} jobs/s")
+        queue.close()
+        return single
+
+def test_enqueue_throughput():
+    assert benchmark_enqueue_rate() > 1000
+
+if __name__ == "__main__":
+    print("🧪 Testing Durable Job Queue...")
+    test_priority_lane_first_and_ack()
+    test_survives_restart_and_lease_expiry()
+    test_stale_lease_cannot_ack_or_nack()
+    test_backoff_and_dead_letter()
+    test_metrics_report_depth_and_age()
+    test_enqueue_throughput()
+    print("\n🎉 All job queue tests passed!")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Test the adaptive metrics polling scheduler
+"""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from metrics_scheduler import MetricsPollingScheduler, TokenBucket
+from viral_engine import (CrossPlatformViralEngine, InstagramAPI, Platform, PostStatus,
+                          SocialPost, TikTokAPI)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class GrowthTikTokAPI(TikTokAPI):
+    """TikTok mock whose views follow a per-post growth curve"""
+    def __init__(self, clock, curves):
+        self.clock = clock
+        self.curves = curves
+        self.calls = []
+
+    async def get_post_metrics(self, post_id):
+        views = int(self.curves[post_id](self.clock()))
+        return {'views': views, 'likes': views // 10, 'shares': 0, 'comments': 0}
+
+    async def get_post_metrics_batch(self, post_ids):
+        self.calls.append(len(post_ids))
+        return await super().get_post_metrics_batch(post_ids)
+
+class CountingInstagramAPI(InstagramAPI):
+    """Instagram mock that records request sizes and peak concurrency"""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+
+    async def get_post_metrics(self, post_id):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.delay)
+        self.in_flight -= 1
+        return await super().get_post_metrics(post_id)
+
+def make_post(platform, post_id=None):
+    post_id = post_id or uuid.uuid4().hex[:8]
+    return SocialPost(id=post_id, submission_id='sub-1', platform=platform, content='', media_url='',
+                      hashtags=[], scheduled_time=None, posted_time=datetime.now(),
+                      status=PostStatus.POSTED, platform_post_id=f'p-{post_id}', metrics={},
+                      viral_score=0.0, created_at=datetime.now())
+
+def make_scheduler(apis, clock, on_metrics=None, **kwargs):
+    async def ignore(post, metrics):
+        pass
+    return MetricsPollingScheduler(apis, on_metrics or ignore, clock=clock, **kwargs)
+
+async def run_until(scheduler, clock, end):
+    """Advance the fake clock from due time to due time, polling as we go"""
+    while True:
+        due = scheduler.next_due()
+        if due is None or due > end:
+            break
+        clock.now = max(clock.now, due)
+        await scheduler.run_once()
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=2.0, burst=3.0)
+    assert all(bucket.try_acquire(0.0) for _ in range(3))
+    assert not bucket.try_acquire(0.0)
+    assert bucket.next_available(0.0) == 0.5
+    assert bucket.try_acquire(0.5) and not bucket.try_acquire(0.5)
+    print("✅ Token bucket refills at its rate up to the burst size")
+
+def test_adaptive_intervals():
+    clock = FakeClock()
+    curves = {'p-fast': lambda t: 1000 * 2 ** (t / 300), 'p-stale': lambda t: 5000}
+    api = GrowthTikTokAPI(clock, curves)
+    scheduler = make_scheduler({Platform.TIKTOK: api}, clock, rate_limits={Platform.TIKTOK: (100.0, 100.0)})
+    fast, stale = make_post(Platform.TIKTOK, 'fast'), make_post(Platform.TIKTOK, 'stale')
+    scheduler.add_post(fast)
+    scheduler.add_post(stale)
+
+    asyncio.run(run_until(scheduler, clock, 6 * 3600))
+
+    fast_polls = scheduler.tracked['fast'].polls
+    stale_polls = scheduler.tracked['stale'].polls
+    assert fast_polls >= 300, fast_polls
+    assert stale_polls < fast_polls / 5, (stale_polls, fast_polls)
+    # Stale posts back off, but never beyond a tenth of their age
+    assert 60 < scheduler.tracked['stale'].interval <= 0.1 * 6 * 3600
+    print(f"✅ Growing post polled {fast_polls}x, stale post {stale_polls}x over 6 hours "
+          f"(fixed 60s polling: {2 * 6 * 60} polls)")
+
+def test_rate_limit_defers_instead_of_blocking():
+    clock = FakeClock()
+    api = CountingInstagramAPI()
+    scheduler = make_scheduler({Platform.INSTAGRAM: api}, clock, rate_limits={Platform.INSTAGRAM: (2.0, 10.0)})
+    for _ in range(100):
+        scheduler.add_post(make_post(Platform.INSTAGRAM))
+
+    polled = asyncio.run(scheduler.run_once())
+    assert polled == 10 and api.calls == 10
+    assert scheduler.get_metrics()['rate_limited'] == 90
+    assert scheduler.next_due() == 0.5
+
+    # Sustained throughput never exceeds the configured rate
+    asyncio.run(run_until(scheduler, clock, 20.0))
+    assert api.calls <= 10 + 2 * 20, api.calls
+    print(f"✅ Rate budget respected: {api.calls} requests in 20s at 2 req/s with burst 10")
+
+def test_batches_where_supported():
+    clock = FakeClock()
+    tiktok = GrowthTikTokAPI(clock, {})
+    instagram = CountingInstagramAPI()
+    scheduler = make_scheduler({Platform.TIKTOK: tiktok, Platform.INSTAGRAM: instagram}, clock,
+                               default_rate=(100.0, 100.0))
+    for i in range(45):
+        post = make_post(Platform.TIKTOK)
+        tiktok.curves[post.platform_post_id] = lambda t: 100
+        scheduler.add_post(post)
+    for _ in range(5):
+        scheduler.add_post(make_post(Platform.INSTAGRAM))
+
+    assert asyncio.run(scheduler.run_once()) == 50
+    assert sorted(tiktok.calls) == [5, 20, 20]
+    assert instagram.calls == 5
+    metrics = scheduler.get_metrics()
+    assert metrics['requests'] == 8 and metrics['batched_requests'] == 3
+    print("✅ TikTok polled in batches of 20, Instagram one post per request")
+
+def test_bounded_concurrency_and_run_loop():
+    async def run():
+        api = CountingInstagramAPI(delay=0.01)
+        seen = []
+
+        async def on_metrics(post, metrics):
+            seen.append(post.id)
+
+        scheduler = MetricsPollingScheduler({Platform.INSTAGRAM: api}, on_metrics, min_interval=0.05,
+                                            max_concurrency=4, default_rate=(1000.0, 1000.0))
+        for _ in range(20):
+            scheduler.add_post(make_post(Platform.INSTAGRAM))
+
+        task = asyncio.create_task(scheduler.run())
+        await asyncio.sleep(0.2)
+        scheduler.stop()
+        await asyncio.wait_for(task, 1.0)
+        return api, seen
+
+    api, seen = asyncio.run(run())
+    assert api.peak <= 4, api.peak
+    assert len(set(seen)) == 20 and len(seen) > 20
+    print(f"✅ At most {api.peak} requests in flight; run loop polled {len(seen)} times and stopped cleanly")
+
+def test_posts_expire_after_max_age():
+    clock = FakeClock()
+    api = CountingInstagramAPI()
+    scheduler = make_scheduler({Platform.INSTAGRAM: api}, clock, max_age=3600, default_rate=(100.0, 100.0))
+    post = make_post(Platform.INSTAGRAM)
+    scheduler.add_post(post)
+
+    asyncio.run(run_until(scheduler, clock, 4 * 3600))
+    assert post.id not in scheduler.tracked
+    assert scheduler.next_due() is None
+    assert scheduler.get_metrics()['expired_posts'] == 1
+
+    removed = make_post(Platform.INSTAGRAM)
+    scheduler.add_post(removed)
+    assert scheduler.remove_post(removed.id) and not scheduler.remove_post(removed.id)
+    assert scheduler.next_due() is None
+    print("✅ Posts drop out after max_age or when removed")
+
+def test_engine_tracks_posted_content():
+    class ViralTikTokAPI(TikTokAPI):
+        async def get_post_metrics(self, post_id):
+            return {'views': 250000, 'likes': 30000, 'shares': 900, 'comments': 1200}
+
+    async def run():
+        engine = CrossPlatformViralEngine()
+        clock = FakeClock()
+        engine.metrics_scheduler.clock = clock
+        engine.platform_apis[Platform.TIKTOK] = ViralTikTokAPI()
+        viral_handled = []
+
+        async def record_viral(post):
+            viral_handled.append(post.id)
+        engine.handle_viral_post = record_viral
+
+        post = make_post(Platform.TIKTOK)
+        await engine.schedule_metrics_tracking(post)
+        await engine.metrics_scheduler.run_once()
+        clock.now = engine.metrics_scheduler.next_due()
+        await engine.metrics_scheduler.run_once()
+        return engine, post, viral_handled
+
+    engine, post, viral_handled = asyncio.run(run())
+    assert post.status == PostStatus.VIRAL
+    assert post.metrics
+    assert viral_handled == [post.id]  # handled once across both polls
+    assert engine.metrics_scheduler.get_metrics()['polls'] == 2
+    print("✅ Engine polls posted content and reacts to virality once")
+
+if __name__ == "__main__":
+    print("🧪 Testing metrics polling scheduler...")
+    test_token_bucket()
+    test_adaptive_intervals()
+    test_rate_limit_defers_instead_of_blocking()
+    test_batches_where_supported()
+    test_bounded_concurrency_and_run_loop()
+    test_posts_expire_after_max_age()
+    test_engine_tracks_posted_content()
+    print("🎉 All metrics polling scheduler tests passed!")
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Test the append-only points ledger and its materialized balances
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from creator_economy import AdvancedCreatorEconomy, PendingAward, RewardTier, RewardTransaction, RewardType
+from points_ledger import PointsLedger
+
+def use_temp_database(tmp):
+    db.db_path = os.path.join(tmp, 'platform.db')
+    db.init_database()
+
+def make_transaction(user_id, amount, reward_type=RewardType.POINTS):
+    return RewardTransaction(
+        id=str(uuid.uuid4()), user_id=user_id, reward_type=reward_type, amount=amount,
+        reason='test', submission_id=None, collaboration_id=None, metadata={},
+        created_at=datetime.now()
+    )
+
+def append(ledger, transactions):
+    conn = sqlite3.connect(db.db_path)
+    ledger.append(conn.cursor(), transactions)
+    conn.commit()
+    conn.close()
+
+def test_append_projects_balances():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        ledger = PointsLedger()
+
+        append(ledger, [make_transaction('a', 10), make_transaction('a', 5), make_transaction('b', 7)])
+        append(ledger, [make_transaction('a', 3), make_transaction('b', 99.0, RewardType.PLATFORM_REVENUE)])
+
+        assert ledger.get_balance('a')['total_points'] == 18
+        assert ledger.get_balance('b')['total_points'] == 7
+        assert ledger.get_balance('a')['last_seq'] == 5
+        assert ledger.get_balance('missing') is None
+        assert ledger.replay() == {'a': 18, 'b': 7}
+        assert ledger.replay(up_to_seq=3) == {'a': 15, 'b': 7}
+        assert ledger.verify() == {}
+    print("✅ Appends project into O(1) balances that match a replay")
+
+def test_ledger_is_append_only():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        append(PointsLedger(), [make_transaction('a', 10)])
+
+        conn = sqlite3.connect(db.db_path)
+        for statement in ('UPDATE reward_transactions SET amount = 1000', 'DELETE FROM reward_transactions'):
+            try:
+                conn.execute(statement)
+                assert False, statement
+            except sqlite3.IntegrityError as e:
+                assert 'append-only' in str(e)
+        conn.close()
+    print("✅ Ledger rejects updates and deletes")
+
+def test_verify_detects_drift_and_rebuild_repairs():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        ledger = PointsLedger()
+        append(ledger, [make_transaction('a', 10), make_transaction('b', 20)])
+
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE creator_balances SET total_points = 500 WHERE user_id = 'a'")
+        conn.execute("INSERT INTO creator_balances VALUES ('ghost', 42, 'earthling', 0, ?)", (datetime.now(),))
+        conn.commit()
+        conn.close()
+
+        assert ledger.verify() == {'a': (500, 10), 'ghost': (42, 0)}
+        assert ledger.verify('b') == {}
+
+        ledger.rebuild()
+        assert ledger.verify() == {}
+        assert ledger.get_balance('a')['total_points'] == 10
+    print("✅ Drift detected by replay and repaired by rebuild")
+
+def test_economy_reads_balance_from_ledger():
+    async def run():
+        economy = AdvancedCreatorEconomy()
+        user = db.create_user('discord-ledger', 'ledger')
+        await economy.initialize_creator_profile(user)
+        await economy.award_points_batch(user.id, [PendingAward(40, 'a'), PendingAward(35, 'b')])
+
+        profile = await economy.get_creator_profile(user.id)
+        assert profile.total_points == 100
+        assert profile.tier == RewardTier.EARTHLING
+        assert await economy.get_points_balance(user.id) == 100
+        assert economy.ledger.verify() == {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        asyncio.run(run())
+    print("✅ Creator profiles read points and tier from the materialized balance")
+
+def benchmark_replay(transactions=1_000_000, users=5_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        ledger = PointsLedger()
+
+        conn = sqlite3.connect(db.db_path)
+        now = datetime.now()
+        conn.executemany('''
+            INSERT INTO reward_transactions (id, user_id, reward_type, amount, reason, metadata, created_at)
+            VALUES (?, ?, 'points', ?, 'bench', '{}', ?)
+        ''', ((str(i), f'user-{i % users}', i % 50, now) for i in range(transactions)))
+        conn.commit()
+        conn.close()
+
+        start = time.perf_counter()
+        ledger.rebuild()
+        rebuild_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for i in range(1000):
+            ledger.get_balance(f'user-{i}')
+        read_ms = (time.perf_counter() - start) * 1000 / 1000
+
+    print(f"⏱️ Replay+rebuild of {transactions} transactions: {rebuild_ms:.0f}ms; "
+          f"balance read: {read_ms:.3f}ms avg")
+
+if __name__ == "__main__":
+    print("🧪 Testing points ledger...")
+    test_append_projects_balances()
+    test_ledger_is_append_only()
+    test_verify_detects_drift_and_rebuild_repairs()
+    test_economy_reads_balance_from_ledger()
+    benchmark_replay()
+    print("🎉 All points ledger tests passed!")
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Test the day-partitioned post metrics time-series store
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from post_metrics_store import PostMetricsStore, MS_PER_DAY, decode_block, encode_block
+from viral_engine import CrossPlatformViralEngine, Platform, PostStatus, SocialPost, ViralMetric
+
+DAY = MS_PER_DAY / 1000
+T0 = 1_790_000_000.0  # 2026-09-21 UTC
+
+def use_temp_database(tmp):
+    db.db_path = os.path.join(tmp, 'platform.db')
+    db.init_database()
+
+def random_walk(rng, samples, start=0):
+    return start + np.cumsum(rng.integers(0, 50, samples))
+
+def test_encoding_roundtrip():
+    rng = np.random.default_rng(1)
+    for block in (np.array([[T0 * 1000], [7], [0]], dtype=np.int64),
+                  np.vstack([np.arange(500) * 60_000 + 1_790_000_000_000, random_walk(rng, 500),
+                             rng.integers(-2 ** 40, 2 ** 40, 500)])):
+        dtype, data = encode_block(block)
+        assert np.array_equal(decode_block(dtype, data, *block.shape), block)
+    print("✅ Delta blocks round-trip exactly")
+
+def test_partitions_and_series():
+    rng = np.random.default_rng(2)
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        store = PostMetricsStore(flush_threshold=97)
+
+        # Three days of minute samples for two posts, flushed many times along the way
+        timestamps = T0 + np.arange(3 * 1440) * 60.0
+        views = {post: random_walk(rng, len(timestamps)) for post in ('a', 'b')}
+        for i, ts in enumerate(timestamps):
+            for post in ('a', 'b'):
+                store.append(post, {'views': views[post][i], 'likes': views[post][i] // 10}, ts)
+
+        # A late sample lands in order
+        store.append('a', {'views': 1, 'likes': 0}, T0 - 30)
+        store.flush()
+
+        ts, series = store.get_series('b')
+        assert np.array_equal(ts, timestamps)
+        assert np.array_equal(series['views'], views['b'])
+        assert np.array_equal(series['likes'], views['b'] // 10)
+        assert np.all(series['shares'] == 0)
+        assert store.get_series('a')[0][0] == T0 - 30
+
+        stats = store.get_storage_stats()
+        assert stats['partitions'] == len({int(t * 1000) // MS_PER_DAY for t in timestamps}) * 2
+        assert stats['samples'] == 2 * len(timestamps) + 1
+
+        # Range queries cover whole and partial days
+        ts, series = store.get_series('b', start=T0 + DAY, end=T0 + DAY + 3600)
+        assert len(ts) == 60 and np.array_equal(series['views'], views['b'][1440:1500])
+        assert store.drop_before(T0 + 2 * DAY) > 0
+        assert store.get_series('b')[0][0] >= T0 + DAY
+    print(f"✅ Partitioned series read back exactly at {stats['bytes_per_sample']:.1f} bytes/sample")
+
+def test_buffered_samples_and_carry_forward():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        store = PostMetricsStore(columns=['views', 'likes'])
+        store.append('p', {ViralMetric.VIEWS: 100, ViralMetric.LIKES: 5, 'unknown': 1}, T0)
+        store.flush()
+        store.append('p', {'views': 150}, T0 + 60)
+
+        # Buffered samples are visible before a flush; missing likes carry forward
+        ts, series = store.get_series('p')
+        assert list(ts) == [T0, T0 + 60]
+        assert list(series['views']) == [100, 150] and list(series['likes']) == [5, 5]
+        store.flush()
+
+        # Partitions written with older columns are realigned on read
+        wider = PostMetricsStore(columns=['views', 'shares', 'likes'])
+        _, series = wider.get_series('p')
+        assert list(series['shares']) == [0, 0] and list(series['likes']) == [5, 5]
+    print("✅ Buffered samples readable; missing metrics carried forward; columns realigned")
+
+def test_downsampling():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        store = PostMetricsStore(columns=['views'])
+        for minute in range(120):
+            store.append('p', {'views': minute * 10}, T0 - T0 % 3600 + minute * 60)
+
+        ts, series = store.downsample('p', 3600)
+        assert np.array_equal(ts - ts[0], [0, 3600])
+        assert list(series['views']) == [590, 1190]
+        _, series = store.downsample('p', 1800, how='mean')
+        assert list(series['views']) == [145.0, 445.0, 745.0, 1045.0]
+        _, series = store.downsample('p', 1800, how='max')
+        assert list(series['views']) == [290, 590, 890, 1190]
+        try:
+            store.downsample('p', 60, how='median')
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+    print("✅ Downsampling by last, mean and max per bucket")
+
+def test_velocity_and_acceleration():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        store = PostMetricsStore(columns=['views'])
+        seconds = np.arange(0, 3600, 60)
+        hour = T0 - T0 % 3600
+        for t in seconds:
+            store.append('p', {'views': 5 * t * t}, hour + t)
+
+        ts, rates = store.velocity('p', 'views')
+        assert np.allclose(rates, 5 * (seconds[1:] + seconds[:-1]))
+        _, accel = store.acceleration('p', 'views')
+        assert np.allclose(accel, 10.0)
+        _, coarse = store.velocity('p', 'views', bucket_seconds=600)
+        assert len(coarse) == 5
+    print("✅ Velocity and acceleration computed from the series")
+
+def test_fractional_metric_roundtrip():
+    rng = np.random.default_rng(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        store = PostMetricsStore(flush_threshold=50)
+        hour = T0 - T0 % 3600
+        rates = np.round(rng.uniform(0.01, 0.2, 120), 4)
+        for minute, rate in enumerate(rates):
+            store.append('p', {'views': minute * 100, 'engagement_rate': rate}, hour + minute * 60)
+        store.flush()
+
+        ts, series = store.get_series('p')
+        assert np.allclose(series['engagement_rate'], rates) and list(series['views']) == list(range(0, 12000, 100))
+        _, growth = store.velocity('p', 'engagement_rate')
+        assert np.allclose(growth, np.diff(rates) / 60)
+        _, means = store.downsample('p', 3600, how='mean', columns=['engagement_rate'])
+        assert np.allclose(means['engagement_rate'], [rates[:60].mean(), rates[60:].mean()])
+
+        # Blocks keep their scale; a store configured differently converts on read
+        coarse = PostMetricsStore(scales={'engagement_rate': 100})
+        _, series = coarse.get_series('p')
+        assert np.allclose(series['engagement_rate'], np.round(rates, 2))
+    print("✅ Fractional metrics round-trip as fixed point")
+
+def test_engine_records_metric_history():
+    async def run():
+        engine = CrossPlatformViralEngine()
+        post = SocialPost(id='post-1', submission_id='sub-1', platform=Platform.TIKTOK, content='',
+                          media_url='', hashtags=[], scheduled_time=None, posted_time=None,
+                          status=PostStatus.POSTED, platform_post_id='tt-1', metrics={},
+                          viral_score=0.0, created_at=None)
+        for views in (1000, 4000, 9000):
+            await engine.apply_post_metrics(post, {'views': views, 'likes': views // 20})
+        engine.stop_metrics_tracking()
+        return engine
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        engine = asyncio.run(run())
+        _, series = PostMetricsStore([m.value for m in ViralMetric]).get_series('post-1')
+        assert list(series['views']) == [1000, 4000, 9000]
+        assert engine.metrics_store.get_metrics()['samples_flushed'] == 3
+    print("✅ Engine keeps a metric history per post")
+
+def benchmark_store(posts=2000, samples_per_post=500):
+    rng = np.random.default_rng(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        store = PostMetricsStore(flush_threshold=200_000)
+        views = rng.integers(0, 400, (posts, samples_per_post)).cumsum(axis=1)
+
+        start = time.perf_counter()
+        for s in range(samples_per_post):
+            ts = T0 + s * 300.0
+            for p in range(posts):
+                v = int(views[p, s])
+                store.append(f'post-{p}', {'views': v, 'likes': v // 12, 'shares': v // 90,
+                                           'comments': v // 40, 'reach': v * 3}, ts)
+        store.flush()
+        write_s = time.perf_counter() - start
+
+        total = posts * samples_per_post
+        stats = store.get_storage_stats()
+        file_bytes = os.path.getsize(db.db_path)
+
+        start = time.perf_counter()
+        for p in range(100):
+            store.velocity(f'post-{p}', 'views', bucket_seconds=3600)
+        query_ms = (time.perf_counter() - start) * 1000 / 100
+
+        # Naive layout for comparison: one row per sample
+        naive_path = os.path.join(tmp, 'naive.db')
+        conn = sqlite3.connect(naive_path)
+        conn.execute('''CREATE TABLE samples (post_id TEXT, ts INTEGER, views INTEGER, likes INTEGER,
+                        shares INTEGER, comments INTEGER, engagement_rate INTEGER, reach INTEGER)''')
+        conn.execute('CREATE INDEX idx_samples_post_ts ON samples(post_id, ts)')
+        sample_posts = posts // 10
+        conn.executemany('INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                         ((f'post-{p}', int((T0 + s * 300) * 1000), int(v), int(v) // 12, int(v) // 90,
+                           int(v) // 40, 0, int(v) * 3)
+                          for p in range(sample_posts) for s, v in enumerate(views[p])))
+        conn.commit()
+        conn.close()
+        naive_bytes_per_sample = os.path.getsize(naive_path) / (sample_posts * samples_per_post)
+
+    print(f"⏱️ {total:,} samples written in {write_s:.1f}s ({total / write_s:,.0f}/s); "
+          f"{stats['bytes_per_sample']:.1f} encoded bytes/sample, {file_bytes / total:.1f} on disk "
+          f"vs {naive_bytes_per_sample:.1f} for row-per-sample; hourly velocity query {query_ms:.2f}ms")
+
+if __name__ == "__main__":
+    print("🧪 Testing post metrics store...")
+    test_encoding_roundtrip()
+    test_partitions_and_series()
+    test_buffered_samples_and_carry_forward()
+    test_downsampling()
+    test_velocity_and_acceleration()
+    test_fractional_metric_roundtrip()
+    test_engine_records_metric_history()
+    benchmark_store()
+    print("🎉 All post metrics store tests passed!")
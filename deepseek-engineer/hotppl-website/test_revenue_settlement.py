@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Test the checkpointed revenue share settlement job
+"""
+
+import asyncio
+import csv
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal, ROUND_FLOOR
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from creator_economy import AdvancedCreatorEconomy
+from revenue_settlement import RevenueSettlement, to_micros
+
+SHARES = {'earthling': 0.0, 'rising_star': 0.1, 'top_creator': 0.35, 'alien_elite': 0.7}
+PERIOD_START = datetime(2026, 9, 1)
+PERIOD_END = datetime(2026, 10, 1)
+
+def use_temp_database(tmp):
+    db.db_path = os.path.join(tmp, 'platform.db')
+    db.init_database()
+
+def set_tiers(tiers):
+    conn = sqlite3.connect(db.db_path)
+    conn.executemany('''
+        INSERT INTO creator_balances (user_id, total_points, tier, last_seq, updated_at) VALUES (?, 0, ?, 0, ?)
+    ''', [(creator_id, tier, datetime.now()) for creator_id, tier in tiers.items()])
+    conn.commit()
+    conn.close()
+
+def read_payouts(path):
+    with open(path, newline='') as f:
+        return {row['creator_id']: Decimal(row['payout']) for row in csv.DictReader(f)}
+
+def test_exact_shares_and_payout_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        set_tiers({'a': 'rising_star', 'b': 'top_creator', 'c': 'earthling'})
+        settlement = RevenueSettlement(SHARES, output_dir=tmp, chunk_size=3)
+
+        amounts = {'a': ['0.0031', '0.0031', '0.0031', '12.34'], 'b': ['0.10', '0.20', '-0.05'],
+                   'c': ['100'], 'd': ['5']}
+        when = PERIOD_START + timedelta(days=3)
+        for creator_id, values in amounts.items():
+            for value in values:
+                settlement.record_event(creator_id, Decimal(value), 'ads', when)
+        settlement.record_event('a', Decimal('999'), 'ads', PERIOD_END)  # next period
+
+        summary = settlement.run(PERIOD_START, PERIOD_END)
+
+        expected = {}
+        for creator_id, values in amounts.items():
+            tier = {'a': 'rising_star', 'b': 'top_creator'}.get(creator_id, 'earthling')
+            gross = sum(Decimal(v) for v in values)
+            payout = (gross * Decimal(str(SHARES[tier]))).quantize(Decimal('0.01'), rounding=ROUND_FLOOR)
+            if payout > 0:
+                expected[creator_id] = payout
+
+        assert read_payouts(summary['payout_file']) == expected
+        assert summary['events'] == 9 and summary['creators'] == 4
+        assert Decimal(summary['total_gross']) == Decimal('117.5993')
+        assert Decimal(summary['total_payout']) == sum(expected.values())
+    print("✅ Shares exact to the minor unit and payout file written")
+
+def test_resume_from_checkpoint():
+    class CrashAfterFirstChunk(RevenueSettlement):
+        def _aggregate(self, conn, cursor, run, period_start, period_end):
+            partial = dict(run, end_seq=run['last_seq'] + self.chunk_size)
+            super()._aggregate(conn, cursor, partial, period_start, period_end)
+            raise RuntimeError("worker died")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        set_tiers({f'c{i}': 'alien_elite' for i in range(4)})
+        when = PERIOD_START + timedelta(hours=1)
+        RevenueSettlement(SHARES).record_events(
+            (f'e{i}', f'c{i % 4}', 1_000_000, 'ads', when) for i in range(40))
+
+        try:
+            CrashAfterFirstChunk(SHARES, output_dir=tmp, chunk_size=10).run(PERIOD_START, PERIOD_END)
+            assert False, "expected crash"
+        except RuntimeError:
+            pass
+
+        settlement = RevenueSettlement(SHARES, output_dir=tmp, chunk_size=10)
+        summary = settlement.run(PERIOD_START, PERIOD_END)
+        assert settlement.get_metrics()['runs_resumed'] == 1
+        assert summary['events'] == 40
+        assert read_payouts(summary['payout_file']) == {f'c{i}': Decimal('7.00') for i in range(4)}
+
+        # A completed run is not paid twice
+        assert settlement.run(PERIOD_START, PERIOD_END) == summary
+    print("✅ Interrupted run resumed from its checkpoint without double counting")
+
+def test_monetization_system_records_and_settles():
+    async def run():
+        economy = AdvancedCreatorEconomy()
+        economy.monetization_system.settlement.output_dir = os.path.dirname(db.db_path)
+        set_tiers({'creator': 'rising_star'})
+
+        await economy.monetization_system.process_revenue_share('creator', Decimal('10.00'), 'merch')
+        now = datetime.now()
+        summary = await economy.monetization_system.settle_period(now - timedelta(hours=1),
+                                                                  now + timedelta(hours=1))
+        assert read_payouts(summary['payout_file']) == {'creator': Decimal('1.00')}
+
+        try:
+            to_micros(Decimal('0.0000001'))
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        asyncio.run(run())
+    print("✅ Monetization system records revenue and settles periods")
+
+def benchmark_settlement(events=2_000_000, creators=50_000):
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        tiers = list(SHARES)
+        set_tiers({f'creator-{i}': rng.choice(tiers) for i in range(creators)})
+
+        settlement = RevenueSettlement(SHARES, output_dir=tmp)
+        start = time.perf_counter()
+        settlement.record_events(
+            (str(i), f'creator-{rng.randrange(creators)}', rng.randrange(1, 5_000_000), 'ads',
+             PERIOD_START + timedelta(seconds=i)) for i in range(events))
+        load_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summary = settlement.run(PERIOD_START, PERIOD_END)
+        settle_s = time.perf_counter() - start
+
+    print(f"⏱️ Loaded {events} events in {load_s:.1f}s; settled {summary['events']} events for "
+          f"{summary['creators']} creators in {settle_s:.1f}s ({summary['events'] / settle_s:,.0f} events/s)")
+
+if __name__ == "__main__":
+    print("🧪 Testing revenue settlement...")
+    test_exact_shares_and_payout_file()
+    test_resume_from_checkpoint()
+    test_monetization_system_records_and_settles()
+    benchmark_settlement()
+    print("🎉 All revenue settlement tests passed!")
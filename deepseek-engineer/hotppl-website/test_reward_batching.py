@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test batched, non-recursive point awarding in the creator economy
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from creator_economy import AdvancedCreatorEconomy, PendingAward, RewardTier
+
+def use_temp_database(tmp):
+    db.db_path = os.path.join(tmp, 'platform.db')
+    db.init_database()
+
+def count_rows(table, user_id):
+    conn = sqlite3.connect(db.db_path)
+    count = conn.execute(f'SELECT COUNT(*) FROM {table} WHERE user_id = ?', (user_id,)).fetchone()[0]
+    conn.close()
+    return count
+
+async def new_creator(economy, name):
+    user = db.create_user(f'discord-{name}', name)
+    await economy.initialize_creator_profile(user)
+    return user
+
+def test_promotion_cascade_is_iterative():
+    async def run():
+        economy = AdvancedCreatorEconomy()
+
+        async def many_submissions(user_id):
+            return 100
+        economy.get_user_submission_count = many_submissions
+
+        user = await new_creator(economy, 'cascade')
+        transactions = await economy.award_points_batch(user.id, [PendingAward(9500, "Big win")])
+
+        profile = await economy.get_creator_profile(user.id)
+        # 25 + 9500 reaches Top Creator; its 500 bonus pushes past 10000 to Viral Legend
+        assert profile.tier == RewardTier.VIRAL_LEGEND
+        assert profile.badges == ['Top Creator', 'Viral Legend']
+        assert profile.monetization_enabled
+        assert profile.total_points == 25 + 9500 + 500 + 1000
+
+        reasons = [t.reason for t in transactions]
+        assert reasons[0] == "Big win" and len(reasons) == 3
+        assert count_rows('reward_transactions', user.id) == 1 + 3
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        asyncio.run(run())
+    print("✅ Promotion cascade resolved iteratively and persisted in one batch")
+
+def test_submission_rewards_single_batch():
+    async def run():
+        economy = AdvancedCreatorEconomy()
+        user = await new_creator(economy, 'submitter')
+        submission = db.create_submission(user.id, 'Neon Alley', 'Take 1', '', 'http://x/v.mp4', [])
+
+        calls = []
+        store_batch = economy.store_reward_batch
+
+        async def counting_store(profile, transactions):
+            calls.append(len(transactions))
+            await store_batch(profile, transactions)
+        economy.store_reward_batch = counting_store
+
+        await economy.process_submission_rewards(submission, {
+            'quality_score': 0.9, 'creativity_score': 0.8, 'viral_potential': 0.9
+        })
+
+        assert calls == [4]
+        profile = await economy.get_creator_profile(user.id)
+        assert profile.total_points == 25 + 10 + 45 + 24 + 500
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        asyncio.run(run())
+    print("✅ Submission rewards written as one batch")
+
+def test_vote_batch_matches_per_vote():
+    async def run():
+        economy = AdvancedCreatorEconomy()
+        user = await new_creator(economy, 'voted')
+        submission = db.create_submission(user.id, 'Neon Alley', 'Take 2', '', 'http://x/v.mp4', [])
+
+        votes = [{'submission_id': submission.id, 'new_vote_count': n} for n in range(1, 61)]
+        await economy.process_vote_rewards_batch(votes + [{'submission_id': 'missing'}])
+
+        profile = await economy.get_creator_profile(user.id)
+        # 60 votes plus the 10 and 50 vote milestones
+        expected = 25 + 60 * economy.point_values['vote_received'] + 20 + 100
+        assert profile.total_points == expected
+        assert count_rows('reward_transactions', user.id) == 1 + 60 + 2
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        asyncio.run(run())
+    print("✅ Vote batch awards votes and milestones per creator")
+
+def benchmark_vote_storm(creators=20, votes_per_creator=50):
+    async def run():
+        economy = AdvancedCreatorEconomy()
+        votes = []
+        for i in range(creators):
+            user = await new_creator(economy, f'storm-{i}')
+            submission = db.create_submission(user.id, 'Neon Alley', 'Storm', '', 'http://x/v.mp4', [])
+            votes.extend({'submission_id': submission.id, 'new_vote_count': n}
+                         for n in range(1, votes_per_creator + 1))
+
+        start = time.perf_counter()
+        for vote in votes:
+            await economy.process_vote_rewards(vote)
+        per_vote = time.perf_counter() - start
+
+        start = time.perf_counter()
+        await economy.process_vote_rewards_batch(votes)
+        batched = time.perf_counter() - start
+        return len(votes), per_vote, batched
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        total, per_vote, batched = asyncio.run(run())
+
+    print(f"⏱️ {total} votes: per-vote {per_vote * 1000:.1f}ms, batched {batched * 1000:.1f}ms "
+          f"({per_vote / batched:.1f}x)")
+
+if __name__ == "__main__":
+    print("🧪 Testing reward batching...")
+    test_promotion_cascade_is_iterative()
+    test_submission_rewards_single_batch()
+    test_vote_batch_matches_per_vote()
+    benchmark_vote_storm()
+    print("🎉 All reward batching tests passed!")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test maintained per-user and per-scene submission counters
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from creator_economy import AdvancedCreatorEconomy, RewardTier
+
+def use_temp_database(tmp):
+    db.db_path = os.path.join(tmp, 'platform.db')
+    db.init_database()
+
+def submit(user_id, scene_name):
+    return db.create_submission(user_id, scene_name, 'Take', '', 'http://x/v.mp4', [])
+
+def test_counters_follow_create_and_delete():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        user = db.create_user('discord-counter', 'counter')
+
+        first = submit(user.id, 'Neon Alley')
+        submit(user.id, 'Neon Alley')
+        submit(user.id, 'Space Port')
+
+        assert db.get_user_submission_count(user.id) == 3
+        assert db.get_scene_submission_count(user.id, 'Neon Alley') == 2
+        assert db.get_scene_submission_count(user.id, 'Space Port') == 1
+        assert db.get_user_by_discord_id('discord-counter').total_submissions == 3
+
+        assert db.delete_submission(first.id)
+        assert not db.delete_submission(first.id)
+        assert db.get_user_submission_count(user.id) == 2
+        assert db.get_scene_submission_count(user.id, 'Neon Alley') == 1
+        assert db.get_scene_submission_count(user.id, 'Unknown') == 0
+    print("✅ Counters follow submission create and delete")
+
+def test_scene_mastery_uses_counter():
+    async def run():
+        economy = AdvancedCreatorEconomy()
+        user = db.create_user('discord-master', 'master')
+        await economy.initialize_creator_profile(user)
+
+        for _ in range(5):
+            submission = submit(user.id, 'Neon Alley')
+            await economy.process_submission_rewards(submission, {})
+
+        profile = await economy.get_creator_profile(user.id)
+        assert profile.specialties == ['Neon Alley']
+        # Welcome bonus, five submissions, the 5-submission mastery award and,
+        # now that the submission count is real, the Rising Star bonus
+        assert profile.total_points == 25 + 5 * 10 + 100 + 50
+        assert profile.tier == RewardTier.RISING_STAR
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        asyncio.run(run())
+    print("✅ Scene mastery milestones read the maintained counter")
+
+def test_repair_rebuilds_counters():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        user = db.create_user('discord-repair', 'repair')
+        for scene in ('Neon Alley', 'Neon Alley', 'Space Port'):
+            submit(user.id, scene)
+
+        conn = sqlite3.connect(db.db_path)
+        conn.execute('UPDATE users SET total_submissions = 99')
+        conn.execute("UPDATE scene_submission_counts SET submission_count = 7 WHERE scene_name = 'Neon Alley'")
+        conn.execute("INSERT INTO scene_submission_counts VALUES (?, 'Ghost Town', 4)", (user.id,))
+        conn.commit()
+        conn.close()
+
+        result = db.rebuild_submission_counters()
+        assert result == {'users': 1, 'scene_counters': 2}
+        assert db.get_user_submission_count(user.id) == 3
+        assert db.get_scene_submission_count(user.id, 'Neon Alley') == 2
+        assert db.get_scene_submission_count(user.id, 'Ghost Town') == 0
+    print("✅ Repair job rebuilds counters from submissions")
+
+def test_init_backfills_counters_on_existing_database():
+    with tempfile.TemporaryDirectory() as tmp:
+        use_temp_database(tmp)
+        user = db.create_user('discord-legacy', 'legacy')
+        for scene in ('Neon Alley', 'Neon Alley', 'Space Port'):
+            submit(user.id, scene)
+
+        # A database written before the counters existed
+        conn = sqlite3.connect(db.db_path)
+        conn.execute('UPDATE users SET total_submissions = 0')
+        conn.execute('DELETE FROM scene_submission_counts')
+        conn.commit()
+        conn.close()
+
+        db.init_database()
+        assert db.get_user_submission_count(user.id) == 3
+        assert db.get_scene_submission_count(user.id, 'Neon Alley') == 2
+
+        # Once seeded, later starts leave the maintained counters alone
+        submit(user.id, 'Space Port')
+        db.init_database()
+        assert db.get_scene_submission_count(user.id, 'Space Port') == 2
+    print("✅ Counters are backfilled when an existing database is opened")
+
+if __name__ == "__main__":
+    print("🧪 Testing submission counters...")
+    test_counters_follow_create_and_delete()
+    test_scene_mastery_uses_counter()
+    test_repair_rebuilds_counters()
+    test_init_backfills_counters_on_existing_database()
+    print("🎉 All submission counter tests passed!")
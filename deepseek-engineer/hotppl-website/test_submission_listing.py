@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Test keyset-paginated submission listings
+"""
+
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from submission_listing import MAX_PAGE_SIZE, SORT_KEYS, InvalidCursor, encode_cursor, list_submissions
+
+SCENES = ['The Arrival', 'The Reveal', 'The Chase']
+TOOLS = ['runway', 'pika', 'sora', 'kling']
+
+def seed(count, seed=1):
+    """Submissions with tied vote counts and timestamps; returns them as listing dicts"""
+    rng = random.Random(seed)
+    users = [db.create_user(f'discord-{i}', f'user{i}') for i in range(5)]
+    for i in range(count):
+        db.create_submission(rng.choice(users).id, rng.choice(SCENES), f'Take {i}', '', 'http://x/v.mp4',
+                             rng.sample(TOOLS, rng.randint(0, 2)))
+    base = datetime(2026, 10, 1)
+    conn = sqlite3.connect(db.db_path)
+    ids = [row[0] for row in conn.execute('SELECT id FROM submissions')]
+    for sub_id in ids:
+        conn.execute('UPDATE submissions SET status = ?, vote_count = ?, created_at = ? WHERE id = ?',
+                     (rng.choice(['approved', 'approved', 'pending']), rng.randint(0, 5),
+                      base + timedelta(minutes=rng.randint(0, 30)), sub_id))
+    conn.commit()
+    rows = conn.execute('SELECT id, scene_name, tools_used, status, vote_count, created_at FROM submissions')
+    expected = [{'id': r[0], 'scene_name': r[1], 'tools_used': json.loads(r[2]), 'status': r[3],
+                 'vote_count': r[4], 'created_at': r[5]} for r in rows]
+    conn.close()
+    return expected
+
+def walk(limit, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = list_submissions(limit=limit, cursor=cursor, **filters)
+        ids += [item['id'] for item in page['submissions']]
+        pages += 1
+        cursor = page['pagination']['next_cursor']
+        if cursor is None:
+            return ids, pages
+
+def test_pages_cover_every_row_once_in_order():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        rows = seed(237)
+
+        for sort, columns in SORT_KEYS.items():
+            for filters in [{}, {'scene': 'The Reveal'}, {'tool': 'sora'}, {'scene': 'The Chase', 'tool': 'pika'},
+                            {'status': 'pending'}]:
+                status = filters.get('status', 'approved')
+                matching = [r for r in rows if r['status'] == status
+                            and r['scene_name'] == filters.get('scene', r['scene_name'])
+                            and ('tool' not in filters or filters['tool'] in r['tools_used'])]
+                expected = [r['id'] for r in sorted(matching, key=lambda r: [r[c] for c in columns], reverse=True)]
+                ids, pages = walk(10, sort=sort, **filters)
+                assert ids == expected, (sort, filters)
+                assert pages == max(1, -(-len(expected) // 10))  # no trailing empty page
+    print("✅ Pages walk every filtered row exactly once in sort order, ties broken by id")
+
+def test_cursor_stable_under_inserts_and_rejects_misuse():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        seed(50)
+        first = list_submissions(limit=20)
+        user = db.create_user('discord-new', 'newcomer')
+        newest = db.create_submission(user.id, 'The Arrival', 'Fresh', '', 'http://x/v.mp4', ['sora'])
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE submissions SET status = 'approved' WHERE id = ?", (newest.id,))
+        conn.commit()
+        conn.close()
+        rest = []
+        cursor = first['pagination']['next_cursor']
+        while cursor:
+            page = list_submissions(limit=20, cursor=cursor)
+            rest += [item['id'] for item in page['submissions']]
+            cursor = page['pagination']['next_cursor']
+        seen = [item['id'] for item in first['submissions']] + rest
+        assert len(seen) == len(set(seen)) and newest.id not in seen  # an OFFSET page 2 would repeat a row
+
+        for bad, sort in [('not-a-cursor!', 'recent'), (first['pagination']['next_cursor'], 'top'),
+                          (encode_cursor('top', [1]), 'top'), (encode_cursor('recent', [{}, 'x']), 'recent'),
+                          (encode_cursor('top', ['7', '2026-10-01', 'x']), 'top'),
+                          (encode_cursor('top', [True, '2026-10-01', 'x']), 'top'),
+                          (encode_cursor('top', [2 ** 70, '2026-10-01', 'x']), 'top')]:
+            try:
+                list_submissions(sort=sort, cursor=bad)
+                assert False, bad
+            except InvalidCursor:
+                pass
+
+        assert newest.id in walk(10, tool='sora')[0]
+        db.delete_submission(newest.id)
+        assert newest.id not in walk(10, tool='sora')[0]
+
+        import api_gateway
+        client = api_gateway.app.test_client()
+        body = client.get('/api/submissions?limit=1000&sort=top').get_json()
+        assert body['pagination']['limit'] == MAX_PAGE_SIZE and not body['pagination']['has_more']
+        votes = [item['vote_count'] for item in body['submissions']]
+        assert votes == sorted(votes, reverse=True)
+        assert client.get('/api/submissions?cursor=garbage').status_code == 400
+        forged = encode_cursor('recent', [{}, 'x'])
+        assert client.get(f'/api/submissions?cursor={forged}').status_code == 400
+        assert client.get('/api/submissions?sort=oldest').status_code == 400
+        assert client.get('/api/submissions?status=deleted').status_code == 400
+    print("✅ Inserts between pages cause no repeats; bad cursors, sorts and statuses rejected; limit capped")
+
+def test_query_plans_seek_an_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        conn = sqlite3.connect(db.db_path)
+        for columns, scene in [(SORT_KEYS['recent'], ''), (SORT_KEYS['top'], ''),
+                               (SORT_KEYS['recent'], 'AND scene_name = ?'), (SORT_KEYS['top'], 'AND scene_name = ?')]:
+            plan = ' '.join(row[-1] for row in conn.execute(f'''
+                EXPLAIN QUERY PLAN SELECT id FROM submissions WHERE status = ? {scene}
+                AND ({', '.join(columns)}) < ({', '.join('?' * len(columns))})
+                ORDER BY {', '.join(c + ' DESC' for c in columns)} LIMIT 21
+            ''', ['approved'] + (['x'] if scene else []) + [0] * len(columns)))
+            assert 'INDEX idx_submissions_' in plan and 'TEMP B-TREE' not in plan, plan
+        conn.close()
+    print("✅ Every sort and scene filter is an index range read with no sort step")
+
+def benchmark_deep_pages(submissions=200000, limit=20):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        rng = random.Random(5)
+        now = datetime.now()
+        conn = sqlite3.connect(db.db_path)
+        conn.execute('''
+            INSERT INTO users (id, discord_id, username, role, created_at, last_active)
+            VALUES ('u', 'd', 'u', 'earthling', ?, ?)
+        ''', (now, now))
+        conn.executemany('''
+            INSERT INTO submissions (id, user_id, scene_name, title, video_url, tools_used, status, created_at,
+                                     updated_at, vote_count)
+            VALUES (?, 'u', ?, 't', 'http://x/v.mp4', '[]', 'approved', ?, ?, ?)
+        ''', [(str(uuid.uuid4()), rng.choice(SCENES), when, when, rng.randint(0, 500))
+              for when in (now - timedelta(seconds=rng.randint(0, 86400 * 90)) for _ in range(submissions))])
+        conn.commit()
+
+        results = []
+        for depth in [1, 100, 5000]:
+            start = time.perf_counter()
+            conn.execute('''
+                SELECT s.id, u.username FROM submissions s JOIN users u ON s.user_id = u.id
+                WHERE s.status = 'approved' ORDER BY s.vote_count DESC, s.created_at DESC, s.id DESC
+                LIMIT ? OFFSET ?
+            ''', (limit, (depth - 1) * limit)).fetchall()
+            offset_ms = (time.perf_counter() - start) * 1000
+
+            last = conn.execute('''
+                SELECT vote_count, created_at, id FROM submissions WHERE status = 'approved'
+                ORDER BY vote_count DESC, created_at DESC, id DESC LIMIT 1 OFFSET ?
+            ''', ((depth - 1) * limit - 1,)).fetchone() if depth > 1 else None
+            cursor = encode_cursor('top', list(last)) if last else None
+            start = time.perf_counter()
+            list_submissions(sort='top', limit=limit, cursor=cursor)
+            keyset_ms = (time.perf_counter() - start) * 1000
+            results.append(f'page {depth}: OFFSET {offset_ms:.1f}ms vs keyset {keyset_ms:.1f}ms')
+        conn.close()
+
+    print(f"⏱️ {submissions} submissions, {limit} per page, sort=top: " + '; '.join(results))
+
+if __name__ == "__main__":
+    print("🧪 Testing submission listing...")
+    test_pages_cover_every_row_once_in_order()
+    test_cursor_stable_under_inserts_and_rejects_misuse()
+    test_query_plans_seek_an_index()
+    benchmark_deep_pages()
+    print("🎉 All submission listing tests passed!")
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Test the decayed vote-velocity trending index
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from database import db
+from trending import TrendingIndex
+
+HOUR = 3600.0
+START = 1_800_000_000.0
+
+def brute_force(votes, now, half_life):
+    scores = {}
+    for submission_id, when, weight in votes:
+        scores[submission_id] = scores.get(submission_id, 0.0) + weight * 2 ** (-(now - when) / half_life)
+    return scores
+
+def test_scores_match_decay_and_new_posts_rank():
+    index = TrendingIndex(half_life=6 * HOUR, clock=lambda: START)
+    votes = [('old-hit', START - 48 * HOUR + i * 60, 1.0) for i in range(40)]
+    votes += [('steady', START - i * HOUR, 1.0) for i in range(12)]
+    votes += [('brand-new', START - 30 - i, 1.0) for i in range(4)]
+    random.Random(1).shuffle(votes)  # arrival order does not matter
+    for submission_id, when, weight in votes:
+        index.record_vote(submission_id, when, weight)
+
+    expected = brute_force(votes, START, 6 * HOUR)
+    top = index.top(10, now=START)
+    assert [submission_id for submission_id, _ in top] == ['steady', 'brand-new', 'old-hit']
+    assert all(abs(score - expected[submission_id]) < 1e-9 for submission_id, score in top)
+    assert index.rank_of('brand-new') == 2 and index.rank_of('missing') is None
+    print(f"✅ Decayed scores exact; a 30-second-old post with 4 votes ({expected['brand-new']:.2f}) "
+          f"outranks 40 votes from two days ago ({expected['old-hit']:.2f})")
+
+def test_renormalize_prune_and_removal():
+    index = TrendingIndex(half_life=60, min_score=0.01, clock=lambda: START)
+    rng = random.Random(2)
+    votes = []
+    now = START
+    for step in range(4000):  # over 11 hours at a one-minute half-life
+        now += rng.uniform(0, 20)
+        submission_id = f'post-{rng.randint(0, 50)}'
+        votes.append((submission_id, now, 1.0))
+        index.record_vote(submission_id, now)
+    index.record_vote('post-0', now, weight=-1.0)
+    votes.append(('post-0', now, -1.0))
+
+    expected = {k: v for k, v in brute_force(votes, now, 60).items() if v >= 0.01}
+    top = index.top(100, now=now)
+    metrics = index.get_metrics()
+    assert metrics['renormalizations'] > 0 and metrics['pruned'] > 0
+    assert {submission_id for submission_id, _ in top} == set(expected)
+    assert all(abs(score - expected[submission_id]) < 1e-6 * max(1, expected[submission_id])
+               for submission_id, score in top)
+    assert index.top(100, now=now + 3600) == [] and index.keys == {}
+    print(f"✅ {metrics['renormalizations']} renormalizations keep scores exact; decayed posts pruned")
+
+def test_dashboard_and_vote_events():
+    from analytics_service import analytics_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        creator = db.create_user('discord-1', 'creator')
+        voters = [db.create_user(f'discord-v{i}', f'voter{i}') for i in range(30)]
+        subs = [db.create_submission(creator.id, 'The Arrival', f'Take {i}', '', 'http://x/v.mp4', [])
+                for i in range(4)]
+        now = datetime.now()
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE submissions SET status = 'approved' WHERE id != ?", (subs[3].id,))
+        votes = [(subs[0].id, now - timedelta(days=2), 25), (subs[1].id, now - timedelta(hours=1), 6),
+                 (subs[2].id, now - timedelta(hours=8), 9), (subs[3].id, now, 30)]
+        conn.executemany('''
+            INSERT INTO votes (id, submission_id, user_id, vote_type, created_at) VALUES (?, ?, ?, 'fire', ?)
+        ''', [(str(uuid.uuid4()), sub_id, voters[i].id, when) for sub_id, when, count in votes
+              for i in range(count)])
+        conn.commit()
+        conn.close()
+
+        before = analytics_service.get_dashboard_data()['trending']['trending_submissions']
+        for _ in range(8):
+            analytics_service.log_event('vote_cast', {'vote_type': 'fire'}, submission_id=subs[2].id)
+        after = analytics_service.get_trending_submissions()
+
+    assert [item['title'] for item in before] == ['Take 1', 'Take 2', 'Take 0']  # Take 3 is not approved
+    assert abs(before[0]['trending_score'] - 6 * 2 ** (-1 / 6)) < 0.01
+    assert [item['title'] for item in after][:2] == ['Take 2', 'Take 1']
+    print("✅ Dashboard trending rebuilt from votes; logged votes re-rank it live")
+
+def test_unapproved_leaders_do_not_starve_the_list():
+    from analytics_service import analytics_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        creator = db.create_user('discord-1', 'creator')
+        voters = [db.create_user(f'discord-v{i}', f'voter{i}') for i in range(20)]
+        subs = [db.create_submission(creator.id, 'The Arrival', f'Take {i}', '', 'http://x/v.mp4', [])
+                for i in range(9)]
+        now = datetime.now()
+        conn = sqlite3.connect(db.db_path)
+        # Seven pending posts outrank the two approved ones
+        conn.executemany("UPDATE submissions SET status = 'approved' WHERE id = ?", [(subs[7].id,), (subs[8].id,)])
+        conn.executemany('''
+            INSERT INTO votes (id, submission_id, user_id, vote_type, created_at) VALUES (?, ?, ?, 'fire', ?)
+        ''', [(str(uuid.uuid4()), sub.id, voters[v].id, now) for i, sub in enumerate(subs) for v in range(20 - i)])
+        conn.commit()
+        conn.close()
+
+        trending = analytics_service.get_trending_submissions(limit=2)
+        everything = analytics_service.get_trending_submissions(limit=5)
+
+    assert [item['title'] for item in trending] == ['Take 7', 'Take 8']
+    assert [item['title'] for item in everything] == ['Take 7', 'Take 8']  # index exhausted
+    print("✅ Trending reads past unapproved leaders until the list is full")
+
+def benchmark_trending(submissions=50000, votes=200000):
+    with tempfile.TemporaryDirectory() as tmp:
+        db.db_path = os.path.join(tmp, 'platform.db')
+        db.init_database()
+        rng = random.Random(3)
+        now = datetime.now()
+        ids = [str(uuid.uuid4()) for _ in range(submissions)]
+        created = [now - timedelta(minutes=rng.randint(1, 60 * 24 * 3)) for _ in ids]
+        conn = sqlite3.connect(db.db_path)
+        conn.execute('''
+            INSERT INTO users (id, discord_id, username, role, created_at, last_active)
+            VALUES ('u', 'd', 'u', 'earthling', ?, ?)
+        ''', (now, now))
+        conn.executemany('''
+            INSERT INTO submissions (id, user_id, scene_name, title, video_url, status, created_at, updated_at,
+                                     vote_count)
+            VALUES (?, 'u', 'The Arrival', 't', 'http://x/v.mp4', 'approved', ?, ?, ?)
+        ''', [(sub_id, when, when, rng.randint(0, 200)) for sub_id, when in zip(ids, created)])
+        conn.commit()
+
+        start = time.perf_counter()
+        conn.execute('''
+            SELECT s.id, s.title, s.scene_name, s.vote_count, u.username
+            FROM submissions s
+            JOIN users u ON s.user_id = u.id
+            WHERE s.created_at >= ? AND s.status = 'approved'
+            ORDER BY (s.vote_count / (julianday('now') - julianday(s.created_at))) DESC
+            LIMIT 5
+        ''', (now - timedelta(days=3),)).fetchall()
+        sql_ms = (time.perf_counter() - start) * 1000
+        conn.close()
+
+        index = TrendingIndex()
+        stream = [(rng.choice(ids), START + i * 0.5) for i in range(votes)]
+        start = time.perf_counter()
+        for sub_id, when in stream:
+            index.record_vote(sub_id, when)
+        vote_us = (time.perf_counter() - start) * 1e6 / votes
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            index.top(10, now=stream[-1][1])
+        top_us = (time.perf_counter() - start) * 1e6 / 1000
+
+    print(f"⏱️ {submissions} submissions: julianday ORDER BY {sql_ms:.0f}ms; index top-10 {top_us:.1f}µs, "
+          f"{vote_us:.1f}µs per vote over {index.get_metrics()['tracked_submissions']} tracked")
+
+if __name__ == "__main__":
+    print("🧪 Testing trending index...")
+    test_scores_match_decay_and_new_posts_rank()
+    test_renormalize_prune_and_removal()
+    test_dashboard_and_vote_events()
+    test_unapproved_leaders_do_not_starve_the_list()
+    benchmark_trending()
+    print("🎉 All trending tests passed!")
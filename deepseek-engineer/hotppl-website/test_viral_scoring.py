@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test table-driven viral scoring against the original per-platform formulas
+"""
+
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(__file__), 'core'))
+
+from viral_engine import CrossPlatformViralEngine, Platform, PostStatus, SocialPost, ViralMetric
+
+def reference_score(post):
+    """The if/elif scoring the table replaced"""
+    platform, metrics = post.platform, post.metrics
+    if platform == Platform.TIKTOK:
+        views = metrics.get(ViralMetric.VIEWS, 0)
+        likes = metrics.get(ViralMetric.LIKES, 0)
+        shares = metrics.get(ViralMetric.SHARES, 0)
+        engagement_rate = (likes + shares * 3) / max(views, 1)
+        return min(1.0, (views / 100000) * 0.6 + engagement_rate * 0.4)
+    if platform == Platform.INSTAGRAM:
+        likes = metrics.get(ViralMetric.LIKES, 0)
+        comments = metrics.get(ViralMetric.COMMENTS, 0)
+        shares = metrics.get(ViralMetric.SHARES, 0)
+        return min(1.0, (likes + comments * 2 + shares * 3) / 50000)
+    if platform == Platform.YOUTUBE_SHORTS:
+        views = metrics.get(ViralMetric.VIEWS, 0)
+        likes = metrics.get(ViralMetric.LIKES, 0)
+        return min(1.0, (views / 100000) * 0.7 + (likes / views) * 0.3 if views > 0 else 0)
+    return min(1.0, sum(metrics.values()) / 10000)
+
+def reference_is_viral(engine, post):
+    for metric_name, threshold in engine.viral_thresholds.get(post.platform, {}).items():
+        metric_enum = ViralMetric(metric_name) if metric_name in [m.value for m in ViralMetric] else None
+        if metric_enum and post.metrics.get(metric_enum, 0) >= threshold:
+            return True
+    return post.viral_score >= 0.8
+
+def random_posts(count, seed=5):
+    rng = random.Random(seed)
+    platforms = list(Platform)
+    posts = []
+    for i in range(count):
+        scale = rng.choice([0, 10, 1000, 50_000, 400_000])
+        metrics = {metric: rng.randint(0, scale) for metric in ViralMetric if rng.random() < 0.8}
+        posts.append(SocialPost(id=str(i), submission_id='s', platform=rng.choice(platforms), content='',
+                                media_url='', hashtags=[], scheduled_time=None, posted_time=None,
+                                status=PostStatus.POSTED, platform_post_id=str(i), metrics=metrics,
+                                viral_score=0.0, created_at=datetime.now()))
+    return posts
+
+def test_scalar_parity():
+    engine = CrossPlatformViralEngine()
+    for post in random_posts(5000):
+        expected = reference_score(post)
+        post.viral_score = engine.calculate_viral_score(post)
+        assert abs(post.viral_score - expected) <= 1e-12, (post.platform, post.metrics)
+        post.viral_score = expected
+        assert engine.is_viral(post) == reference_is_viral(engine, post)
+    print("✅ Table-driven scalar scoring matches the per-platform formulas")
+
+def test_batch_parity():
+    engine = CrossPlatformViralEngine()
+    posts = random_posts(20000, seed=6)
+    expected_scores = np.array([reference_score(post) for post in posts])
+
+    viral = engine.score_posts(posts)
+    assert np.allclose([post.viral_score for post in posts], expected_scores, rtol=0, atol=1e-12)
+    assert viral == [reference_is_viral(engine, post) for post in posts]
+    assert any(viral) and not all(viral)
+    print(f"✅ Batch scoring matches on {len(posts)} posts ({sum(viral)} viral)")
+
+def test_edge_cases_and_recompile():
+    engine = CrossPlatformViralEngine()
+    post = random_posts(1)[0]
+    post.platform, post.metrics = Platform.YOUTUBE_SHORTS, {ViralMetric.LIKES: 500}
+    assert engine.calculate_viral_score(post) == 0.0  # no views yet
+    post.platform, post.metrics = Platform.TIKTOK, {ViralMetric.LIKES: 3}
+    assert engine.calculate_viral_score(post) == reference_score(post) == 1.0  # engagement over max(views, 1)
+
+    post.platform, post.metrics, post.viral_score = Platform.TWITTER, {ViralMetric.VIEWS: 600}, 0.0
+    assert not engine.is_viral(post)
+    engine.viral_thresholds[Platform.TWITTER]['views'] = 500
+    engine.viral_scorer.compile()
+    assert engine.is_viral(post) and engine.score_posts([post]) == [True]
+    print("✅ Missing views, engagement floor and recompiled thresholds handled")
+
+def benchmark_scoring(count=50_000):
+    engine = CrossPlatformViralEngine()
+    posts = random_posts(count, seed=7)
+
+    start = time.perf_counter()
+    for post in posts:
+        post.viral_score = reference_score(post)
+        reference_is_viral(engine, post)
+    loop_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    engine.score_posts(posts)
+    batch_ms = (time.perf_counter() - start) * 1000
+
+    scorer = engine.viral_scorer
+    codes = np.array([scorer.platform_code(post.platform) for post in posts])
+    values = np.array([scorer.vector(post.metrics) for post in posts])
+    start = time.perf_counter()
+    scorer.score_batch(codes, values)
+    array_ms = (time.perf_counter() - start) * 1000
+
+    print(f"⏱️ {count} posts: per-post loop {loop_ms:.0f}ms, score_posts {batch_ms:.0f}ms, "
+          f"score_batch on prepared arrays {array_ms:.1f}ms")
+
+if __name__ == "__main__":
+    print("🧪 Testing viral scoring...")
+    test_scalar_parity()
+    test_batch_parity()
+    test_edge_cases_and_recompile()
+    benchmark_scoring()
+    print("🎉 All viral scoring tests passed!")